@@ -7,7 +7,11 @@ from ie_capstone.llm.judge import LLMJudge
 from ie_capstone.llm.socratic_lm import SocraticLM
 from ie_capstone.logging.session_logger import SessionLogger
 from ie_capstone.models import (
+    DialogueTurn,
     ExperimentSession,
+    JudgeCall,
+    JudgeVerdict,
+    LeakEvent,
     Message,
     PersonaType,
     Problem,
@@ -16,8 +20,12 @@ from ie_capstone.models import (
 
 __all__ = [
     "ClaudeClient",
+    "DialogueTurn",
     "ExperimentSession",
+    "JudgeCall",
+    "JudgeVerdict",
     "LLMJudge",
+    "LeakEvent",
     "Message",
     "PersonaType",
     "Problem",
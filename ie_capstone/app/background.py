@@ -0,0 +1,274 @@
+"""Background judging so code submission does not block the UI."""
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from ie_capstone.config import (
+    JUDGE_BACKGROUND_WORKERS,
+    SPECULATIVE_CACHE_SIZE,
+    SPECULATIVE_IDLE_SECONDS,
+    SPECULATIVE_WORKERS,
+)
+from ie_capstone.dataset.reference import code_fingerprint, problem_version
+from ie_capstone.llm.judge import LLMJudge
+from ie_capstone.logging.session_logger import SessionLogger
+from ie_capstone.models import ExperimentSession, JudgeVerdict, Problem
+
+logger = logging.getLogger(__name__)
+
+# (problem ID, problem version, code fingerprint): a judgment is only reused for the same content
+# of the problem, so one made before a hot reload never answers for the edited problem
+JudgmentKey = tuple[int, str, str]
+
+
+def _judgment_key(problem: Problem, code: str) -> JudgmentKey:
+    """Get the key a judgment of code is stored under."""
+    return (problem.id, problem_version(problem), code_fingerprint(problem.id, code))
+
+
+class BackgroundJudge:
+    """
+    Runs judge evaluations on a shared thread pool.
+    Each verdict is logged and the session saved as soon as it arrives; a judge that fails (e.g.,
+    on an API error) is logged and recorded as an incorrect verdict decided by "error".
+    """
+
+    def __init__(self, logger: SessionLogger, max_workers: int = JUDGE_BACKGROUND_WORKERS):
+        """
+        Initialize the background judge.
+
+        Args:
+            logger: Session logger that stores verdicts
+            max_workers: Maximum submissions judged concurrently (across all sessions)
+        """
+        self.logger = logger
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="judge")
+        self._outstanding = 0
+        self._outstanding_lock = threading.Lock()
+
+    @property
+    def outstanding(self) -> int:
+        """Number of submissions still being judged."""
+        return self._outstanding
+
+    def submit(
+        self,
+        judge: LLMJudge,
+        session: ExperimentSession,
+        problem: Problem,
+        problem_id: int,
+        code: str,
+        precomputed: Future[JudgeVerdict] | None = None,
+    ) -> Future[JudgeVerdict]:
+        """
+        Record a submission and start judging it in the background.
+
+        Args:
+            judge: Judge for this session
+            session: The experiment session
+            problem: The problem being submitted
+            problem_id: ID of the problem (1-6)
+            code: Student's submitted code
+            precomputed: Speculative judgment of the same code to reuse instead of judging again
+
+        Returns:
+            Future resolving to the verdict once it has been logged
+        """
+        self.logger.log_submission(session, problem_id, code)
+        self.logger.save_session(session)
+
+        if precomputed is not None and precomputed.done() and precomputed.exception() is None:
+            self._log_verdict(session, problem_id, code, precomputed.result())
+            return precomputed
+
+        with self._outstanding_lock:
+            self._outstanding += 1
+        future = self.executor.submit(self._judge_and_log, judge, session, problem, problem_id, code, precomputed)
+        future.add_done_callback(self._finish)
+        return future
+
+    def _finish(self, _future: Future) -> None:
+        with self._outstanding_lock:
+            self._outstanding -= 1
+
+    def _judge_and_log(
+        self,
+        judge: LLMJudge,
+        session: ExperimentSession,
+        problem: Problem,
+        problem_id: int,
+        code: str,
+        precomputed: Future[JudgeVerdict] | None = None,
+    ) -> JudgeVerdict:
+        """Judge a submission (or wait for its speculative judgment) and store the verdict in the session log."""
+        # A failed speculative judgment is simply redone
+        if precomputed is not None and precomputed.exception() is None:
+            verdict = precomputed.result()
+        else:
+            try:
+                verdict = judge.evaluate(problem, code)
+            except Exception:
+                logger.exception("Judging session %s problem %s failed", session.session_id, problem_id)
+                verdict = JudgeVerdict(is_correct=False, decided_by="error")
+        self._log_verdict(session, problem_id, code, verdict)
+        return verdict
+
+    def _log_verdict(self, session: ExperimentSession, problem_id: int, code: str, verdict: JudgeVerdict) -> None:
+        """Store a verdict and save the session."""
+        self.logger.log_final_submission(
+            session, problem_id, code, verdict.is_correct, verdict.scores, verdict.decided_by, verdict.calls
+        )
+        self.logger.save_session(session)
+
+    @staticmethod
+    def wait_for(futures: list[Future], timeout: float | None = None) -> None:
+        """
+        Block until the outstanding judgments finish.
+
+        Args:
+            futures: Futures returned by submit (finished ones return immediately)
+            timeout: Optional maximum seconds to wait
+        """
+        pending = [future for future in futures if not future.done()]
+        if pending:
+            wait(pending, timeout=timeout)
+
+
+class SpeculativeJudge:
+    """
+    Judges editor contents ahead of submission.
+
+    When a participant's code changes and then stays unchanged for idle_seconds, it is judged
+    on a separate low-priority pool (deferred while submitted code is being judged). Judgments
+    are deduplicated by problem version and code fingerprint, so submitting code that was already
+    judged reuses the verdict instead of calling the judge again. A session only has state here
+    while its idle timer is pending; firing, cancelling or claiming removes it.
+    """
+
+    def __init__(
+        self,
+        background_judge: BackgroundJudge,
+        idle_seconds: float = SPECULATIVE_IDLE_SECONDS,
+        max_workers: int = SPECULATIVE_WORKERS,
+        cache_size: int = SPECULATIVE_CACHE_SIZE,
+    ):
+        """
+        Initialize the speculative judge.
+
+        Args:
+            background_judge: Foreground judge whose work takes priority
+            idle_seconds: Seconds the code must stay unchanged before it is judged
+            max_workers: Concurrent speculative judgments
+            cache_size: Maximum judgments kept
+        """
+        self.background_judge = background_judge
+        self.idle_seconds = idle_seconds
+        self.cache_size = cache_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative-judge")
+        self._judgments: OrderedDict[JudgmentKey, Future[JudgeVerdict]] = OrderedDict()
+        # Pending idle timer per session, with the token its callback checks to tell it is still current
+        self._timers: dict[str, tuple[object, threading.Timer]] = {}
+        self._lock = threading.Lock()
+
+    def on_code_change(self, session_id: str, judge: LLMJudge, problem: Problem, code: str) -> None:
+        """
+        Restart the idle timer for a participant's editor.
+
+        Args:
+            session_id: Session the editor belongs to
+            judge: Judge for this session
+            problem: Problem being worked on
+            code: Current editor contents
+        """
+        with self._lock:
+            self._schedule(session_id, judge, problem, code)
+
+    def cancel(self, session_id: str) -> None:
+        """
+        Stop waiting on a participant's editor (e.g., after submission).
+
+        Args:
+            session_id: Session the editor belongs to
+        """
+        with self._lock:
+            pending = self._timers.pop(session_id, None)
+        if pending is not None:
+            pending[1].cancel()
+
+    def claim(self, session_id: str, problem: Problem, code: str) -> Future[JudgeVerdict] | None:
+        """
+        Stop waiting on a participant's editor and get the judgment of their submitted code.
+
+        Args:
+            session_id: Session submitting the code
+            problem: The problem being submitted
+            code: Submitted code
+
+        Returns:
+            Future for the speculative judgment (possibly still running), or None
+        """
+        self.cancel(session_id)
+        return self.lookup(problem, code)
+
+    def lookup(self, problem: Problem, code: str) -> Future[JudgeVerdict] | None:
+        """
+        Get the speculative judgment of code, if one was started.
+
+        Args:
+            problem: The problem being submitted
+            code: Submitted code
+
+        Returns:
+            Future for the judgment (possibly still running), or None
+        """
+        with self._lock:
+            return self._judgments.get(_judgment_key(problem, code))
+
+    def discard_problems(self, problem_ids: Iterable[int]) -> int:
+        """
+        Drop the judgments made for some problems (e.g., after they were edited).
+
+        Args:
+            problem_ids: IDs of the problems
+
+        Returns:
+            Number of judgments dropped
+        """
+        problem_ids = set(problem_ids)
+        with self._lock:
+            keys = [key for key in self._judgments if key[0] in problem_ids]
+            for key in keys:
+                del self._judgments[key]
+        return len(keys)
+
+    def _schedule(self, session_id: str, judge: LLMJudge, problem: Problem, code: str) -> None:
+        """Replace the session's idle timer. Must be called with the lock held."""
+        pending = self._timers.pop(session_id, None)
+        if pending is not None:
+            pending[1].cancel()
+        token = object()
+        timer = threading.Timer(self.idle_seconds, self._on_idle, args=(session_id, token, judge, problem, code))
+        timer.daemon = True
+        self._timers[session_id] = (token, timer)
+        timer.start()
+
+    def _on_idle(self, session_id: str, token: object, judge: LLMJudge, problem: Problem, code: str) -> None:
+        """Judge code that stayed unchanged, unless submitted code is waiting on the judge."""
+        key = _judgment_key(problem, code)
+        with self._lock:
+            pending = self._timers.get(session_id)
+            if pending is None or pending[0] is not token:
+                return  # Edited or cancelled since this timer was scheduled
+            if self.background_judge.outstanding > 0:
+                self._schedule(session_id, judge, problem, code)
+                return
+            del self._timers[session_id]
+            if key in self._judgments:
+                self._judgments.move_to_end(key)
+                return
+            self._judgments[key] = self.executor.submit(judge.evaluate, problem, code)
+            while len(self._judgments) > self.cache_size:
+                self._judgments.popitem(last=False)
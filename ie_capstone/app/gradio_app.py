@@ -1,13 +1,29 @@
 """Gradio application for the IE Capstone Experiment."""
 
 from datetime import datetime
+from functools import partial
 
 import gradio as gr
 
-from ie_capstone.config import GOOGLE_FORM_URL, TOTAL_PROBLEMS
+from ie_capstone.app.background import BackgroundJudge, SpeculativeJudge
+from ie_capstone.config import (
+    CACHE_WARMING,
+    DATASET_HOT_RELOAD,
+    GOOGLE_FORM_URL,
+    OPENING_BANK,
+    RESPONSE_CACHE,
+    SPECULATIVE_JUDGING,
+    TOTAL_PROBLEMS,
+)
+from ie_capstone.dataset.bank import DatasetWatcher, ProblemBank
 from ie_capstone.dataset.parser import load_all_problems
+from ie_capstone.llm.cache_warmer import PromptCacheWarmer
 from ie_capstone.llm.client import ClaudeClient
 from ie_capstone.llm.judge import LLMJudge
+from ie_capstone.llm.leak_guard import StreamReset
+from ie_capstone.llm.openers import OpeningBank, load_opening_bank
+from ie_capstone.llm.prompt_registry import socratic_prompts
+from ie_capstone.llm.response_cache import ResponseCache
 from ie_capstone.llm.socratic_lm import SocraticLM
 from ie_capstone.logging.session_logger import SessionLogger
 from ie_capstone.models import PersonaType
@@ -29,6 +45,59 @@ def get_participant_id_from_request(request: gr.Request) -> str:
     return "anonymous"
 
 
+def watch_problem_bank(
+    problem_bank: ProblemBank,
+    cache_warmer: PromptCacheWarmer | None,
+    response_cache: ResponseCache | None,
+    speculative_judge: SpeculativeJudge | None,
+) -> None:
+    """Invalidate the enabled caches of edited problems on reload, and poll the dataset if hot reload is on."""
+    if cache_warmer is not None:
+        problem_bank.subscribe(lambda problems, _: cache_warmer.set_problems(problems))
+    if response_cache is not None:
+        problem_bank.subscribe(lambda _, changed: response_cache.discard_problems(p.id for p in changed))
+    if speculative_judge is not None:
+        problem_bank.subscribe(lambda _, changed: speculative_judge.discard_problems(p.id for p in changed))
+    if DATASET_HOT_RELOAD:
+        DatasetWatcher(problem_bank).start()
+
+
+def warm_problem_start(cache_warmer: PromptCacheWarmer | None, persona: PersonaType, problem_index: int) -> None:
+    """Warm the started problem's tutor prompt and the next one's, if cache warming is enabled."""
+    if cache_warmer is not None:
+        cache_warmer.on_problem_start(persona, problem_index)
+
+
+def handle_code_change(speculative_judge: SpeculativeJudge, code: str, state: dict):
+    """Restart the idle timer for speculative judging of the editor contents."""
+    problem = state["problems"][state["current_problem_idx"]]
+    speculative_judge.on_code_change(state["session"].session_id, state["judge"], problem, code)
+
+
+def generate_results_summary(session) -> str:
+    """Generate final results summary."""
+    success_rate = session.success_rate
+    avg_turns = session.average_turns
+    total_correct = sum(1 for a in session.problem_attempts if a.is_correct)
+
+    results = f"""
+### 실험 결과
+
+| 항목 | 값 |
+|------|-----|
+| 정답 문제 수 | {total_correct} / {TOTAL_PROBLEMS} |
+| 정답률 | {success_rate:.1%} |
+| 평균 대화 턴 수 | {avg_turns:.1f} |
+
+---
+
+**세션 ID:** `{session.session_id}`
+
+실험에 참여해 주셔서 감사합니다!
+"""
+    return results
+
+
 def create_app() -> gr.Blocks:
     """
     Create Gradio app for the experiment.
@@ -40,11 +109,20 @@ def create_app() -> gr.Blocks:
     Returns:
         Gradio Blocks app
     """
-    # Load problems
-    problems = load_all_problems()
+    # Load problems and render every persona-problem tutor prompt once
+    problem_bank = ProblemBank(load_all_problems())
+    socratic_prompts.register(problem_bank.problems)
 
     # Initialize components (will be set per session)
     logger = SessionLogger()
+    background_judge = BackgroundJudge(logger)
+    speculative_judge = SpeculativeJudge(background_judge) if SPECULATIVE_JUDGING else None
+    cache_warmer = PromptCacheWarmer(ClaudeClient(), problem_bank.problems).start() if CACHE_WARMING else None
+    opening_bank = OpeningBank(load_opening_bank()) if OPENING_BANK else None
+    response_cache = ResponseCache() if RESPONSE_CACHE else None
+
+    # Hot reload: edited problems reach new sessions; live sessions keep the snapshot they started with
+    watch_problem_bank(problem_bank, cache_warmer, response_cache, speculative_judge)
 
     with gr.Blocks(
         title="IE Capstone 실험 - Python 디버깅",
@@ -110,6 +188,8 @@ def create_app() -> gr.Blocks:
             """Initialize experiment session on page load."""
             persona = get_persona_from_request(request)
             participant_id = get_participant_id_from_request(request)
+            # This session's problems, unaffected by later reloads
+            problems = problem_bank.problems
 
             # Create session
             session = logger.create_session(participant_id, persona)
@@ -117,11 +197,21 @@ def create_app() -> gr.Blocks:
             # Initialize Claude client and components
             client = ClaudeClient()
             judge = LLMJudge(client)
-            socratic_lm = SocraticLM(client, persona, problems[0])
+            socratic_lm = SocraticLM(
+                client,
+                persona,
+                problems[0],
+                on_summary=partial(logger.log_summary, session),
+                opening_bank=opening_bank,
+                response_cache=response_cache,
+                on_leak=partial(logger.log_leak, session),
+            )
+            # Warm this problem's tutor prompt (if the refresh loop let it expire) and the next one's
+            warm_problem_start(cache_warmer, persona, 0)
 
             # Get initial greeting
             greeting = socratic_lm.get_initial_greeting()
-            logger.log_message(session, 1, "assistant", greeting)
+            logger.log_message(session, 1, "assistant", greeting, socratic_lm.prompt_hash)
 
             # Prepare initial state
             new_state = {
@@ -131,6 +221,7 @@ def create_app() -> gr.Blocks:
                 "socratic_lm": socratic_lm,
                 "current_problem_idx": 0,
                 "problems": problems,
+                "pending_judges": [],
             }
 
             # Format problem display
@@ -168,7 +259,7 @@ def create_app() -> gr.Blocks:
 
             # Log user message with current code context
             log_content = f"[현재 코드]\n```python\n{current_code}\n```\n\n[메시지]\n{user_message}"
-            logger.log_message(session, problem_id, "user", log_content)
+            logger.log_message(session, problem_id, "user", log_content, socratic_lm.prompt_hash)
 
             # Add user message to chat history immediately
             chat_history = [
@@ -180,12 +271,13 @@ def create_app() -> gr.Blocks:
             # Stream response (pass current code to AI)
             full_response = ""
             for chunk in socratic_lm.stream_response(user_message, current_code):
-                full_response += chunk
+                # The leak guard may discard a cut-off reply before streaming its regeneration
+                full_response = "" if isinstance(chunk, StreamReset) else full_response + chunk
                 chat_history[-1]["content"] = full_response
                 yield chat_history, state, ""
 
             # Log assistant response after streaming completes
-            logger.log_message(session, problem_id, "assistant", full_response)
+            logger.log_message(session, problem_id, "assistant", full_response, socratic_lm.prompt_hash)
 
             # Save session after each message
             logger.save_session(session)
@@ -193,7 +285,7 @@ def create_app() -> gr.Blocks:
             yield chat_history, state, ""
 
         def handle_code_submit(code: str, chat_history: list, state: dict):
-            """Handle final code submission for current problem."""
+            """Handle final code submission: judge in the background and move on immediately."""
             session = state["session"]
             judge = state["judge"]
             problems_list = state["problems"]
@@ -201,23 +293,23 @@ def create_app() -> gr.Blocks:
             problem = problems_list[current_idx]
             problem_id = current_idx + 1
 
-            # Evaluate the fix
-            is_correct, scores = judge.evaluate_fix(problem, code)
+            # Reuse a speculative judgment of the same code, if one was started
+            precomputed = None
+            if speculative_judge is not None:
+                precomputed = speculative_judge.claim(session.session_id, problem, code)
 
-            # Log final submission
-            logger.log_final_submission(session, problem_id, code, is_correct, scores)
-
-            # Save session
-            logger.save_session(session)
+            # Judge in the background; the verdict is logged when it arrives
+            state["pending_judges"].append(
+                background_judge.submit(judge, session, problem, problem_id, code, precomputed)
+            )
 
-            # Prepare feedback
-            if is_correct:
-                feedback = f"### 문제 {problem_id} 완료!\n\n제출한 코드가 **정답**으로 평가되었습니다."
-            else:
-                feedback = f"### 문제 {problem_id} 완료!\n\n제출한 코드가 **오답**으로 평가되었습니다."
+            feedback = f"### 문제 {problem_id} 제출 완료!\n\n답안이 제출되었습니다. 채점 결과는 실험 종료 후 확인할 수 있습니다."
 
             # Check if this was the last problem
             if current_idx >= TOTAL_PROBLEMS - 1:
+                # Wait only for judges still outstanding before summarizing
+                background_judge.wait_for(state["pending_judges"])
+
                 # Experiment complete
                 session.end_time = datetime.now()
                 logger.save_session(session)
@@ -230,11 +322,12 @@ def create_app() -> gr.Blocks:
                     gr.update(visible=True),
                     results_md,
                     "**진행 상황: 완료!**",
+                    gr.update(),
+                    gr.update(value=code, interactive=False),
+                    chat_history,
                     gr.update(interactive=False),
                     gr.update(interactive=False),
                     gr.update(interactive=False),
-                    chat_history,
-                    code,
                 )
 
             # Move to next problem
@@ -244,10 +337,11 @@ def create_app() -> gr.Blocks:
 
             # Update Socratic LM for new problem
             state["socratic_lm"].set_problem(next_problem)
+            warm_problem_start(cache_warmer, session.persona, next_idx)
 
             # Get new greeting
             new_greeting = state["socratic_lm"].get_initial_greeting()
-            logger.log_message(session, next_idx + 1, "assistant", new_greeting)
+            logger.log_message(session, next_idx + 1, "assistant", new_greeting, state["socratic_lm"].prompt_hash)
 
             # New chat history
             new_chat = [{"role": "assistant", "content": new_greeting}]
@@ -269,31 +363,11 @@ def create_app() -> gr.Blocks:
                 problem_md,
                 next_problem.buggy_code,
                 new_chat,
+                gr.update(),
+                gr.update(),
+                gr.update(),
             )
 
-        def generate_results_summary(session) -> str:
-            """Generate final results summary."""
-            success_rate = session.success_rate
-            avg_turns = session.average_turns
-            total_correct = sum(1 for a in session.problem_attempts if a.is_correct)
-
-            results = f"""
-### 실험 결과
-
-| 항목 | 값 |
-|------|-----|
-| 정답 문제 수 | {total_correct} / {TOTAL_PROBLEMS} |
-| 정답률 | {success_rate:.1%} |
-| 평균 대화 턴 수 | {avg_turns:.1f} |
-
----
-
-**세션 ID:** `{session.session_id}`
-
-실험에 참여해 주셔서 감사합니다!
-"""
-            return results
-
         # Event handlers
         app.load(
             initialize_session,
@@ -322,6 +396,15 @@ def create_app() -> gr.Blocks:
             outputs=[chatbot, state, msg_input],
         )
 
+        # Speculative judging while the participant edits (opt-in)
+        if speculative_judge is not None:
+            code_editor.input(
+                partial(handle_code_change, speculative_judge),
+                inputs=[code_editor, state],
+                outputs=None,
+                queue=False,
+            )
+
         # Code submission with multiple outputs based on whether experiment is complete
         submit_btn.click(
             handle_code_submit,
@@ -335,6 +418,9 @@ def create_app() -> gr.Blocks:
                 problem_display,
                 code_editor,
                 chatbot,
+                submit_btn,
+                msg_input,
+                send_btn,
             ],
         )
 
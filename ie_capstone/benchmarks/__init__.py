@@ -0,0 +1,5 @@
+"""Benchmarks for measuring judge speed, cost and accuracy, and system prompt size.
+
+Each module is run with `python -m ie_capstone.benchmarks.<name>`, so nothing is imported here:
+preloading a module would make runpy warn when it is then executed as __main__.
+"""
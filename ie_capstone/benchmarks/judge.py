@@ -0,0 +1,360 @@
+"""Judge benchmark: latency, API cost and agreement with labels on a fixed corpus.
+
+Usage:
+    python -m ie_capstone.benchmarks.judge build-corpus
+    python -m ie_capstone.benchmarks.judge run --config baseline --config cascade
+
+The corpus is a JSONL file of labeled submissions. `build-corpus` seeds it from the dataset
+(reference solutions are correct, buggy code is incorrect, partial fixes are labeled by the
+problem's unit tests) and from the `final_code` of saved session logs, also labeled by the unit
+tests. Labels never come from differential fuzzing, so the `fuzz` configuration is not scored
+against its own output; the `local-tests` configuration runs the labeling tests, so its report
+leaves the unit-test-labeled cases out. Hand-labeled cases can be appended to the file and are
+kept when the corpus is rebuilt.
+`run` judges every case with each named configuration and writes one JSON report per run.
+"""
+
+import argparse
+import itertools
+import json
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+from ie_capstone.config import BENCHMARK_CORPUS_PATH, BENCHMARK_RESULTS_DIR, JUDGE_ITERATIONS, LOGS_DIR
+from ie_capstone.dataset.reference import apply_fixes, code_fingerprint, normalize_code
+from ie_capstone.grading.runner import run_unit_tests
+from ie_capstone.llm.client import USAGE_FIELDS, ClaudeClient
+from ie_capstone.llm.judge import LLMJudge
+from ie_capstone.llm.rejudge import iter_session_logs
+from ie_capstone.models import Problem
+
+
+@dataclass
+class BenchmarkCase:
+    """A labeled submission."""
+
+    problem_id: int
+    code: str
+    label: bool
+    source: str
+
+    @property
+    def case_id(self) -> str:
+        """Identifier shared by submissions with the same normalized AST."""
+        return code_fingerprint(self.problem_id, self.code)
+
+
+@dataclass
+class JudgeConfig:
+    """A judge configuration to benchmark."""
+
+    name: str
+    iterations: int = JUDGE_ITERATIONS
+    parallel: bool = False
+    cascade: bool = False
+    local_tests: bool = False
+    fuzzing: bool = False
+    reference_match: bool = True
+    prompt_variant: str = "full"
+
+    def build_judge(self, client: ClaudeClient) -> LLMJudge:
+        """Create a judge with this configuration."""
+        return LLMJudge(
+            client,
+            use_reference_match=self.reference_match,
+            use_local_tests=self.local_tests,
+            use_fuzzing=self.fuzzing,
+            parallel=self.parallel,
+            cascade=self.cascade,
+            prompt_variant=self.prompt_variant,
+        )
+
+
+# Named configurations selectable with --config
+JUDGE_CONFIGS = {
+    config.name: config
+    for config in [
+        JudgeConfig("baseline"),
+        JudgeConfig("llm-only", reference_match=False),
+        JudgeConfig("parallel", parallel=True),
+        JudgeConfig("single", iterations=1),
+        JudgeConfig("cascade", cascade=True),
+        JudgeConfig("local-tests", local_tests=True),
+        JudgeConfig("fuzz", fuzzing=True),
+        JudgeConfig("diff", prompt_variant="diff"),
+        JudgeConfig("llm-only-diff", reference_match=False, prompt_variant="diff"),
+    ]
+}
+
+
+# Generated case sources labeled by running the problem's unit tests
+UNIT_TEST_LABELED_SOURCES = frozenset({"partial_fix", "logs"})
+
+
+def load_corpus(path: Path | None = None) -> list[BenchmarkCase]:
+    """
+    Load a benchmark corpus.
+
+    Args:
+        path: Optional path to the JSONL file (defaults to BENCHMARK_CORPUS_PATH)
+
+    Returns:
+        Labeled cases (empty if the file does not exist)
+    """
+    path = path or BENCHMARK_CORPUS_PATH
+    if not path.exists():
+        return []
+    return [BenchmarkCase(**json.loads(line)) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def save_corpus(cases: list[BenchmarkCase], path: Path | None = None) -> Path:
+    """
+    Save a benchmark corpus.
+
+    Args:
+        cases: Labeled cases
+        path: Optional path to the JSONL file (defaults to BENCHMARK_CORPUS_PATH)
+
+    Returns:
+        Path to saved file
+    """
+    path = path or BENCHMARK_CORPUS_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(asdict(case), ensure_ascii=False) + "\n" for case in cases), encoding="utf-8")
+    return path
+
+
+def _unit_test_label(problem: Problem, code: str) -> bool | None:
+    """Label code by the problem's unit tests, or None if the problem has none."""
+    return run_unit_tests(code, problem.unit_tests).passed if problem.unit_tests else None
+
+
+def dataset_cases(problem: Problem) -> list[BenchmarkCase]:
+    """
+    Derive labeled cases from a problem's dataset entry.
+
+    Args:
+        problem: The debugging problem
+
+    Returns:
+        Reference solutions (correct), the buggy code (incorrect), and every partial
+        combination of the expected fixes, labeled by the unit tests
+    """
+    cases = [BenchmarkCase(problem.id, code, True, "reference") for code in problem.reference_solutions]
+    cases.append(BenchmarkCase(problem.id, problem.buggy_code, False, "buggy"))
+
+    fixes = problem.expected_fixes
+    references = {normalize_code(code) for code in problem.reference_solutions}
+    for size in range(1, len(fixes)):
+        for subset in itertools.combinations(fixes, size):
+            code = apply_fixes(problem.buggy_code, list(subset))
+            if code is None or normalize_code(code) in references:
+                continue
+            label = _unit_test_label(problem, code)
+            if label is not None:
+                cases.append(BenchmarkCase(problem.id, code, label, "partial_fix"))
+    return cases
+
+
+def log_cases(problems: dict[int, Problem], logs_dir: Path) -> list[BenchmarkCase]:
+    """
+    Derive labeled cases from saved session logs.
+
+    Args:
+        problems: Problems keyed by ID
+        logs_dir: Directory containing session JSON files
+
+    Returns:
+        Submitted final_code labeled by the unit tests (problems without unit tests are skipped)
+    """
+    cases = []
+    for _, session in iter_session_logs(logs_dir):
+        for attempt in session.get("problem_attempts", []):
+            problem = problems.get(attempt["problem_id"])
+            code = attempt.get("final_code", "")
+            if problem is None or not code.strip():
+                continue
+            label = _unit_test_label(problem, code)
+            if label is not None:
+                cases.append(BenchmarkCase(problem.id, code, label, "logs"))
+    return cases
+
+
+def build_corpus(problems: list[Problem], logs_dir: Path, existing: list[BenchmarkCase]) -> list[BenchmarkCase]:
+    """
+    Build a corpus from the dataset and session logs, keeping hand-labeled cases.
+
+    Args:
+        problems: All problems
+        logs_dir: Directory containing session JSON files
+        existing: Current corpus (cases from sources other than the generated ones are kept)
+
+    Returns:
+        Cases deduplicated by normalized AST, in order of first appearance
+    """
+    generated_sources = {"reference", "buggy", "partial_fix", "logs"}
+    cases = [case for case in existing if case.source not in generated_sources]
+    for problem in problems:
+        cases.extend(dataset_cases(problem))
+    cases.extend(log_cases({problem.id: problem for problem in problems}, logs_dir))
+
+    unique: dict[str, BenchmarkCase] = {}
+    for case in cases:
+        unique.setdefault(case.case_id, case)
+    return list(unique.values())
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Compute a percentile with linear interpolation.
+
+    Args:
+        values: Samples
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(config: JudgeConfig, results: list[dict]) -> dict:
+    """
+    Aggregate per-case results into a report.
+
+    Args:
+        config: The benchmarked configuration
+        results: Per-case results from run_benchmark
+
+    Returns:
+        Report with agreement, confusion counts, latency percentiles, calls and tokens (including
+        prompt-cache reads and writes) per verdict
+    """
+    count = len(results)
+    latencies = [r["latency_seconds"] for r in results]
+    confusion = Counter(
+        ("true" if r["is_correct"] == r["label"] else "false") + ("_positive" if r["is_correct"] else "_negative")
+        for r in results
+    )
+    tokens = {name: sum(r[name] for r in results) for name in USAGE_FIELDS}
+    return {
+        "config": asdict(config),
+        "cases": count,
+        "agreement": sum(r["is_correct"] == r["label"] for r in results) / count if count else 0.0,
+        "confusion": {
+            key: confusion[key] for key in ("true_positive", "false_positive", "true_negative", "false_negative")
+        },
+        "latency_seconds": {
+            "mean": sum(latencies) / count if count else 0.0,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies, default=0.0),
+        },
+        "calls_per_verdict": sum(r["calls"] for r in results) / count if count else 0.0,
+        "tokens": {
+            "input": tokens["input_tokens"],
+            "output": tokens["output_tokens"],
+            "cache_creation": tokens["cache_creation_input_tokens"],
+            "cache_read": tokens["cache_read_input_tokens"],
+            "per_verdict": sum(tokens.values()) / count if count else 0.0,
+        },
+        "decided_by": dict(Counter(r["decided_by"] for r in results)),
+        "results": results,
+    }
+
+
+def run_benchmark(
+    client: ClaudeClient,
+    problems: dict[int, Problem],
+    cases: list[BenchmarkCase],
+    config: JudgeConfig,
+) -> dict:
+    """
+    Judge every case with a configuration, one case at a time.
+
+    Calls and tokens are measured from the client's usage counters around each verdict. Cases
+    labeled by the unit tests are left out when the configuration runs them (local_tests), since
+    agreement with its own check says nothing about the judge.
+
+    Args:
+        client: Claude API client
+        problems: Problems keyed by ID
+        cases: Labeled cases
+        config: Judge configuration
+
+    Returns:
+        Report from summarize, with the number of cases left out
+    """
+    judge = config.build_judge(client)
+    scored = [case for case in cases if not (config.local_tests and case.source in UNIT_TEST_LABELED_SOURCES)]
+    results = []
+    for case in scored:
+        before = client.usage_snapshot()
+        start = time.perf_counter()
+        verdict = judge.evaluate(problems[case.problem_id], case.code, config.iterations)
+        latency = time.perf_counter() - start
+        after = client.usage_snapshot()
+        results.append({
+            "case_id": case.case_id,
+            "problem_id": case.problem_id,
+            "source": case.source,
+            "label": case.label,
+            "is_correct": verdict.is_correct,
+            "decided_by": verdict.decided_by,
+            "latency_seconds": latency,
+            "calls": after["calls"] - before["calls"],
+            **{name: after.get(name, 0) - before.get(name, 0) for name in USAGE_FIELDS},
+        })
+    return {**summarize(config, results), "excluded_cases": len(cases) - len(scored)}
+
+
+def main(argv: list[str] | None = None):
+    """Build the corpus or benchmark judge configurations."""
+    from ie_capstone.dataset.parser import load_all_problems
+
+    parser = argparse.ArgumentParser(description="Benchmark LLM judge configurations on a labeled corpus.")
+    parser.add_argument("--corpus", type=Path, default=BENCHMARK_CORPUS_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build-corpus", help="Seed the corpus from the dataset and session logs")
+    build_parser.add_argument("--logs-dir", type=Path, default=LOGS_DIR)
+    run_parser = subparsers.add_parser("run", help="Judge the corpus with one or more configurations")
+    run_parser.add_argument("--config", action="append", choices=sorted(JUDGE_CONFIGS), default=None)
+    run_parser.add_argument("--output-dir", type=Path, default=BENCHMARK_RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    problems = load_all_problems()
+    if args.command == "build-corpus":
+        cases = build_corpus(problems, args.logs_dir, load_corpus(args.corpus))
+        path = save_corpus(cases, args.corpus)
+        print(f"Saved {len(cases)} case(s) to {path} ({dict(Counter(case.source for case in cases))})")
+        return
+
+    cases = load_corpus(args.corpus)
+    client = ClaudeClient()
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for name in args.config or ["baseline"]:
+        report = run_benchmark(client, {problem.id: problem for problem in problems}, cases, JUDGE_CONFIGS[name])
+        report["corpus"] = str(args.corpus)
+        path = args.output_dir / f"{name}_{timestamp}.json"
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        latency = report["latency_seconds"]
+        print(
+            f"{name}: agreement {report['agreement']:.3f}, p50 {latency['p50']:.2f}s, p90 {latency['p90']:.2f}s, "
+            f"{report['calls_per_verdict']:.2f} calls/verdict, {report['tokens']['per_verdict']:.0f} tokens/verdict, "
+            f"{report['excluded_cases']} case(s) left out -> {path}"
+        )
+
+
+if __name__ == "__main__":
+    main()
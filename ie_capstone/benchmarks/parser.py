@@ -0,0 +1,142 @@
+"""Parser benchmark: parse time of large synthetic dataset files.
+
+Usage:
+    python -m ie_capstone.benchmarks.parser
+    python -m ie_capstone.benchmarks.parser --lines 50000 --repeat 10
+
+Generates a Socratic Debugging Benchmark file and a TreeInstruct file with `--lines` lines of
+buggy code (and a dialogue and description of similar size), then times parsing each one. For
+the Socratic format, the single-scan extract_tags is also timed against looking up each tag
+with its own search (extract_tag_content), the way the parser used to.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from ie_capstone.dataset.parser import (
+    extract_tag_content,
+    extract_tags,
+    parse_problem_file,
+    parse_treeinstruct_file,
+)
+
+SOCRATIC_TAGS = ("problem", "bug_code", "bug_desc", "bug_fixes", "unit_tests", "dialogue", "stu_desc")
+
+
+def _numbered_code(lines: int) -> str:
+    """Get numbered Python code of a given length."""
+    body = [f"{i + 1}. " + ("    " * (i % 3)) + f"value_{i} = compute(value_{i - 1}, {i})" for i in range(lines)]
+    return "\n".join(body)
+
+
+def synthetic_socratic_file(lines: int) -> str:
+    """
+    Generate a Socratic Debugging Benchmark file.
+
+    Args:
+        lines: Lines of buggy code; the description and dialogue scale with it
+
+    Returns:
+        File content
+    """
+    description = "\n".join(f"문제 설명 {i}: 정수 리스트에서 값을 찾는 함수를 작성하세요." for i in range(lines // 10))
+    tests = "\n".join(f"assert search({i}, [{i}]) == 0" for i in range(lines // 10))
+    dialogue = "\n".join(
+        f"User: Line {i} looks wrong?\nAssistant: What does line {i} do?\n\t<alt>Which value does line {i} use?"
+        for i in range(lines // 10)
+    )
+    return (
+        f"<problem>\n{description}\n</problem>\n<bug_code>\n{_numbered_code(lines)}\n</bug_code>\n"
+        f"<bug_desc>\nOff by one.\n</bug_desc>\n<bug_fixes>\nReplace `<` with `<=` on line 3.\n</bug_fixes>\n"
+        f"<unit_tests>\n{tests}\n</unit_tests>\n<stu_desc>\n</stu_desc>\n"
+        f"<dialogue>\n{dialogue}\n<code>\n{_numbered_code(20)}\n</code>\nAssistant: Good.\n</dialogue>\n"
+    )
+
+
+def synthetic_treeinstruct_file(lines: int) -> str:
+    """
+    Generate a TreeInstruct file.
+
+    Args:
+        lines: Lines of buggy and correct code
+
+    Returns:
+        File content
+    """
+    separator = "\n\n" + "-" * 71 + "\n"
+    sections = {
+        "problem": "\n".join(f"정수 배열 nums가 주어집니다 ({i})." for i in range(lines // 10)),
+        "bug_fixes": "Add a colon at the end of line 2.",
+        "bug_desc": "On line 2, a colon is missing.",
+        "line_no": "2",
+        "buggy_code": _numbered_code(lines),
+        "correct_code": _numbered_code(lines),
+    }
+    return separator.join(f"{name}: ---\n{name}:\n{content}\n---" for name, content in sections.items()) + "\n"
+
+
+def time_call(function: Callable[[], object], repeat: int) -> dict[str, float]:
+    """
+    Time repeated calls.
+
+    Args:
+        function: Call to time
+        repeat: Number of calls
+
+    Returns:
+        Median and minimum seconds per call
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return {"median": statistics.median(durations), "min": min(durations)}
+
+
+def run_benchmark(lines: int, repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Time the parsers on synthetic files.
+
+    Args:
+        lines: Lines of buggy code per file
+        repeat: Timed runs per measurement
+
+    Returns:
+        Timings keyed by measurement name
+    """
+    socratic = synthetic_socratic_file(lines)
+    treeinstruct = synthetic_treeinstruct_file(lines)
+    with tempfile.TemporaryDirectory() as directory:
+        socratic_path = Path(directory) / "1.txt"
+        treeinstruct_path = Path(directory) / "synthetic.py.txt"
+        socratic_path.write_text(socratic, encoding="utf-8")
+        treeinstruct_path.write_text(treeinstruct, encoding="utf-8")
+        return {
+            "extract_tags": time_call(lambda: extract_tags(socratic), repeat),
+            "extract_tag_content_per_tag": time_call(
+                lambda: [extract_tag_content(socratic, tag) for tag in SOCRATIC_TAGS], repeat
+            ),
+            "parse_problem_file": time_call(lambda: parse_problem_file(socratic_path), repeat),
+            "parse_treeinstruct_file": time_call(lambda: parse_treeinstruct_file(treeinstruct_path, 4), repeat),
+        }
+
+
+def main(argv: list[str] | None = None):
+    """Print parser timings on synthetic files."""
+    parser = argparse.ArgumentParser(description="Benchmark the dataset parsers on large synthetic files.")
+    parser.add_argument("--lines", type=int, default=20000, help="Lines of buggy code per synthetic file")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.lines, args.repeat)
+    for name, timing in results.items():
+        print(f"{name:<28} median {timing['median'] * 1000:8.2f} ms   min {timing['min'] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Prompt token budget: estimated size of every rendered system prompt, per section.
+
+Usage:
+    python -m ie_capstone.benchmarks.prompts
+    python -m ie_capstone.benchmarks.prompts --check
+
+Every tutor prompt (per persona) and judge prompt (plain and structured) is rendered for every
+problem and its tokens are estimated offline, split into the template's own text and each
+inserted field. `--check` exits with status 1 when a prompt exceeds its PROMPT_TOKEN_BUDGETS
+entry; the same check runs in the test suite, so a prompt edit that outgrows the budget fails CI.
+
+Tokens are estimated with ie_capstone.llm.tokens.estimate_tokens, a character-class approximation
+of the Claude tokenizer; when the real count matters, compare with the input_tokens the API reports.
+"""
+
+import argparse
+import string
+import sys
+from dataclasses import dataclass, field
+from typing import get_args
+
+from ie_capstone.config import PROMPT_TOKEN_BUDGETS
+from ie_capstone.llm.prompts import (
+    JUDGE_RESPONSE_INSTRUCTIONS,
+    JUDGE_STRUCTURED_RESPONSE_INSTRUCTIONS,
+    JUDGE_SYSTEM_PROMPT,
+    TUTOR_PERSONA_CLOSINGS,
+    TUTOR_PERSONA_PREFIXES,
+    TUTOR_PROBLEM_SECTION,
+)
+from ie_capstone.llm.tokens import estimate_tokens
+from ie_capstone.models import PersonaType, Problem
+
+# Section holding the template's own text (everything but the inserted fields)
+TEMPLATE_SECTION = "template"
+
+
+def template_sections(template: str, **values: str) -> dict[str, str]:
+    """
+    Split a rendered template into its own text and the text of each field.
+
+    Args:
+        template: str.format template
+        values: Field values
+
+    Returns:
+        Mapping of section name (TEMPLATE_SECTION or a field name) to its text
+    """
+    sections = {TEMPLATE_SECTION: ""}
+    for literal, name, _, _ in string.Formatter().parse(template):
+        sections[TEMPLATE_SECTION] += literal
+        if name is not None:
+            sections[name] = sections.get(name, "") + values[name]
+    return sections
+
+
+@dataclass
+class PromptBudget:
+    """Estimated tokens of one rendered prompt."""
+
+    prompt: str
+    kind: str
+    problem_id: int
+    sections: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        """Get the estimated tokens of the whole prompt."""
+        return sum(self.sections.values())
+
+    @property
+    def budget(self) -> int | None:
+        """Get the token budget for this kind of prompt (None if there is none)."""
+        return PROMPT_TOKEN_BUDGETS.get(self.kind)
+
+    @property
+    def over_budget(self) -> bool:
+        """Check whether the prompt exceeds its budget."""
+        return self.budget is not None and self.total > self.budget
+
+
+def _budget(prompt: str, kind: str, problem: Problem, sections: dict[str, str]) -> PromptBudget:
+    """Estimate every section of a rendered prompt."""
+    return PromptBudget(
+        prompt=prompt,
+        kind=kind,
+        problem_id=problem.id,
+        sections={name: estimate_tokens(text) for name, text in sections.items()},
+    )
+
+
+def tutor_prompt_budget(persona: PersonaType, problem: Problem) -> PromptBudget:
+    """
+    Estimate the tutor system prompt for a persona and problem.
+
+    Args:
+        persona: Tutor persona
+        problem: The debugging problem
+
+    Returns:
+        Budget with the persona prefix, the problem section's fields and template, and the closing
+    """
+    problem_sections = template_sections(
+        TUTOR_PROBLEM_SECTION,
+        problem_description=problem.description,
+        buggy_code=problem.buggy_code,
+        bug_description=problem.bug_description,
+        expected_fix="\n".join(problem.expected_fixes),
+        unit_tests="\n".join(problem.unit_tests),
+    )
+    sections = {
+        "persona": TUTOR_PERSONA_PREFIXES[persona],
+        **problem_sections,
+        "closing": TUTOR_PERSONA_CLOSINGS[persona],
+    }
+    return _budget(f"tutor:{persona}", "tutor", problem, sections)
+
+
+def judge_prompt_budget(problem: Problem, *, structured: bool = False) -> PromptBudget:
+    """
+    Estimate the judge system prompt for a problem.
+
+    Args:
+        problem: The debugging problem
+        structured: Estimate the cascade's structured-verdict variant
+
+    Returns:
+        Budget with the template and each problem field
+    """
+    sections = template_sections(
+        JUDGE_SYSTEM_PROMPT,
+        buggy_code=problem.buggy_code,
+        bug_description=problem.bug_description,
+        expected_fixes="\n".join(problem.expected_fixes),
+        unit_tests="\n".join(problem.unit_tests),
+        response_instructions=JUDGE_STRUCTURED_RESPONSE_INSTRUCTIONS if structured else JUDGE_RESPONSE_INSTRUCTIONS,
+    )
+    return _budget("judge:structured" if structured else "judge", "judge", problem, sections)
+
+
+def analyze_prompts(problems: list[Problem]) -> list[PromptBudget]:
+    """
+    Estimate every system prompt for every problem.
+
+    Args:
+        problems: Experiment problems
+
+    Returns:
+        Budgets per problem: each tutor persona, then the judge prompt and its structured variant
+    """
+    budgets = []
+    for problem in problems:
+        budgets.extend(tutor_prompt_budget(persona, problem) for persona in get_args(PersonaType))
+        budgets.append(judge_prompt_budget(problem))
+        budgets.append(judge_prompt_budget(problem, structured=True))
+    return budgets
+
+
+def format_report(budgets: list[PromptBudget]) -> str:
+    """
+    Format budgets as a table, one row per prompt with its largest sections.
+
+    Args:
+        budgets: Results of analyze_prompts
+
+    Returns:
+        Report text
+    """
+    lines = [f"{'prompt':<18} {'problem':>7} {'tokens':>7} {'budget':>7}  sections"]
+    for budget in budgets:
+        largest = sorted(budget.sections.items(), key=lambda item: -item[1])
+        sections = ", ".join(f"{name}={tokens}" for name, tokens in largest)
+        limit = budget.budget if budget.budget is not None else "-"
+        flag = "  OVER BUDGET" if budget.over_budget else ""
+        lines.append(f"{budget.prompt:<18} {budget.problem_id:>7} {budget.total:>7} {limit:>7}  {sections}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None):
+    """Print the estimated size of every system prompt, optionally failing on a budget overrun."""
+    from ie_capstone.dataset.parser import load_all_problems
+
+    parser = argparse.ArgumentParser(description="Estimate system prompt tokens per problem and section.")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a prompt is over budget")
+    args = parser.parse_args(argv)
+
+    budgets = analyze_prompts(load_all_problems())
+    print(format_report(budgets))
+    over = [budget for budget in budgets if budget.over_budget]
+    if over:
+        print(f"{len(over)} prompt(s) over budget")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
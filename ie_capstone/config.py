@@ -7,14 +7,137 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data" / "socratic-debugging-benchmark"
 TREEINSTRUCT_DATA_DIR = PROJECT_ROOT / "data" / "treeinstruct-dataset"
 LOGS_DIR = PROJECT_ROOT / "logs" / "sessions"
+REJUDGE_DIR = PROJECT_ROOT / "logs" / "rejudge"
+REFERENCE_SOLUTIONS_PATH = PROJECT_ROOT / "data" / "reference-solutions.json"
+BENCHMARK_CORPUS_PATH = PROJECT_ROOT / "data" / "judge-benchmark" / "corpus.jsonl"
+BENCHMARK_RESULTS_DIR = PROJECT_ROOT / "logs" / "benchmarks"
+OPENING_BANK_PATH = PROJECT_ROOT / "data" / "opening-replies.json"
+PROBLEM_CACHE_PATH = PROJECT_ROOT / ".cache" / "problems.json"
+PROBLEM_CORPUS_CACHE_PATH = PROJECT_ROOT / ".cache" / "corpus.json"
 
 # Claude API
 CLAUDE_MODEL = "claude-opus-4-5-20251101"
+FAST_CLAUDE_MODEL = "claude-haiku-4-5-20251001"
 MAX_TOKENS = 16384
+# Prompt caching (ie_capstone.llm.client): shortest prompt prefix, in tokens, each model will cache.
+# Shorter prefixes are sent without cache_control, since the API would silently process them uncached
+PROMPT_CACHE_MIN_TOKENS = {CLAUDE_MODEL: 4096, FAST_CLAUDE_MODEL: 4096}
+PROMPT_CACHE_DEFAULT_MIN_TOKENS = 1024
 
 # Experiment settings
 TOTAL_PROBLEMS = 6
 JUDGE_ITERATIONS = 3
+JUDGE_BACKGROUND_WORKERS = 8
+
+# Judge prompt: "full" sends the buggy and student programs, "diff" only the student's changes
+# (with JUDGE_DIFF_CONTEXT unchanged lines around each change)
+JUDGE_PROMPT_VARIANT = "full"
+JUDGE_DIFF_CONTEXT = 1
+
+# Run the self-consistency rounds concurrently instead of one after another
+JUDGE_PARALLEL = False
+
+# Reject submissions that fail the problem's unit tests locally, before any LLM call
+JUDGE_LOCAL_TESTS = False
+
+# Limits of the subprocesses that run participant code (unit tests, fuzzing): address space and
+# size of any file written, in bytes; CPU time is capped just above each run's timeout
+SANDBOX_MEMORY_BYTES = 512 * 1024 * 1024
+SANDBOX_FILE_BYTES = 1024 * 1024
+
+# Differential fuzzing against the reference solution, before any LLM call: the first input
+# where the outputs differ rejects the submission, and agreement on every input accepts it
+JUDGE_FUZZ = False
+JUDGE_FUZZ_CASES = 1000
+JUDGE_FUZZ_TIMEOUT = 10.0
+
+# Cascade judging: the fast model votes first, and the primary model (CLAUDE_MODEL, JUDGE_ITERATIONS)
+# is only consulted when fast votes disagree or any vote is below the confidence threshold
+JUDGE_CASCADE = False
+JUDGE_FAST_MODEL = FAST_CLAUDE_MODEL
+JUDGE_FAST_ITERATIONS = 2
+JUDGE_FAST_MIN_CONFIDENCE = 0.8
+JUDGE_FAST_MAX_TOKENS = 256
+
+# Bounded tutor context: keep the last SOCRATIC_CONTEXT_TURNS user turns verbatim and fold older
+# turns into a running summary written by the fast model between turns (0 sends the full history)
+SOCRATIC_CONTEXT_TURNS = 0
+SOCRATIC_SUMMARY_MODEL = FAST_CLAUDE_MODEL
+SOCRATIC_SUMMARY_MAX_TOKENS = 512
+SOCRATIC_SUMMARY_WORKERS = 4
+
+# Editor code in tutor messages: "full" repeats the whole program every turn, "changed" only when it
+# changed since the model last saw it, "diff" sends a diff against that code instead (with
+# SOCRATIC_CODE_DIFF_CONTEXT unchanged lines around each change). In the delta modes, code sections
+# of turns before the latest full program are collapsed
+SOCRATIC_CODE_CONTEXT = "full"
+SOCRATIC_CODE_DIFF_CONTEXT = 2
+
+# Few-shot exemplars (opt-in): the SOCRATIC_EXEMPLARS exchanges of the problem's example dialogue most
+# relevant to the student's message (BM25 over its turns) are added to the tutor prompt each turn
+SOCRATIC_EXEMPLARS = 0
+
+# Prompt cache warming (opt-in): every persona-problem tutor prompt is cached at startup and re-cached
+# before the cache TTL (5 minutes) expires, but only during CACHE_WARM_ACTIVE_HOURS (local start and
+# end hour, None for always); starting a problem also warms the next problem's prompt. Prompts shorter
+# than the model's PROMPT_CACHE_MIN_TOKENS are skipped, so with the current prompts nothing is sent
+CACHE_WARMING = False
+CACHE_WARM_REFRESH_SECONDS = 240.0
+CACHE_WARM_CHECK_SECONDS = 30.0
+CACHE_WARM_ACTIVE_HOURS: tuple[int, int] | None = (9, 22)
+CACHE_WARM_WORKERS = 4
+
+# Opening reply bank (opt-in, built by ie_capstone.llm.openers): a first message similar enough to
+# a canonical opener, sent with the unchanged buggy code, gets a vetted reply without a model call,
+# streamed locally in OPENING_STREAM_CHARS-character chunks
+OPENING_BANK = False
+OPENING_BANK_THRESHOLD = 0.5
+OPENING_BANK_REPLIES = 3
+OPENING_STREAM_CHARS = 4
+OPENING_STREAM_DELAY = 0.02
+
+# Cohort-wide tutor reply cache (opt-in): a question at least RESPONSE_CACHE_THRESHOLD similar
+# (character-bigram Jaccard) to one asked before with the same persona, problem, code and turn
+# index reuses its reply. RESPONSE_CACHE_PERSONAS lists the experiment arms it serves
+RESPONSE_CACHE = False
+RESPONSE_CACHE_THRESHOLD = 0.9
+RESPONSE_CACHE_SIZE = 4096
+RESPONSE_CACHE_PERSONAS: tuple[str, ...] = ("neutral", "emotional")
+RESPONSE_CACHE_PERMUTATIONS = 64
+RESPONSE_CACHE_BANDS = 16
+
+# Answer-leak guard on streamed tutor replies: a reply containing a key snippet of the expected
+# fix (at least LEAK_MIN_PATTERN_CHARS characters, whitespace ignored) is cut and regenerated up
+# to LEAK_GUARD_RETRIES times, then replaced by a generic question
+LEAK_GUARD = True
+LEAK_MIN_PATTERN_CHARS = 6
+LEAK_GUARD_RETRIES = 1
+
+# Speculative judging of editor contents before submission (opt-in)
+SPECULATIVE_JUDGING = False
+SPECULATIVE_IDLE_SECONDS = 5.0
+SPECULATIVE_WORKERS = 1
+SPECULATIVE_CACHE_SIZE = 256
+
+# Bulk re-judging (ie_capstone.llm.rejudge)
+REJUDGE_MAX_WORKERS = 8
+BATCH_MAX_REQUESTS = 10000
+BATCH_POLL_INTERVAL = 60.0
+
+# Prompt token budgets (ie_capstone.benchmarks.prompts): estimated tokens each rendered system prompt
+# may use, per prompt kind; the test suite fails when an edit makes any problem's prompt exceed it
+PROMPT_TOKEN_BUDGETS = {"tutor": 2000, "judge": 900}
+
+# Parsed problem cache (ie_capstone.dataset.cache): load_all_problems reads problems, their rendered
+# tutor prompts and normalized buggy code from PROBLEM_CACHE_PATH, reparsing only the dataset files
+# whose content changed since they were cached
+PROBLEM_CACHE = True
+# Hot reload (opt-in, ie_capstone.dataset.bank): the app polls the dataset files every
+# DATASET_POLL_SECONDS and swaps edited problems in for sessions started afterwards
+DATASET_HOT_RELOAD = False
+DATASET_POLL_SECONDS = 2.0
+# Full-dataset corpora (ie_capstone.dataset.corpus): worker processes parsing uncached files
+PROBLEM_LOAD_WORKERS = 4
 
 # Google Form URL (to be updated with actual form)
 GOOGLE_FORM_URL = "https://forms.google.com/your-form-id"
@@ -0,0 +1,204 @@
+"""The running app's problem bank, hot-reloaded from the dataset files by a polling watcher.
+
+The bank hands out snapshots: a session takes the problem list when it starts and keeps it, so
+an edit to a dataset file only reaches sessions started after the reload. On a reload, changed
+problems are swapped in as a whole new list, and what was derived from their old content is
+invalidated: their rendered tutor prompts, the leak automata and exemplar indexes (rebuilt on use)
+and any listener's state (e.g., cached replies and warmed prompts).
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from ie_capstone.config import DATASET_POLL_SECONDS, REFERENCE_SOLUTIONS_PATH
+from ie_capstone.dataset.parser import load_all_problems, problem_sources
+from ie_capstone.llm.exemplars import clear_exemplar_indexes
+from ie_capstone.llm.leak_guard import clear_leak_matchers
+from ie_capstone.llm.prompt_registry import PromptRegistry, socratic_prompts
+from ie_capstone.models import Problem
+
+logger = logging.getLogger(__name__)
+
+# Called after a swap with the new problem list and the replaced (old) versions of changed problems
+SwapListener = Callable[[list[Problem], list[Problem]], None]
+# (path, mtime_ns, size) of every watched file, None for a missing file
+FileSnapshot = tuple[tuple[str, int | None, int | None], ...]
+
+
+class ProblemBank:
+    """The current problem list, replaced atomically on reload."""
+
+    def __init__(self, problems: list[Problem], registry: PromptRegistry = socratic_prompts):
+        """
+        Initialize the bank.
+
+        Args:
+            problems: Experiment problems, in order
+            registry: Registry holding the problems' rendered tutor prompts
+        """
+        self.registry = registry
+        self.version = 0
+        self._problems = tuple(problems)
+        self._listeners: list[SwapListener] = []
+        self._lock = threading.Lock()
+
+    @property
+    def problems(self) -> list[Problem]:
+        """Get a snapshot of the current problems (unaffected by later reloads)."""
+        return list(self._problems)
+
+    def subscribe(self, listener: SwapListener) -> None:
+        """
+        Call a function after every swap that changed a problem.
+
+        Args:
+            listener: Receives the new problem list and the old versions of the changed problems
+        """
+        self._listeners.append(listener)
+
+    def swap(self, problems: list[Problem]) -> list[Problem]:
+        """
+        Replace the problems, invalidating what was derived from the ones that changed.
+
+        Args:
+            problems: Reloaded problems, in order
+
+        Returns:
+            Old versions of the problems that changed (nothing is swapped if no problem changed)
+        """
+        with self._lock:
+            if tuple(problems) == self._problems:
+                return []
+            current = {problem.id: problem for problem in self._problems}
+            changed = [current[problem.id] for problem in problems if current.get(problem.id, problem) != problem]
+            self._problems = tuple(problems)
+            self.version += 1
+        for problem in changed:
+            self.registry.discard(problem)
+        clear_leak_matchers()
+        clear_exemplar_indexes()
+        self.registry.register(problems)
+        for listener in self._listeners:
+            listener(list(problems), changed)
+        return changed
+
+
+def watched_paths() -> list[Path]:
+    """
+    Get the files the problems are loaded from.
+
+    Returns:
+        Dataset files (with generated tests) and the reference solutions file
+    """
+    return [path for source in problem_sources() for path in source.dependencies] + [REFERENCE_SOLUTIONS_PATH]
+
+
+def snapshot_files(paths: list[Path]) -> FileSnapshot:
+    """
+    Get the size and mtime of files.
+
+    Args:
+        paths: Files to stat
+
+    Returns:
+        (path, mtime_ns, size) per file, with None for files that do not exist
+    """
+    snapshot = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            snapshot.append((str(path), None, None))
+        else:
+            snapshot.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(snapshot)
+
+
+class DatasetWatcher:
+    """
+    Polls the dataset files and swaps reloaded problems into a bank.
+
+    A poll only stats files; when any changed, the problems are loaded again through the problem
+    cache, which reparses only the files whose content changed. A reload that misses one of the
+    bank's problems (e.g., a file caught mid-save fails to parse) is not swapped in and is
+    retried at the next poll.
+    """
+
+    def __init__(
+        self,
+        bank: ProblemBank,
+        loader: Callable[[], list[Problem]] = load_all_problems,
+        paths: Callable[[], list[Path]] = watched_paths,
+        interval: float = DATASET_POLL_SECONDS,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            bank: Bank to swap reloaded problems into
+            loader: Loads the problems
+            paths: Lists the files to watch (called on every poll, so new files are noticed)
+            interval: Seconds between polls
+        """
+        self.bank = bank
+        self.loader = loader
+        self.paths = paths
+        self.interval = interval
+        self.reloads = 0
+        self._snapshot = snapshot_files(paths())
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def poll(self) -> list[Problem]:
+        """
+        Reload the problems if a watched file changed since the last successful reload.
+
+        Returns:
+            Old versions of the problems that changed (empty if none did)
+        """
+        snapshot = snapshot_files(self.paths())
+        if snapshot == self._snapshot:
+            return []
+        problems = self.loader()
+        loaded_ids = {problem.id for problem in problems}
+        current_ids = {problem.id for problem in self.bank.problems}
+        if loaded_ids != current_ids:
+            logger.warning(
+                "Dataset reload not swapped in, retrying at the next poll (missing IDs %s, unexpected IDs %s)",
+                sorted(current_ids - loaded_ids),
+                sorted(loaded_ids - current_ids),
+            )
+            return []
+        self._snapshot = snapshot
+        changed = self.bank.swap(problems)
+        self.reloads += bool(changed)
+        return changed
+
+    def start(self) -> "DatasetWatcher":
+        """
+        Poll in a background thread.
+
+        Returns:
+            The watcher itself, for chaining after construction
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll_loop, name="dataset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _poll_loop(self) -> None:
+        """Poll until stopped; a failed reload is retried at the next poll."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Dataset reload failed, retrying at the next poll")
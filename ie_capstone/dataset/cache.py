@@ -0,0 +1,386 @@
+"""Persistent cache of parsed problems and the artifacts derived from them.
+
+The cache is one compact JSON file with an entry per dataset file: the parsed Problem, the
+rendered tutor prompt of every persona (seeded into socratic_prompts) and the normalized AST of
+the buggy code (seeded into normalize_code). Each entry records the size, mtime and content hash
+of every file it was parsed from (a TreeInstruct file's generated .tests file included). On load,
+a file whose size and mtime are unchanged is trusted; otherwise its content is hashed, and the
+entry is only reparsed when the hash changed. The whole cache is dropped when the parser, prompt
+or normalization code, the Problem model or the Python version (normalized ASTs are ast.dump
+output, which differs between versions) changes, since entries would then be parsed or rendered
+differently. An entry that cannot be restored (e.g., malformed) is reparsed.
+
+Usage:
+    python -m ie_capstone.dataset.cache            # refresh the cache, listing reparsed files
+    python -m ie_capstone.dataset.cache --rebuild  # reparse every file
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import get_args
+
+from ie_capstone.config import PROBLEM_CACHE_PATH
+from ie_capstone.dataset.parser import ProblemSource, problem_sources
+from ie_capstone.dataset.reference import normalize_code, seed_normalized_code
+from ie_capstone.llm.prompt_registry import PromptRegistry, RenderedPrompt, socratic_prompts
+from ie_capstone.llm.prompts import TUTOR_PERSONA_PREFIXES, get_socratic_prompt_parts
+from ie_capstone.models import DialogueTurn, PersonaType, Problem
+
+# Bump when the entry layout changes
+CACHE_FORMAT = 1
+# Code that produces the entries (parsing, normalization, prompt rendering, the Problem model); editing its
+# modules invalidates the cache
+_PRODUCERS = (ProblemSource, normalize_code, get_socratic_prompt_parts, PromptRegistry, Problem)
+
+
+@lru_cache(maxsize=1)
+def cache_version() -> str:
+    """
+    Get the version of the cached data: the entry layout, the code that produces the entries and
+    the Python version (the normalized ASTs are ast.dump output, which varies between versions).
+
+    Returns:
+        Hex digest (32 characters)
+    """
+    digest = hashlib.sha256(f"{CACHE_FORMAT}:{platform.python_version()}".encode())
+    for producer in _PRODUCERS:
+        digest.update(Path(sys.modules[producer.__module__].__file__).read_bytes())
+    return digest.hexdigest()[:32]
+
+
+def file_signature(path: Path) -> dict | None:
+    """
+    Get the size, mtime and content hash of a file.
+
+    Args:
+        path: File to sign
+
+    Returns:
+        {"size", "mtime_ns", "sha256"}, or None if the file does not exist
+    """
+    try:
+        stat = path.stat()
+        content = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": hashlib.sha256(content).hexdigest()}
+
+
+def _file_state(path: Path, signature: dict | None) -> str:
+    """
+    Compare a file with its recorded signature, hashing it only when its mtime moved.
+
+    Returns "unchanged", "touched" (new mtime, same content; the signature takes the new
+    mtime so the file is not hashed again) or "changed".
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return "unchanged" if signature is None else "changed"
+    if signature is None or stat.st_size != signature["size"]:
+        return "changed"
+    if stat.st_mtime_ns == signature["mtime_ns"]:
+        return "unchanged"
+    if hashlib.sha256(path.read_bytes()).hexdigest() != signature["sha256"]:
+        return "changed"
+    signature["mtime_ns"] = stat.st_mtime_ns
+    return "touched"
+
+
+def problem_to_dict(problem: Problem) -> dict:
+    """
+    Convert a problem to JSON-serializable data (reference solutions are loaded separately).
+
+    Args:
+        problem: Parsed problem
+
+    Returns:
+        Problem fields as a dictionary
+    """
+    data = asdict(problem)
+    del data["reference_solutions"]
+    return data
+
+
+def problem_from_dict(data: dict) -> Problem:
+    """
+    Rebuild a problem from problem_to_dict output.
+
+    Args:
+        data: Problem fields
+
+    Returns:
+        The problem
+    """
+    return Problem(**{**data, "dialogue": [DialogueTurn(**turn) for turn in data["dialogue"]]})
+
+
+def build_entry(source: ProblemSource) -> dict:
+    """
+    Parse a dataset file and derive its cached artifacts.
+
+    Args:
+        source: Dataset file
+
+    Returns:
+        Cache entry (JSON-serializable, so it can be returned from a worker process)
+
+    Raises:
+        ValueError: If the file is malformed
+    """
+    signatures = {str(path): file_signature(path) for path in source.dependencies}
+    problem = source.parse()
+    registry = PromptRegistry()
+    rendered = {persona: registry.get(persona, problem) for persona in get_args(PersonaType)}
+    return {
+        "problem_id": source.problem_id,
+        "files": signatures,
+        "problem": problem_to_dict(problem),
+        "prompts": {persona: {"suffix": prompt.suffix, "hash": prompt.hash} for persona, prompt in rendered.items()},
+        "normalized_buggy_code": normalize_code(problem.buggy_code),
+    }
+
+
+def restore_entry(entry: dict, registry: PromptRegistry = socratic_prompts) -> Problem:
+    """
+    Rebuild a cached problem and seed its derived artifacts.
+
+    Args:
+        entry: Cache entry from build_entry
+        registry: Registry the cached tutor prompts are added to
+
+    Returns:
+        The problem
+
+    Raises:
+        KeyError, TypeError, ValueError, AttributeError: If the entry is malformed (nothing is seeded then)
+    """
+    problem = problem_from_dict(entry["problem"])
+    prompts = [
+        RenderedPrompt(
+            persona=persona,
+            problem_id=problem.id,
+            prefix=TUTOR_PERSONA_PREFIXES[persona],
+            suffix=cached["suffix"],
+            hash=cached["hash"],
+        )
+        for persona, cached in entry["prompts"].items()
+    ]
+    normalized = entry["normalized_buggy_code"]
+    for prompt in prompts:
+        registry.add(problem, prompt)
+    seed_normalized_code(problem.buggy_code, normalized)
+    return problem
+
+
+@dataclass(frozen=True)
+class LoadError:
+    """A dataset file that could not be loaded."""
+
+    path: Path
+    error: str
+
+
+def _try_build_entry(source: ProblemSource) -> dict | str:
+    """Build a cache entry, or describe why the file could not be parsed (runs in worker processes)."""
+    try:
+        return build_entry(source)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def build_entries(sources: list[ProblemSource], workers: int = 0) -> Iterator[tuple[ProblemSource, dict | str]]:
+    """
+    Parse dataset files, in a process pool when there are several workers.
+
+    Args:
+        sources: Dataset files
+        workers: Worker processes (0 or 1 parses in this process)
+
+    Yields:
+        (source, cache entry or error message), in source order as soon as each file is parsed
+    """
+    if workers <= 1 or len(sources) <= 1:
+        for source in sources:
+            yield source, _try_build_entry(source)
+        return
+    chunksize = max(1, len(sources) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from zip(sources, executor.map(_try_build_entry, sources, chunksize=chunksize), strict=True)
+
+
+class ProblemCache:
+    """Parsed problems persisted in a JSON file, invalidated per dataset file."""
+
+    def __init__(self, path: Path | None = PROBLEM_CACHE_PATH, registry: PromptRegistry = socratic_prompts):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Cache file (None parses every file and persists nothing)
+            registry: Registry cached tutor prompts are added to
+        """
+        self.path = path
+        self.registry = registry
+        # Sources reparsed by the last load, and files it skipped
+        self.reparsed: list[ProblemSource] = []
+        self.errors: list[LoadError] = []
+
+    def read(self) -> dict[str, dict]:
+        """
+        Read the cache entries.
+
+        Returns:
+            Entries keyed by dataset file path (empty if the file is missing, unreadable or from another version)
+        """
+        if self.path is None:
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != cache_version():
+            return {}
+        return data.get("entries", {})
+
+    def write(self, entries: dict[str, dict]) -> None:
+        """
+        Write the cache entries atomically, so concurrent readers never see a partial file.
+
+        A cache that cannot be written (e.g., a read-only checkout) is skipped: the problems
+        are simply parsed again next time.
+
+        Args:
+            entries: Entries keyed by dataset file path
+        """
+        if self.path is None:
+            return
+        data = json.dumps({"version": cache_version(), "entries": entries}, ensure_ascii=False, separators=(",", ":"))
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.path.parent, prefix=f".{self.path.name}.", delete=False
+            ) as file:
+                file.write(data)
+            os.replace(file.name, self.path)
+        except OSError:
+            return
+
+    def entry_state(self, source: ProblemSource, entry: dict | None) -> str:
+        """
+        Check whether a cache entry is still valid for a dataset file.
+
+        Args:
+            source: Dataset file
+            entry: Its cache entry, if any
+
+        Returns:
+            "unchanged", "touched" (valid, but a file's mtime moved) or "changed" (the entry
+            is missing, for another ID, or built from files whose content changed)
+        """
+        if entry is None or entry["problem_id"] != source.problem_id:
+            return "changed"
+        files = entry["files"]
+        if sorted(files) != sorted(str(path) for path in source.dependencies):
+            return "changed"
+        states = {_file_state(path, files[str(path)]) for path in source.dependencies}
+        return "changed" if "changed" in states else "touched" if "touched" in states else "unchanged"
+
+    def _restore(self, source: ProblemSource, entry: dict | None) -> tuple[str, Problem | None]:
+        """Check and restore a cache entry, treating a malformed one as changed: (state, problem or None)."""
+        try:
+            state = self.entry_state(source, entry)
+            return state, None if state == "changed" else restore_entry(entry, self.registry)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return "changed", None
+
+    def iter_load(
+        self, sources: list[ProblemSource] | None = None, rebuild: bool = False, workers: int = 0
+    ) -> Iterator[Problem]:
+        """
+        Stream problems: first those fresh in the cache, then the rest as they are parsed.
+
+        Malformed files are skipped and recorded in errors. Once the iterator is exhausted,
+        reparsed entries (and refreshed mtimes) are written back, and entries of files that
+        are no longer loaded are dropped.
+
+        Args:
+            sources: Dataset files (default: problem_sources())
+            rebuild: Reparse every file
+            workers: Worker processes parsing the files that are not cached (0 parses in this process)
+
+        Yields:
+            Problems (without reference solutions)
+        """
+        sources = problem_sources() if sources is None else sources
+        cached = {} if rebuild else self.read()
+        entries = {}
+        stale = []
+        modified = False
+        self.reparsed = []
+        self.errors = []
+        for source in sources:
+            entry = cached.get(str(source.path))
+            state, problem = self._restore(source, entry)
+            if problem is None:
+                stale.append(source)
+                continue
+            modified |= state == "touched"
+            entries[str(source.path)] = entry
+            yield problem
+        for source, entry in build_entries(stale, workers):
+            if isinstance(entry, str):
+                self.errors.append(LoadError(source.path, entry))
+                continue
+            self.reparsed.append(source)
+            entries[str(source.path)] = entry
+            yield restore_entry(entry, self.registry)
+        if modified or self.reparsed or entries.keys() != cached.keys():
+            self.write(entries)
+
+    def load(
+        self, sources: list[ProblemSource] | None = None, rebuild: bool = False, workers: int = 0
+    ) -> list[Problem]:
+        """
+        Load problems, from the cache where it is fresh and by parsing elsewhere (see iter_load).
+
+        Args:
+            sources: Dataset files (default: problem_sources())
+            rebuild: Reparse every file
+            workers: Worker processes parsing the files that are not cached
+
+        Returns:
+            Problems in source order, without malformed files (without reference solutions)
+        """
+        sources = problem_sources() if sources is None else sources
+        order = {source.problem_id: position for position, source in enumerate(sources)}
+        return sorted(self.iter_load(sources, rebuild, workers), key=lambda problem: order[problem.id])
+
+
+def main(argv: list[str] | None = None):
+    """Load the problems through the cache and report which files were reparsed."""
+    parser = argparse.ArgumentParser(description="Refresh the parsed problem cache.")
+    parser.add_argument("--rebuild", action="store_true", help="Reparse every dataset file")
+    args = parser.parse_args(argv)
+
+    cache = ProblemCache()
+    problems = cache.load(rebuild=args.rebuild)
+    print(f"{len(problems)} problems, {len(cache.reparsed)} reparsed -> {cache.path}")
+    for source in cache.reparsed:
+        print(f"  reparsed {source.problem_id}: {source.path}")
+    for error in cache.errors:
+        print(f"  skipped {error.path}: {error.error}")
+
+
+if __name__ == "__main__":
+    main()
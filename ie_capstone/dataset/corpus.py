@@ -0,0 +1,88 @@
+"""Full-dataset problem corpora (practice pools, simulations), discovered by file pattern.
+
+Usage:
+    python -m ie_capstone.dataset.corpus
+    python -m ie_capstone.dataset.corpus --socratic-dir path/to/socratic --treeinstruct-dir path/to/treeinstruct
+    python -m ie_capstone.dataset.corpus --store .cache/problems.store
+
+Every Socratic (*.txt) and TreeInstruct (*.py.txt) file under the dataset directories is
+loaded, with IDs that depend only on the file's format and relative path (the experiment's six
+problems keep IDs 1-6, see stable_problem_id). Files that are not cached are parsed in a process
+pool and problems are yielded as they are ready; malformed files are skipped and reported.
+With --store, the problems are also packed into a memory-mapped ProblemStore as they stream in.
+"""
+
+import argparse
+from collections.abc import Iterator
+from pathlib import Path
+
+from ie_capstone.config import DATA_DIR, PROBLEM_CORPUS_CACHE_PATH, PROBLEM_LOAD_WORKERS, TREEINSTRUCT_DATA_DIR
+from ie_capstone.dataset.cache import ProblemCache
+from ie_capstone.dataset.parser import ProblemSource, discover_sources
+from ie_capstone.dataset.store import write_store
+from ie_capstone.models import Problem
+
+
+def corpus_sources(
+    socratic_dir: Path | None = DATA_DIR, treeinstruct_dir: Path | None = TREEINSTRUCT_DATA_DIR
+) -> list[ProblemSource]:
+    """
+    Discover the dataset files of a corpus.
+
+    Args:
+        socratic_dir: Socratic Debugging Benchmark directory (None to leave the dataset out)
+        treeinstruct_dir: TreeInstruct directory (None to leave the dataset out)
+
+    Returns:
+        Socratic sources, then TreeInstruct sources, each ordered by relative path
+    """
+    sources = []
+    if socratic_dir is not None:
+        sources.extend(discover_sources(socratic_dir, "socratic"))
+    if treeinstruct_dir is not None:
+        sources.extend(discover_sources(treeinstruct_dir, "treeinstruct"))
+    return sources
+
+
+def iter_corpus(
+    sources: list[ProblemSource],
+    cache: ProblemCache | None = None,
+    workers: int = PROBLEM_LOAD_WORKERS,
+) -> Iterator[Problem]:
+    """
+    Stream the problems of a corpus.
+
+    Args:
+        sources: Dataset files (e.g., from corpus_sources)
+        cache: Problem cache to read and refresh (default: one at PROBLEM_CORPUS_CACHE_PATH);
+            its errors list the skipped files once the iterator is exhausted
+        workers: Worker processes parsing the files that are not cached
+
+    Yields:
+        Problems as they are ready: cached ones first, then parsed ones in source order
+    """
+    cache = ProblemCache(PROBLEM_CORPUS_CACHE_PATH) if cache is None else cache
+    yield from cache.iter_load(sources, workers=workers)
+
+
+def main(argv: list[str] | None = None):
+    """Load a full corpus and report its size and skipped files."""
+    parser = argparse.ArgumentParser(description="Load every problem of the datasets and report malformed files.")
+    parser.add_argument("--socratic-dir", type=Path, default=DATA_DIR, help="Socratic Debugging Benchmark directory")
+    parser.add_argument("--treeinstruct-dir", type=Path, default=TREEINSTRUCT_DATA_DIR, help="TreeInstruct directory")
+    parser.add_argument("--workers", type=int, default=PROBLEM_LOAD_WORKERS, help="Parser processes")
+    parser.add_argument("--cache", type=Path, default=PROBLEM_CORPUS_CACHE_PATH, help="Problem cache file")
+    parser.add_argument("--store", type=Path, help="Also pack the problems into this memory-mapped store file")
+    args = parser.parse_args(argv)
+
+    sources = corpus_sources(args.socratic_dir, args.treeinstruct_dir)
+    cache = ProblemCache(args.cache)
+    problems = iter_corpus(sources, cache, args.workers)
+    count = write_store(args.store, problems) if args.store else sum(1 for _ in problems)
+    print(f"{count} of {len(sources)} files loaded ({len(cache.reparsed)} parsed, the rest cached)")
+    for error in cache.errors:
+        print(f"  skipped {error.path}: {error.error}")
+
+
+if __name__ == "__main__":
+    main()
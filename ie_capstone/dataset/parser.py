@@ -1,10 +1,75 @@
 """Parser for the Socratic Debugging Benchmark and TreeInstruct datasets."""
 
+import hashlib
 import re
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Literal
+
+from ie_capstone.config import DATA_DIR, PROBLEM_CACHE, PROBLEM_CACHE_PATH, TREEINSTRUCT_DATA_DIR
+from ie_capstone.dataset.reference import load_reference_solutions
+from ie_capstone.dataset.testgen import unit_tests_path_for
+from ie_capstone.models import DialogueTurn, Problem
+
+_CODE_BLOCK = re.compile(r"(<code>.*?</code>)", re.DOTALL)
+# Opening markers; each closing marker is then found with str.find, so the text is scanned once
+_OPEN_TAG = re.compile(r"<(\w+)>")
+_TREEINSTRUCT_HEADER = re.compile(r"(\w+): ---\n\1:\n?")
+# "N. " after a newline: the leading literal lets the regex engine skip ahead instead of testing
+# every position for a line start ([^\S\n] keeps the match from running onto the next line)
+_LINE_NUMBER = re.compile(r"\n\d+\.[^\S\n]?")
+_SPEAKERS = {"User:": "user", "Assistant:": "assistant"}
+# One dialogue line: an optional speaker or <alt> marker, then the stripped text
+_DIALOGUE_LINE = re.compile(r"^[^\S\n]*(User:|Assistant:|<alt>)?[^\S\n]*(.*?)[^\S\n]*$", re.MULTILINE)
+
+SourceFormat = Literal["socratic", "treeinstruct"]
+# Dataset files of each format, matched recursively under the dataset directory
+SOURCE_PATTERNS: dict[SourceFormat, str] = {"socratic": "*.txt", "treeinstruct": "*.py.txt"}
+# The experiment's problems, by format and path relative to the dataset directory; they keep
+# the IDs their sessions were logged with
+LEGACY_PROBLEM_IDS: dict[tuple[SourceFormat, str], int] = {
+    ("socratic", "1.txt"): 1,
+    ("socratic", "2.txt"): 2,
+    ("socratic", "3.txt"): 3,
+    ("treeinstruct", "9-palindrome-number.py.txt"): 4,
+    ("treeinstruct", "45-jump-game-ii.py.txt"): 5,
+    ("treeinstruct", "463-island-perimeter.py.txt"): 6,
+}
+# Other discovered files get IDs from here up, derived from their format and relative path
+DISCOVERED_ID_BASE = 1000
+
+
+def extract_tags(text: str) -> dict[str, str]:
+    """
+    Extract every top-level <tag>...</tag> of a file in a single scan.
+
+    Tags nested in another tag's content (e.g., <code> in <dialogue>) stay part of that content.
 
-from ie_capstone.config import DATA_DIR, TREEINSTRUCT_DATA_DIR
-from ie_capstone.models import Problem
+    Args:
+        text: Full file content
+
+    Returns:
+        Mapping of tag name to its stripped content (the first occurrence wins)
+    """
+    tags: dict[str, str] = {}
+    position = 0
+    while match := _OPEN_TAG.search(text, position):
+        name = match.group(1)
+        end = text.find(f"</{name}>", match.end())
+        if end < 0:
+            # An unclosed tag (like <alt>) is plain text
+            position = match.end()
+            continue
+        tags.setdefault(name, text[match.end() : end].strip())
+        position = end + len(name) + 3
+    return tags
+
+
+@lru_cache(maxsize=32)
+def _tag_pattern(tag_name: str) -> re.Pattern[str]:
+    """Compile the pattern for one tag (once per tag name)."""
+    return re.compile(rf"<{tag_name}>(.*?)</{tag_name}>", re.DOTALL)
 
 
 def extract_tag_content(text: str, tag_name: str) -> str:
@@ -18,8 +83,7 @@ def extract_tag_content(text: str, tag_name: str) -> str:
     Returns:
         Stripped content between tags, or empty string if tag not found
     """
-    pattern = rf"<{tag_name}>(.*?)</{tag_name}>"
-    match = re.search(pattern, text, re.DOTALL)
+    match = _tag_pattern(tag_name).search(text)
     if match:
         return match.group(1).strip()
     return ""
@@ -37,13 +101,7 @@ def strip_line_numbers(code: str) -> str:
     Returns:
         Code without line numbers
     """
-    lines = code.split("\n")
-    stripped_lines = []
-    for line in lines:
-        # Match pattern like "1. ", "2. ", "10. " at start of line
-        stripped = re.sub(r"^\d+\.\s?", "", line)
-        stripped_lines.append(stripped)
-    return "\n".join(stripped_lines)
+    return _LINE_NUMBER.sub("\n", "\n" + code)[1:]
 
 
 def parse_bug_fixes(bug_fixes_content: str) -> list[str]:
@@ -105,12 +163,60 @@ def parse_unit_tests(unit_tests_content: str) -> list[str]:
     return [line for line in lines if line.startswith("assert")]
 
 
-def parse_problem_file(file_path: Path) -> Problem:
+def parse_dialogue(dialogue_content: str) -> list[DialogueTurn]:
+    """
+    Parse an example dialogue into turns.
+
+    "User:" and "Assistant:" lines start a turn, "<alt>" lines add an alternative to the
+    current turn, and a <code> block is attached to the current turn (without line numbers).
+    Other lines continue the current text.
+
+    Args:
+        dialogue_content: Content from <dialogue> tag
+
+    Returns:
+        List of turns in dialogue order
+    """
+    turns: list[DialogueTurn] = []
+    for segment in _CODE_BLOCK.split(dialogue_content):
+        if segment.startswith("<code>"):
+            if turns:
+                turns[-1].code = strip_line_numbers(segment.removeprefix("<code>").removesuffix("</code>").strip())
+            continue
+        for marker, text in _DIALOGUE_LINE.findall(segment):
+            if marker in _SPEAKERS:
+                turns.append(DialogueTurn(role=_SPEAKERS[marker], content=text))
+            elif not turns or not (marker or text):
+                continue
+            elif marker:
+                turns[-1].alternatives.append(text)
+            elif turns[-1].alternatives:
+                turns[-1].alternatives[-1] += "\n" + text
+            else:
+                turns[-1].content += "\n" + text
+    return turns
+
+
+def dialogue_turns(problem: Problem) -> list[DialogueTurn]:
+    """
+    Get a problem's dialogue turns, parsing example_dialogue if they were not set.
+
+    Args:
+        problem: The debugging problem
+
+    Returns:
+        List of turns (empty without a dialogue)
+    """
+    return problem.dialogue or parse_dialogue(problem.example_dialogue)
+
+
+def parse_problem_file(file_path: Path, problem_id: int | None = None) -> Problem:
     """
     Parse a single problem file with XML-like tags.
 
     Args:
         file_path: Path to the .txt file
+        problem_id: ID to assign to this problem (default: the number in the filename)
 
     Returns:
         Problem object with all extracted fields
@@ -124,16 +230,17 @@ def parse_problem_file(file_path: Path) -> Problem:
     text = file_path.read_text(encoding="utf-8")
 
     # Extract problem ID from filename (e.g., "1.txt" -> 1)
-    problem_id = int(file_path.stem)
-
-    # Extract all tagged content
-    description = extract_tag_content(text, "problem")
-    buggy_code_raw = extract_tag_content(text, "bug_code")
-    buggy_code = strip_line_numbers(buggy_code_raw)
-    bug_description = extract_tag_content(text, "bug_desc")
-    bug_fixes_raw = extract_tag_content(text, "bug_fixes")
-    unit_tests_raw = extract_tag_content(text, "unit_tests")
-    example_dialogue = extract_tag_content(text, "dialogue")
+    if problem_id is None:
+        problem_id = int(file_path.stem)
+
+    # Extract all tagged content in one scan
+    tags = extract_tags(text)
+    description = tags.get("problem", "")
+    buggy_code = strip_line_numbers(tags.get("bug_code", ""))
+    bug_description = tags.get("bug_desc", "")
+    bug_fixes_raw = tags.get("bug_fixes", "")
+    unit_tests_raw = tags.get("unit_tests", "")
+    example_dialogue = tags.get("dialogue", "")
 
     return Problem(
         id=problem_id,
@@ -143,9 +250,31 @@ def parse_problem_file(file_path: Path) -> Problem:
         expected_fixes=parse_bug_fixes(bug_fixes_raw),
         unit_tests=parse_unit_tests(unit_tests_raw),
         example_dialogue=example_dialogue,
+        dialogue=parse_dialogue(example_dialogue),
     )
 
 
+def extract_treeinstruct_sections(text: str) -> dict[str, str]:
+    """
+    Extract every TreeInstruct section (section: --- ... ---) of a file in a single scan.
+
+    Args:
+        text: Full file content
+
+    Returns:
+        Mapping of section name to its stripped content (the first occurrence wins)
+    """
+    sections: dict[str, str] = {}
+    position = 0
+    while match := _TREEINSTRUCT_HEADER.search(text, position):
+        end = text.find("---", match.end())
+        if end < 0:
+            break
+        sections.setdefault(match.group(1), text[match.end() : end].strip())
+        position = end + 3
+    return sections
+
+
 def extract_treeinstruct_section(text: str, section_name: str) -> str:
     """
     Extract content from TreeInstruct format (section: --- ... ---).
@@ -157,11 +286,7 @@ def extract_treeinstruct_section(text: str, section_name: str) -> str:
     Returns:
         Stripped content between markers, or empty string if not found
     """
-    pattern = rf"{section_name}: ---\n{section_name}:\n?(.*?)---"
-    match = re.search(pattern, text, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    return ""
+    return extract_treeinstruct_sections(text).get(section_name, "")
 
 
 def parse_treeinstruct_file(file_path: Path, problem_id: int) -> Problem:
@@ -183,15 +308,16 @@ def parse_treeinstruct_file(file_path: Path, problem_id: int) -> Problem:
 
     text = file_path.read_text(encoding="utf-8")
 
-    # Extract all sections
-    description = extract_treeinstruct_section(text, "problem")
-    buggy_code_raw = extract_treeinstruct_section(text, "buggy_code")
-    buggy_code = strip_line_numbers(buggy_code_raw)
-    bug_description = extract_treeinstruct_section(text, "bug_desc")
-    bug_fixes_raw = extract_treeinstruct_section(text, "bug_fixes")
+    # Extract all sections in one scan
+    sections = extract_treeinstruct_sections(text)
+    description = sections.get("problem", "")
+    buggy_code = strip_line_numbers(sections.get("buggy_code", ""))
+    bug_description = sections.get("bug_desc", "")
+    bug_fixes_raw = sections.get("bug_fixes", "")
 
-    # TreeInstruct doesn't have unit tests, so we leave empty
-    unit_tests: list[str] = []
+    # TreeInstruct doesn't have unit tests; load the ones generated offline (see ie_capstone.dataset.testgen)
+    tests_path = unit_tests_path_for(file_path)
+    unit_tests = parse_unit_tests(tests_path.read_text(encoding="utf-8")) if tests_path.exists() else []
 
     return Problem(
         id=problem_id,
@@ -204,6 +330,121 @@ def parse_treeinstruct_file(file_path: Path, problem_id: int) -> Problem:
     )
 
 
+def stable_problem_id(source_format: SourceFormat, relative_path: str) -> int:
+    """
+    Get the ID of a dataset file, which depends only on its format and location.
+
+    Args:
+        source_format: "socratic" or "treeinstruct"
+        relative_path: POSIX path relative to the dataset directory
+
+    Returns:
+        The legacy ID for the experiment's problems, otherwise DISCOVERED_ID_BASE plus a path hash
+    """
+    legacy = LEGACY_PROBLEM_IDS.get((source_format, relative_path))
+    if legacy is not None:
+        return legacy
+    digest = hashlib.sha256(f"{source_format}:{relative_path}".encode()).hexdigest()
+    return DISCOVERED_ID_BASE + int(digest[:12], 16)
+
+
+@dataclass(frozen=True)
+class ProblemSource:
+    """A dataset file and the ID its problem is loaded as."""
+
+    path: Path
+    problem_id: int
+    format: SourceFormat
+
+    @property
+    def dependencies(self) -> list[Path]:
+        """Get every file the parsed problem depends on (the file, and a TreeInstruct file's generated tests)."""
+        if self.format == "treeinstruct":
+            return [self.path, unit_tests_path_for(self.path)]
+        return [self.path]
+
+    def parse(self) -> Problem:
+        """
+        Parse the file.
+
+        Returns:
+            Problem object with all extracted fields (without reference solutions)
+
+        Raises:
+            ValueError: If the file has no problem description or buggy code
+        """
+        if self.format == "treeinstruct":
+            problem = parse_treeinstruct_file(self.path, self.problem_id)
+        else:
+            problem = parse_problem_file(self.path, self.problem_id)
+        missing = [name for name in ("description", "buggy_code") if not getattr(problem, name)]
+        if missing:
+            raise ValueError(f"Malformed problem file {self.path}: no {' or '.join(missing)}")
+        return problem
+
+
+def discover_sources(directory: Path, source_format: SourceFormat) -> list[ProblemSource]:
+    """
+    Find every dataset file of a format under a directory.
+
+    Args:
+        directory: Dataset directory (searched recursively)
+        source_format: "socratic" or "treeinstruct"
+
+    Returns:
+        Sources ordered by relative path, with stable_problem_id IDs
+    """
+    paths = sorted(directory.rglob(SOURCE_PATTERNS[source_format]))
+    if source_format == "socratic":
+        # TreeInstruct files kept in the same tree are not Socratic files
+        paths = [path for path in paths if not path.match(SOURCE_PATTERNS["treeinstruct"])]
+    return [
+        ProblemSource(path, stable_problem_id(source_format, path.relative_to(directory).as_posix()), source_format)
+        for path in paths
+        if path.is_file()
+    ]
+
+
+def _legacy_sources(directory: Path, source_format: SourceFormat) -> list[ProblemSource]:
+    """Get the experiment's files of a format that exist, ordered by ID."""
+    sources = [
+        ProblemSource(directory / relative_path, problem_id, source_format)
+        for (legacy_format, relative_path), problem_id in LEGACY_PROBLEM_IDS.items()
+        if legacy_format == source_format
+    ]
+    return [source for source in sources if source.path.exists()]
+
+
+def socratic_sources() -> list[ProblemSource]:
+    """
+    Get the Socratic Debugging Benchmark files (1.txt, 2.txt, 3.txt) that exist.
+
+    Returns:
+        Sources with IDs 1-3
+    """
+    return _legacy_sources(DATA_DIR, "socratic")
+
+
+def treeinstruct_sources() -> list[ProblemSource]:
+    """
+    Get the TreeInstruct files that exist.
+
+    Returns:
+        Sources with IDs 4-6
+    """
+    return _legacy_sources(TREEINSTRUCT_DATA_DIR, "treeinstruct")
+
+
+def problem_sources() -> list[ProblemSource]:
+    """
+    Get the files of all problems from both datasets.
+
+    Returns:
+        Sources ordered by problem ID
+    """
+    return sorted(socratic_sources() + treeinstruct_sources(), key=lambda source: source.problem_id)
+
+
 def load_socratic_problems() -> list[Problem]:
     """
     Load problems from Socratic Debugging Benchmark (1.txt, 2.txt, 3.txt).
@@ -211,12 +452,7 @@ def load_socratic_problems() -> list[Problem]:
     Returns:
         List of Problem objects with IDs 1-3
     """
-    problems = []
-    for i in range(1, 4):  # 1, 2, 3
-        file_path = DATA_DIR / f"{i}.txt"
-        if file_path.exists():
-            problems.append(parse_problem_file(file_path))
-    return problems
+    return [source.parse() for source in socratic_sources()]
 
 
 def load_treeinstruct_problems() -> list[Problem]:
@@ -226,36 +462,37 @@ def load_treeinstruct_problems() -> list[Problem]:
     Returns:
         List of Problem objects with IDs 4-6
     """
-    # TreeInstruct files and their assigned IDs
-    treeinstruct_files = [
-        ("9-palindrome-number.py.txt", 4),
-        ("45-jump-game-ii.py.txt", 5),
-        ("463-island-perimeter.py.txt", 6),
-    ]
+    return [source.parse() for source in treeinstruct_sources()]
 
-    problems = []
-    for filename, problem_id in treeinstruct_files:
-        file_path = TREEINSTRUCT_DATA_DIR / filename
-        if file_path.exists():
-            problems.append(parse_treeinstruct_file(file_path, problem_id))
-    return problems
 
-
-def load_all_problems() -> list[Problem]:
+def load_all_problems(use_cache: bool = PROBLEM_CACHE) -> list[Problem]:
     """
     Load all 6 problems from both datasets.
 
+    Args:
+        use_cache: Read parsed problems from the problem cache, reparsing only files that changed
+            (see ie_capstone.dataset.cache)
+
     Returns:
         List of Problem objects ordered by ID (1-6)
         - Problems 1-3: Socratic Debugging Benchmark
         - Problems 4-6: TreeInstruct Dataset
-    """
-    problems = []
-
-    # Load from Socratic Debugging Benchmark (IDs 1-3)
-    problems.extend(load_socratic_problems())
 
-    # Load from TreeInstruct Dataset (IDs 4-6)
-    problems.extend(load_treeinstruct_problems())
+    Raises:
+        ValueError: If an experiment problem file cannot be parsed (unlike a discovered corpus,
+            the experiment needs every one of its problems)
+    """
+    from ie_capstone.dataset.cache import ProblemCache
+
+    cache = ProblemCache(PROBLEM_CACHE_PATH if use_cache else None)
+    problems = cache.load(problem_sources())
+    if cache.errors:
+        failures = "; ".join(f"{error.path}: {error.error}" for error in cache.errors)
+        raise ValueError(f"Experiment problem files failed to load: {failures}")
+
+    # Attach reference solutions synthesized offline (see ie_capstone.dataset.reference)
+    references = load_reference_solutions()
+    for problem in problems:
+        problem.reference_solutions = references.get(problem.id, [])
 
     return sorted(problems, key=lambda p: p.id)
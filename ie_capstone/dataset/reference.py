@@ -0,0 +1,311 @@
+"""Reference-solution synthesis from textual bug fixes and AST-based matching."""
+
+import ast
+import hashlib
+import itertools
+import json
+import re
+from dataclasses import asdict
+from functools import lru_cache
+from pathlib import Path
+
+from ie_capstone.config import REFERENCE_SOLUTIONS_PATH
+from ie_capstone.grading.runner import run_unit_tests
+from ie_capstone.models import Problem
+
+# "Replace `<` with `<=` on line 3", "Replace <= with < on line 3.", "Replace `=` with `==` on lines 2, 4, 6, and 8."
+REPLACE_FIX_PATTERN = re.compile(
+    r"^Replace\s+(?:`(?P<old_q>[^`]+)`|(?P<old>\S+))\s+with\s*(?:`(?P<new_q>[^`]+)`|(?P<new>\S+))"
+    r"\s+(?:on|in)\s+lines?\s+(?P<lines>\d+(?:\s*,?\s*(?:and\s+)?\d+)*)\.?$"
+)
+# "Add a colon at the end of line 6.", "Add a colon to the end of line 10."
+ADD_COLON_FIX_PATTERN = re.compile(r"^Add a colon (?:at|to) the end of line (?P<line>\d+)\.?$")
+
+OPERATOR_CHARS = set("<>=!+-*/%&|^~")
+
+# Fix subsets are only enumerated up to this many fixes (2^n - 1 candidates)
+MAX_FIX_SUBSET_SIZE = 4
+
+# Normalized ASTs of known code (the problems' buggy code, from the problem cache), used before parsing
+_seeded_normalizations: dict[str, str | None] = {}
+
+
+def _is_boundary(left: str, right: str, token: str) -> bool:
+    """Check that a token occurrence is not part of a longer identifier or operator."""
+    if token[0].isalnum() or token[0] == "_":
+        if left.isalnum() or left == "_":
+            return False
+    elif token[0] in OPERATOR_CHARS and left in OPERATOR_CHARS:
+        return False
+    if token[-1].isalnum() or token[-1] == "_":
+        if right.isalnum() or right == "_":
+            return False
+    elif token[-1] in OPERATOR_CHARS and right in OPERATOR_CHARS:
+        return False
+    return True
+
+
+def replace_token(line: str, old: str, new: str) -> str | None:
+    """
+    Replace every standalone occurrence of a token in a line.
+
+    Args:
+        line: A single source line
+        old: Token to replace (e.g., "<", "range(n)")
+        new: Replacement token
+
+    Returns:
+        Updated line, or None if the token does not occur
+    """
+    parts = []
+    cursor = 0
+    start = line.find(old)
+    while start != -1:
+        end = start + len(old)
+        left = line[start - 1] if start > 0 else " "
+        right = line[end] if end < len(line) else " "
+        if _is_boundary(left, right, old):
+            parts.extend([line[cursor:start], new])
+            cursor = end
+            start = line.find(old, end)
+        else:
+            start = line.find(old, start + 1)
+    if not parts:
+        return None
+    parts.append(line[cursor:])
+    return "".join(parts)
+
+
+def apply_fix(code: str, fix: str) -> str | None:
+    """
+    Apply a single textual fix to code.
+
+    Supports "Replace X with Y on line(s) N" and "Add a colon at the end of line N".
+
+    Args:
+        code: Code without line numbers
+        fix: Fix description from Problem.expected_fixes
+
+    Returns:
+        Fixed code, or None if the fix is not understood or does not apply
+    """
+    lines = code.split("\n")
+    fix = fix.strip()
+
+    replace = REPLACE_FIX_PATTERN.match(fix)
+    if replace:
+        old = replace.group("old_q") or replace.group("old")
+        new = replace.group("new_q") or replace.group("new")
+        for line_no in (int(n) for n in re.findall(r"\d+", replace.group("lines"))):
+            if not 1 <= line_no <= len(lines):
+                return None
+            updated = replace_token(lines[line_no - 1], old, new)
+            if updated is None:
+                return None
+            lines[line_no - 1] = updated
+        return "\n".join(lines)
+
+    add_colon = ADD_COLON_FIX_PATTERN.match(fix)
+    if add_colon:
+        line_no = int(add_colon.group("line"))
+        if not 1 <= line_no <= len(lines):
+            return None
+        lines[line_no - 1] = lines[line_no - 1].rstrip() + ":"
+        return "\n".join(lines)
+
+    return None
+
+
+def apply_fixes(code: str, fixes: list[str]) -> str | None:
+    """
+    Apply several fixes in order. Fixes address line numbers of the buggy code, which none of them shift.
+
+    Args:
+        code: Code without line numbers
+        fixes: Fix descriptions
+
+    Returns:
+        Fixed code, or None if any fix does not apply
+    """
+    for fix in fixes:
+        fixed = apply_fix(code, fix)
+        if fixed is None:
+            return None
+        code = fixed
+    return code
+
+
+def _strip_docstrings(tree: ast.AST) -> None:
+    """Remove docstrings from modules, classes and functions in place."""
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        body = node.body
+        first = body[0] if body else None
+        if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+            node.body = body[1:] or [ast.Pass()]
+
+
+def seed_normalized_code(code: str, normalized: str | None) -> None:
+    """
+    Record a normalized AST computed elsewhere (e.g., read from the problem cache).
+
+    Args:
+        code: Python source
+        normalized: Its normalize_code result
+    """
+    _seeded_normalizations[code] = normalized
+
+
+@lru_cache(maxsize=256)
+def normalize_code(code: str) -> str | None:
+    """
+    Normalize code to a canonical AST dump, ignoring formatting, comments and docstrings.
+
+    Args:
+        code: Python source
+
+    Returns:
+        AST dump string, or None if the code does not parse
+    """
+    if code in _seeded_normalizations:
+        return _seeded_normalizations[code]
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    _strip_docstrings(tree)
+    return ast.dump(tree, include_attributes=False)
+
+
+def code_fingerprint(problem_id: int, code: str) -> str:
+    """
+    Fingerprint a submission so that equivalent code can share a verdict.
+
+    Args:
+        problem_id: ID of the problem
+        code: Submitted code
+
+    Returns:
+        Hex digest shared by code with the same normalized AST (or text, if unparsable)
+    """
+    normalized = normalize_code(code) or code.strip()
+    return hashlib.sha256(f"{problem_id}\0{normalized}".encode()).hexdigest()[:32]
+
+
+def problem_version(problem: Problem) -> str:
+    """
+    Hash the content of a problem, so results derived from one version of it are not reused for another.
+
+    Args:
+        problem: The debugging problem
+
+    Returns:
+        Hex digest of every field (changes when the problem is edited and reloaded)
+    """
+    return hashlib.sha256(json.dumps(asdict(problem), sort_keys=True).encode()).hexdigest()[:32]
+
+
+def matches_reference(problem: Problem, code: str) -> bool:
+    """
+    Check whether code is AST-equivalent to one of the problem's reference solutions.
+
+    Args:
+        problem: The debugging problem
+        code: Student's submitted code
+
+    Returns:
+        True if the normalized AST equals a reference solution's
+    """
+    if not problem.reference_solutions:
+        return False
+    normalized = normalize_code(code)
+    if normalized is None:
+        return False
+    return any(normalize_code(reference) == normalized for reference in problem.reference_solutions)
+
+
+def synthesize_reference_solutions(problem: Problem) -> list[str]:
+    """
+    Turn a problem's expected fixes into verified reference solutions.
+
+    With unit tests, every subset of fixes is tried (fixes are sometimes alternatives, as in
+    problem 2) and kept if the tests pass. Without unit tests only the combination of all
+    fixes is used, and it only has to parse.
+
+    Args:
+        problem: The debugging problem
+
+    Returns:
+        Reference solutions, one per distinct normalized AST
+    """
+    fixes = problem.expected_fixes
+    if problem.unit_tests and len(fixes) <= MAX_FIX_SUBSET_SIZE:
+        subsets = [list(s) for size in range(1, len(fixes) + 1) for s in itertools.combinations(fixes, size)]
+    else:
+        subsets = [fixes]
+
+    solutions: list[str] = []
+    seen: set[str] = set()
+    for subset in subsets:
+        fixed = apply_fixes(problem.buggy_code, subset)
+        if fixed is None:
+            continue
+        normalized = normalize_code(fixed)
+        if normalized is None or normalized in seen:
+            continue
+        if problem.unit_tests and not run_unit_tests(fixed, problem.unit_tests).passed:
+            continue
+        seen.add(normalized)
+        solutions.append(fixed)
+    return solutions
+
+
+def load_reference_solutions(path: Path | None = None) -> dict[int, list[str]]:
+    """
+    Load stored reference solutions.
+
+    Args:
+        path: Optional path to the JSON file (defaults to REFERENCE_SOLUTIONS_PATH)
+
+    Returns:
+        Mapping of problem ID to reference solutions (empty if the file does not exist)
+    """
+    path = path or REFERENCE_SOLUTIONS_PATH
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {int(problem_id): solutions for problem_id, solutions in data.items()}
+
+
+def save_reference_solutions(solutions: dict[int, list[str]], path: Path | None = None) -> Path:
+    """
+    Save reference solutions to JSON.
+
+    Args:
+        solutions: Mapping of problem ID to reference solutions
+        path: Optional path to the JSON file (defaults to REFERENCE_SOLUTIONS_PATH)
+
+    Returns:
+        Path to saved file
+    """
+    path = path or REFERENCE_SOLUTIONS_PATH
+    data = {str(problem_id): solutions[problem_id] for problem_id in sorted(solutions)}
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def main():
+    """Synthesize reference solutions for all problems and store them."""
+    from ie_capstone.dataset.parser import load_all_problems
+
+    solutions = {}
+    for problem in load_all_problems():
+        solutions[problem.id] = synthesize_reference_solutions(problem)
+        print(f"Problem {problem.id}: {len(solutions[problem.id])} reference solution(s)")
+    path = save_reference_solutions(solutions)
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
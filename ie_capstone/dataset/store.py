@@ -0,0 +1,297 @@
+"""Read-only, memory-mapped problem store for large problem banks.
+
+A packed file holds one record per problem and an open-addressing hash table from problem ID to
+record offset, so a lookup by ID touches a few table slots and one record header. The file is
+mapped read-only: fields are decoded from the mapping on each access and nothing is kept per
+problem, so worker processes opening the same store share its pages through the OS page cache
+(a pickled store reopens the mapping in the receiving process).
+
+Layout (little-endian):
+    header   magic, format, count, table offset, table slots, order offset
+    records  problem ID, byte length of each STORE_FIELDS field, then the fields' UTF-8 bytes
+             (text as is, lists as JSON)
+    table    (problem ID, record offset) slots, empty slots have offset 0
+    order    record offsets in the order the problems were written
+
+Build a store from a corpus with `python -m ie_capstone.dataset.corpus --store PATH`.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict
+from pathlib import Path
+from typing import BinaryIO
+
+from ie_capstone.models import DialogueTurn, Problem
+
+STORE_MAGIC = b"IEPS"
+STORE_FORMAT = 1
+# Problem fields in record order; the ID lives in the record header
+STORE_FIELDS = (
+    "description",
+    "buggy_code",
+    "bug_description",
+    "expected_fixes",
+    "unit_tests",
+    "example_dialogue",
+    "reference_solutions",
+    "dialogue",
+)
+# Problems per table slot at most (a sparse table keeps probe sequences short)
+STORE_LOAD_FACTOR = 0.5
+
+_HEADER = struct.Struct("<4sIQQQQ")
+_RECORD = struct.Struct(f"<q{len(STORE_FIELDS)}I")
+_SLOT = struct.Struct("<qQ")
+_OFFSET = struct.Struct("<Q")
+# Fibonacci hashing spreads consecutive IDs over the table
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _encode(problem: Problem, name: str) -> bytes:
+    """Encode one field of a problem."""
+    value = getattr(problem, name)
+    if name == "dialogue":
+        value = [asdict(turn) for turn in value]
+    return (value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)).encode()
+
+
+def _decode_text(data: bytes) -> str:
+    """Decode a text field."""
+    return data.decode()
+
+
+def _decode_list(data: bytes) -> list:
+    """Decode a list field."""
+    return json.loads(data)
+
+
+def _decode_dialogue(data: bytes) -> list[DialogueTurn]:
+    """Decode the dialogue turns."""
+    return [DialogueTurn(**turn) for turn in json.loads(data)]
+
+
+def _slot(problem_id: int, slots: int) -> int:
+    """Get the first table slot of a problem ID (slots is a power of two)."""
+    return ((problem_id * _HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> 32 & (slots - 1)
+
+
+def _write_records(file: BinaryIO, problems: Iterable[Problem]) -> dict[int, int]:
+    """Write one record per problem after the header, returning the record offset of each ID."""
+    offsets: dict[int, int] = {}
+    file.write(bytes(_HEADER.size))
+    for problem in problems:
+        if problem.id in offsets:
+            raise ValueError(f"Duplicate problem ID {problem.id}")
+        offsets[problem.id] = file.tell()
+        fields = [_encode(problem, name) for name in STORE_FIELDS]
+        file.write(_RECORD.pack(problem.id, *(len(data) for data in fields)))
+        file.writelines(fields)
+    return offsets
+
+
+def _write_index(file: BinaryIO, offsets: dict[int, int]) -> None:
+    """Write the hash table and the record order after the records, then the header."""
+    slots = 1
+    while slots * STORE_LOAD_FACTOR < max(len(offsets), 1):
+        slots *= 2
+    table = [(0, 0)] * slots
+    for problem_id, offset in offsets.items():
+        slot = _slot(problem_id, slots)
+        while table[slot][1]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = (problem_id, offset)
+    table_offset = file.tell()
+    file.writelines(_SLOT.pack(*entry) for entry in table)
+    order_offset = file.tell()
+    file.writelines(_OFFSET.pack(offset) for offset in offsets.values())
+    file.seek(0)
+    file.write(_HEADER.pack(STORE_MAGIC, STORE_FORMAT, len(offsets), table_offset, slots, order_offset))
+
+
+def write_store(path: Path, problems: Iterable[Problem]) -> int:
+    """
+    Pack problems into a store file, replacing it atomically.
+
+    Problems are written as they arrive, so a streaming source (e.g., iter_corpus) is never
+    held in memory; only the (ID, offset) pairs are kept until the table is written.
+
+    Args:
+        path: Store file
+        problems: Problems to pack
+
+    Returns:
+        Number of problems written
+
+    Raises:
+        ValueError: If two problems share an ID
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, prefix=f".{path.name}.", delete=False) as file:
+        try:
+            offsets = _write_records(file, problems)
+            _write_index(file, offsets)
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+    return len(offsets)
+
+
+class _StoredField:
+    """A problem field decoded from the store on every access."""
+
+    def __init__(self, decode: Callable[[bytes], object]):
+        self.decode = decode
+
+    def __set_name__(self, owner: type, name: str):
+        self.index = STORE_FIELDS.index(name)
+
+    def __get__(self, problem: "StoredProblem | None", owner: type):
+        if problem is None:
+            return self
+        return self.decode(problem.store.field(problem.offset, self.index))
+
+
+class StoredProblem:
+    """A problem in a store, read like a Problem but decoded field by field on access."""
+
+    __slots__ = ("offset", "store")
+
+    description = _StoredField(_decode_text)
+    buggy_code = _StoredField(_decode_text)
+    bug_description = _StoredField(_decode_text)
+    expected_fixes = _StoredField(_decode_list)
+    unit_tests = _StoredField(_decode_list)
+    example_dialogue = _StoredField(_decode_text)
+    reference_solutions = _StoredField(_decode_list)
+    dialogue = _StoredField(_decode_dialogue)
+
+    def __init__(self, store: "ProblemStore", offset: int):
+        """
+        Point at a record.
+
+        Args:
+            store: Store holding the record
+            offset: Record offset in the store
+        """
+        self.store = store
+        self.offset = offset
+
+    @property
+    def id(self) -> int:
+        """Get the problem ID."""
+        return _RECORD.unpack_from(self.store.buffer, self.offset)[0]
+
+    def to_problem(self) -> Problem:
+        """
+        Decode every field (e.g., to hand the problem to code that keeps it).
+
+        Returns:
+            The problem as a Problem
+        """
+        return Problem(id=self.id, **{name: getattr(self, name) for name in STORE_FIELDS})
+
+    def __repr__(self) -> str:
+        return f"StoredProblem(id={self.id})"
+
+
+class ProblemStore:
+    """A memory-mapped store file, with lookups by problem ID."""
+
+    def __init__(self, path: Path):
+        """
+        Map a store file.
+
+        Args:
+            path: Store file written by write_store
+
+        Raises:
+            ValueError: If the file is not a store of this format
+        """
+        self.path = path
+        with path.open("rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self.table_offset, self.slots, self.order_offset = _HEADER.unpack_from(
+            self.buffer, 0
+        )
+        if magic != STORE_MAGIC or version != STORE_FORMAT:
+            self.buffer.close()
+            raise ValueError(f"Not a problem store (format {STORE_FORMAT}): {path}")
+
+    def _find(self, problem_id: int) -> int:
+        """Get the record offset of a problem ID (0 if it is not stored)."""
+        slot = _slot(problem_id, self.slots)
+        while True:
+            stored_id, offset = _SLOT.unpack_from(self.buffer, self.table_offset + slot * _SLOT.size)
+            if not offset or stored_id == problem_id:
+                return offset
+            slot = (slot + 1) & (self.slots - 1)
+
+    def field(self, offset: int, index: int) -> bytes:
+        """
+        Read the bytes of one field of a record.
+
+        Args:
+            offset: Record offset
+            index: Position of the field in STORE_FIELDS
+
+        Returns:
+            The encoded field
+        """
+        lengths = _RECORD.unpack_from(self.buffer, offset)[1:]
+        start = offset + _RECORD.size + sum(lengths[:index])
+        return self.buffer[start : start + lengths[index]]
+
+    def get(self, problem_id: int) -> StoredProblem | None:
+        """
+        Look up a problem by ID.
+
+        Args:
+            problem_id: ID of the problem
+
+        Returns:
+            The stored problem, or None if the ID is not stored
+        """
+        offset = self._find(problem_id)
+        return StoredProblem(self, offset) if offset else None
+
+    def __getitem__(self, problem_id: int) -> StoredProblem:
+        problem = self.get(problem_id)
+        if problem is None:
+            raise KeyError(problem_id)
+        return problem
+
+    def __contains__(self, problem_id: object) -> bool:
+        return isinstance(problem_id, int) and bool(self._find(problem_id))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[StoredProblem]:
+        """Iterate over the problems in the order they were written."""
+        for position in range(self.count):
+            (offset,) = _OFFSET.unpack_from(self.buffer, self.order_offset + position * _OFFSET.size)
+            yield StoredProblem(self, offset)
+
+    def ids(self) -> list[int]:
+        """
+        Get the stored problem IDs.
+
+        Returns:
+            IDs in the order the problems were written
+        """
+        return [problem.id for problem in self]
+
+    def close(self) -> None:
+        """Unmap the file (problems read from the store can no longer be decoded)."""
+        self.buffer.close()
+
+    def __reduce__(self):
+        # Worker processes map the file themselves instead of receiving its contents
+        return ProblemStore, (self.path,)
@@ -0,0 +1,184 @@
+"""Offline unit-test generation for TreeInstruct problems.
+
+Usage:
+    python -m ie_capstone.dataset.testgen
+
+TreeInstruct files have no unit tests, only worked examples in the problem statement
+("입력: ... 출력: ..."). This module turns those examples into assert statements, computes
+expected values with the reference solution (the file's `correct_code` section), and adds a
+few boundary variants of each example input. The asserts are written next to the dataset
+file as `<name>.tests` and loaded by `parse_treeinstruct_file`.
+"""
+
+import ast
+import re
+from pathlib import Path
+
+from ie_capstone.grading.runner import evaluate_expressions
+
+# "입력: nums = [2,3,1,1,4]\n출력: 2" (the input may span several lines, as in the grid example)
+EXAMPLE_PATTERN = re.compile(r"입력:\s*(?P<input>.*?)\s*출력:\s*(?P<output>[^\n]+)", re.DOTALL)
+ASSIGNMENT_PREFIX_PATTERN = re.compile(r"^\w+\s*=\s*")
+JSON_LITERALS = {"true": "True", "false": "False", "null": "None"}
+
+TESTS_HEADER = "# Generated by `python -m ie_capstone.dataset.testgen` from the problem examples and correct_code"
+
+
+def unit_tests_path_for(file_path: Path) -> Path:
+    """
+    Get the path of the generated tests for a TreeInstruct file.
+
+    Args:
+        file_path: Path to the dataset file (e.g., "9-palindrome-number.py.txt")
+
+    Returns:
+        Sibling path with a ".tests" suffix (e.g., "9-palindrome-number.py.tests")
+    """
+    return file_path.with_name(file_path.name.removesuffix(".txt") + ".tests")
+
+
+def _to_python_literal(text: str):
+    """Parse an example value, accepting JSON-style true/false/null."""
+    text = ASSIGNMENT_PREFIX_PATTERN.sub("", text.strip())
+    text = re.sub(r"\b(true|false|null)\b", lambda m: JSON_LITERALS[m.group(1)], text)
+    return ast.literal_eval(text)
+
+
+def extract_examples(description: str) -> list[tuple[object, object]]:
+    """
+    Extract (input, output) pairs from a problem statement.
+
+    Args:
+        description: Problem statement with "입력:"/"출력:" examples
+
+    Returns:
+        Parsed example pairs; examples whose values are not literals are skipped
+    """
+    examples = []
+    for match in EXAMPLE_PATTERN.finditer(description):
+        try:
+            examples.append((_to_python_literal(match.group("input")), _to_python_literal(match.group("output"))))
+        except (ValueError, SyntaxError):
+            continue
+    return examples
+
+
+def find_entry_point(code: str) -> str | None:
+    """
+    Find the callable to test in a solution.
+
+    Args:
+        code: Solution source (LeetCode-style `class Solution` or a plain function)
+
+    Returns:
+        Call prefix such as "Solution().isPalindrome" or "search", or None if none is found
+    """
+    tree = ast.parse(code)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "Solution":
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and not item.name.startswith("_"):
+                    return f"Solution().{item.name}"
+        if isinstance(node, ast.FunctionDef):
+            return node.name
+    return None
+
+
+def boundary_variants(value) -> list:
+    """
+    Derive boundary inputs from an example input that keep its shape and constraints.
+
+    Args:
+        value: Example input
+
+    Returns:
+        Variants: 0 and 7 for integers, [0] for integer lists, and the transpose of a grid (none otherwise)
+    """
+    if isinstance(value, bool):
+        return []
+    if isinstance(value, int):
+        return [0, 7]
+    if isinstance(value, list) and value and all(isinstance(row, list) for row in value):
+        return [[list(column) for column in zip(*value)]]
+    if isinstance(value, list) and value:
+        return [[0]] if all(isinstance(item, int) for item in value) else []
+    return []
+
+
+def generate_unit_tests(description: str, reference_code: str, include_variants: bool = True) -> list[str]:
+    """
+    Generate assert statements for a problem from its examples and a reference solution.
+
+    Expected values always come from the reference solution. Examples whose stated output
+    disagrees with the reference are dropped.
+
+    Args:
+        description: Problem statement with examples
+        reference_code: A correct solution
+        include_variants: Also add boundary variants of each example input
+
+    Returns:
+        Assert statements (e.g., "assert Solution().isPalindrome(121) == True")
+    """
+    entry_point = find_entry_point(reference_code)
+    if entry_point is None:
+        return []
+
+    examples = extract_examples(description)
+    inputs = [example_input for example_input, _ in examples]
+    if include_variants:
+        inputs += [variant for example_input in inputs for variant in boundary_variants(example_input)]
+
+    calls = []
+    for value in inputs:
+        call = f"{entry_point}({value!r})"
+        if call not in calls:
+            calls.append(call)
+
+    expected = evaluate_expressions(reference_code, calls)
+    stated = {f"{entry_point}({example_input!r})": repr(output) for example_input, output in examples}
+
+    tests = []
+    for call, value in zip(calls, expected):
+        if value is None or (call in stated and stated[call] != value):
+            continue
+        tests.append(f"assert {call} == {value}")
+    return tests
+
+
+def write_unit_tests(file_path: Path, tests: list[str]) -> Path:
+    """
+    Write generated tests next to a dataset file.
+
+    Args:
+        file_path: Path to the dataset file
+        tests: Assert statements
+
+    Returns:
+        Path to the tests file
+    """
+    path = unit_tests_path_for(file_path)
+    path.write_text("\n".join([TESTS_HEADER, *tests]) + "\n", encoding="utf-8")
+    return path
+
+
+def main():
+    """Generate unit tests for every TreeInstruct file."""
+    from ie_capstone.config import TREEINSTRUCT_DATA_DIR
+    from ie_capstone.dataset.parser import extract_treeinstruct_sections, strip_line_numbers
+
+    for file_path in sorted(TREEINSTRUCT_DATA_DIR.glob("*.txt")):
+        text = file_path.read_text(encoding="utf-8")
+        sections = extract_treeinstruct_sections(text)
+        description = sections.get("problem", "")
+        reference_code = strip_line_numbers(sections.get("correct_code", ""))
+        if not reference_code:
+            print(f"{file_path.name}: no correct_code section, skipped")
+            continue
+        tests = generate_unit_tests(description, reference_code)
+        path = write_unit_tests(file_path, tests)
+        print(f"{file_path.name}: {len(tests)} test(s) -> {path.name}")
+
+
+if __name__ == "__main__":
+    main()
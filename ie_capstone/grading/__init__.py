@@ -0,0 +1,6 @@
+"""Local execution-based grading of student code."""
+
+from ie_capstone.grading.fuzz import FuzzResult, differential_fuzz
+from ie_capstone.grading.runner import TestRunResult, evaluate_expressions, run_unit_tests
+
+__all__ = ["FuzzResult", "TestRunResult", "differential_fuzz", "evaluate_expressions", "run_unit_tests"]
@@ -0,0 +1,210 @@
+"""Batched differential fuzzing of student code against a reference solution."""
+
+import json
+import random
+import subprocess
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from ie_capstone.config import JUDGE_FUZZ_CASES, JUDGE_FUZZ_TIMEOUT
+from ie_capstone.dataset.testgen import find_entry_point
+from ie_capstone.grading.runner import CODE_PRELUDE, run_python
+from ie_capstone.models import Problem
+
+# Runs every case in one process: start-up is paid once per submission, not once per case
+_FUZZ_SCRIPT = """
+import contextlib, copy, io, json, sys
+payload = json.loads(sys.stdin.read())
+
+def load(code, name):
+    namespace = {}
+    exec(compile(code, name, "exec"), namespace)
+    return namespace
+
+def call(namespace, args):
+    try:
+        return True, eval(payload["entry"], namespace)(*copy.deepcopy(args))
+    except Exception as exc:
+        return False, type(exc).__name__
+
+result = {"cases_run": 0, "mismatch": None, "error": None, "reference_error": None}
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        reference = load(payload["reference"], "<reference>")
+    except BaseException as exc:
+        reference = None
+        result["reference_error"] = f"{type(exc).__name__}: {exc}"
+    try:
+        student = load(payload["student"], "<student>") if reference is not None else None
+    except BaseException as exc:
+        student = None
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    if student is not None:
+        for args in payload["cases"]:
+            ok, expected = call(reference, args)
+            if not ok:
+                continue  # Input outside what the reference handles
+            result["cases_run"] += 1
+            student_ok, actual = call(student, args)
+            if not student_ok or actual != expected:
+                result["mismatch"] = {
+                    "args": repr(tuple(args)),
+                    "expected": repr(expected),
+                    "actual": repr(actual) if student_ok else f"raised {actual}",
+                }
+                break
+print(json.dumps(result))
+"""
+
+InputGenerator = Callable[[random.Random], tuple]
+
+
+def _search_inputs(rng: random.Random) -> tuple:
+    seq = sorted(rng.sample(range(-100, 101), rng.randint(0, 10)))
+    x = rng.choice(seq) if seq and rng.random() < 0.5 else rng.randint(-110, 110)
+    return x, seq
+
+
+def _factorial_inputs(rng: random.Random) -> tuple:
+    return (rng.randint(-5, 15),)
+
+
+def _compass_inputs(rng: random.Random) -> tuple:
+    return (rng.choice(["N", "E", "S", "W", "NE", "n", "", "rubbish", 42, None]),)
+
+
+def _palindrome_inputs(rng: random.Random) -> tuple:
+    half = str(rng.randint(0, 9999))
+    palindrome = int(rng.choice([half + half[::-1], half + half[-2::-1]]))
+    return (rng.choice([palindrome, -palindrome, rng.randint(-(10**6), 10**6), rng.randint(0, 10)]),)
+
+
+def _jump_inputs(rng: random.Random) -> tuple:
+    # Guaranteed reachable: every index before the last can move at least one step
+    length = rng.randint(1, 15)
+    return ([rng.randint(1, 5) for _ in range(length - 1)] + [rng.randint(0, 5)],)
+
+
+def _island_inputs(rng: random.Random) -> tuple:
+    rows, cols = rng.randint(1, 7), rng.randint(1, 7)
+    grid = [[0] * cols for _ in range(rows)]
+    frontier = [(rng.randrange(rows), rng.randrange(cols))]
+    for _ in range(rng.randint(1, rows * cols)):
+        i, j = rng.choice(frontier)
+        grid[i][j] = 1
+        for ni, nj in ((i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+            if 0 <= ni < rows and 0 <= nj < cols and not grid[ni][nj]:
+                frontier.append((ni, nj))
+    return (grid,)
+
+
+# Input generators for the experiment problems, keyed by problem ID
+INPUT_SPECS: dict[int, InputGenerator] = {
+    1: _search_inputs,
+    2: _factorial_inputs,
+    3: _compass_inputs,
+    4: _palindrome_inputs,
+    5: _jump_inputs,
+    6: _island_inputs,
+}
+
+
+@dataclass
+class FuzzResult:
+    """Outcome of differential fuzzing."""
+
+    passed: bool
+    cases_run: int = 0
+    failing_input: str | None = None
+    expected: str | None = None
+    actual: str | None = None
+    error: str | None = None
+
+
+def generate_cases(generator: InputGenerator, count: int, seed: int = 0) -> list[list]:
+    """
+    Generate distinct argument lists from an input generator.
+
+    Args:
+        generator: Per-problem input generator
+        count: Number of cases to generate
+        seed: Random seed (fixed so verdicts are reproducible)
+
+    Returns:
+        JSON-serializable argument lists
+    """
+    rng = random.Random(seed)  # noqa: S311
+    cases: list[list] = []
+    seen: set[str] = set()
+    for _ in range(count * 3):
+        args = list(generator(rng))
+        key = json.dumps(args)
+        if key not in seen:
+            seen.add(key)
+            cases.append(args)
+            if len(cases) == count:
+                break
+    return cases
+
+
+def differential_fuzz(
+    problem: Problem,
+    student_code: str,
+    cases: int = JUDGE_FUZZ_CASES,
+    seed: int = 0,
+    timeout: float = JUDGE_FUZZ_TIMEOUT,
+) -> FuzzResult | None:
+    """
+    Compare student code with the problem's reference solution on random inputs.
+
+    All cases run in one hardened subprocess per submission (see run_python); the first differing
+    input is reported.
+
+    Args:
+        problem: The debugging problem (needs an input spec and a reference solution)
+        student_code: Student's submitted code
+        cases: Number of random inputs
+        seed: Random seed
+        timeout: Seconds before the subprocess is killed (e.g., on an infinite loop)
+
+    Returns:
+        FuzzResult, or None when fuzzing gives no signal: the problem has no input spec or
+        reference solution, the reference fails to load, or no case ran
+    """
+    generator = INPUT_SPECS.get(problem.id)
+    if generator is None or not problem.reference_solutions:
+        return None
+    reference = problem.reference_solutions[0]
+    try:
+        entry_point = find_entry_point(reference)
+    except SyntaxError:
+        return None
+    if entry_point is None:
+        return None
+
+    payload = {
+        "reference": CODE_PRELUDE + reference,
+        "student": CODE_PRELUDE + student_code,
+        "entry": entry_point,
+        "cases": generate_cases(generator, cases, seed),
+    }
+    try:
+        completed = run_python(_FUZZ_SCRIPT, json.dumps(payload), timeout)
+    except subprocess.TimeoutExpired:
+        return FuzzResult(passed=False, error="Timed out")
+    if completed.returncode != 0 or not completed.stdout.strip():
+        return FuzzResult(passed=False, error=completed.stderr.strip() or "Fuzzer crashed")
+
+    outcome = json.loads(completed.stdout.strip().splitlines()[-1])
+    mismatch = outcome["mismatch"] or {}
+    # A broken reference, or a reference that rejects every input, says nothing about the submission
+    if outcome["reference_error"] is not None or (outcome["error"] is None and outcome["cases_run"] == 0):
+        return None
+    return FuzzResult(
+        passed=outcome["error"] is None and not mismatch,
+        cases_run=outcome["cases_run"],
+        failing_input=mismatch.get("args"),
+        expected=mismatch.get("expected"),
+        actual=mismatch.get("actual"),
+        error=outcome["error"],
+    )
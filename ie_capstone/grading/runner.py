@@ -0,0 +1,167 @@
+"""Run assert-style unit tests (or evaluate expressions) against a code snippet in a subprocess.
+
+Participant code runs in a hardened subprocess (see run_python): isolated mode, an environment
+holding only PATH (so API keys are not readable), and POSIX resource limits on memory, file size
+and CPU time. This is not a full sandbox: the code can still read files and use the network
+with the server's permissions, so the runner must only see code from experiment participants.
+"""
+
+import json
+import math
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+from ie_capstone.config import SANDBOX_FILE_BYTES, SANDBOX_MEMORY_BYTES
+
+# Imports the dataset code relies on without importing them itself (e.g. `List` in TreeInstruct)
+CODE_PRELUDE = "from typing import *\n"
+
+_RUNNER_SCRIPT = """
+import contextlib, io, json, sys
+payload = json.loads(sys.stdin.read())
+namespace = {}
+error = None
+failed = []
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        exec(compile(payload["code"], "<student>", "exec"), namespace)
+    except BaseException as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        failed = payload["tests"]
+    else:
+        for test in payload["tests"]:
+            try:
+                exec(test, namespace)
+            except BaseException:
+                failed.append(test)
+print(json.dumps({"error": error, "failed": failed}))
+"""
+
+_EVALUATE_SCRIPT = """
+import contextlib, io, json, sys
+payload = json.loads(sys.stdin.read())
+namespace = {}
+values = []
+with contextlib.redirect_stdout(io.StringIO()):
+    exec(compile(payload["code"], "<reference>", "exec"), namespace)
+    for expression in payload["expressions"]:
+        try:
+            values.append(repr(eval(expression, namespace)))
+        except Exception:
+            values.append(None)
+print(json.dumps({"values": values}))
+"""
+
+
+@dataclass
+class TestRunResult:
+    """Outcome of running unit tests against a code snippet."""
+
+    __test__ = False  # Not a pytest test class
+
+    passed: bool
+    failed_tests: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def run_unit_tests(code: str, tests: list[str], timeout: float = 5.0) -> TestRunResult:
+    """
+    Execute assert statements against code in a fresh Python subprocess.
+
+    Args:
+        code: Source code defining the function or class under test
+        tests: Assert statements (e.g., "assert search(5, [5]) == 0")
+        timeout: Seconds before the subprocess is killed
+
+    Returns:
+        TestRunResult with the failing tests and any load error
+    """
+    try:
+        outcome = _run_script(_RUNNER_SCRIPT, {"code": CODE_PRELUDE + code, "tests": tests}, timeout)
+    except subprocess.TimeoutExpired:
+        return TestRunResult(passed=False, failed_tests=list(tests), error="Timed out")
+    except RuntimeError as e:
+        return TestRunResult(passed=False, failed_tests=list(tests), error=str(e))
+    return TestRunResult(passed=not outcome["failed"], failed_tests=outcome["failed"], error=outcome["error"])
+
+
+def evaluate_expressions(code: str, expressions: list[str], timeout: float = 5.0) -> list[str | None]:
+    """
+    Evaluate expressions against trusted code (e.g., a reference solution) in a subprocess.
+
+    Args:
+        code: Source code defining the function or class to call
+        expressions: Python expressions (e.g., "Solution().isPalindrome(121)")
+        timeout: Seconds before the subprocess is killed
+
+    Returns:
+        repr() of each value, or None where the expression raised
+
+    Raises:
+        RuntimeError: If the code fails to load
+        subprocess.TimeoutExpired: If evaluation takes longer than timeout
+    """
+    outcome = _run_script(_EVALUATE_SCRIPT, {"code": CODE_PRELUDE + code, "expressions": expressions}, timeout)
+    return outcome["values"]
+
+
+# Applied by the child itself before it reads any code (a preexec_fn is unsafe in the threaded server)
+_LIMITS_PRELUDE = """
+try:
+    import resource
+except ImportError:
+    pass
+else:
+    for limit, value in {limits!r}:
+        resource.setrlimit(getattr(resource, limit), (value, value))
+"""
+
+
+def _sandbox_env() -> dict[str, str]:
+    """Get the environment of a code subprocess: PATH only, without secrets like ANTHROPIC_API_KEY."""
+    return {"PATH": os.environ["PATH"]} if "PATH" in os.environ else {}
+
+
+def run_python(script: str, stdin: str, timeout: float) -> subprocess.CompletedProcess:
+    """
+    Run a helper script that executes participant code in a hardened Python subprocess.
+
+    The subprocess runs in isolated mode (-I: no user site, no PYTHON* variables, no script
+    directory on sys.path) without writing bytecode, with a scrubbed environment, and (on POSIX)
+    with limits on its address space, the size of files it writes and its CPU time.
+
+    Args:
+        script: Python source of the helper script
+        stdin: Text passed on standard input (e.g., a JSON payload)
+        timeout: Seconds before the subprocess is killed
+
+    Returns:
+        The completed process (text stdout and stderr)
+
+    Raises:
+        subprocess.TimeoutExpired: If the script runs longer than timeout
+    """
+    limits = [
+        ("RLIMIT_AS", SANDBOX_MEMORY_BYTES),
+        ("RLIMIT_FSIZE", SANDBOX_FILE_BYTES),
+        ("RLIMIT_CPU", math.ceil(timeout) + 1),
+    ]
+    return subprocess.run(  # noqa: S603
+        [sys.executable, "-I", "-B", "-c", _LIMITS_PRELUDE.format(limits=limits) + script],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        env=_sandbox_env(),
+        check=False,
+    )
+
+
+def _run_script(script: str, payload: dict, timeout: float) -> dict:
+    """Run a helper script with a JSON payload on stdin and parse its JSON output."""
+    completed = run_python(script, json.dumps(payload), timeout)
+    if completed.returncode != 0 or not completed.stdout.strip():
+        raise RuntimeError(completed.stderr.strip() or "Runner crashed")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
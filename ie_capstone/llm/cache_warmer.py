@@ -0,0 +1,212 @@
+"""Prompt cache warming for the tutor's per-persona, per-problem system prompts."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, get_args
+
+from ie_capstone.config import (
+    CACHE_WARM_ACTIVE_HOURS,
+    CACHE_WARM_CHECK_SECONDS,
+    CACHE_WARM_REFRESH_SECONDS,
+    CACHE_WARM_WORKERS,
+)
+from ie_capstone.llm.client import ClaudeClient, SystemPrompt
+from ie_capstone.llm.prompt_registry import socratic_prompts
+from ie_capstone.models import PersonaType, Problem
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCacheWarmer:
+    """
+    Keeps the tutor's system prompts in the prompt cache.
+
+    There is one system prompt per persona-problem pair, so all of them can be cached ahead of
+    a participant's first turn. Each warm-up is a minimal request (one output token) with the
+    same cached system block SocraticLM sends; a pair is warmed again once refresh_seconds have
+    passed, which is kept below the cache TTL. A failed warm-up is retried at the next check;
+    until then the next real turn simply pays the uncached prefill.
+
+    A prompt shorter than the model's minimum cacheable length is never warmed, and a pair whose
+    warm-up response reports no cache write or read is not warmed again; both are logged once.
+    """
+
+    def __init__(
+        self,
+        client: ClaudeClient,
+        problems: list[Problem],
+        personas: tuple[PersonaType, ...] = get_args(PersonaType),
+        refresh_seconds: float = CACHE_WARM_REFRESH_SECONDS,
+        check_seconds: float = CACHE_WARM_CHECK_SECONDS,
+        active_hours: tuple[int, int] | None = CACHE_WARM_ACTIVE_HOURS,
+        max_workers: int = CACHE_WARM_WORKERS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the warmer.
+
+        Args:
+            client: Claude API client (the model must match the tutor's)
+            problems: Experiment problems, in order
+            personas: Personas to warm prompts for
+            refresh_seconds: Seconds after which a pair is warmed again
+            check_seconds: Seconds between checks of the refresh loop
+            active_hours: (start hour, end hour) in local time when the refresh loop warms, or None for always
+            max_workers: Concurrent warm-up requests
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.client = client
+        self.problems = problems
+        self.personas = personas
+        self.refresh_seconds = refresh_seconds
+        self.check_seconds = check_seconds
+        self.active_hours = active_hours
+        self.clock = clock
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-warmer")
+        self._warmed_at: dict[tuple[PersonaType, int], float] = {}
+        self._uncacheable: set[tuple[PersonaType, int]] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def warm(self, persona: PersonaType, problem: Problem) -> Future | None:
+        """
+        Warm one persona-problem prompt, unless it was warmed within refresh_seconds or cannot be cached.
+
+        Args:
+            persona: Tutor persona
+            problem: The debugging problem
+
+        Returns:
+            Future for the warm-up request, or None if the prompt is still warm or cannot be cached
+        """
+        key = (persona, problem.id)
+        system_prompt = socratic_prompts.get(persona, problem).system_blocks(self.client.model)
+        if not any("cache_control" in block for block in system_prompt):
+            self._mark_uncacheable(key, "is shorter than the minimum cacheable length")
+            return None
+        now = self.clock()
+        with self._lock:
+            if key in self._uncacheable:
+                return None
+            warmed_at = self._warmed_at.get(key)
+            if warmed_at is not None and now - warmed_at < self.refresh_seconds:
+                return None
+            self._warmed_at[key] = now
+        return self.executor.submit(self._send_warm_request, key, system_prompt)
+
+    def set_problems(self, problems: list[Problem]) -> None:
+        """
+        Replace the problems (e.g., after a hot reload); every prompt is warmed again at the next check.
+
+        Args:
+            problems: Experiment problems, in order
+        """
+        with self._lock:
+            self.problems = problems
+            self._warmed_at.clear()
+            self._uncacheable.clear()
+
+    def warm_all(self) -> list[Future]:
+        """
+        Warm every persona-problem prompt that is due.
+
+        Returns:
+            Futures for the warm-up requests sent
+        """
+        futures = [self.warm(persona, problem) for persona in self.personas for problem in self.problems]
+        return [future for future in futures if future is not None]
+
+    def on_problem_start(self, persona: PersonaType, problem_index: int) -> list[Future]:
+        """
+        Warm the prompt of the problem being started and prefetch the next one.
+
+        Args:
+            persona: Participant's persona
+            problem_index: Index of the problem being started
+
+        Returns:
+            Futures for the warm-up requests sent
+        """
+        futures = [self.warm(persona, problem) for problem in self.problems[problem_index : problem_index + 2]]
+        return [future for future in futures if future is not None]
+
+    def is_active(self, now: datetime | None = None) -> bool:
+        """
+        Check whether the refresh loop should keep prompts warm.
+
+        Args:
+            now: Local time (defaults to the current time)
+
+        Returns:
+            True within the active hours (or always, if there are none)
+        """
+        if self.active_hours is None:
+            return True
+        start, end = self.active_hours
+        hour = (now or datetime.now()).hour
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def start(self) -> "PromptCacheWarmer":
+        """
+        Warm every prompt now and keep them warm in a background thread.
+
+        Returns:
+            The warmer itself, for chaining after construction
+        """
+        if self._thread is None:
+            self.warm_all()
+            self._thread = threading.Thread(target=self._refresh_loop, name="cache-warmer-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the refresh loop."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _refresh_loop(self) -> None:
+        """Re-warm prompts that are due, during active hours, until stopped."""
+        while not self._stop.wait(self.check_seconds):
+            if self.is_active():
+                self.warm_all()
+
+    def _mark_uncacheable(self, key: tuple[PersonaType, int], reason: str) -> None:
+        """Stop warming a pair, logging why the first time."""
+        with self._lock:
+            if key in self._uncacheable:
+                return
+            self._uncacheable.add(key)
+            self._warmed_at.pop(key, None)
+        persona, problem_id = key
+        logger.warning(
+            "Not warming the %s prompt of problem %s: it %s for %s", persona, problem_id, reason, self.client.model
+        )
+
+    def _check_cached(self, key: tuple[PersonaType, int], response: Any) -> None:
+        """Stop warming a pair whose warm-up neither wrote nor read the prompt cache."""
+        usage = response.usage
+        if not (getattr(usage, "cache_creation_input_tokens", 0) or getattr(usage, "cache_read_input_tokens", 0)):
+            self._mark_uncacheable(key, "was not written to the prompt cache")
+
+    def _send_warm_request(self, key: tuple[PersonaType, int], system_prompt: SystemPrompt) -> None:
+        """Send a minimal request that writes (or refreshes) the cached system prompt."""
+        try:
+            self.client.send_message(
+                messages=[{"role": "user", "content": "."}],
+                system_prompt=system_prompt,
+                temperature=0.0,
+                max_tokens=1,
+                on_response=lambda response: self._check_cached(key, response),
+            )
+        except Exception:
+            # Let the next check retry instead of waiting a full refresh interval
+            with self._lock:
+                self._warmed_at.pop(key, None)
+            raise
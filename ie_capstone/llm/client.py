@@ -1,15 +1,61 @@
 """Claude API client wrapper."""
 
-from collections.abc import Iterator
+import threading
+from collections.abc import Callable, Iterator
 from typing import Any
 
 import anthropic
 
-from ie_capstone.config import CLAUDE_MODEL, MAX_TOKENS
+from ie_capstone.config import CLAUDE_MODEL, MAX_TOKENS, PROMPT_CACHE_DEFAULT_MIN_TOKENS, PROMPT_CACHE_MIN_TOKENS
+from ie_capstone.llm.tokens import estimate_tokens
+
+SystemPrompt = str | list[dict[str, Any]]
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def prompt_cache_min_tokens(model: str) -> int:
+    """
+    Get the shortest prompt prefix a model will cache.
+
+    Args:
+        model: Model ID
+
+    Returns:
+        Minimum cacheable length in tokens
+    """
+    return PROMPT_CACHE_MIN_TOKENS.get(model, PROMPT_CACHE_DEFAULT_MIN_TOKENS)
+
+
+def cached_system_prompt(*texts: str, model: str = CLAUDE_MODEL) -> list[dict[str, Any]]:
+    """
+    Wrap system prompt texts as text blocks, marking those that end a cacheable prefix.
+
+    A block is marked for prompt caching only when the estimated tokens of it and every block
+    before it reach the model's minimum cacheable length; below that the API ignores the marker
+    and processes the prompt uncached, so short prompts are sent unmarked.
+
+    Args:
+        texts: System prompt texts, from the most to the least widely shared
+        model: Model the prompt is sent to
+
+    Returns:
+        System blocks for messages.create; calls sharing the leading texts reuse the cached prefix
+    """
+    minimum = prompt_cache_min_tokens(model)
+    blocks = []
+    tokens = 0
+    for text in texts:
+        tokens += estimate_tokens(text)
+        block: dict[str, Any] = {"type": "text", "text": text}
+        if tokens >= minimum:
+            block["cache_control"] = {"type": "ephemeral"}
+        blocks.append(block)
+    return blocks
 
 
 class ClaudeClient:
-    """Simple wrapper for Claude API calls."""
+    """Simple wrapper for Claude API calls. Counts calls and tokens across all messages sent."""
 
     def __init__(self, api_key: str | None = None):
         """
@@ -20,61 +66,91 @@ class ClaudeClient:
         """
         self.client = anthropic.Anthropic(api_key=api_key)
         self.model = CLAUDE_MODEL
+        self.usage = dict.fromkeys(("calls", *USAGE_FIELDS), 0)
+        self._usage_lock = threading.Lock()
+
+    def usage_snapshot(self) -> dict[str, int]:
+        """
+        Get a copy of the usage counters.
+
+        Returns:
+            Dictionary with "calls" and the token counts in USAGE_FIELDS so far
+        """
+        with self._usage_lock:
+            return dict(self.usage)
+
+    def _record_usage(self, usage: Any) -> None:
+        """Add one API call's token usage to the counters."""
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            for name in USAGE_FIELDS:
+                self.usage[name] += int(getattr(usage, name, 0) or 0)
 
     def send_message(
         self,
         messages: Any,
-        system_prompt: str,
+        system_prompt: SystemPrompt,
         temperature: float = 0.7,
         max_tokens: int = MAX_TOKENS,
+        model: str | None = None,
+        on_response: Callable[[Any], None] | None = None,
     ) -> str:
         """
         Send messages to Claude and get response.
 
         Args:
             messages: List of {"role": "user"|"assistant", "content": str}
-            system_prompt: System prompt for the conversation
+            system_prompt: System prompt for the conversation (text or content blocks)
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
+            model: Model override (defaults to CLAUDE_MODEL)
+            on_response: Optional callback receiving the raw API response (e.g., for its usage)
 
         Returns:
             Assistant's response text
         """
         response = self.client.messages.create(
-            model=self.model,
+            model=model or self.model,
             max_tokens=max_tokens,
             system=system_prompt,
             messages=messages,
             temperature=temperature,
         )
+        self._record_usage(response.usage)
+        if on_response is not None:
+            on_response(response)
         return response.content[0].text
 
     def send_single_message(
         self,
         user_message: str,
-        system_prompt: str,
+        system_prompt: SystemPrompt,
         temperature: float = 0.7,
         max_tokens: int = MAX_TOKENS,
+        model: str | None = None,
+        on_response: Callable[[Any], None] | None = None,
     ) -> str:
         """
         Convenience method for single-turn interactions (e.g., judge).
 
         Args:
             user_message: Single user message
-            system_prompt: System prompt for the conversation
+            system_prompt: System prompt for the conversation (text or content blocks)
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
+            model: Model override (defaults to CLAUDE_MODEL)
+            on_response: Optional callback receiving the raw API response (e.g., for its usage)
 
         Returns:
             Assistant's response text
         """
         messages = [{"role": "user", "content": user_message}]
-        return self.send_message(messages, system_prompt, temperature, max_tokens)
+        return self.send_message(messages, system_prompt, temperature, max_tokens, model, on_response)
 
     def stream_message(
         self,
         messages: Any,
-        system_prompt: str,
+        system_prompt: SystemPrompt,
         temperature: float = 0.7,
         max_tokens: int = MAX_TOKENS,
     ) -> Iterator[str]:
@@ -83,12 +159,13 @@ class ClaudeClient:
 
         Args:
             messages: List of {"role": "user"|"assistant", "content": str}
-            system_prompt: System prompt for the conversation
+            system_prompt: System prompt for the conversation (text or content blocks)
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
 
         Yields:
-            Text chunks as they arrive
+            Text chunks as they arrive (closing the generator stops the generation, and the tokens
+            used up to then are still counted)
         """
         with self.client.messages.stream(
             model=self.model,
@@ -97,4 +174,51 @@ class ClaudeClient:
             messages=messages,
             temperature=temperature,
         ) as stream:
-            yield from stream.text_stream
+            try:
+                yield from stream.text_stream
+            except GeneratorExit:
+                # Closed early (e.g., a reply cut off by the leak guard): count what was generated
+                self._record_usage(stream.current_message_snapshot.usage)
+                raise
+            self._record_usage(stream.get_final_message().usage)
+
+    def create_batch(self, requests: list[dict]) -> str:
+        """
+        Submit a Message Batches job.
+
+        Args:
+            requests: List of {"custom_id": str, "params": messages.create kwargs}
+
+        Returns:
+            Batch ID
+        """
+        batch = self.client.messages.batches.create(requests=requests)
+        return batch.id
+
+    def get_batch_status(self, batch_id: str) -> str:
+        """
+        Get the processing status of a batch.
+
+        Args:
+            batch_id: Batch ID returned by create_batch
+
+        Returns:
+            "in_progress", "canceling" or "ended"
+        """
+        return self.client.messages.batches.retrieve(batch_id).processing_status
+
+    def iter_batch_results(self, batch_id: str) -> Iterator[tuple[str, str | None]]:
+        """
+        Stream results of an ended batch.
+
+        Args:
+            batch_id: Batch ID returned by create_batch
+
+        Yields:
+            (custom_id, response text), with None as text for errored or expired requests
+        """
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                yield entry.custom_id, entry.result.message.content[0].text
+            else:
+                yield entry.custom_id, None
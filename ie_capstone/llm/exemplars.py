@@ -0,0 +1,197 @@
+"""Few-shot exemplars from a problem's example dialogue, retrieved locally with BM25.
+
+Each exchange of the dialogue (a student turn and the tutor's reply with its <alt> variants) is
+one document; the student's alternatives and edited code are indexed too, but only the student
+turn and the replies are shown to the tutor. The dialogues are in English, so a Korean message
+mostly matches through code identifiers, values and line numbers; when nothing matches, the
+exchange at the same point of the conversation is used instead.
+"""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+
+from ie_capstone.dataset.parser import dialogue_turns
+from ie_capstone.llm.leak_guard import leak_matcher, normalize_for_leaks
+from ie_capstone.models import Problem
+
+# ASCII identifiers and numbers, or runs of other letters: Korean particles do not stick to "seq" or "3"
+_WORD = re.compile(r"[a-z0-9_]+|[^\W\da-z_]+")
+
+# (role, content, alternatives, code) of each turn, hashable so indexes can be cached
+_TurnKey = tuple[str, str, tuple[str, ...], str]
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase word tokens (identifiers and numbers stay whole, apart from Korean particles).
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of tokens
+    """
+    return _WORD.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class Exemplar:
+    """One exchange of an example dialogue."""
+
+    position: int
+    student: str
+    replies: tuple[str, ...]
+    student_alternatives: tuple[str, ...] = ()
+    code: str = ""
+
+    def format(self) -> str:
+        """Format the exchange for the tutor prompt (the first reply, then its alternatives)."""
+        lines = [f"Student: {self.student}", f"Tutor: {self.replies[0]}"]
+        lines.extend(f"Tutor (alternative): {reply}" for reply in self.replies[1:])
+        return "\n".join(lines)
+
+
+class BM25:
+    """Okapi BM25 over tokenized documents, with inverted postings so a query only touches matching documents."""
+
+    def __init__(self, documents: Sequence[list[str]], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            documents: Tokenized documents
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.lengths = [len(document) for document in documents]
+        self.average_length = sum(self.lengths) / len(documents) if documents else 0.0
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        for doc_id, document in enumerate(documents):
+            for term, count in Counter(document).items():
+                self.postings.setdefault(term, []).append((doc_id, count))
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def scores(self, query: list[str]) -> dict[int, float]:
+        """
+        Score the documents sharing a term with the query.
+
+        Args:
+            query: Query tokens
+
+        Returns:
+            Mapping of document index to score (documents without a shared term are left out)
+        """
+        scores: dict[int, float] = {}
+        for term in set(query):
+            for doc_id, count in self.postings.get(term, ()):
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / self.average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + self.idf[term] * count * (self.k1 + 1) / (count + norm)
+        return scores
+
+
+class ExemplarIndex:
+    """The exchanges of one example dialogue, searchable by the student's message."""
+
+    def __init__(self, exemplars: list[Exemplar]):
+        """
+        Index the exchanges.
+
+        Args:
+            exemplars: Exchanges in dialogue order
+        """
+        self.exemplars = exemplars
+        self.bm25 = BM25([
+            tokenize(" ".join([exemplar.student, *exemplar.student_alternatives, exemplar.code, *exemplar.replies]))
+            for exemplar in exemplars
+        ])
+
+    def search(self, query: str, k: int, position: int | None = None) -> list[Exemplar]:
+        """
+        Find the exchanges most relevant to a student message.
+
+        Args:
+            query: Student's message
+            k: Maximum number of exchanges
+            position: Exchanges so far in the conversation, used when no exchange shares a term with the query
+
+        Returns:
+            Up to k exchanges in dialogue order
+        """
+        if not self.exemplars or k <= 0:
+            return []
+        scores = self.bm25.scores(tokenize(query))
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))[:k]
+        if not ranked and position is not None:
+            ranked = [min(range(len(self.exemplars)), key=lambda i: abs(self.exemplars[i].position - position))]
+        return [self.exemplars[doc_id] for doc_id in sorted(ranked)]
+
+    def __len__(self) -> int:
+        return len(self.exemplars)
+
+
+def format_exemplars(exemplars: list[Exemplar]) -> str:
+    """
+    Format exchanges for the tutor prompt.
+
+    Args:
+        exemplars: Exchanges from ExemplarIndex.search
+
+    Returns:
+        The exchanges separated by blank lines
+    """
+    return "\n\n".join(exemplar.format() for exemplar in exemplars)
+
+
+@lru_cache(maxsize=64)
+def _build_index(turns: tuple[_TurnKey, ...], leak_patterns: frozenset[str]) -> ExemplarIndex:
+    """Build the index for one dialogue (cached, so it is built once per problem)."""
+    exchanges = [
+        (student, tutor)
+        for student, tutor in zip(turns, turns[1:], strict=False)
+        if student[0] == "user" and tutor[0] == "assistant"
+    ]
+    exemplars = []
+    for position, (student, tutor) in enumerate(exchanges):
+        exemplar = Exemplar(
+            position=position,
+            student=student[1],
+            replies=(tutor[1], *tutor[2]),
+            student_alternatives=student[2],
+            code=student[3],
+        )
+        shown = normalize_for_leaks(exemplar.format())
+        if not any(pattern in shown for pattern in leak_patterns):
+            exemplars.append(exemplar)
+    return ExemplarIndex(exemplars)
+
+
+def clear_exemplar_indexes() -> None:
+    """Drop every built index (e.g., after problems were reloaded); they are built again on use."""
+    _build_index.cache_clear()
+
+
+def exemplar_index(problem: Problem) -> ExemplarIndex:
+    """
+    Get the exemplar index of a problem's example dialogue.
+
+    Exchanges whose shown text contains a snippet of the expected fix (see leak_matcher) are
+    left out, so an exemplar never hands the fix to the tutor.
+
+    Args:
+        problem: The debugging problem
+
+    Returns:
+        The index (empty without a dialogue), shared by every session on the problem
+    """
+    turns = tuple((turn.role, turn.content, tuple(turn.alternatives), turn.code) for turn in dialogue_turns(problem))
+    return _build_index(turns, leak_matcher(problem)[1])
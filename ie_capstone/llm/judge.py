@@ -1,25 +1,87 @@
 """LLM-as-a-Judge for evaluating student bug fixes."""
 
-from ie_capstone.config import JUDGE_ITERATIONS
-from ie_capstone.llm.client import ClaudeClient
-from ie_capstone.llm.prompts import get_judge_prompt
-from ie_capstone.models import Problem
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from ie_capstone.config import (
+    JUDGE_CASCADE,
+    JUDGE_FAST_ITERATIONS,
+    JUDGE_FAST_MAX_TOKENS,
+    JUDGE_FAST_MIN_CONFIDENCE,
+    JUDGE_FAST_MODEL,
+    JUDGE_FUZZ,
+    JUDGE_ITERATIONS,
+    JUDGE_LOCAL_TESTS,
+    JUDGE_PARALLEL,
+    JUDGE_PROMPT_VARIANT,
+    MAX_TOKENS,
+)
+from ie_capstone.dataset.reference import matches_reference
+from ie_capstone.grading.fuzz import differential_fuzz
+from ie_capstone.grading.runner import run_unit_tests
+from ie_capstone.llm.client import USAGE_FIELDS, ClaudeClient, cached_system_prompt
+from ie_capstone.llm.prompts import get_judge_prompt, get_judge_user_message
+from ie_capstone.models import JudgeCall, JudgeVerdict, Problem
+
+# Lower temperature for more consistent judgments
+JUDGE_TEMPERATURE = 0.3
+
+JSON_OBJECT_PATTERN = re.compile(r"\{.*?\}", re.DOTALL)
 
 
 class LLMJudge:
     """
     LLM-as-a-Judge for evaluating student bug fixes.
     Uses self-consistency with multiple evaluations.
+    Submissions AST-equivalent to a reference solution are accepted without calling the LLM,
+    and with local tests enabled, submissions failing the unit tests are rejected without it.
+    With fuzzing enabled, random inputs compared against the reference solution decide the verdict.
+    In cascade mode a fast model votes first and the primary model only decides unclear cases.
+    The per-problem system prompt is marked for prompt caching and the student's code is sent
+    in the user message, so all rounds and participants on a problem share the cached prefix.
     """
 
-    def __init__(self, client: ClaudeClient):
+    def __init__(
+        self,
+        client: ClaudeClient,
+        use_reference_match: bool = True,
+        use_local_tests: bool = JUDGE_LOCAL_TESTS,
+        use_fuzzing: bool = JUDGE_FUZZ,
+        parallel: bool = JUDGE_PARALLEL,
+        prompt_variant: str = JUDGE_PROMPT_VARIANT,
+        cascade: bool = JUDGE_CASCADE,
+        fast_model: str = JUDGE_FAST_MODEL,
+        fast_iterations: int = JUDGE_FAST_ITERATIONS,
+        fast_min_confidence: float = JUDGE_FAST_MIN_CONFIDENCE,
+    ):
         """
         Initialize judge with Claude client.
 
         Args:
             client: Claude API client
+            use_reference_match: Accept submissions matching a reference solution without the LLM
+            use_local_tests: Reject submissions failing the unit tests without the LLM
+            use_fuzzing: Decide by differential fuzzing against the reference solution without the LLM
+            parallel: Run the self-consistency rounds concurrently
+            prompt_variant: Judge prompt variant ("full" or "diff")
+            cascade: Let a fast model vote first and escalate only unclear cases to the primary model
+            fast_model: Model for the fast tier
+            fast_iterations: Number of fast-tier votes
+            fast_min_confidence: Escalate if any fast vote is less confident than this
         """
         self.client = client
+        self.use_reference_match = use_reference_match
+        self.use_local_tests = use_local_tests
+        self.use_fuzzing = use_fuzzing
+        self.parallel = parallel
+        self.prompt_variant = prompt_variant
+        self.cascade = cascade
+        self.fast_model = fast_model
+        self.fast_iterations = fast_iterations
+        self.fast_min_confidence = fast_min_confidence
 
     def evaluate_fix(
         self,
@@ -40,38 +102,249 @@ class LLMJudge:
             - is_correct: True if average score >= 0.5
             - scores: Individual scores from each iteration (1.0 or 0.0)
         """
-        scores = []
-        for _ in range(iterations):
-            score = self._single_evaluation(problem, student_code)
-            scores.append(score)
+        verdict = self.evaluate(problem, student_code, iterations)
+        return verdict.is_correct, verdict.scores
 
-        average_score = sum(scores) / len(scores)
-        is_correct = average_score >= 0.5
+    def evaluate(
+        self,
+        problem: Problem,
+        student_code: str,
+        iterations: int = JUDGE_ITERATIONS,
+    ) -> JudgeVerdict:
+        """
+        Evaluate a fix, trying the reference-solution fast path before the LLM.
 
-        return is_correct, scores
+        Args:
+            problem: The debugging problem
+            student_code: Student's submitted code
+            iterations: Number of LLM evaluation rounds (default 3)
 
-    def _single_evaluation(self, problem: Problem, student_code: str) -> float:
+        Returns:
+            JudgeVerdict with the scores, the raw API calls, and what decided it: "reference_ast",
+            "unit_tests", "fuzz", "llm", or in cascade mode the tier ("fast" or "primary")
         """
-        Perform single evaluation.
+        if self.use_reference_match and matches_reference(problem, student_code):
+            return JudgeVerdict(is_correct=True, scores=[1.0], decided_by="reference_ast")
+
+        local_tests = self.use_local_tests and problem.unit_tests
+        if local_tests and not run_unit_tests(student_code, problem.unit_tests).passed:
+            return JudgeVerdict(is_correct=False, scores=[0.0], decided_by="unit_tests")
+
+        if self.use_fuzzing:
+            fuzz_result = differential_fuzz(problem, student_code)
+            if fuzz_result is not None:
+                score = 1.0 if fuzz_result.passed else 0.0
+                return JudgeVerdict(is_correct=fuzz_result.passed, scores=[score], decided_by="fuzz")
+
+        calls: list[JudgeCall] = []
+        if self.cascade:
+            fast_verdict = self._fast_tier(problem, student_code, calls)
+            if fast_verdict is not None:
+                return fast_verdict
+
+        scores = self._collect_scores(problem, student_code, iterations, calls)
+        decided_by = "primary" if self.cascade else "llm"
+        return JudgeVerdict(is_correct=self.aggregate_scores(scores), scores=scores, decided_by=decided_by, calls=calls)
+
+    def _collect_scores(
+        self, problem: Problem, student_code: str, iterations: int, calls: list[JudgeCall]
+    ) -> list[float]:
+        """
+        Run the self-consistency rounds, concurrently if the judge is parallel.
 
         Args:
             problem: The debugging problem
             student_code: Student's submitted code
+            iterations: Number of evaluation rounds
+            calls: List the API calls are appended to
 
         Returns:
-            1.0 if CORRECT, 0.0 if INCORRECT
+            Individual scores (1.0 or 0.0)
         """
-        prompt = get_judge_prompt(problem, student_code)
+        if not self.parallel or iterations < 2:
+            return [self._single_evaluation(problem, student_code, calls) for _ in range(iterations)]
+        with ThreadPoolExecutor(max_workers=iterations) as executor:
+            futures = [
+                executor.submit(self._single_evaluation, problem, student_code, calls) for _ in range(iterations)
+            ]
+            return [future.result() for future in futures]
 
-        # Use lower temperature for more consistent judgments
-        response = self.client.send_single_message(
-            user_message="Please evaluate the student's code fix.",
-            system_prompt=prompt,
-            temperature=0.3,
-        )
+    def _fast_tier(self, problem: Problem, student_code: str, calls: list[JudgeCall]) -> JudgeVerdict | None:
+        """
+        Collect fast-model votes with confidences.
 
-        # Parse response - looking for CORRECT or INCORRECT
+        Args:
+            problem: The debugging problem
+            student_code: Student's submitted code
+            calls: List the API calls are appended to
+
+        Returns:
+            Verdict if all votes agree with sufficient confidence, None to escalate
+        """
+        system_prompt = cached_system_prompt(get_judge_prompt(problem, structured=True), model=self.fast_model)
+        user_message = get_judge_user_message(problem, student_code, self.prompt_variant)
+        votes = []
+        for _ in range(self.fast_iterations):
+            response = self._send(
+                "fast", system_prompt, user_message, calls, max_tokens=JUDGE_FAST_MAX_TOKENS, model=self.fast_model
+            )
+            vote = self.parse_structured_response(response)
+            if vote is None or vote[1] < self.fast_min_confidence:
+                return None
+            votes.append(vote[0])
+
+        if len(set(votes)) != 1:
+            return None
+        return JudgeVerdict(is_correct=votes[0] == 1.0, scores=votes, decided_by="fast", calls=calls)
+
+    def build_request(self, problem: Problem, student_code: str) -> dict:
+        """
+        Build Messages API parameters for a single evaluation (e.g., for batch jobs).
+
+        Args:
+            problem: The debugging problem
+            student_code: Student's submitted code
+
+        Returns:
+            Request parameters accepted by messages.create
+        """
+        return {
+            "model": self.client.model,
+            "max_tokens": MAX_TOKENS,
+            "system": cached_system_prompt(get_judge_prompt(problem), model=self.client.model),
+            "messages": [
+                {"role": "user", "content": get_judge_user_message(problem, student_code, self.prompt_variant)}
+            ],
+            "temperature": JUDGE_TEMPERATURE,
+        }
+
+    @staticmethod
+    def parse_score(response: str) -> float:
+        """
+        Parse a judge response into a score.
+
+        Args:
+            response: Raw judge response text
+
+        Returns:
+            1.0 if CORRECT, 0.0 if INCORRECT
+        """
         response_upper = response.strip().upper()
         if "CORRECT" in response_upper and "INCORRECT" not in response_upper:
             return 1.0
         return 0.0
+
+    @staticmethod
+    def parse_structured_response(response: str) -> tuple[float, float] | None:
+        """
+        Parse a structured judge response ({"verdict": ..., "confidence": ...}).
+
+        Args:
+            response: Raw judge response text
+
+        Returns:
+            (score, confidence), or None if the response is malformed
+        """
+        match = JSON_OBJECT_PATTERN.search(response)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+            verdict = str(data["verdict"]).strip().upper()
+            confidence = float(data["confidence"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        if verdict not in ("CORRECT", "INCORRECT"):
+            return None
+        return (1.0 if verdict == "CORRECT" else 0.0), min(max(confidence, 0.0), 1.0)
+
+    @staticmethod
+    def aggregate_scores(scores: list[float], threshold: float = 0.5) -> bool:
+        """
+        Combine self-consistency scores into a verdict.
+
+        Args:
+            scores: Individual scores (1.0 or 0.0)
+            threshold: Minimum average score for a correct verdict
+
+        Returns:
+            True if average score >= threshold
+        """
+        return sum(scores) / len(scores) >= threshold
+
+    def _single_evaluation(self, problem: Problem, student_code: str, calls: list[JudgeCall] | None = None) -> float:
+        """
+        Perform single evaluation.
+
+        Args:
+            problem: The debugging problem
+            student_code: Student's submitted code
+            calls: Optional list the API call is appended to
+
+        Returns:
+            1.0 if CORRECT, 0.0 if INCORRECT
+        """
+        response = self._send(
+            "primary" if self.cascade else "llm",
+            cached_system_prompt(get_judge_prompt(problem), model=self.client.model),
+            get_judge_user_message(problem, student_code, self.prompt_variant),
+            calls,
+        )
+
+        # Parse response - looking for CORRECT or INCORRECT
+        return self.parse_score(response)
+
+    def _send(
+        self,
+        stage: str,
+        system_prompt: list[dict[str, Any]],
+        user_message: str,
+        calls: list[JudgeCall] | None,
+        max_tokens: int | None = None,
+        model: str | None = None,
+    ) -> str:
+        """
+        Send one judge request and record it.
+
+        Args:
+            stage: Judge stage making the call ("llm", "fast" or "primary")
+            system_prompt: System blocks
+            user_message: User message with the student's code
+            calls: Optional list the JudgeCall is appended to
+            max_tokens: Optional response limit (client default if None)
+            model: Optional model override (client default if None)
+
+        Returns:
+            Raw response text
+        """
+        overrides: dict[str, Any] = {}
+        if max_tokens is not None:
+            overrides["max_tokens"] = max_tokens
+        if model is not None:
+            overrides["model"] = model
+        raw: dict[str, Any] = {}
+
+        start = time.perf_counter()
+        response = self.client.send_single_message(
+            user_message=user_message,
+            system_prompt=system_prompt,
+            temperature=JUDGE_TEMPERATURE,
+            on_response=lambda message: raw.update(message=message),
+            **overrides,
+        )
+        latency = time.perf_counter() - start
+
+        if calls is not None:
+            message = raw.get("message")
+            usage = getattr(message, "usage", None)
+            calls.append(
+                JudgeCall(
+                    stage=stage,
+                    model=str(getattr(message, "model", None) or model or self.client.model),
+                    temperature=JUDGE_TEMPERATURE,
+                    response=response,
+                    latency_seconds=latency,
+                    usage={name: int(getattr(usage, name, 0) or 0) for name in USAGE_FIELDS} if usage else {},
+                )
+            )
+        return response
@@ -0,0 +1,286 @@
+"""Streaming check that the tutor does not reveal the expected fix."""
+
+import difflib
+import re
+from collections import deque
+from collections.abc import Iterable
+from functools import lru_cache
+
+from ie_capstone.config import LEAK_MIN_PATTERN_CHARS
+from ie_capstone.dataset.reference import apply_fix
+from ie_capstone.models import Problem
+
+_TOKEN = re.compile(r"\w+|[^\w\s]+")
+
+
+class StreamReset(str):
+    """
+    Empty chunk telling stream consumers to discard the text shown so far.
+
+    Yielded before a regenerated reply; consumers that simply concatenate chunks are unaffected.
+    """
+
+    __slots__ = ()
+
+
+def normalize_for_leaks(text: str) -> str:
+    """
+    Normalize text the way the guard sees it: lowercase, without whitespace.
+
+    Characters are lowercased one at a time, as LeakGuard reads them from the stream.
+
+    Args:
+        text: Code or tutor text
+
+    Returns:
+        Normalized text
+    """
+    return "".join(char.lower() for char in text if not char.isspace())
+
+
+class AhoCorasick:
+    """Multi-pattern automaton; text is fed one character at a time and never rescanned."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            patterns: Patterns to find (already normalized)
+        """
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail = [0]
+        self._depth = [0]
+        # Longest pattern ending at each state (its own, or inherited through fail links)
+        self._output: list[str | None] = [None]
+        for pattern in patterns:
+            self._insert(pattern)
+        self._link()
+
+    def _insert(self, pattern: str) -> None:
+        """Add a pattern to the trie."""
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._depth.append(self._depth[state] + 1)
+                self._output.append(None)
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        if pattern:
+            self._output[state] = pattern
+
+    def _link(self) -> None:
+        """Compute fail links breadth-first."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._output[child] is None:
+                    self._output[child] = self._output[self._fail[child]]
+                queue.append(child)
+
+    def step(self, state: int, char: str) -> int:
+        """
+        Advance the automaton by one character.
+
+        Args:
+            state: Current state (0 at the start of the text)
+            char: Next character
+
+        Returns:
+            New state
+        """
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        return self._goto[state].get(char, 0)
+
+    def depth(self, state: int) -> int:
+        """Get the length of the pattern prefix the text currently ends with."""
+        return self._depth[state]
+
+    def match(self, state: int) -> str | None:
+        """Get the pattern the text ends with at this state, if any."""
+        return self._output[state]
+
+
+def _changed_snippets(buggy_code: str, fixed_code: str, min_chars: int) -> set[str]:
+    """
+    Get short normalized snippets around each change of fixed code against buggy code.
+
+    Each snippet is the changed part of a line, widened by whole tokens until it is at least
+    min_chars long and no longer occurs in the buggy code (which the tutor may quote freely).
+    """
+    buggy_normalized = normalize_for_leaks(buggy_code)
+    buggy_lines = buggy_code.split("\n")
+    fixed_lines = fixed_code.split("\n")
+    snippets = set()
+    matcher = difflib.SequenceMatcher(a=buggy_lines, b=fixed_lines, autojunk=False)
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        for offset, line in enumerate(fixed_lines[b_start:b_end]):
+            old = buggy_lines[a_start + offset] if tag == "replace" and a_start + offset < a_end else ""
+            tokens = [(m.start(), m.end()) for m in _TOKEN.finditer(line)]
+            if not tokens:
+                continue
+            changed = [op for op in difflib.SequenceMatcher(a=old, b=line).get_opcodes() if op[0] != "equal"]
+            span_start = min((op[3] for op in changed), default=0)
+            span_end = max((op[4] for op in changed), default=len(line))
+            touched = [
+                i for i, (start, end) in enumerate(tokens) if start < max(span_end, span_start + 1) and end > span_start
+            ]
+            first, last = (touched[0], touched[-1]) if touched else (0, len(tokens) - 1)
+            first, last = max(first - 1, 0), min(last + 1, len(tokens) - 1)
+            snippet = normalize_for_leaks(line[tokens[first][0] : tokens[last][1]])
+            while (len(snippet) < min_chars or snippet in buggy_normalized) and (first > 0 or last < len(tokens) - 1):
+                first, last = max(first - 1, 0), min(last + 1, len(tokens) - 1)
+                snippet = normalize_for_leaks(line[tokens[first][0] : tokens[last][1]])
+            if len(snippet) >= min_chars and snippet not in buggy_normalized:
+                snippets.add(snippet)
+    return snippets
+
+
+@lru_cache(maxsize=64)
+def _build_matcher(
+    buggy_code: str, expected_fixes: tuple[str, ...], reference_solutions: tuple[str, ...], min_chars: int
+) -> tuple[AhoCorasick, frozenset[str]]:
+    """Build the automaton for one problem's content (cached, so it is built once per problem)."""
+    fixed_versions = [*reference_solutions]
+    for fix in expected_fixes:
+        fixed = apply_fix(buggy_code, fix)
+        if fixed is not None:
+            fixed_versions.append(fixed)
+    patterns = frozenset().union(*(_changed_snippets(buggy_code, fixed, min_chars) for fixed in fixed_versions))
+    return AhoCorasick(sorted(patterns)), patterns
+
+
+def leak_matcher(problem: Problem, min_chars: int = LEAK_MIN_PATTERN_CHARS) -> tuple[AhoCorasick, frozenset[str]]:
+    """
+    Get the leak automaton for a problem, built from key snippets of its fixes.
+
+    Snippets come from the lines the reference solutions and the individually applied expected
+    fixes change, cut down to the changed tokens and their neighbours.
+
+    Args:
+        problem: The debugging problem
+        min_chars: Minimum normalized snippet length (shorter ones, like "<=", match too much)
+
+    Returns:
+        (automaton, patterns); the automaton is shared by every session on the problem
+    """
+    return _build_matcher(
+        problem.buggy_code, tuple(problem.expected_fixes), tuple(problem.reference_solutions), min_chars
+    )
+
+
+@lru_cache(maxsize=256)
+def _pattern_matcher(patterns: frozenset[str]) -> AhoCorasick:
+    """Build the automaton for a subset of a problem's patterns (cached per subset)."""
+    return AhoCorasick(sorted(patterns))
+
+
+def leak_matcher_for_code(
+    problem: Problem, current_code: str | None, min_chars: int = LEAK_MIN_PATTERN_CHARS
+) -> AhoCorasick:
+    """
+    Get the leak automaton for a turn, leaving out the snippets the student's code already contains.
+
+    Once the student has typed (part of) the fix, a reply quoting their code reveals nothing.
+
+    Args:
+        problem: The debugging problem
+        current_code: Current code in the editor (optional)
+        min_chars: Minimum normalized snippet length
+
+    Returns:
+        The problem's shared automaton, or one without the typed snippets
+    """
+    matcher, patterns = leak_matcher(problem, min_chars)
+    code = normalize_for_leaks(current_code or "")
+    typed = frozenset(pattern for pattern in patterns if pattern in code)
+    return _pattern_matcher(patterns - typed) if typed else matcher
+
+
+def clear_leak_matchers() -> None:
+    """Drop every built automaton (e.g., after problems were reloaded); they are built again on use."""
+    _build_matcher.cache_clear()
+    _pattern_matcher.cache_clear()
+
+
+class LeakGuard:
+    """
+    Checks one streamed reply for leaked fixes, holding back only a possible partial match.
+
+    Each character passes through the automaton once. Text is released as soon as it cannot be
+    the start of a pattern, so the guard delays the stream by at most one pattern's length.
+    """
+
+    def __init__(self, matcher: AhoCorasick):
+        """
+        Initialize the guard for a new reply.
+
+        Args:
+            matcher: Automaton from leak_matcher
+        """
+        self.matcher = matcher
+        self.leak: str | None = None
+        self.text = ""
+        self._state = 0
+        self._pending = ""
+        # Offsets in _pending of the normalized characters that may start a pattern
+        self._offsets: list[int] = []
+
+    def feed(self, chunk: str) -> str:
+        """
+        Check the next chunk of the reply.
+
+        Args:
+            chunk: Streamed text
+
+        Returns:
+            Text safe to show. After a leak (self.leak is set), nothing more is released.
+        """
+        if self.leak is not None:
+            return ""
+        self.text += chunk
+        base = len(self._pending)
+        self._pending += chunk
+        for index, char in enumerate(chunk):
+            if char.isspace():
+                continue
+            # Lowercasing may expand a character (e.g., "İ" to "i" and a combining dot); every
+            # normalized character keeps the offset of the character it came from
+            for normalized in char.lower():
+                self._offsets.append(base + index)
+                self._state = self.matcher.step(self._state, normalized)
+                pattern = self.matcher.match(self._state)
+                if pattern is not None:
+                    self.leak = pattern
+                    self.text = self.text[: len(self.text) - len(chunk) + index + 1]
+                    return self._release(self._offsets[-len(pattern)])
+        depth = self.matcher.depth(self._state)
+        return self._release(self._offsets[-depth] if depth else len(self._pending))
+
+    def flush(self) -> str:
+        """
+        Release the held-back text at the end of the reply.
+
+        Returns:
+            Remaining text (empty after a leak)
+        """
+        if self.leak is not None:
+            return ""
+        return self._release(len(self._pending))
+
+    def _release(self, cut: int) -> str:
+        """Release pending text before an offset, keeping the rest."""
+        released, self._pending = self._pending[:cut], self._pending[cut:]
+        depth = self.matcher.depth(self._state)
+        self._offsets = [offset - cut for offset in self._offsets[-depth:]] if depth else []
+        return released
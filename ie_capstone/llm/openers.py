@@ -0,0 +1,230 @@
+"""Bank of vetted first-turn tutor replies, served without a model call.
+
+Usage:
+    python -m ie_capstone.llm.openers
+    python -m ie_capstone.llm.openers --replies 5 --force
+
+Most students open with nearly the same message ("what's wrong with this code?"). This job
+generates first-turn replies for every persona and problem with the tutor's own prompt, seeded
+with the first exchange of Problem.dialogue, and stores them unvetted. A researcher
+reviews the file and sets "vetted": true on replies that may be served; only those are used.
+"""
+
+import argparse
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import get_args
+
+from ie_capstone.config import OPENING_BANK_PATH, OPENING_BANK_REPLIES, OPENING_BANK_THRESHOLD
+from ie_capstone.dataset.parser import dialogue_turns, load_all_problems
+from ie_capstone.llm.client import ClaudeClient
+from ie_capstone.llm.prompt_registry import socratic_prompts
+from ie_capstone.llm.prompts import (
+    OPENING_REPLY_EXAMPLES,
+    TUTOR_CODE_SNAPSHOT,
+    get_tutor_user_message,
+)
+from ie_capstone.llm.similarity import ngram_similarity
+from ie_capstone.models import PersonaType, Problem
+
+# Openers most first messages are close to; each problem's example dialogue adds its own
+CANONICAL_OPENERS = (
+    "이 코드 뭐가 문제인가요?",
+    "이 코드에서 어디가 틀렸나요?",
+    "버그가 어디에 있나요?",
+    "코드가 제대로 작동하지 않아요. 도와주세요.",
+    "어디서부터 봐야 할지 모르겠어요.",
+    "What's wrong with this code?",
+    "Where is the bug?",
+)
+
+
+@dataclass
+class OpeningReply:
+    """A first-turn tutor reply for one persona and problem."""
+
+    persona: PersonaType
+    problem_id: int
+    reply: str
+    openers: list[str] = field(default_factory=list)
+    vetted: bool = False
+    source: str = "generated"
+
+
+def dialogue_opening(problem: Problem) -> tuple[str | None, list[str]]:
+    """
+    Get the first exchange of a problem's example dialogue.
+
+    Args:
+        problem: The debugging problem
+
+    Returns:
+        (first user message or None, first assistant reply followed by its <alt> variants)
+    """
+    turns = dialogue_turns(problem)
+    if not turns or turns[0].role != "user":
+        return None, []
+    if len(turns) < 2:
+        return turns[0].content, []
+    return turns[0].content, [turns[1].content, *turns[1].alternatives]
+
+
+class OpeningBank:
+    """Vetted opening replies, looked up by similarity of the first message to known openers."""
+
+    def __init__(self, entries: list[OpeningReply], threshold: float = OPENING_BANK_THRESHOLD):
+        """
+        Initialize the bank.
+
+        Args:
+            entries: Bank entries (unvetted ones are ignored)
+            threshold: Minimum n-gram similarity to an opener for a reply to be served
+        """
+        self.threshold = threshold
+        self._entries: dict[tuple[str, int], list[OpeningReply]] = {}
+        for entry in entries:
+            if entry.vetted:
+                self._entries.setdefault((entry.persona, entry.problem_id), []).append(entry)
+
+    def match(self, persona: PersonaType, problem: Problem, message: str, current_code: str | None) -> str | None:
+        """
+        Find a vetted reply for a first message.
+
+        Replies are written against the buggy code, so a student who already edited it is
+        always answered by the model.
+
+        Args:
+            persona: Tutor persona
+            problem: The debugging problem
+            message: Student's first message
+            current_code: Current code in the editor (optional)
+
+        Returns:
+            The reply whose openers are most similar to the message, or None below the threshold
+        """
+        if current_code is not None and current_code.strip() != problem.buggy_code.strip():
+            return None
+        best: tuple[float, str] | None = None
+        for entry in self._entries.get((persona, problem.id), []):
+            score = max((ngram_similarity(message, opener) for opener in entry.openers), default=0.0)
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, entry.reply)
+        return best[1] if best else None
+
+
+def load_opening_bank(path: Path | None = None) -> list[OpeningReply]:
+    """
+    Load stored opening replies.
+
+    Args:
+        path: Optional path to the JSON file (defaults to OPENING_BANK_PATH)
+
+    Returns:
+        Bank entries (empty if the file does not exist)
+    """
+    path = path or OPENING_BANK_PATH
+    if not path.exists():
+        return []
+    return [OpeningReply(**entry) for entry in json.loads(path.read_text(encoding="utf-8"))]
+
+
+def save_opening_bank(entries: list[OpeningReply], path: Path | None = None) -> Path:
+    """
+    Save opening replies to JSON.
+
+    Args:
+        entries: Bank entries
+        path: Optional path to the JSON file (defaults to OPENING_BANK_PATH)
+
+    Returns:
+        Path to saved file
+    """
+    path = path or OPENING_BANK_PATH
+    data = [asdict(entry) for entry in entries]
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def generate_opening_replies(
+    client: ClaudeClient, persona: PersonaType, problem: Problem, count: int = OPENING_BANK_REPLIES
+) -> list[OpeningReply]:
+    """
+    Generate unvetted opening replies with the tutor's prompt.
+
+    The request is the one SocraticLM would send for a canonical first message with the
+    buggy code; the example dialogue's first replies are added as guidance when present.
+
+    Args:
+        client: Claude API client
+        persona: Tutor persona
+        problem: The debugging problem
+        count: Number of replies to generate
+
+    Returns:
+        Unvetted bank entries
+    """
+    dialogue_opener, dialogue_replies = dialogue_opening(problem)
+    openers = [*CANONICAL_OPENERS, *([dialogue_opener] if dialogue_opener else [])]
+    system_prompt = socratic_prompts.get(persona, problem).system_blocks()
+    if dialogue_replies:
+        examples = "\n".join(f"- {reply}" for reply in dialogue_replies)
+        system_prompt.append({"type": "text", "text": OPENING_REPLY_EXAMPLES.format(examples=examples)})
+    user_message = get_tutor_user_message(CANONICAL_OPENERS[0], TUTOR_CODE_SNAPSHOT.format(code=problem.buggy_code))
+
+    entries = []
+    for _ in range(count):
+        reply = client.send_message(
+            messages=[{"role": "user", "content": user_message}], system_prompt=system_prompt, temperature=0.7
+        )
+        entries.append(OpeningReply(persona=persona, problem_id=problem.id, reply=reply.strip(), openers=openers))
+    return entries
+
+
+def build_opening_bank(
+    client: ClaudeClient,
+    problems: list[Problem],
+    existing: list[OpeningReply],
+    count: int = OPENING_BANK_REPLIES,
+    force: bool = False,
+) -> list[OpeningReply]:
+    """
+    Generate replies for every persona-problem pair that has none yet.
+
+    Args:
+        client: Claude API client
+        problems: Experiment problems
+        existing: Current bank entries (kept, with their vetted flags)
+        count: Replies to generate per pair
+        force: Also generate for pairs that already have replies
+
+    Returns:
+        Existing entries followed by the new ones
+    """
+    covered = {(entry.persona, entry.problem_id) for entry in existing}
+    entries = list(existing)
+    for persona in get_args(PersonaType):
+        for problem in problems:
+            if force or (persona, problem.id) not in covered:
+                entries.extend(generate_opening_replies(client, persona, problem, count))
+    return entries
+
+
+def main(argv: list[str] | None = None):
+    """Generate missing opening replies and store them for vetting."""
+    parser = argparse.ArgumentParser(description="Build the bank of first-turn tutor replies.")
+    parser.add_argument("--path", type=Path, default=OPENING_BANK_PATH)
+    parser.add_argument("--replies", type=int, default=OPENING_BANK_REPLIES, help="Replies per persona and problem")
+    parser.add_argument("--force", action="store_true", help="Also generate for pairs that already have replies")
+    args = parser.parse_args(argv)
+
+    existing = load_opening_bank(args.path)
+    entries = build_opening_bank(ClaudeClient(), load_all_problems(), existing, args.replies, args.force)
+    path = save_opening_bank(entries, args.path)
+    vetted = sum(entry.vetted for entry in entries)
+    print(f"{len(entries) - len(existing)} new replies, {vetted}/{len(entries)} vetted. Saved to {path}")
+    print('Review the file and set "vetted": true on replies that may be served.')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Tutor system prompts rendered once per persona and problem, with content hashes for logging."""
+
+import hashlib
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import get_args
+
+from ie_capstone.config import CLAUDE_MODEL
+from ie_capstone.llm.client import SystemPrompt, cached_system_prompt
+from ie_capstone.llm.prompts import get_socratic_prompt_parts
+from ie_capstone.models import PersonaType, Problem
+
+# Everything the prompt is rendered from, so an edited problem is rendered again
+_PromptKey = tuple[str, int, str, str, str, tuple[str, ...], tuple[str, ...]]
+
+
+def _prompt_key(persona: PersonaType, problem: Problem) -> _PromptKey:
+    """Get the registry key of a persona-problem pair."""
+    return (
+        persona,
+        problem.id,
+        problem.description,
+        problem.buggy_code,
+        problem.bug_description,
+        tuple(problem.expected_fixes),
+        tuple(problem.unit_tests),
+    )
+
+
+def prompt_hash(text: str) -> str:
+    """
+    Get the content hash identifying a prompt version.
+
+    Args:
+        text: Full prompt text
+
+    Returns:
+        Hex digest (32 characters)
+    """
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """A tutor system prompt split into the persona prefix and the problem suffix."""
+
+    persona: PersonaType
+    problem_id: int
+    prefix: str
+    suffix: str
+    hash: str
+
+    @property
+    def text(self) -> str:
+        """Get the full prompt text."""
+        return f"{self.prefix}\n\n{self.suffix}"
+
+    def system_blocks(self, model: str = CLAUDE_MODEL) -> SystemPrompt:
+        """
+        Get the prompt as API system blocks.
+
+        Each block is marked for caching once the prompt up to it reaches the model's minimum
+        cacheable length: the prefix is shared by every problem of the persona, and the suffix
+        completes the prefix of this persona-problem pair.
+
+        Args:
+            model: Model the prompt is sent to
+
+        Returns:
+            [persona block, problem block]
+        """
+        return cached_system_prompt(self.prefix, self.suffix, model=model)
+
+
+class PromptRegistry:
+    """Rendered tutor prompts, keyed by persona and problem content."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._prompts: dict[_PromptKey, RenderedPrompt] = {}
+        self._lock = threading.Lock()
+
+    def register(self, problems: Iterable[Problem], personas: Iterable[PersonaType] = get_args(PersonaType)) -> None:
+        """
+        Render the prompts of every persona-problem pair (e.g., at startup).
+
+        Args:
+            problems: Experiment problems
+            personas: Tutor personas
+        """
+        personas = tuple(personas)
+        for problem in problems:
+            for persona in personas:
+                self.get(persona, problem)
+
+    def get(self, persona: PersonaType, problem: Problem) -> RenderedPrompt:
+        """
+        Get the prompt for a persona and problem, rendering it if it is not registered yet.
+
+        Args:
+            persona: "neutral" or "emotional"
+            problem: The debugging problem
+
+        Returns:
+            The rendered prompt
+        """
+        key = _prompt_key(persona, problem)
+        with self._lock:
+            prompt = self._prompts.get(key)
+        if prompt is None:
+            prefix, suffix = get_socratic_prompt_parts(persona, problem)
+            prompt = RenderedPrompt(
+                persona=persona,
+                problem_id=problem.id,
+                prefix=prefix,
+                suffix=suffix,
+                hash=prompt_hash(f"{prefix}\n\n{suffix}"),
+            )
+            with self._lock:
+                prompt = self._prompts.setdefault(key, prompt)
+        return prompt
+
+    def add(self, problem: Problem, prompt: RenderedPrompt) -> None:
+        """
+        Register a prompt rendered elsewhere (e.g., read from the problem cache) without rendering it again.
+
+        Args:
+            problem: The problem the prompt was rendered from
+            prompt: The rendered prompt
+        """
+        with self._lock:
+            self._prompts.setdefault(_prompt_key(prompt.persona, problem), prompt)
+
+    def discard(self, problem: Problem) -> None:
+        """
+        Drop the prompts rendered from a problem's content (e.g., after the problem was edited).
+
+        Sessions already holding one of the prompts keep using it.
+
+        Args:
+            problem: The problem as it was rendered
+        """
+        with self._lock:
+            for persona in get_args(PersonaType):
+                self._prompts.pop(_prompt_key(persona, problem), None)
+
+    def clear(self) -> None:
+        """Drop every rendered prompt (they are rendered again on use)."""
+        with self._lock:
+            self._prompts.clear()
+
+    def __len__(self) -> int:
+        return len(self._prompts)
+
+
+# Shared by the tutor, the cache warmer and the opening bank, so all send the same blocks
+socratic_prompts = PromptRegistry()
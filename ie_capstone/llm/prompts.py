@@ -1,8 +1,11 @@
 """System prompts for different personas and the judge."""
 
-from ie_capstone.models import PersonaType, Problem
+import difflib
 
-NEUTRAL_PERSONA_SYSTEM_PROMPT = """당신은 소크라테스 방식을 사용하여 학생이 Python 코드를 디버깅하는 것을 돕는 프로그래밍 튜터입니다.
+from ie_capstone.config import JUDGE_DIFF_CONTEXT
+from ie_capstone.models import Message, PersonaType, Problem
+
+NEUTRAL_PERSONA_PREFIX = """당신은 소크라테스 방식을 사용하여 학생이 Python 코드를 디버깅하는 것을 돕는 프로그래밍 튜터입니다.
 당신의 주된 목표는 제가 제시한 주제에 대해 탐색적이고 개방적인 일련의 질문을 던져 비판적 사고를 기르고 스스로 결론에 도달하도록 돕는 것입니다.
 
 제가 구체적으로 요청하지 않는 한, 직접적인 정답이나 자세한 설명은 하지 마십시오. 대신, 저의 기존 가정에 의문을 제기하고 다양한 관점을 탐구할 수 있는 질문들로 저를 이끌어 주십시오.
@@ -27,30 +30,11 @@ NEUTRAL_PERSONA_SYSTEM_PROMPT = """당신은 소크라테스 방식을 사용하
 
 고려할 사항:
 - 학생에게는 수정해야 하는 코드가 주어집니다.
-- 학생은 직접 Python 코드를 수정할 수 있지만, 실제로 작동을 시키거나 테스트할 수는 없습니다.
-
-문제 설명:
-{problem_description}
-
-버그가 있는 코드:
-```python
-{buggy_code}
-```
-
-버그 설명 (학생에게 절대 공개하지 마세요):
-{bug_description}
-
-예상 수정 방법 (학생에게 절대 공개하지 마세요):
-{expected_fix}
+- 학생은 직접 Python 코드를 수정할 수 있지만, 실제로 작동을 시키거나 테스트할 수는 없습니다."""
 
-단위 테스트:
-```python
-{unit_tests}
-```
+NEUTRAL_PERSONA_CLOSING = """기억하세요: 당신의 목표는 신중한 질문을 통해 학생이 스스로 버그를 발견하며 학습하도록 돕는 것입니다. 버그가 무엇인지 또는 어떻게 수정하는지 절대 직접 알려주지 마세요."""
 
-기억하세요: 당신의 목표는 신중한 질문을 통해 학생이 스스로 버그를 발견하며 학습하도록 돕는 것입니다. 버그가 무엇인지 또는 어떻게 수정하는지 절대 직접 알려주지 마세요."""
-
-EMOTIONAL_PERSONA_SYSTEM_PROMPT = """당신은 소크라테스 방식을 사용하여 학생이 Python 코드를 디버깅하는 것을 돕는 친근하고 격려하는 프로그래밍 튜터입니다!
+EMOTIONAL_PERSONA_PREFIX = """당신은 소크라테스 방식을 사용하여 학생이 Python 코드를 디버깅하는 것을 돕는 친근하고 격려하는 프로그래밍 튜터입니다!
 당신의 주된 목표는 제가 제시한 주제에 대해 탐색적이고 개방적인 일련의 질문을 던져 비판적 사고를 기르고 스스로 결론에 도달하도록 돕는 것입니다.
 
 제가 구체적으로 요청하지 않는 한, 직접적인 정답이나 자세한 설명은 하지 마십시오. 대신, 저의 기존 가정에 의문을 제기하고 다양한 관점을 탐구할 수 있는 질문들로 저를 이끌어 주십시오.
@@ -75,9 +59,22 @@ EMOTIONAL_PERSONA_SYSTEM_PROMPT = """당신은 소크라테스 방식을 사용
 
 고려할 사항:
 - 학생에게는 수정해야 하는 코드가 주어집니다.
-- 학생은 직접 Python 코드를 수정할 수 있지만, 실제로 작동을 시키거나 테스트할 수는 없습니다.
-
-문제 설명:
+- 학생은 직접 Python 코드를 수정할 수 있지만, 실제로 작동을 시키거나 테스트할 수는 없습니다."""
+
+EMOTIONAL_PERSONA_CLOSING = """기억하세요: 당신의 목표는 학생이 스스로 버그를 발견하며 학습하도록 돕는 것이며, 동시에 경험을 즐겁고 격려적으로 만드는 것입니다! 버그가 무엇인지 또는 어떻게 수정하는지 절대 직접 알려주지 마세요. 🌟"""
+
+# Tutor system prompt layout: the persona's instructions (identical for every problem) come first, so they
+# form a stable cacheable prefix, followed by the problem section and the persona's closing reminder
+TUTOR_PERSONA_PREFIXES: dict[PersonaType, str] = {
+    "neutral": NEUTRAL_PERSONA_PREFIX,
+    "emotional": EMOTIONAL_PERSONA_PREFIX,
+}
+TUTOR_PERSONA_CLOSINGS: dict[PersonaType, str] = {
+    "neutral": NEUTRAL_PERSONA_CLOSING,
+    "emotional": EMOTIONAL_PERSONA_CLOSING,
+}
+
+TUTOR_PROBLEM_SECTION = """문제 설명:
 {problem_description}
 
 버그가 있는 코드:
@@ -94,11 +91,65 @@ EMOTIONAL_PERSONA_SYSTEM_PROMPT = """당신은 소크라테스 방식을 사용
 단위 테스트:
 ```python
 {unit_tests}
-```
+```"""
+
+CONVERSATION_SUMMARY_PROMPT = """You maintain a running summary of a Socratic tutoring conversation in which a tutor helps a student debug Python code.
+Merge the new turns into the previous summary. Keep what the student has already tried, discovered or misunderstood, which questions the tutor has asked, and where the student currently stands.
+Write the summary in Korean, as a few short bullet points. Respond with ONLY the updated summary."""
+
+CONVERSATION_SUMMARY_USER_MESSAGE = """[이전 요약]
+{previous_summary}
+
+[새 대화]
+{transcript}"""
+
+# Appended to the tutor's system prompt when older turns have been summarized
+CONVERSATION_SUMMARY_CONTEXT = """이전 대화 요약 (최근 대화는 메시지로 이어집니다):
+{summary}"""
+
+EXEMPLAR_CONTEXT = """참고: 이 문제의 예시 대화 중 학생의 현재 메시지와 가장 관련 있는 부분입니다 (영어). 질문의 방향만 참고하고, 문장을 옮기지 말고 당신의 말투로, 한국어로 답하세요.
+{exemplars}"""
+
+# Tutor user messages: an optional section with the editor code, then the student's message
+TUTOR_USER_MESSAGE = """{code_section}
+
+[학생의 메시지]
+{user_message}"""
 
-기억하세요: 당신의 목표는 학생이 스스로 버그를 발견하며 학습하도록 돕는 것이며, 동시에 경험을 즐겁고 격려적으로 만드는 것입니다! 버그가 무엇인지 또는 어떻게 수정하는지 절대 직접 알려주지 마세요. 🌟"""
+TUTOR_CODE_SNAPSHOT = """[학생의 현재 코드]
+```python
+{code}
+```"""
+
+TUTOR_CODE_DIFF = """[학생의 코드 변경 사항] (직전에 보여준 코드 대비, 번호는 그 코드의 줄 번호)
+```diff
+{code_diff}
+```"""
+
+TUTOR_CODE_UNCHANGED = """[학생의 현재 코드]
+(직전에 보여준 코드와 동일)"""
+
+# Replaces code sections that a later full program has made stale
+TUTOR_CODE_COLLAPSED = """[학생의 이전 코드]
+(이후 메시지의 코드로 대체되어 생략)"""
+
+# Editor code modes for tutor messages (see SOCRATIC_CODE_CONTEXT)
+TUTOR_CODE_MODES = ("full", "changed", "diff")
+
+# Added to the system prompt when the leak guard cut off a reply that revealed the fix
+LEAK_RETRY_NOTICE = """주의: 직전에 작성한 응답이 정답 수정 내용을 그대로 드러내어 전달되지 않았습니다. 수정된 코드나 연산자를 직접 쓰지 말고, 학생이 스스로 찾도록 질문으로만 안내하세요."""
+
+# Sent instead when every regenerated reply still revealed the fix
+LEAK_FALLBACK_REPLIES = {
+    "neutral": "답을 직접 알려드릴 수는 없습니다. 문제가 되는 줄에서 각 변수가 어떤 값을 갖는지 하나씩 따라가 보시겠습니까?",
+    "emotional": "답을 바로 알려드리면 재미없잖아요! 😊 문제가 되는 줄에서 각 변수가 어떤 값을 갖는지 하나씩 따라가 볼까요?",
+}
 
-JUDGE_SYSTEM_PROMPT = """You are an expert code evaluator. Your task is to determine if the student's proposed bug fix correctly addresses the bug in the original code.
+# Guidance for generating banked opening replies (ie_capstone.llm.openers)
+OPENING_REPLY_EXAMPLES = """참고: 이 문제의 예시 대화에서 튜터가 학생의 첫 메시지에 한 좋은 첫 질문들입니다 (영어). 이와 같은 방향의 질문 하나를 당신의 말투로, 한국어로 하세요.
+{examples}"""
+
+JUDGE_SYSTEM_PROMPT = """You are an expert code evaluator. Your task is to determine if the student's proposed bug fix correctly addresses the bug in the original code. The student's code is given in the user message.
 
 Original Buggy Code:
 ```python
@@ -111,11 +162,6 @@ Bug Description:
 Expected Fix(es):
 {expected_fixes}
 
-Student's Final Code:
-```python
-{student_code}
-```
-
 Unit Tests that must pass:
 ```python
 {unit_tests}
@@ -126,46 +172,193 @@ Evaluate whether the student's code:
 2. Would pass all the unit tests
 3. Is semantically equivalent to the expected fix (may have different style but same logic)
 
-Respond with ONLY "CORRECT" if the fix is valid, or "INCORRECT" if not. Do not include any other text."""
+{response_instructions}"""
+
+# The student's code travels in the user message so the system prompt is a per-problem prefix
+JUDGE_USER_MESSAGE = """Student's Final Code:
+```python
+{student_code}
+```
+
+Please evaluate the student's code fix."""
 
+JUDGE_DIFF_USER_MESSAGE = """Student's Changes to the Buggy Code (numbers are buggy-code line numbers; other lines are unchanged):
+```diff
+{code_diff}
+```
 
-def get_socratic_prompt(persona: PersonaType, problem: Problem) -> str:
+Please evaluate the student's code fix."""
+
+# Judge user message variants: the full student program, or its diff against the buggy code
+JUDGE_PROMPT_VARIANTS = ("full", "diff")
+
+JUDGE_RESPONSE_INSTRUCTIONS = (
+    'Respond with ONLY "CORRECT" if the fix is valid, or "INCORRECT" if not. Do not include any other text.'
+)
+
+JUDGE_STRUCTURED_RESPONSE_INSTRUCTIONS = """Respond with ONLY a JSON object of the form {"verdict": "CORRECT", "confidence": 0.9}.
+"verdict" is "CORRECT" if the fix is valid, or "INCORRECT" if not. "confidence" is a number between 0 and 1 expressing how certain you are. Do not include any other text."""
+
+
+def get_socratic_prompt_parts(persona: PersonaType, problem: Problem) -> tuple[str, str]:
     """
-    Get the appropriate system prompt for the persona.
+    Get the system prompt for the persona as a stable prefix and a problem-specific suffix.
 
     Args:
         persona: "neutral" or "emotional"
         problem: The debugging problem
 
     Returns:
-        Formatted system prompt
+        (persona instructions shared by every problem, problem section followed by the closing reminder)
     """
-    template = NEUTRAL_PERSONA_SYSTEM_PROMPT if persona == "neutral" else EMOTIONAL_PERSONA_SYSTEM_PROMPT
-
-    return template.format(
+    problem_section = TUTOR_PROBLEM_SECTION.format(
         problem_description=problem.description,
         buggy_code=problem.buggy_code,
         bug_description=problem.bug_description,
         expected_fix="\n".join(problem.expected_fixes),
         unit_tests="\n".join(problem.unit_tests),
     )
+    return TUTOR_PERSONA_PREFIXES[persona], f"{problem_section}\n\n{TUTOR_PERSONA_CLOSINGS[persona]}"
 
 
-def get_judge_prompt(problem: Problem, student_code: str) -> str:
+def get_socratic_prompt(persona: PersonaType, problem: Problem) -> str:
     """
-    Get the judge prompt with problem context.
+    Get the appropriate system prompt for the persona.
 
     Args:
+        persona: "neutral" or "emotional"
         problem: The debugging problem
+
+    Returns:
+        Formatted system prompt
+    """
+    return "\n\n".join(get_socratic_prompt_parts(persona, problem))
+
+
+def get_summary_user_message(previous_summary: str, messages: list[Message]) -> str:
+    """
+    Get the user message asking to fold new turns into the running summary.
+
+    Args:
+        previous_summary: Current summary (empty if none yet)
+        messages: Turns to fold in, oldest first
+
+    Returns:
+        Formatted user message
+    """
+    speakers = {"user": "학생", "assistant": "튜터"}
+    transcript = "\n\n".join(f"{speakers[msg.role]}: {msg.content}" for msg in messages)
+    return CONVERSATION_SUMMARY_USER_MESSAGE.format(
+        previous_summary=previous_summary or "(없음)", transcript=transcript
+    )
+
+
+def get_tutor_user_message(user_message: str, code_section: str | None = None) -> str:
+    """
+    Get a tutor user message, with the editor code section first if there is one.
+
+    Args:
+        user_message: Student's message
+        code_section: Formatted code section (e.g., TUTOR_CODE_SNAPSHOT), or None
+
+    Returns:
+        Formatted user message
+    """
+    if code_section is None:
+        return user_message
+    return TUTOR_USER_MESSAGE.format(code_section=code_section, user_message=user_message)
+
+
+def collapse_tutor_code(content: str) -> str:
+    """
+    Replace the code section of a tutor user message with TUTOR_CODE_COLLAPSED.
+
+    Args:
+        content: User message from get_tutor_user_message
+
+    Returns:
+        The message with its code section collapsed (unchanged if it has none)
+    """
+    separator = "\n\n[학생의 메시지]\n"
+    if separator not in content:
+        return content
+    return TUTOR_USER_MESSAGE.format(code_section=TUTOR_CODE_COLLAPSED, user_message=content.split(separator, 1)[1])
+
+
+def format_code_diff(buggy_code: str, student_code: str, context: int = JUDGE_DIFF_CONTEXT) -> str:
+    """
+    Format a unified diff of student code against buggy code, numbered by buggy-code lines.
+
+    Removed and unchanged lines carry their line number in the buggy code; added lines have none.
+
+    Args:
+        buggy_code: Original buggy code
         student_code: Student's submitted code
+        context: Unchanged lines shown around each change
 
     Returns:
-        Formatted judge prompt
+        Diff text, or "(no changes)" if the code is identical
+    """
+    buggy_lines = buggy_code.split("\n")
+    student_lines = student_code.split("\n")
+    matcher = difflib.SequenceMatcher(a=buggy_lines, b=student_lines, autojunk=False)
+
+    hunks = []
+    for group in matcher.get_grouped_opcodes(context):
+        first, last = group[0], group[-1]
+        lines = [f"@@ -{first[1] + 1},{last[2] - first[1]} +{first[3] + 1},{last[4] - first[3]} @@"]
+        for tag, a_start, a_end, b_start, b_end in group:
+            if tag == "equal":
+                lines.extend(f" {n + 1:>4} {buggy_lines[n]}" for n in range(a_start, a_end))
+                continue
+            lines.extend(f"-{n + 1:>4} {buggy_lines[n]}" for n in range(a_start, a_end))
+            lines.extend(f"+     {student_lines[n]}" for n in range(b_start, b_end))
+        hunks.append("\n".join(lines))
+    return "\n".join(hunks) or "(no changes)"
+
+
+def get_judge_prompt(problem: Problem, *, structured: bool = False) -> str:
+    """
+    Get the judge system prompt with problem context.
+
+    The prompt only depends on the problem, so every judge call for a problem shares it
+    as a cacheable prefix; the student's code goes in get_judge_user_message.
+
+    Args:
+        problem: The debugging problem
+        structured: Ask for a JSON verdict with a confidence instead of a bare CORRECT/INCORRECT
+
+    Returns:
+        Formatted judge system prompt
     """
     return JUDGE_SYSTEM_PROMPT.format(
         buggy_code=problem.buggy_code,
         bug_description=problem.bug_description,
         expected_fixes="\n".join(problem.expected_fixes),
-        student_code=student_code,
         unit_tests="\n".join(problem.unit_tests),
+        response_instructions=JUDGE_STRUCTURED_RESPONSE_INSTRUCTIONS if structured else JUDGE_RESPONSE_INSTRUCTIONS,
     )
+
+
+def get_judge_user_message(problem: Problem, student_code: str, variant: str = "full") -> str:
+    """
+    Get the judge user message carrying the student's code.
+
+    Args:
+        problem: The debugging problem
+        student_code: Student's submitted code
+        variant: "full" for the whole program, or "diff" for only the student's changes to the buggy code
+            (falls back to "full" when the diff would not be shorter)
+
+    Returns:
+        Formatted user message
+    """
+    if variant not in JUDGE_PROMPT_VARIANTS:
+        raise ValueError(f"Unknown judge prompt variant: {variant}")
+
+    if variant == "diff":
+        code_diff = format_code_diff(problem.buggy_code, student_code)
+        # A rewrite can make the diff longer than the program itself
+        if len(code_diff) < len(student_code):
+            return JUDGE_DIFF_USER_MESSAGE.format(code_diff=code_diff)
+    return JUDGE_USER_MESSAGE.format(student_code=student_code)
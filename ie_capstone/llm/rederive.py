@@ -0,0 +1,142 @@
+"""Offline re-derivation of judge verdicts from stored raw responses.
+
+Usage:
+    python -m ie_capstone.llm.rederive
+    python -m ie_capstone.llm.rederive --threshold 0.67 --fast-min-confidence 0.9 --output flips.json
+
+Each attempt's `judge_calls` holds the raw judge responses behind its verdict. This tool parses
+them again with the current parsers and the given thresholds, without any API call, and reports
+the attempts whose verdict would change. Verdicts not made by the LLM (e.g., "reference_ast")
+are skipped, as are cascade verdicts that would need calls that were never made.
+"""
+
+import argparse
+import json
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from ie_capstone.config import JUDGE_FAST_ITERATIONS, JUDGE_FAST_MIN_CONFIDENCE, LOGS_DIR
+from ie_capstone.llm.judge import LLMJudge
+from ie_capstone.llm.rejudge import iter_session_logs
+from ie_capstone.models import JudgeCall, JudgeVerdict
+
+
+@dataclass
+class RederivedAttempt:
+    """An attempt whose verdict was re-derived."""
+
+    session_id: str
+    problem_id: int
+    original: bool | None
+    rederived: bool
+    decided_by: str
+
+
+def rederive_verdict(
+    calls: list[JudgeCall],
+    threshold: float = 0.5,
+    fast_min_confidence: float = JUDGE_FAST_MIN_CONFIDENCE,
+    fast_iterations: int = JUDGE_FAST_ITERATIONS,
+) -> JudgeVerdict | None:
+    """
+    Re-derive a verdict from stored judge calls.
+
+    Args:
+        calls: Stored calls of one judgment
+        threshold: Minimum average score for a correct verdict
+        fast_min_confidence: Minimum confidence for fast-tier votes to decide
+        fast_iterations: Number of fast-tier votes needed to decide (the fast tier stops
+            early on a low-confidence vote, so fewer may be stored)
+
+    Returns:
+        The re-derived verdict, or None if the stored calls are not enough to decide
+    """
+    fast_calls = [call for call in calls if call.stage == "fast"]
+    primary_calls = [call for call in calls if call.stage != "fast"]
+
+    if fast_calls:
+        votes = [LLMJudge.parse_structured_response(call.response) for call in fast_calls[:fast_iterations]]
+        confident = all(vote is not None and vote[1] >= fast_min_confidence for vote in votes)
+        scores = [vote[0] for vote in votes if vote is not None]
+        if confident and len(set(scores)) == 1:
+            if len(votes) < fast_iterations:
+                # The live judge would have asked for more fast votes, which were never made
+                return None
+            return JudgeVerdict(is_correct=scores[0] == 1.0, scores=scores, decided_by="fast", calls=calls)
+
+    if not primary_calls:
+        return None
+    scores = [LLMJudge.parse_score(call.response) for call in primary_calls]
+    decided_by = "primary" if fast_calls else "llm"
+    return JudgeVerdict(
+        is_correct=LLMJudge.aggregate_scores(scores, threshold), scores=scores, decided_by=decided_by, calls=calls
+    )
+
+
+def rederive_logs(
+    logs_dir: Path,
+    threshold: float = 0.5,
+    fast_min_confidence: float = JUDGE_FAST_MIN_CONFIDENCE,
+) -> tuple[list[RederivedAttempt], Counter]:
+    """
+    Re-derive the verdicts of every logged attempt with stored judge calls.
+
+    Args:
+        logs_dir: Directory containing session JSON files
+        threshold: Minimum average score for a correct verdict
+        fast_min_confidence: Minimum confidence for fast-tier votes to decide
+
+    Returns:
+        (re-derived attempts, counts of "rederived", "skipped" and "undecidable" attempts)
+    """
+    results = []
+    counts: Counter = Counter()
+    for _, session in iter_session_logs(logs_dir):
+        for attempt in session.get("problem_attempts", []):
+            stored = attempt.get("judge_calls") or []
+            if not stored:
+                counts["skipped"] += 1
+                continue
+            verdict = rederive_verdict([JudgeCall(**call) for call in stored], threshold, fast_min_confidence)
+            if verdict is None:
+                counts["undecidable"] += 1
+                continue
+            counts["rederived"] += 1
+            results.append(
+                RederivedAttempt(
+                    session_id=session["session_id"],
+                    problem_id=attempt["problem_id"],
+                    original=attempt.get("is_correct"),
+                    rederived=verdict.is_correct,
+                    decided_by=verdict.decided_by,
+                )
+            )
+    return results, counts
+
+
+def main(argv: list[str] | None = None):
+    """Re-derive logged verdicts and report the ones that change."""
+    parser = argparse.ArgumentParser(description="Re-derive judge verdicts from stored raw responses.")
+    parser.add_argument("--logs-dir", type=Path, default=LOGS_DIR)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--fast-min-confidence", type=float, default=JUDGE_FAST_MIN_CONFIDENCE)
+    parser.add_argument("--output", type=Path, help="Optional JSON file for the changed verdicts")
+    args = parser.parse_args(argv)
+
+    results, counts = rederive_logs(args.logs_dir, args.threshold, args.fast_min_confidence)
+    flips = [result for result in results if result.original != result.rederived]
+    for flip in flips:
+        print(f"{flip.session_id} problem {flip.problem_id}: {flip.original} -> {flip.rederived} ({flip.decided_by})")
+    print(
+        f"{counts['rederived']} re-derived, {len(flips)} changed, "
+        f"{counts['undecidable']} need new calls, {counts['skipped']} without stored calls"
+    )
+    if args.output:
+        args.output.write_text(
+            json.dumps([vars(flip) for flip in flips], indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+
+
+if __name__ == "__main__":
+    main()
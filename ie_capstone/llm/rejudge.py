@@ -0,0 +1,351 @@
+"""Bulk offline re-judging of saved session logs.
+
+Usage:
+    python -m ie_capstone.llm.rejudge --label judge-v2
+    python -m ie_capstone.llm.rejudge --label judge-v2 --mode direct --max-workers 4
+
+Every distinct `final_code` under the logs directory is judged once (submissions with the
+same normalized AST share a verdict). Progress is appended to a state file, so re-running
+with the same label resumes an interrupted run, including batches that are still processing.
+New verdicts are written into each attempt under `rejudge.<label>`, next to the original scores.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import anthropic
+
+from ie_capstone.config import (
+    BATCH_MAX_REQUESTS,
+    BATCH_POLL_INTERVAL,
+    JUDGE_ITERATIONS,
+    LOGS_DIR,
+    REJUDGE_DIR,
+    REJUDGE_MAX_WORKERS,
+)
+from ie_capstone.dataset.reference import code_fingerprint, matches_reference
+from ie_capstone.llm.client import ClaudeClient
+from ie_capstone.llm.judge import LLMJudge
+from ie_capstone.models import JudgeVerdict, Problem
+
+
+@dataclass
+class Submission:
+    """A distinct submission to re-judge."""
+
+    key: str
+    problem_id: int
+    code: str
+
+
+def submission_key(problem_id: int, code: str) -> str:
+    """
+    Get the deduplication key for a submission.
+
+    Args:
+        problem_id: ID of the problem
+        code: Submitted code
+
+    Returns:
+        Hex digest shared by submissions with the same normalized AST (or text, if unparsable)
+    """
+    return code_fingerprint(problem_id, code)
+
+
+def iter_session_logs(logs_dir: Path) -> Iterator[tuple[Path, dict]]:
+    """
+    Stream session logs one file at a time.
+
+    Args:
+        logs_dir: Directory containing session JSON files
+
+    Yields:
+        (path, session data), skipping files that are not valid JSON
+    """
+    for path in sorted(logs_dir.glob("*.json")):
+        try:
+            yield path, json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            continue
+
+
+def collect_submissions(logs_dir: Path) -> dict[str, Submission]:
+    """
+    Collect distinct submissions from all session logs.
+
+    Args:
+        logs_dir: Directory containing session JSON files
+
+    Returns:
+        Submissions keyed by submission_key
+    """
+    submissions: dict[str, Submission] = {}
+    for _, session in iter_session_logs(logs_dir):
+        for attempt in session.get("problem_attempts", []):
+            code = attempt.get("final_code", "")
+            if not code.strip():
+                continue
+            key = submission_key(attempt["problem_id"], code)
+            submissions.setdefault(key, Submission(key=key, problem_id=attempt["problem_id"], code=code))
+    return submissions
+
+
+class RejudgeState:
+    """
+    Append-only progress file for a re-judge run.
+    Records verdicts and submitted batches so an interrupted run can resume.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Load existing progress, if any.
+
+        Args:
+            path: Path to the JSONL state file
+        """
+        self.path = path
+        self.verdicts: dict[str, JudgeVerdict] = {}
+        self.pending_batches: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    self._apply(json.loads(line))
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+    def record_verdict(self, key: str, verdict: JudgeVerdict) -> None:
+        """Record the verdict for a submission."""
+        self._append({
+            "type": "verdict",
+            "key": key,
+            "is_correct": verdict.is_correct,
+            "scores": verdict.scores,
+            "decided_by": verdict.decided_by,
+        })
+
+    def record_batch(self, batch_id: str, keys: list[str]) -> None:
+        """Record a submitted batch and the submissions it covers."""
+        self._append({"type": "batch", "batch_id": batch_id, "keys": keys})
+
+    def record_batch_done(self, batch_id: str) -> None:
+        """Record that a batch's results have been ingested."""
+        self._append({"type": "batch_done", "batch_id": batch_id})
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            self._apply(record)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def _apply(self, record: dict) -> None:
+        if record["type"] == "verdict":
+            self.verdicts[record["key"]] = JudgeVerdict(
+                is_correct=record["is_correct"],
+                scores=record["scores"],
+                decided_by=record["decided_by"],
+            )
+        elif record["type"] == "batch":
+            self.pending_batches[record["batch_id"]] = record["keys"]
+        elif record["type"] == "batch_done":
+            self.pending_batches.pop(record["batch_id"], None)
+
+
+class BulkRejudger:
+    """Re-judges submissions through Message Batches or bounded-concurrency direct calls."""
+
+    def __init__(
+        self,
+        judge: LLMJudge,
+        problems: dict[int, Problem],
+        state: RejudgeState,
+        iterations: int = JUDGE_ITERATIONS,
+        max_workers: int = REJUDGE_MAX_WORKERS,
+        poll_interval: float = BATCH_POLL_INTERVAL,
+    ):
+        """
+        Initialize the re-judger.
+
+        Args:
+            judge: Judge used to build requests and parse responses
+            problems: Problems keyed by ID
+            state: Progress state for this run
+            iterations: Self-consistency rounds per submission
+            max_workers: Concurrent requests in direct mode
+            poll_interval: Seconds between batch status checks
+        """
+        self.judge = judge
+        self.problems = problems
+        self.state = state
+        self.iterations = iterations
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+
+    def run_direct(self, submissions: list[Submission]) -> None:
+        """
+        Judge submissions with direct API calls, at most max_workers at a time.
+
+        Args:
+            submissions: Submissions without a recorded verdict
+        """
+
+        def judge_one(submission: Submission) -> None:
+            verdict = self.judge.evaluate(self.problems[submission.problem_id], submission.code, self.iterations)
+            self.state.record_verdict(submission.key, verdict)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(judge_one, submissions))
+
+    def run_batch(self, submissions: list[Submission]) -> None:
+        """
+        Judge submissions through Message Batches, falling back to direct calls if batches are unavailable.
+
+        Args:
+            submissions: Submissions without a recorded verdict
+        """
+        remaining = self._resolve_locally(submissions)
+        requests = []
+        for submission in remaining:
+            params = self.judge.build_request(self.problems[submission.problem_id], submission.code)
+            requests.extend({"custom_id": f"{submission.key}_{i}", "params": params} for i in range(self.iterations))
+
+        for start in range(0, len(requests), BATCH_MAX_REQUESTS):
+            chunk = requests[start : start + BATCH_MAX_REQUESTS]
+            try:
+                batch_id = self.judge.client.create_batch(chunk)
+            except anthropic.APIError as e:
+                print(f"Batch submission failed ({e}); falling back to direct calls")
+                submitted = {key for keys in self.state.pending_batches.values() for key in keys}
+                self.run_direct([s for s in remaining if s.key not in submitted])
+                break
+            self.state.record_batch(batch_id, sorted({r["custom_id"].rsplit("_", 1)[0] for r in chunk}))
+            print(f"Submitted batch {batch_id} ({len(chunk)} requests)")
+
+        self.wait_for_batches()
+
+    def wait_for_batches(self) -> None:
+        """Poll pending batches (including ones from an interrupted run) and ingest their results."""
+        for batch_id in list(self.state.pending_batches):
+            while self.judge.client.get_batch_status(batch_id) != "ended":
+                time.sleep(self.poll_interval)
+
+            scores: dict[str, list[float]] = {}
+            failed: set[str] = set()
+            for custom_id, text in self.judge.client.iter_batch_results(batch_id):
+                key = custom_id.rsplit("_", 1)[0]
+                if text is None:
+                    failed.add(key)
+                else:
+                    scores.setdefault(key, []).append(self.judge.parse_score(text))
+
+            # Submissions with errored requests get no verdict and are resubmitted on the next run
+            for key, key_scores in scores.items():
+                if key not in failed:
+                    verdict = JudgeVerdict(
+                        is_correct=self.judge.aggregate_scores(key_scores), scores=key_scores, decided_by="llm"
+                    )
+                    self.state.record_verdict(key, verdict)
+            self.state.record_batch_done(batch_id)
+            print(f"Ingested batch {batch_id} ({len(failed)} submission(s) failed)")
+
+    def _resolve_locally(self, submissions: list[Submission]) -> list[Submission]:
+        """Record verdicts that need no API call and return the rest."""
+        submitted = {key for keys in self.state.pending_batches.values() for key in keys}
+        remaining = []
+        for submission in submissions:
+            if submission.key in submitted:
+                continue
+            problem = self.problems[submission.problem_id]
+            if self.judge.use_reference_match and matches_reference(problem, submission.code):
+                verdict = JudgeVerdict(is_correct=True, scores=[1.0], decided_by="reference_ast")
+                self.state.record_verdict(submission.key, verdict)
+            else:
+                remaining.append(submission)
+        return remaining
+
+
+def write_rejudge_results(logs_dir: Path, label: str, verdicts: dict[str, JudgeVerdict]) -> int:
+    """
+    Write new verdicts into session logs next to the original scores.
+
+    Args:
+        logs_dir: Directory containing session JSON files
+        label: Name of this re-judge run (key under each attempt's "rejudge")
+        verdicts: Verdicts keyed by submission_key
+
+    Returns:
+        Number of attempts updated
+    """
+    judged_at = datetime.now().isoformat()
+    updated = 0
+    for path, session in iter_session_logs(logs_dir):
+        changed = False
+        for attempt in session.get("problem_attempts", []):
+            code = attempt.get("final_code", "")
+            verdict = verdicts.get(submission_key(attempt["problem_id"], code)) if code.strip() else None
+            if verdict is None:
+                continue
+            attempt.setdefault("rejudge", {})[label] = {
+                "is_correct": verdict.is_correct,
+                "judge_scores": verdict.scores,
+                "judge_decided_by": verdict.decided_by,
+                "judged_at": judged_at,
+            }
+            changed = True
+            updated += 1
+        if changed:
+            tmp_path = path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(session, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+    return updated
+
+
+def main(argv: list[str] | None = None):
+    """Re-judge all saved submissions."""
+    from ie_capstone.dataset.parser import load_all_problems
+
+    parser = argparse.ArgumentParser(description="Re-judge every saved final_code in the session logs.")
+    parser.add_argument("--label", required=True, help="Name of this run; reuse it to resume")
+    parser.add_argument("--logs-dir", type=Path, default=LOGS_DIR)
+    parser.add_argument("--mode", choices=["batch", "direct"], default="batch")
+    parser.add_argument("--iterations", type=int, default=JUDGE_ITERATIONS)
+    parser.add_argument("--max-workers", type=int, default=REJUDGE_MAX_WORKERS)
+    parser.add_argument("--poll-interval", type=float, default=BATCH_POLL_INTERVAL)
+    args = parser.parse_args(argv)
+
+    problems = {problem.id: problem for problem in load_all_problems()}
+    state = RejudgeState(REJUDGE_DIR / f"{args.label}.jsonl")
+    rejudger = BulkRejudger(
+        LLMJudge(ClaudeClient()),
+        problems,
+        state,
+        iterations=args.iterations,
+        max_workers=args.max_workers,
+        poll_interval=args.poll_interval,
+    )
+
+    submissions = collect_submissions(args.logs_dir)
+    todo = [s for s in submissions.values() if s.key not in state.verdicts and s.problem_id in problems]
+    print(f"{len(submissions)} distinct submission(s), {len(todo)} left to judge")
+
+    if args.mode == "batch":
+        rejudger.run_batch(todo)
+    else:
+        rejudger.wait_for_batches()
+        rejudger.run_direct([s for s in todo if s.key not in state.verdicts])
+
+    updated = write_rejudge_results(args.logs_dir, args.label, state.verdicts)
+    print(f"Wrote {args.label} verdicts to {updated} attempt(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Cohort-wide cache of tutor replies for near-identical questions."""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from ie_capstone.config import (
+    RESPONSE_CACHE_BANDS,
+    RESPONSE_CACHE_PERMUTATIONS,
+    RESPONSE_CACHE_PERSONAS,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_THRESHOLD,
+)
+from ie_capstone.dataset.reference import code_fingerprint
+from ie_capstone.llm.similarity import MinHasher, char_ngrams, jaccard, normalize_text
+from ie_capstone.models import PersonaType
+
+# (persona, problem ID, tutor prompt hash, code fingerprint, user turn index): only replies given in
+# the same situation, to the same version of the problem, are candidates; the question itself is
+# matched by similarity
+CacheScope = tuple[str, int, str, str, int]
+
+
+@dataclass
+class _CachedReply:
+    """A cached reply with its lookup keys."""
+
+    scope: CacheScope
+    grams: set[str]
+    bands: list[tuple[int, ...]]
+    reply: str
+
+
+class ResponseCache:
+    """
+    Tutor replies shared across sessions, keyed by situation and looked up by question similarity.
+
+    A reply is reused only for the same persona, problem, tutor prompt (so a reply to an edited
+    problem's old version is never served, even if a session still on the old version stores it),
+    code state (AST fingerprint) and user turn index, and only if the question's character n-grams are at least `threshold` similar
+    (Jaccard) to the cached question. Candidates come from MinHash LSH buckets, so lookups do not
+    scan every cached question; the least recently used replies are evicted beyond max_size.
+    """
+
+    def __init__(
+        self,
+        threshold: float = RESPONSE_CACHE_THRESHOLD,
+        max_size: int = RESPONSE_CACHE_SIZE,
+        personas: tuple[PersonaType, ...] = RESPONSE_CACHE_PERSONAS,
+        permutations: int = RESPONSE_CACHE_PERMUTATIONS,
+        bands: int = RESPONSE_CACHE_BANDS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum question similarity for a hit
+            max_size: Maximum cached replies
+            personas: Experiment arms the cache serves (others always ask the model)
+            permutations: MinHash signature length
+            bands: LSH bands (must divide permutations)
+        """
+        if permutations % bands:
+            raise ValueError("bands must divide permutations")
+        self.threshold = threshold
+        self.max_size = max_size
+        self.personas = personas
+        self.band_count = bands
+        self.hasher = MinHasher(permutations)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, _CachedReply] = OrderedDict()
+        self._buckets: dict[tuple[CacheScope, tuple[int, ...]], set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def enabled_for(self, persona: PersonaType) -> bool:
+        """Check whether the cache serves a persona's arm."""
+        return persona in self.personas
+
+    def lookup(
+        self,
+        persona: PersonaType,
+        problem_id: int,
+        prompt_hash: str,
+        turn_index: int,
+        code: str | None,
+        question: str,
+    ) -> str | None:
+        """
+        Find a cached reply to a near-identical question asked in the same situation.
+
+        Args:
+            persona: Tutor persona
+            problem_id: ID of the problem
+            prompt_hash: Hash of the tutor prompt (identifies the problem version)
+            turn_index: Number of earlier user turns on this problem
+            code: Current editor code (optional)
+            question: Student's message
+
+        Returns:
+            The cached reply, or None on a miss
+        """
+        if not self.enabled_for(persona):
+            return None
+        scope = self._scope(persona, problem_id, prompt_hash, turn_index, code)
+        grams = char_ngrams(question)
+        bands = self.hasher.bands(self.hasher.signature(grams), self.band_count)
+        with self._lock:
+            candidates = set().union(*(self._buckets.get((scope, band), set()) for band in bands))
+            best: tuple[float, int] | None = None
+            for entry_id in candidates:
+                score = jaccard(grams, self._entries[entry_id].grams)
+                if score >= self.threshold and (best is None or score > best[0]):
+                    best = (score, entry_id)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best[1])
+            return self._entries[best[1]].reply
+
+    def store(
+        self,
+        persona: PersonaType,
+        problem_id: int,
+        prompt_hash: str,
+        turn_index: int,
+        code: str | None,
+        question: str,
+        reply: str,
+    ) -> None:
+        """
+        Cache a model reply.
+
+        Args:
+            persona: Tutor persona
+            problem_id: ID of the problem
+            prompt_hash: Hash of the tutor prompt the reply was generated with
+            turn_index: Number of earlier user turns on this problem
+            code: Editor code the question was asked with (optional)
+            question: Student's message
+            reply: The tutor's reply
+        """
+        if not self.enabled_for(persona) or not normalize_text(question):
+            return
+        scope = self._scope(persona, problem_id, prompt_hash, turn_index, code)
+        grams = char_ngrams(question)
+        entry = _CachedReply(
+            scope=scope,
+            grams=grams,
+            bands=self.hasher.bands(self.hasher.signature(grams), self.band_count),
+            reply=reply,
+        )
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            for band in entry.bands:
+                self._buckets.setdefault((scope, band), set()).add(entry_id)
+            while len(self._entries) > self.max_size:
+                self._evict()
+
+    def discard_problems(self, problem_ids: Iterable[int]) -> int:
+        """
+        Drop every reply cached for some problems (e.g., after they were edited).
+
+        Args:
+            problem_ids: IDs of the problems
+
+        Returns:
+            Number of replies dropped
+        """
+        problem_ids = set(problem_ids)
+        with self._lock:
+            entry_ids = [entry_id for entry_id, entry in self._entries.items() if entry.scope[1] in problem_ids]
+            for entry_id in entry_ids:
+                self._entries.move_to_end(entry_id, last=False)
+                self._evict()
+        return len(entry_ids)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _scope(
+        persona: PersonaType, problem_id: int, prompt_hash: str, turn_index: int, code: str | None
+    ) -> CacheScope:
+        """Get the situation a question is asked in."""
+        fingerprint = code_fingerprint(problem_id, code) if code is not None else ""
+        return (persona, problem_id, prompt_hash, fingerprint, turn_index)
+
+    def _evict(self) -> None:
+        """Drop the least recently used reply. Must be called with the lock held."""
+        entry_id, entry = self._entries.popitem(last=False)
+        for band in entry.bands:
+            bucket = self._buckets.get((entry.scope, band))
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[(entry.scope, band)]
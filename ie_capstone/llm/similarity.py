@@ -0,0 +1,119 @@
+"""Local character n-gram similarity for matching student messages (no embedding service).
+
+Bigrams are the default: a Hangul syllable already carries most of a morpheme, so longer
+n-grams make short Korean messages look unrelated after a single particle changes.
+"""
+
+import hashlib
+import random
+import re
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a message for matching: lowercase, no punctuation, single spaces.
+
+    Args:
+        text: Student message
+
+    Returns:
+        Normalized text
+    """
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+def char_ngrams(text: str, n: int = 2) -> set[str]:
+    """
+    Get the character n-grams of normalized text.
+
+    Args:
+        text: Text to split
+        n: N-gram length
+
+    Returns:
+        Set of n-grams (the whole text if it is shorter than n)
+    """
+    normalized = normalize_text(text)
+    if len(normalized) < n:
+        return {normalized} if normalized else set()
+    return {normalized[i : i + n] for i in range(len(normalized) - n + 1)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    """
+    Jaccard similarity of two n-gram sets.
+
+    Args:
+        a: First set
+        b: Second set
+
+    Returns:
+        Similarity between 0 and 1 (0 if either set is empty)
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def ngram_similarity(a: str, b: str, n: int = 2) -> float:
+    """
+    Jaccard similarity of two texts' character n-grams.
+
+    Args:
+        a: First text
+        b: Second text
+        n: N-gram length
+
+    Returns:
+        Similarity between 0 and 1
+    """
+    return jaccard(char_ngrams(a, n), char_ngrams(b, n))
+
+
+class MinHasher:
+    """MinHash signatures of n-gram sets, for locality-sensitive candidate lookup."""
+
+    _PRIME = (1 << 61) - 1
+
+    def __init__(self, permutations: int = 64, seed: int = 0):
+        """
+        Initialize the hash family.
+
+        Args:
+            permutations: Signature length
+            seed: Seed for the permutation parameters (fixed so signatures are stable)
+        """
+        rng = random.Random(seed)  # noqa: S311
+        self.permutations = [(rng.randrange(1, self._PRIME), rng.randrange(self._PRIME)) for _ in range(permutations)]
+
+    def signature(self, grams: set[str]) -> tuple[int, ...]:
+        """
+        Get the MinHash signature of an n-gram set.
+
+        Args:
+            grams: N-grams (e.g., from char_ngrams)
+
+        Returns:
+            One minimum per permutation (all zeros for an empty set)
+        """
+        if not grams:
+            return (0,) * len(self.permutations)
+        hashes = [int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big") for gram in grams]
+        return tuple(min((a * h + b) % self._PRIME for h in hashes) for a, b in self.permutations)
+
+    def bands(self, signature: tuple[int, ...], bands: int) -> list[tuple[int, ...]]:
+        """
+        Split a signature into LSH bands; texts sharing any band are lookup candidates.
+
+        Args:
+            signature: MinHash signature
+            bands: Number of bands (must divide the signature length)
+
+        Returns:
+            Band keys, each prefixed with its band index
+        """
+        rows = len(signature) // bands
+        return [(band, *signature[band * rows : (band + 1) * rows]) for band in range(bands)]
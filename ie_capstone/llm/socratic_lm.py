@@ -1,17 +1,65 @@
 """Socratic Learning Model chatbot for debugging assistance."""
 
-from collections.abc import Iterator
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
-from ie_capstone.llm.client import ClaudeClient
-from ie_capstone.llm.prompts import get_socratic_prompt
-from ie_capstone.models import Message, PersonaType, Problem
+from ie_capstone.config import (
+    LEAK_GUARD,
+    LEAK_GUARD_RETRIES,
+    OPENING_STREAM_CHARS,
+    OPENING_STREAM_DELAY,
+    SOCRATIC_CODE_CONTEXT,
+    SOCRATIC_CODE_DIFF_CONTEXT,
+    SOCRATIC_CONTEXT_TURNS,
+    SOCRATIC_EXEMPLARS,
+    SOCRATIC_SUMMARY_MAX_TOKENS,
+    SOCRATIC_SUMMARY_MODEL,
+    SOCRATIC_SUMMARY_WORKERS,
+)
+from ie_capstone.llm.client import ClaudeClient, SystemPrompt
+from ie_capstone.llm.exemplars import exemplar_index, format_exemplars
+from ie_capstone.llm.leak_guard import AhoCorasick, LeakGuard, StreamReset, leak_matcher_for_code
+from ie_capstone.llm.openers import OpeningBank
+from ie_capstone.llm.prompt_registry import socratic_prompts
+from ie_capstone.llm.prompts import (
+    CONVERSATION_SUMMARY_CONTEXT,
+    CONVERSATION_SUMMARY_PROMPT,
+    EXEMPLAR_CONTEXT,
+    LEAK_FALLBACK_REPLIES,
+    LEAK_RETRY_NOTICE,
+    TUTOR_CODE_DIFF,
+    TUTOR_CODE_MODES,
+    TUTOR_CODE_SNAPSHOT,
+    TUTOR_CODE_UNCHANGED,
+    collapse_tutor_code,
+    format_code_diff,
+    get_summary_user_message,
+    get_tutor_user_message,
+)
+from ie_capstone.llm.response_cache import ResponseCache
+from ie_capstone.models import LeakEvent, Message, PersonaType, Problem
+
+# Shared by all sessions; summaries are off the critical path, so a small pool is enough
+_summary_executor = ThreadPoolExecutor(max_workers=SOCRATIC_SUMMARY_WORKERS, thread_name_prefix="summary")
 
 
 class SocraticLM:
     """
     Socratic Learning Model chatbot for debugging assistance.
     Guides students through Socratic questioning without revealing answers.
+    With a bounded context, only the last turns are sent verbatim; older turns are folded
+    into a running summary by a cheap background call after each reply.
+    In the "changed" and "diff" code modes, the editor code is only resent (in full or as a diff)
+    when it changed since the model last saw it.
+    With an opening bank, a typical first message gets a vetted reply without a model call;
+    with a response cache, so does a question another student already asked in the same situation.
+    With the leak guard, a model reply that reveals part of the expected fix is cut off as it
+    streams and regenerated.
+    With exemplars, the most relevant exchanges of the problem's example dialogue are added
+    to the system prompt for each model call.
     """
 
     def __init__(
@@ -19,6 +67,14 @@ class SocraticLM:
         client: ClaudeClient,
         persona: PersonaType,
         problem: Problem,
+        context_turns: int = SOCRATIC_CONTEXT_TURNS,
+        on_summary: Callable[[int, str], None] | None = None,
+        code_context: str = SOCRATIC_CODE_CONTEXT,
+        opening_bank: OpeningBank | None = None,
+        response_cache: ResponseCache | None = None,
+        leak_guard: bool = LEAK_GUARD,
+        on_leak: Callable[[int, LeakEvent], None] | None = None,
+        exemplars: int = SOCRATIC_EXEMPLARS,
     ):
         """
         Initialize SocraticLM with persona and problem context.
@@ -27,12 +83,44 @@ class SocraticLM:
             client: Claude API client
             persona: "neutral" or "emotional"
             problem: The current debugging problem
+            context_turns: User turns kept verbatim (0 sends the full history)
+            on_summary: Optional callback receiving (problem_id, summary) whenever the summary is updated
+            code_context: "full", "changed" or "diff" (see SOCRATIC_CODE_CONTEXT)
+            opening_bank: Optional bank of vetted first-turn replies
+            response_cache: Optional reply cache shared with other sessions
+            leak_guard: Check model replies for snippets of the expected fix
+            on_leak: Optional callback receiving (problem_id, event) whenever the guard cuts a reply
+            exemplars: Example dialogue exchanges added per model call (0 adds none)
         """
+        if code_context not in TUTOR_CODE_MODES:
+            raise ValueError(f"Unknown code context mode: {code_context}")
         self.client = client
         self.persona = persona
         self.problem = problem
-        self.system_prompt = get_socratic_prompt(persona, problem)
+        self.prompt = socratic_prompts.get(persona, problem)
+        self.system_prompt = self.prompt.text
         self.conversation_history: list[Message] = []
+        self.context_turns = context_turns
+        self.on_summary = on_summary
+        self.summary = ""
+        # Messages in conversation_history[:summarized_count] are covered by the summary
+        self.summarized_count = 0
+        self._summary_future: Future | None = None
+        self._summary_lock = threading.Lock()
+        self.code_context = code_context
+        # Last editor code the model saw, the user message holding it in full, and every user
+        # message with a code section (indices into conversation_history)
+        self._code_seen: str | None = None
+        self._snapshot_index: int | None = None
+        self._code_indices: list[int] = []
+        self.opening_bank = opening_bank
+        self.response_cache = response_cache
+        self.leak_guard = leak_guard
+        self.on_leak = on_leak
+        self.exemplars = exemplars
+        self._exemplar_index = exemplar_index(problem) if exemplars else None
+        # Exemplars picked for the current user message
+        self._exemplar_context = ""
 
     def get_response(self, user_message: str, current_code: str | None = None) -> str:
         """
@@ -45,33 +133,23 @@ class SocraticLM:
         Returns:
             Assistant's Socratic response
         """
-        # Format message with current code if provided
-        if current_code is not None:
-            formatted_message = f"""[학생의 현재 코드]
-```python
-{current_code}
-```
-
-[학생의 메시지]
-{user_message}"""
-        else:
-            formatted_message = user_message
-
-        # Add user message to history (store formatted version)
-        self.conversation_history.append(Message(role="user", content=formatted_message, timestamp=datetime.now()))
+        turn_index = self.turn_count
+        prepared_reply = self._prepared_reply(user_message, current_code, turn_index)
 
-        # Convert to API format
-        api_messages = self._get_conversation_for_api()
+        # Add user message (with current code) to history and convert to API format
+        api_messages = self._add_user_message(user_message, current_code)
 
-        # Get response from Claude
-        response = self.client.send_message(
-            messages=api_messages,
-            system_prompt=self.system_prompt,
-            temperature=0.7,
-        )
+        # Get response from Claude, unless a banked or cached reply matches
+        if prepared_reply is not None:
+            response = prepared_reply
+        else:
+            self._select_exemplars(user_message, turn_index)
+            response = self._send_guarded(api_messages, current_code)
+            self._cache_reply(turn_index, user_message, current_code, response)
 
         # Add assistant response to history
         self.conversation_history.append(Message(role="assistant", content=response, timestamp=datetime.now()))
+        self._schedule_summary()
 
         return response
 
@@ -86,36 +164,29 @@ class SocraticLM:
         Yields:
             Text chunks as they arrive
         """
-        # Format message with current code if provided
-        if current_code is not None:
-            formatted_message = f"""[학생의 현재 코드]
-```python
-{current_code}
-```
+        turn_index = self.turn_count
+        prepared_reply = self._prepared_reply(user_message, current_code, turn_index)
 
-[학생의 메시지]
-{user_message}"""
-        else:
-            formatted_message = user_message
+        # Add user message (with current code) to history and convert to API format
+        api_messages = self._add_user_message(user_message, current_code)
 
-        # Add user message to history
-        self.conversation_history.append(Message(role="user", content=formatted_message, timestamp=datetime.now()))
-
-        # Convert to API format
-        api_messages = self._get_conversation_for_api()
-
-        # Stream response from Claude and collect full response
+        # Stream response from Claude (or a banked or cached reply, locally) and collect full response
+        if prepared_reply is not None:
+            chunks = self._stream_locally(prepared_reply)
+        else:
+            self._select_exemplars(user_message, turn_index)
+            chunks = self._stream_guarded(api_messages, current_code)
         full_response = ""
-        for chunk in self.client.stream_message(
-            messages=api_messages,
-            system_prompt=self.system_prompt,
-            temperature=0.7,
-        ):
-            full_response += chunk
+        for chunk in chunks:
+            # A regenerated reply replaces what was streamed before it
+            full_response = "" if isinstance(chunk, StreamReset) else full_response + chunk
             yield chunk
+        if prepared_reply is None:
+            self._cache_reply(turn_index, user_message, current_code, full_response)
 
         # Add complete assistant response to history
         self.conversation_history.append(Message(role="assistant", content=full_response, timestamp=datetime.now()))
+        self._schedule_summary()
 
     def get_initial_greeting(self) -> str:
         """
@@ -139,8 +210,17 @@ class SocraticLM:
         return greeting
 
     def reset_conversation(self) -> None:
-        """Clear conversation history for new problem."""
-        self.conversation_history = []
+        """Clear conversation history and summary for new problem."""
+        with self._summary_lock:
+            self.conversation_history = []
+            self.summary = ""
+            self.summarized_count = 0
+            # A summary still running for the old conversation is discarded when it finishes
+            self._summary_future = None
+        self._code_seen = None
+        self._snapshot_index = None
+        self._code_indices = []
+        self._exemplar_context = ""
 
     def set_problem(self, problem: Problem) -> None:
         """
@@ -150,17 +230,289 @@ class SocraticLM:
             problem: New debugging problem
         """
         self.problem = problem
-        self.system_prompt = get_socratic_prompt(self.persona, problem)
+        self.prompt = socratic_prompts.get(self.persona, problem)
+        self.system_prompt = self.prompt.text
+        self._exemplar_index = exemplar_index(problem) if self.exemplars else None
         self.reset_conversation()
 
-    def _get_conversation_for_api(self) -> list[dict]:
+    def _prepared_reply(self, user_message: str, current_code: str | None, turn_index: int) -> str | None:
+        """
+        Get a reply that needs no model call: a vetted opening reply on the first user turn,
+        or a cached reply to a near-identical question asked in the same situation.
+
+        Args:
+            user_message: Student's message
+            current_code: Current code in the editor (optional)
+            turn_index: Number of earlier user turns
+
+        Returns:
+            The prepared reply, or None to ask the model
+        """
+        if self.opening_bank is not None and turn_index == 0:
+            banked_reply = self.opening_bank.match(self.persona, self.problem, user_message, current_code)
+            if banked_reply is not None:
+                return banked_reply
+        if self.response_cache is None:
+            return None
+        return self.response_cache.lookup(
+            self.persona, self.problem.id, self.prompt.hash, turn_index, current_code, user_message
+        )
+
+    def _select_exemplars(self, user_message: str, turn_index: int) -> None:
+        """Pick the example dialogue exchanges sent with the next model call."""
+        if self._exemplar_index is None:
+            return
+        found = self._exemplar_index.search(user_message, self.exemplars, position=turn_index)
+        self._exemplar_context = EXEMPLAR_CONTEXT.format(exemplars=format_exemplars(found)) if found else ""
+
+    def _turn_leak_matcher(self, current_code: str | None) -> AhoCorasick | None:
+        """Get the leak automaton for this turn, ignoring fix snippets already in the student's code."""
+        if not self.leak_guard:
+            return None
+        return leak_matcher_for_code(self.problem, current_code)
+
+    def _send_guarded(self, api_messages: list[dict], current_code: str | None) -> str:
+        """
+        Get a model reply, regenerating it while it reveals the expected fix.
+
+        Args:
+            api_messages: Conversation in API format
+            current_code: Current code in the editor (optional); fix snippets it contains are not leaks
+
+        Returns:
+            The first reply without a leak, or a generic question if every attempt leaked
+        """
+        system_prompt = self._get_system_prompt_for_api()
+        matcher = self._turn_leak_matcher(current_code)
+        for attempt in range(LEAK_GUARD_RETRIES + 1):
+            response = self.client.send_message(messages=api_messages, system_prompt=system_prompt, temperature=0.7)
+            if matcher is None:
+                return response
+            guard = LeakGuard(matcher)
+            guard.feed(response)
+            if guard.leak is None:
+                return response
+            self._report_leak(attempt, guard)
+            system_prompt = self._get_retry_system_prompt()
+        return LEAK_FALLBACK_REPLIES[self.persona]
+
+    def _stream_guarded(self, api_messages: list[dict], current_code: str | None) -> Iterator[str]:
+        """
+        Stream a model reply, cutting it off and regenerating it as soon as it reveals the expected fix.
+
+        Text that could still become a leak is held back (at most one pattern's length). When a
+        reply is cut after some text was shown, a StreamReset chunk precedes the regenerated one.
+
+        Args:
+            api_messages: Conversation in API format
+            current_code: Current code in the editor (optional); fix snippets it contains are not leaks
+
+        Yields:
+            Text chunks, and StreamReset before a regenerated reply
+        """
+        system_prompt = self._get_system_prompt_for_api()
+        matcher = self._turn_leak_matcher(current_code)
+        if matcher is None:
+            yield from self.client.stream_message(messages=api_messages, system_prompt=system_prompt, temperature=0.7)
+            return
+        for attempt in range(LEAK_GUARD_RETRIES + 1):
+            guard = LeakGuard(matcher)
+            shown = False
+            stream = self.client.stream_message(messages=api_messages, system_prompt=system_prompt, temperature=0.7)
+            for chunk in stream:
+                safe = guard.feed(chunk)
+                if safe:
+                    shown = True
+                    yield safe
+                if guard.leak is not None:
+                    # Stop generating the rest of the leaking reply
+                    close = getattr(stream, "close", None)
+                    if close is not None:
+                        close()
+                    break
+            if guard.leak is None:
+                yield guard.flush()
+                return
+            self._report_leak(attempt, guard)
+            if shown:
+                yield StreamReset()
+            system_prompt = self._get_retry_system_prompt()
+        yield LEAK_FALLBACK_REPLIES[self.persona]
+
+    def _get_retry_system_prompt(self) -> SystemPrompt:
+        """Get the system prompt with a notice that the last reply revealed the fix."""
+        return [*self._get_system_prompt_for_api(), {"type": "text", "text": LEAK_RETRY_NOTICE}]
+
+    def _report_leak(self, attempt: int, guard: LeakGuard) -> None:
+        """Pass a leak guard trigger to the on_leak callback."""
+        if self.on_leak is not None:
+            self.on_leak(self.problem.id, LeakEvent(pattern=guard.leak or "", attempt=attempt, text=guard.text))
+
+    def _cache_reply(self, turn_index: int, user_message: str, current_code: str | None, response: str) -> None:
+        """Share a model reply with later sessions through the response cache, if there is one."""
+        if self.response_cache is not None:
+            self.response_cache.store(
+                self.persona, self.problem.id, self.prompt.hash, turn_index, current_code, user_message, response
+            )
+
+    @staticmethod
+    def _stream_locally(reply: str) -> Iterator[str]:
+        """Yield a prepared reply in small paced chunks, like a streamed model reply."""
+        for start in range(0, len(reply), OPENING_STREAM_CHARS):
+            if start:
+                time.sleep(OPENING_STREAM_DELAY)
+            yield reply[start : start + OPENING_STREAM_CHARS]
+
+    def _add_user_message(self, user_message: str, current_code: str | None) -> list[dict]:
+        """
+        Format a user message, add it to the history and get the conversation in API format.
+
+        Args:
+            user_message: Student's message
+            current_code: Current code in the editor (optional)
+
+        Returns:
+            List of message dicts for Claude API
+        """
+        # Read once: a summary finishing meanwhile must not hide the code a diff refers to
+        start = self.summarized_count
+        code_section = None
+        if current_code is not None:
+            code_section = self._code_section(current_code, start)
+            self._code_indices.append(len(self.conversation_history))
+            self._code_seen = current_code
+        formatted_message = get_tutor_user_message(user_message, code_section)
+        self.conversation_history.append(Message(role="user", content=formatted_message, timestamp=datetime.now()))
+        return self._get_conversation_for_api(start)
+
+    def _code_section(self, current_code: str, start: int) -> str:
+        """
+        Get the code section for the next user message, recording it if it holds the full program.
+
+        Args:
+            current_code: Current code in the editor
+            start: Index of the oldest history message that will be sent
+
+        Returns:
+            The full program, a diff against the code the model last saw, or an unchanged note
+        """
+        base_visible = self._snapshot_index is not None and self._snapshot_index >= start
+        if self.code_context != "full" and base_visible:
+            if current_code == self._code_seen:
+                return TUTOR_CODE_UNCHANGED
+            if self.code_context == "diff":
+                code_diff = format_code_diff(self._code_seen, current_code, SOCRATIC_CODE_DIFF_CONTEXT)
+                # A rewrite can make the diff longer than the program itself
+                if len(code_diff) < len(current_code):
+                    return TUTOR_CODE_DIFF.format(code_diff=code_diff)
+        self._snapshot_index = len(self.conversation_history)
+        return TUTOR_CODE_SNAPSHOT.format(code=current_code)
+
+    def _get_conversation_for_api(self, start: int | None = None) -> list[dict]:
         """
         Convert conversation history to API format.
 
+        Messages already covered by the summary are left out. Until a summary catches up,
+        the older messages are still sent verbatim, so a turn never waits for it.
+        In the delta code modes, code sections older than the latest full program are collapsed.
+
+        Args:
+            start: Index of the oldest message to send (defaults to the first one not summarized)
+
         Returns:
             List of message dicts for Claude API
         """
-        return [{"role": msg.role, "content": msg.content} for msg in self.conversation_history]
+        if start is None:
+            start = self.summarized_count
+        stale: set[int] = set()
+        if self.code_context != "full" and self._snapshot_index is not None:
+            stale = {index for index in self._code_indices if index < self._snapshot_index}
+        return [
+            {"role": msg.role, "content": collapse_tutor_code(msg.content) if index in stale else msg.content}
+            for index, msg in enumerate(self.conversation_history)
+            if index >= start
+        ]
+
+    def _get_system_prompt_for_api(self) -> SystemPrompt:
+        """
+        Get the system prompt, followed by the exemplar and summary blocks if there are any.
+
+        The persona and problem blocks are marked for prompt caching when long enough for the
+        tutor's model, so they match the prefix cached by PromptCacheWarmer and by earlier turns;
+        exemplars and the summary change and follow them uncached.
+
+        Returns:
+            [persona block, problem block, exemplar block (optional), summary block (optional)]
+        """
+        blocks = self.prompt.system_blocks(self.client.model)
+        if self._exemplar_context:
+            blocks.append({"type": "text", "text": self._exemplar_context})
+        if self.summary:
+            blocks.append({"type": "text", "text": CONVERSATION_SUMMARY_CONTEXT.format(summary=self.summary)})
+        return blocks
+
+    def _window_start(self) -> int:
+        """Get the index of the oldest message in the verbatim window (the context_turns-th last user turn)."""
+        user_indices = [i for i, msg in enumerate(self.conversation_history) if msg.role == "user"]
+        if len(user_indices) <= self.context_turns:
+            return 0
+        return user_indices[-self.context_turns]
+
+    def _schedule_summary(self) -> None:
+        """Fold turns that left the verbatim window into the summary in the background."""
+        if self.context_turns <= 0:
+            return
+        with self._summary_lock:
+            if self._summary_future is not None:
+                return  # The next reply picks up whatever this one leaves
+            window_start = self._window_start()
+            if window_start <= self.summarized_count:
+                return
+            messages = self.conversation_history[self.summarized_count : window_start]
+            self._summary_future = _summary_executor.submit(
+                self._update_summary, self.summary, messages, self.conversation_history, window_start
+            )
+
+    def _update_summary(
+        self, previous_summary: str, messages: list[Message], history: list[Message], window_start: int
+    ) -> None:
+        """Merge messages into the summary, unless the conversation was reset meanwhile."""
+        summary = None
+        try:
+            summary = self.client.send_single_message(
+                user_message=get_summary_user_message(previous_summary, messages),
+                system_prompt=CONVERSATION_SUMMARY_PROMPT,
+                temperature=0.0,
+                max_tokens=SOCRATIC_SUMMARY_MAX_TOKENS,
+                model=SOCRATIC_SUMMARY_MODEL,
+            ).strip()
+        finally:
+            # A failed summary is retried after the next reply; until then the turns stay verbatim
+            with self._summary_lock:
+                is_current = history is self.conversation_history
+                if is_current:
+                    self._summary_future = None
+                    if summary is not None:
+                        self.summary = summary
+                        self.summarized_count = window_start
+        if is_current and summary is not None and self.on_summary is not None:
+            self.on_summary(self.problem.id, summary)
+
+    def wait_for_summary(self, timeout: float | None = None) -> None:
+        """
+        Block until a running summary finishes (e.g., in tests or before saving a session).
+
+        Args:
+            timeout: Optional maximum seconds to wait
+        """
+        future = self._summary_future
+        if future is not None:
+            future.exception(timeout=timeout)
+
+    @property
+    def prompt_hash(self) -> str:
+        """Get the content hash of the current system prompt (logged with every message)."""
+        return self.prompt.hash
 
     @property
     def turn_count(self) -> int:
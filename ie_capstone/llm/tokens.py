@@ -0,0 +1,51 @@
+"""Offline token estimates for prompt text.
+
+The estimate is a character-class approximation of the Claude tokenizer for Korean, English and
+Python code, meant for comparing prompt versions and checking prompt sizes against thresholds
+rather than for billing; when the real count matters, compare with the input_tokens the API reports.
+"""
+
+import math
+import re
+
+# One pass over the text; each run is costed by its character class
+_RUNS = re.compile(
+    r"(?P<hangul>[가-힣]+)|(?P<word>[A-Za-z]+)|(?P<digits>\d+)|(?P<newline>\n)|(?P<space>[ \t]+)|(?P<symbol>\S)"
+)
+# Characters per token for Latin words and digit runs
+WORD_CHARS_PER_TOKEN = 4
+DIGITS_PER_TOKEN = 3
+# Hangul syllables rarely merge, so each one costs about a token
+HANGUL_TOKENS_PER_SYLLABLE = 1.0
+# Emoji and other non-ASCII symbols take several byte-level tokens
+NON_ASCII_SYMBOL_TOKENS = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of text offline.
+
+    Args:
+        text: Prompt text (Korean, English and code)
+
+    Returns:
+        Estimated number of tokens
+    """
+    tokens = 0
+    for match in _RUNS.finditer(text):
+        run = match.group()
+        kind = match.lastgroup
+        if kind == "hangul":
+            tokens += math.ceil(len(run) * HANGUL_TOKENS_PER_SYLLABLE)
+        elif kind == "word":
+            tokens += math.ceil(len(run) / WORD_CHARS_PER_TOKEN)
+        elif kind == "digits":
+            tokens += math.ceil(len(run) / DIGITS_PER_TOKEN)
+        elif kind == "newline":
+            tokens += 1
+        elif kind == "space":
+            # A single space joins the next word's token; indentation is a token of its own
+            tokens += len(run) > 1
+        else:
+            tokens += 1 if run.isascii() else NON_ASCII_SYMBOL_TOKENS
+    return tokens
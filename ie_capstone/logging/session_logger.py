@@ -1,18 +1,29 @@
 """Session logging to JSON files."""
 
 import json
+import threading
 import uuid
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 
 from ie_capstone.config import LOGS_DIR
-from ie_capstone.models import ExperimentSession, Message, MessageRole, PersonaType, ProblemAttempt
+from ie_capstone.models import (
+    ExperimentSession,
+    JudgeCall,
+    LeakEvent,
+    Message,
+    MessageRole,
+    PersonaType,
+    ProblemAttempt,
+)
 
 
 class SessionLogger:
     """
     Logs experiment sessions to JSON files.
     Each session gets its own file with all conversation data.
+    Safe to call from background judge threads.
     """
 
     def __init__(self, logs_dir: Path | None = None):
@@ -24,6 +35,7 @@ class SessionLogger:
         """
         self.logs_dir = logs_dir or LOGS_DIR
         self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
 
     def create_session(
         self,
@@ -55,6 +67,7 @@ class SessionLogger:
         problem_id: int,
         role: MessageRole,
         content: str,
+        prompt_hash: str = "",
     ) -> None:
         """
         Log a single message in the current problem attempt.
@@ -64,13 +77,69 @@ class SessionLogger:
             problem_id: ID of the current problem (1-6)
             role: "user" or "assistant"
             content: Message content
+            prompt_hash: Content hash of the tutor system prompt the message was exchanged under
         """
-        # Find or create problem attempt
-        attempt = self._get_or_create_attempt(session, problem_id)
+        with self._lock:
+            # Find or create problem attempt
+            attempt = self._get_or_create_attempt(session, problem_id)
 
-        # Add message
-        message = Message(role=role, content=content, timestamp=datetime.now())
-        attempt.conversation_history.append(message)
+            # Add message
+            message = Message(role=role, content=content, timestamp=datetime.now(), prompt_hash=prompt_hash)
+            attempt.conversation_history.append(message)
+
+    def log_summary(
+        self,
+        session: ExperimentSession,
+        problem_id: int,
+        summary: str,
+    ) -> None:
+        """
+        Log the running summary of older conversation turns (stored next to the raw history).
+
+        Args:
+            session: The experiment session
+            problem_id: ID of the problem (1-6)
+            summary: Latest summary
+        """
+        with self._lock:
+            attempt = self._get_or_create_attempt(session, problem_id)
+            attempt.conversation_summary = summary
+
+    def log_leak(
+        self,
+        session: ExperimentSession,
+        problem_id: int,
+        event: LeakEvent,
+    ) -> None:
+        """
+        Log a tutor reply the leak guard cut off (the regenerated reply is logged as a message).
+
+        Args:
+            session: The experiment session
+            problem_id: ID of the problem (1-6)
+            event: The leak guard trigger
+        """
+        with self._lock:
+            attempt = self._get_or_create_attempt(session, problem_id)
+            attempt.leak_events.append(event)
+
+    def log_submission(
+        self,
+        session: ExperimentSession,
+        problem_id: int,
+        final_code: str,
+    ) -> None:
+        """
+        Log submitted code before its verdict is known.
+
+        Args:
+            session: The experiment session
+            problem_id: ID of the problem (1-6)
+            final_code: Student's final submitted code
+        """
+        with self._lock:
+            attempt = self._get_or_create_attempt(session, problem_id)
+            attempt.final_code = final_code
 
     def log_final_submission(
         self,
@@ -79,6 +148,8 @@ class SessionLogger:
         final_code: str,
         is_correct: bool,
         judge_scores: list[float],
+        decided_by: str = "llm",
+        judge_calls: list[JudgeCall] | None = None,
     ) -> None:
         """
         Log the final submission for a problem.
@@ -89,11 +160,16 @@ class SessionLogger:
             final_code: Student's final submitted code
             is_correct: Whether the fix was correct
             judge_scores: List of scores from judge evaluations
+            decided_by: What produced the verdict (e.g., "llm", "reference_ast")
+            judge_calls: Raw judge API calls behind the verdict
         """
-        attempt = self._get_or_create_attempt(session, problem_id)
-        attempt.final_code = final_code
-        attempt.is_correct = is_correct
-        attempt.judge_scores = judge_scores
+        with self._lock:
+            attempt = self._get_or_create_attempt(session, problem_id)
+            attempt.final_code = final_code
+            attempt.is_correct = is_correct
+            attempt.judge_scores = judge_scores
+            attempt.judge_decided_by = decided_by
+            attempt.judge_calls = judge_calls or []
 
     def save_session(self, session: ExperimentSession) -> Path:
         """
@@ -106,10 +182,11 @@ class SessionLogger:
             Path to saved file
         """
         file_path = self.get_session_file_path(session.session_id)
-        session_dict = self._session_to_dict(session)
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(session_dict, f, indent=2, ensure_ascii=False)
+        with self._lock:
+            session_dict = self._session_to_dict(session)
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(session_dict, f, indent=2, ensure_ascii=False)
 
         return file_path
 
@@ -187,12 +264,25 @@ class SessionLogger:
                     "final_code": attempt.final_code,
                     "is_correct": attempt.is_correct,
                     "judge_scores": attempt.judge_scores,
+                    "judge_decided_by": attempt.judge_decided_by,
+                    "judge_calls": [asdict(call) for call in attempt.judge_calls],
                     "turn_count": attempt.turn_count,
+                    "conversation_summary": attempt.conversation_summary,
+                    "leak_events": [
+                        {
+                            "pattern": event.pattern,
+                            "attempt": event.attempt,
+                            "text": event.text,
+                            "timestamp": event.timestamp.isoformat(),
+                        }
+                        for event in attempt.leak_events
+                    ],
                     "conversation_history": [
                         {
                             "role": msg.role,
                             "content": msg.content,
                             "timestamp": msg.timestamp.isoformat(),
+                            "prompt_hash": msg.prompt_hash,
                         }
                         for msg in attempt.conversation_history
                     ],
@@ -8,6 +8,16 @@ PersonaType = Literal["neutral", "emotional"]
 MessageRole = Literal["user", "assistant"]
 
 
+@dataclass
+class DialogueTurn:
+    """One turn of a problem's example dialogue."""
+
+    role: MessageRole
+    content: str
+    alternatives: list[str] = field(default_factory=list)
+    code: str = ""
+
+
 @dataclass
 class Problem:
     """Represents a debugging problem from the dataset."""
@@ -19,6 +29,8 @@ class Problem:
     expected_fixes: list[str]
     unit_tests: list[str]
     example_dialogue: str = ""
+    reference_solutions: list[str] = field(default_factory=list)
+    dialogue: list[DialogueTurn] = field(default_factory=list)
 
 
 @dataclass
@@ -28,6 +40,40 @@ class Message:
     role: MessageRole
     content: str
     timestamp: datetime = field(default_factory=datetime.now)
+    # Content hash of the tutor system prompt in force (see ie_capstone.llm.prompt_registry)
+    prompt_hash: str = ""
+
+
+@dataclass
+class JudgeCall:
+    """One judge API call, stored so verdicts can be re-derived without calling the API again."""
+
+    stage: str
+    model: str
+    temperature: float
+    response: str
+    latency_seconds: float
+    usage: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class JudgeVerdict:
+    """Outcome of judging one submission."""
+
+    is_correct: bool
+    scores: list[float] = field(default_factory=list)
+    decided_by: str = "llm"
+    calls: list[JudgeCall] = field(default_factory=list)
+
+
+@dataclass
+class LeakEvent:
+    """A tutor reply cut off by the leak guard for revealing part of the expected fix."""
+
+    pattern: str
+    attempt: int
+    text: str
+    timestamp: datetime = field(default_factory=datetime.now)
 
 
 @dataclass
@@ -36,9 +82,13 @@ class ProblemAttempt:
 
     problem_id: int
     conversation_history: list[Message] = field(default_factory=list)
+    conversation_summary: str = ""
     final_code: str = ""
     is_correct: bool | None = None
     judge_scores: list[float] = field(default_factory=list)
+    judge_decided_by: str = ""
+    judge_calls: list[JudgeCall] = field(default_factory=list)
+    leak_events: list[LeakEvent] = field(default_factory=list)
 
     @property
     def turn_count(self) -> int:
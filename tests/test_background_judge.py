@@ -0,0 +1,191 @@
+"""Tests for background judging."""
+
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import replace
+from unittest.mock import MagicMock
+
+import pytest
+
+from ie_capstone.app.background import BackgroundJudge, SpeculativeJudge
+from ie_capstone.logging.session_logger import SessionLogger
+from ie_capstone.models import JudgeVerdict, Problem
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Condition not met in time"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def problem():
+    return Problem(
+        id=1,
+        description="Write a search function",
+        buggy_code="def search(x, seq):\n  return 0",
+        bug_description="Always returns 0",
+        expected_fixes=["Return the index"],
+        unit_tests=[],
+    )
+
+
+@pytest.fixture
+def logger(tmp_path):
+    return SessionLogger(logs_dir=tmp_path)
+
+
+class TestBackgroundJudge:
+    def test_submit_returns_before_verdict(self, logger, problem):
+        release = threading.Event()
+        judge = MagicMock()
+
+        def slow_evaluate(problem, code):
+            release.wait(5)
+            return JudgeVerdict(is_correct=True, scores=[1.0, 1.0, 1.0])
+
+        judge.evaluate.side_effect = slow_evaluate
+        session = logger.create_session("P001", "neutral")
+        background = BackgroundJudge(logger)
+
+        future = background.submit(judge, session, problem, 1, "fixed code")
+
+        attempt = session.problem_attempts[0]
+        assert not future.done()
+        assert attempt.final_code == "fixed code"
+        assert attempt.is_correct is None
+
+        release.set()
+        verdict = future.result(timeout=5)
+        assert verdict.is_correct is True
+        assert attempt.is_correct is True
+        assert attempt.judge_scores == [1.0, 1.0, 1.0]
+
+    def test_verdict_saved_to_session_log(self, logger, problem):
+        judge = MagicMock()
+        judge.evaluate.return_value = JudgeVerdict(is_correct=False, scores=[0.0], decided_by="llm")
+        session = logger.create_session("P001", "neutral")
+        background = BackgroundJudge(logger)
+
+        background.submit(judge, session, problem, 1, "code").result(timeout=5)
+
+        saved = logger.load_session(session.session_id)
+        assert saved["problem_attempts"][0]["is_correct"] is False
+        assert saved["problem_attempts"][0]["judge_scores"] == [0.0]
+
+    def test_failed_judge_is_logged_and_recorded(self, logger, problem, caplog):
+        judge = MagicMock()
+        judge.evaluate.side_effect = RuntimeError("API unavailable")
+        session = logger.create_session("P001", "neutral")
+        background = BackgroundJudge(logger)
+
+        verdict = background.submit(judge, session, problem, 1, "code").result(timeout=5)
+
+        assert verdict.decided_by == "error"
+        assert "API unavailable" in caplog.text
+        saved = logger.load_session(session.session_id)
+        assert saved["problem_attempts"][0]["is_correct"] is False
+        assert saved["problem_attempts"][0]["judge_decided_by"] == "error"
+
+    def test_wait_for_blocks_until_outstanding_finish(self, logger, problem):
+        judge = MagicMock()
+        judge.evaluate.return_value = JudgeVerdict(is_correct=True, scores=[1.0])
+        session = logger.create_session("P001", "neutral")
+        background = BackgroundJudge(logger)
+
+        futures = [background.submit(judge, session, problem, problem_id, "code") for problem_id in (1, 2, 3)]
+        background.wait_for(futures)
+
+        assert all(future.done() for future in futures)
+        assert session.success_rate == 1.0
+
+
+class TestSpeculativeJudge:
+    def test_idle_code_is_judged_once_and_reused(self, logger, problem):
+        judge = MagicMock()
+        judge.evaluate.return_value = JudgeVerdict(is_correct=True, scores=[1.0])
+        background = BackgroundJudge(logger)
+        speculative = SpeculativeJudge(background, idle_seconds=0.01)
+
+        speculative.on_code_change("s1", judge, problem, "def f():\n    return 1")
+        wait_until(lambda: speculative.lookup(problem, "def f():\n    return 1") is not None)
+        precomputed = speculative.lookup(problem, "def f():  # same\n  return 1")
+        precomputed.result(timeout=5)
+
+        session = logger.create_session("P001", "neutral")
+        future = background.submit(judge, session, problem, 1, "def f():\n    return 1", precomputed)
+
+        assert future.done()
+        assert session.problem_attempts[0].is_correct is True
+        assert judge.evaluate.call_count == 1
+
+    def test_edits_before_idle_restart_the_timer(self, logger, problem):
+        judge = MagicMock()
+        judge.evaluate.return_value = JudgeVerdict(is_correct=False, scores=[0.0])
+        speculative = SpeculativeJudge(BackgroundJudge(logger), idle_seconds=0.05)
+
+        speculative.on_code_change("s1", judge, problem, "draft 1")
+        speculative.on_code_change("s1", judge, problem, "draft 2")
+        wait_until(lambda: speculative.lookup(problem, "draft 2") is not None)
+
+        assert speculative.lookup(problem, "draft 1") is None
+        speculative.lookup(problem, "draft 2").result(timeout=5)
+        assert judge.evaluate.call_count == 1
+
+    def test_judgment_is_not_reused_for_an_edited_problem(self, logger, problem):
+        judge = MagicMock()
+        judge.evaluate.return_value = JudgeVerdict(is_correct=True, scores=[1.0])
+        speculative = SpeculativeJudge(BackgroundJudge(logger), idle_seconds=0.01)
+
+        speculative.on_code_change("s1", judge, problem, "code")
+        wait_until(lambda: speculative.lookup(problem, "code") is not None)
+
+        assert speculative.lookup(replace(problem, unit_tests=["assert search(1, [1]) == 0"]), "code") is None
+
+    def test_discard_problems(self, logger, problem):
+        judge = MagicMock()
+        judge.evaluate.return_value = JudgeVerdict(is_correct=True, scores=[1.0])
+        speculative = SpeculativeJudge(BackgroundJudge(logger), idle_seconds=0.01)
+        speculative.on_code_change("s1", judge, problem, "code")
+        wait_until(lambda: speculative.lookup(problem, "code") is not None)
+
+        assert speculative.discard_problems([2]) == 0
+        assert speculative.discard_problems([1]) == 1
+        assert speculative.lookup(problem, "code") is None
+
+    def test_cancel_stops_pending_judgment(self, logger, problem):
+        judge = MagicMock()
+        speculative = SpeculativeJudge(BackgroundJudge(logger), idle_seconds=0.01)
+
+        speculative.on_code_change("s1", judge, problem, "code")
+        speculative.cancel("s1")
+        time.sleep(0.05)
+
+        assert speculative.lookup(problem, "code") is None
+        judge.evaluate.assert_not_called()
+
+    def test_session_state_is_removed(self, logger, problem):
+        judge = MagicMock()
+        judge.evaluate.return_value = JudgeVerdict(is_correct=True, scores=[1.0])
+        speculative = SpeculativeJudge(BackgroundJudge(logger), idle_seconds=0.01)
+
+        speculative.on_code_change("s1", judge, problem, "code")
+        speculative.on_code_change("s2", judge, problem, "other code")
+        speculative.claim("s1", problem, "code")
+        wait_until(lambda: speculative.lookup(problem, "other code") is not None)
+
+        assert speculative._timers == {}
+
+    def test_failed_speculation_is_redone_on_submit(self, logger, problem):
+        judge = MagicMock()
+        judge.evaluate.return_value = JudgeVerdict(is_correct=True, scores=[1.0])
+        failed = Future()
+        failed.set_exception(RuntimeError("API down"))
+        session = logger.create_session("P001", "neutral")
+
+        verdict = BackgroundJudge(logger).submit(judge, session, problem, 1, "code", failed).result(timeout=5)
+
+        assert verdict.is_correct is True
+        judge.evaluate.assert_called_once()
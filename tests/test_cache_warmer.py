@@ -0,0 +1,224 @@
+"""Tests for prompt cache warming."""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from ie_capstone.llm.cache_warmer import PromptCacheWarmer
+from ie_capstone.llm.prompt_registry import socratic_prompts
+from ie_capstone.llm.prompts import get_socratic_prompt
+from ie_capstone.llm.socratic_lm import SocraticLM
+from ie_capstone.models import Problem
+
+
+@pytest.fixture
+def problems():
+    return [
+        Problem(
+            id=i,
+            description=f"Problem {i}",
+            buggy_code=f"def f{i}(): pass",
+            bug_description="Bug",
+            expected_fixes=["Fix"],
+            unit_tests=[],
+        )
+        for i in range(1, 4)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def cacheable_prompts(monkeypatch):
+    """Let the short test prompts reach the test model's minimum cacheable length."""
+    monkeypatch.setattr("ie_capstone.llm.client.PROMPT_CACHE_DEFAULT_MIN_TOKENS", 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_warmer(problems, client=None, **kwargs):
+    client = client or MagicMock()
+    client.model = "test-model"
+    kwargs.setdefault("refresh_seconds", 240.0)
+    return PromptCacheWarmer(client, problems, **kwargs), client
+
+
+def sent_prompts(client):
+    return [
+        "\n\n".join(block["text"] for block in call.kwargs["system_prompt"])
+        for call in client.send_message.call_args_list
+    ]
+
+
+def wait(futures):
+    for future in futures:
+        future.exception()
+
+
+class TestWarm:
+    def test_warm_all_covers_every_pair(self, problems):
+        warmer, client = make_warmer(problems)
+        futures = warmer.warm_all()
+        wait(futures)
+
+        assert len(futures) == 6
+        assert sorted(sent_prompts(client)) == sorted(
+            get_socratic_prompt(persona, problem) for persona in ("neutral", "emotional") for problem in problems
+        )
+
+    def test_warm_request_is_minimal(self, problems):
+        warmer, client = make_warmer(problems)
+        wait([warmer.warm("neutral", problems[0])])
+
+        call_kwargs = client.send_message.call_args.kwargs
+        assert call_kwargs["max_tokens"] == 1
+        assert call_kwargs["system_prompt"] == socratic_prompts.get("neutral", problems[0]).system_blocks("test-model")
+
+    def test_warm_prefix_matches_tutor_prefix(self, problems):
+        warmer, client = make_warmer(problems)
+        wait([warmer.warm("emotional", problems[1])])
+        tutor_client = MagicMock()
+        tutor_client.send_message.return_value = "Question?"
+        SocraticLM(tutor_client, "emotional", problems[1]).get_response("Hi")
+
+        assert (
+            tutor_client.send_message.call_args.kwargs["system_prompt"]
+            == client.send_message.call_args.kwargs["system_prompt"]
+        )
+
+    def test_warm_prompt_is_skipped_until_refresh(self, problems):
+        clock = FakeClock()
+        warmer, client = make_warmer(problems, clock=clock)
+        wait(warmer.warm_all())
+        clock.now = 100.0
+        assert warmer.warm_all() == []
+
+        clock.now = 240.0
+        wait(warmer.warm_all())
+        assert client.send_message.call_count == 12
+
+    def test_failed_warm_is_retried(self, problems):
+        client = MagicMock()
+        client.send_message.side_effect = [RuntimeError("API down"), "."]
+        warmer, _ = make_warmer(problems, client=client)
+        wait([warmer.warm("neutral", problems[0])])
+
+        retry = warmer.warm("neutral", problems[0])
+        assert retry is not None
+        wait([retry])
+        assert client.send_message.call_count == 2
+
+
+class TestUncacheable:
+    def test_short_prompt_is_not_warmed(self, problems, monkeypatch, caplog):
+        monkeypatch.setattr("ie_capstone.llm.client.PROMPT_CACHE_DEFAULT_MIN_TOKENS", 100_000)
+        warmer, client = make_warmer(problems)
+
+        assert warmer.warm_all() == []
+        assert warmer.warm_all() == []
+        client.send_message.assert_not_called()
+        assert len(caplog.records) == 6
+        assert "shorter than the minimum cacheable length" in caplog.records[0].getMessage()
+
+    def test_warm_without_cache_write_is_not_repeated(self, problems, caplog):
+        clock = FakeClock()
+        warmer, client = make_warmer(problems, clock=clock)
+        wait([warmer.warm("neutral", problems[0])])
+        response = MagicMock()
+        response.usage.cache_creation_input_tokens = 0
+        response.usage.cache_read_input_tokens = 0
+        client.send_message.call_args.kwargs["on_response"](response)
+
+        clock.now = 240.0
+        assert warmer.warm("neutral", problems[0]) is None
+        assert "was not written to the prompt cache" in caplog.records[0].getMessage()
+
+    def test_cache_read_counts_as_warm(self, problems):
+        clock = FakeClock()
+        warmer, client = make_warmer(problems, clock=clock)
+        wait([warmer.warm("neutral", problems[0])])
+        response = MagicMock()
+        response.usage.cache_creation_input_tokens = 0
+        response.usage.cache_read_input_tokens = 800
+        client.send_message.call_args.kwargs["on_response"](response)
+
+        clock.now = 240.0
+        assert warmer.warm("neutral", problems[0]) is not None
+
+
+class TestPrefetch:
+    def test_problem_start_prefetches_next(self, problems):
+        warmer, client = make_warmer(problems)
+        wait(warmer.on_problem_start("neutral", 0))
+
+        assert sent_prompts(client) == [get_socratic_prompt("neutral", problem) for problem in problems[:2]]
+
+    def test_last_problem_has_nothing_to_prefetch(self, problems):
+        warmer, client = make_warmer(problems)
+        wait(warmer.on_problem_start("neutral", 2))
+
+        assert sent_prompts(client) == [get_socratic_prompt("neutral", problems[2])]
+
+    def test_prefetched_prompt_is_not_warmed_twice(self, problems):
+        warmer, client = make_warmer(problems)
+        wait(warmer.on_problem_start("neutral", 0))
+        wait(warmer.on_problem_start("neutral", 1))
+
+        assert client.send_message.call_count == 3
+
+
+class TestSetProblems:
+    def test_replaced_problems_are_warmed_again(self, problems):
+        warmer, client = make_warmer(problems)
+        wait(warmer.warm_all())
+        edited = [Problem(**{**vars(problems[0]), "description": "Edited"}), *problems[1:]]
+        warmer.set_problems(edited)
+        wait(warmer.warm_all())
+
+        assert client.send_message.call_count == 12
+        assert get_socratic_prompt("neutral", edited[0]) in sent_prompts(client)
+
+
+class TestRefreshLoop:
+    @pytest.mark.parametrize(
+        ("active_hours", "hour", "expected"),
+        [
+            (None, 3, True),
+            ((9, 22), 9, True),
+            ((9, 22), 22, False),
+            ((22, 6), 23, True),
+            ((22, 6), 5, True),
+            ((22, 6), 12, False),
+        ],
+    )
+    def test_is_active(self, problems, active_hours, hour, expected):
+        warmer, _ = make_warmer(problems, active_hours=active_hours)
+        assert warmer.is_active(datetime(2026, 1, 1, hour)) is expected
+
+    def test_start_warms_every_pair_once(self, problems):
+        clock = FakeClock()
+        warmer, client = make_warmer(problems, clock=clock, check_seconds=0.01, active_hours=None)
+        assert warmer.start() is warmer
+        warmer.stop()
+        warmer.executor.shutdown(wait=True)
+
+        # The loop found nothing due after the startup pass
+        assert client.send_message.call_count == 6
+
+    def test_loop_warms_due_prompts(self, problems):
+        clock = FakeClock()
+        warmer, client = make_warmer(problems, clock=clock, check_seconds=0.01, active_hours=None)
+        warmer.start()
+        clock.now = 240.0
+        for _ in range(500):
+            if client.send_message.call_count >= 12:
+                break
+            warmer._stop.wait(0.01)
+        warmer.stop()
+
+        assert client.send_message.call_count == 12
@@ -0,0 +1,36 @@
+"""Tests for full-dataset corpus loading."""
+
+import shutil
+
+from ie_capstone.config import DATA_DIR, TREEINSTRUCT_DATA_DIR
+from ie_capstone.dataset.cache import ProblemCache
+from ie_capstone.dataset.corpus import corpus_sources, iter_corpus
+from ie_capstone.llm.prompt_registry import PromptRegistry
+
+
+def test_corpus_of_the_experiment_datasets_has_legacy_ids(tmp_path):
+    cache = ProblemCache(tmp_path / "corpus.json", registry=PromptRegistry())
+    problems = list(iter_corpus(corpus_sources(), cache, workers=0))
+    assert sorted(problem.id for problem in problems) == [1, 2, 3, 4, 5, 6]
+    assert cache.errors == []
+
+
+def test_corpus_skips_malformed_files(tmp_path):
+    socratic_dir = tmp_path / "socratic"
+    shutil.copytree(DATA_DIR, socratic_dir)
+    (socratic_dir / "extra").mkdir()
+    shutil.copy(DATA_DIR / "1.txt", socratic_dir / "extra" / "1.txt")
+    (socratic_dir / "empty.txt").write_text("", encoding="utf-8")
+    cache = ProblemCache(tmp_path / "corpus.json", registry=PromptRegistry())
+
+    problems = list(iter_corpus(corpus_sources(socratic_dir, None), cache, workers=2))
+
+    ids = [problem.id for problem in problems]
+    assert sorted(ids)[:3] == [1, 2, 3]
+    assert len(ids) == len(set(ids)) == 4
+    assert [error.path.name for error in cache.errors] == ["empty.txt"]
+
+
+def test_corpus_sources_of_one_dataset():
+    sources = corpus_sources(None, TREEINSTRUCT_DATA_DIR)
+    assert [source.problem_id for source in sources] == [5, 6, 4]
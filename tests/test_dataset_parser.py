@@ -4,13 +4,21 @@ import pytest
 
 from ie_capstone.config import DATA_DIR, TREEINSTRUCT_DATA_DIR
 from ie_capstone.dataset.parser import (
+    DISCOVERED_ID_BASE,
+    ProblemSource,
+    dialogue_turns,
+    discover_sources,
     extract_tag_content,
+    extract_tags,
     extract_treeinstruct_section,
+    extract_treeinstruct_sections,
     load_all_problems,
     parse_bug_fixes,
+    parse_dialogue,
     parse_problem_file,
     parse_treeinstruct_file,
     parse_unit_tests,
+    stable_problem_id,
     strip_line_numbers,
 )
 from ie_capstone.models import Problem
@@ -42,6 +50,28 @@ class TestExtractTagContent:
         assert result == "User: <code>print(x)</code>"
 
 
+class TestExtractTags:
+    def test_all_tags_in_one_scan(self):
+        text = "<problem>\nP\n</problem>\n<bug_code>\n1. x = 1\n</bug_code>\n<stu_desc>\n</stu_desc>"
+        assert extract_tags(text) == {"problem": "P", "bug_code": "1. x = 1", "stu_desc": ""}
+
+    def test_nested_tags_stay_in_content(self):
+        text = "<dialogue>User: <code>print(x)</code>\n\t<alt>Hi</dialogue><problem>P</problem>"
+        assert extract_tags(text) == {"dialogue": "User: <code>print(x)</code>\n\t<alt>Hi", "problem": "P"}
+
+    def test_unclosed_tag_is_text(self):
+        assert extract_tags("<alt>Hi <problem>P</problem>") == {"problem": "P"}
+
+    def test_first_occurrence_wins(self):
+        assert extract_tags("<problem>A</problem><problem>B</problem>") == {"problem": "A"}
+
+    def test_matches_per_tag_lookup_on_dataset(self):
+        text = (DATA_DIR / "2.txt").read_text(encoding="utf-8")
+        tags = extract_tags(text)
+        for name in ("problem", "bug_code", "bug_desc", "bug_fixes", "unit_tests", "dialogue"):
+            assert tags[name] == extract_tag_content(text, name)
+
+
 class TestStripLineNumbers:
     def test_strip_simple_line_numbers(self):
         code = "1. def foo():\n2.     return 1"
@@ -63,6 +93,12 @@ class TestStripLineNumbers:
         result = strip_line_numbers(code)
         assert result == "def foo():\n x = 1\n  return x"
 
+    def test_empty_numbered_lines(self):
+        assert strip_line_numbers("1. a = 1\n2.\n3. b = 2") == "a = 1\n\nb = 2"
+
+    def test_number_only_at_line_start(self):
+        assert strip_line_numbers("x = 1. + 2\n  3. y") == "x = 1. + 2\n  3. y"
+
 
 class TestParseBugFixes:
     def test_single_fix(self):
@@ -98,6 +134,44 @@ assert search(0, [-120, 60, 78, 100]) == 1"""
         assert tests == []
 
 
+class TestParseDialogue:
+    def test_turns_with_alternatives(self):
+        text = "User: Hi!\nAssistant: What fails?\n\t<alt>Which test fails?\n\t<alt>What do you see?\nUser: The first test."
+        turns = parse_dialogue(text)
+        assert [(turn.role, turn.content) for turn in turns] == [
+            ("user", "Hi!"),
+            ("assistant", "What fails?"),
+            ("user", "The first test."),
+        ]
+        assert turns[1].alternatives == ["Which test fails?", "What do you see?"]
+
+    def test_code_attaches_to_current_turn(self):
+        text = "User: Fixed it!\n<code>\n1. def f():\n2.     return 1\n</code>\n\t<alt>Done.\nAssistant: Good."
+        turns = parse_dialogue(text)
+        assert turns[0].code == "def f():\n    return 1"
+        assert turns[0].alternatives == ["Done."]
+        assert turns[1].code == ""
+
+    def test_continuation_lines_join_the_turn(self):
+        turns = parse_dialogue("Assistant: First line.\nSecond line.")
+        assert turns[0].content == "First line.\nSecond line."
+
+    def test_empty_dialogue(self):
+        assert parse_dialogue("") == []
+
+    def test_dialogue_turns_parses_raw_dialogue(self):
+        problem = Problem(
+            id=1,
+            description="",
+            buggy_code="",
+            bug_description="",
+            expected_fixes=[],
+            unit_tests=[],
+            example_dialogue="User: Hi\nAssistant: Hello",
+        )
+        assert [turn.content for turn in dialogue_turns(problem)] == ["Hi", "Hello"]
+
+
 class TestParseProblemFile:
     """Tests for Socratic Debugging Benchmark parser (problems 1-3)."""
 
@@ -108,6 +182,13 @@ class TestParseProblemFile:
         assert "def search(x, seq):" in problem.buggy_code
         assert len(problem.unit_tests) > 0
 
+    def test_parse_problem_1_dialogue(self):
+        problem = parse_problem_file(DATA_DIR / "1.txt")
+        assert [turn.role for turn in problem.dialogue[:2]] == ["user", "assistant"]
+        assert len(problem.dialogue[1].alternatives) == 3
+        assert any("def search(x, seq):" in turn.code for turn in problem.dialogue)
+        assert all("<alt>" not in turn.content for turn in problem.dialogue)
+
     def test_parse_problem_2(self):
         problem = parse_problem_file(DATA_DIR / "2.txt")
         assert problem.id == 2
@@ -150,6 +231,16 @@ Test
         result = extract_treeinstruct_section(text, "nonexistent")
         assert result == ""
 
+    def test_all_sections_in_one_scan(self):
+        text = "problem: ---\nproblem:\nP\n---\n\n-----\nbug_desc: ---\nbug_desc:\nD\n---\n"
+        assert extract_treeinstruct_sections(text) == {"problem": "P", "bug_desc": "D"}
+
+    def test_matches_per_section_lookup_on_dataset(self):
+        text = (TREEINSTRUCT_DATA_DIR / "45-jump-game-ii.py.txt").read_text(encoding="utf-8")
+        sections = extract_treeinstruct_sections(text)
+        assert set(sections) >= {"problem", "bug_fixes", "bug_desc", "buggy_code", "correct_code"}
+        assert sections["buggy_code"].startswith("1. class Solution:")
+
 
 class TestParseTreeinstructFile:
     """Tests for TreeInstruct dataset parser (problems 4-6)."""
@@ -173,8 +264,16 @@ class TestParseTreeinstructFile:
         assert "섬" in problem.description or "둘레" in problem.description
         assert "islandPerimeter" in problem.buggy_code
 
-    def test_treeinstruct_has_no_unit_tests(self):
+    def test_treeinstruct_loads_generated_unit_tests(self):
         problem = parse_treeinstruct_file(TREEINSTRUCT_DATA_DIR / "9-palindrome-number.py.txt", 4)
+        assert "assert Solution().isPalindrome(121) == True" in problem.unit_tests
+        assert all(test.startswith("assert") for test in problem.unit_tests)
+
+    def test_treeinstruct_without_generated_tests(self, tmp_path):
+        source = TREEINSTRUCT_DATA_DIR / "9-palindrome-number.py.txt"
+        file_path = tmp_path / source.name
+        file_path.write_text(source.read_text(encoding="utf-8"), encoding="utf-8")
+        problem = parse_treeinstruct_file(file_path, 4)
         assert problem.unit_tests == []
 
     def test_treeinstruct_code_has_no_line_numbers(self):
@@ -204,9 +303,8 @@ class TestLoadAllProblems:
             assert problem.buggy_code
             assert problem.bug_description
             assert len(problem.expected_fixes) > 0
-            # Note: TreeInstruct problems (4-6) don't have unit_tests
-            if problem.id <= 3:
-                assert len(problem.unit_tests) > 0
+            # TreeInstruct problems (4-6) use unit tests generated offline
+            assert len(problem.unit_tests) > 0
 
     def test_buggy_code_has_no_line_numbers(self):
         problems = load_all_problems()
@@ -230,6 +328,36 @@ class TestLoadAllProblems:
         problems = load_all_problems()
         treeinstruct = [p for p in problems if p.id >= 4]
         assert len(treeinstruct) == 3
-        # TreeInstruct problems don't have unit tests
+        # TreeInstruct problems have generated unit tests
         for p in treeinstruct:
-            assert p.unit_tests == []
+            assert len(p.unit_tests) > 0
+
+
+class TestDiscovery:
+    def test_legacy_files_keep_their_ids(self):
+        sources = discover_sources(DATA_DIR, "socratic") + discover_sources(TREEINSTRUCT_DATA_DIR, "treeinstruct")
+        assert sorted(source.problem_id for source in sources) == [1, 2, 3, 4, 5, 6]
+
+    def test_discovered_ids_are_stable_and_distinct(self):
+        first = stable_problem_id("socratic", "v2/4.txt")
+        assert first == stable_problem_id("socratic", "v2/4.txt")
+        assert first >= DISCOVERED_ID_BASE
+        assert first != stable_problem_id("treeinstruct", "v2/4.txt")
+
+    def test_discovery_is_recursive_and_ordered(self, tmp_path):
+        (tmp_path / "b").mkdir()
+        for name in ("b/2.txt", "1.txt", "a.py.txt", "notes.md"):
+            (tmp_path / name).write_text("", encoding="utf-8")
+        socratic = discover_sources(tmp_path, "socratic")
+        assert [source.path.relative_to(tmp_path).as_posix() for source in socratic] == ["1.txt", "b/2.txt"]
+        assert [source.path.name for source in discover_sources(tmp_path, "treeinstruct")] == ["a.py.txt"]
+
+    def test_source_assigns_its_id(self):
+        problem = ProblemSource(DATA_DIR / "1.txt", 1234, "socratic").parse()
+        assert problem.id == 1234
+
+    def test_malformed_file_raises(self, tmp_path):
+        path = tmp_path / "broken.txt"
+        path.write_text("no tags here", encoding="utf-8")
+        with pytest.raises(ValueError, match="Malformed"):
+            ProblemSource(path, 1000, "socratic").parse()
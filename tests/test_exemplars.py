@@ -0,0 +1,94 @@
+"""Tests for few-shot exemplar retrieval."""
+
+import pytest
+
+from ie_capstone.llm.exemplars import BM25, Exemplar, exemplar_index, format_exemplars, tokenize
+from ie_capstone.models import DialogueTurn, Problem
+
+DIALOGUE = [
+    DialogueTurn("user", "Hi! My code fails the first test. Can you help?"),
+    DialogueTurn(
+        "assistant",
+        "Sure. Why should the first test return 1?",
+        alternatives=["What differs between the first test and the others?"],
+    ),
+    DialogueTurn("user", "Because 5 is at position 1 in seq."),
+    DialogueTurn("assistant", "Good. What happens on line 3 when `i` is 1?"),
+    DialogueTurn("user", "It compares `x < seq[i]`, so it skips 5."),
+    DialogueTurn("assistant", "So what should the comparison be?"),
+    DialogueTurn("user", "I changed it to `x <= seq[i]` and it works!", code="def search(x, seq): ..."),
+    DialogueTurn("assistant", "Great, so `x <= seq[i]` fixes it."),
+]
+
+
+@pytest.fixture
+def problem():
+    return Problem(
+        id=1,
+        description="Write a search function",
+        buggy_code="def search(x, seq):\n  for i in range(len(seq)):\n    if x < seq[i]:\n      return i\n  return len(seq)",
+        bug_description="Missing equality check",
+        expected_fixes=["Replace `<` with `<=` on line 3"],
+        unit_tests=[],
+        dialogue=DIALOGUE,
+    )
+
+
+class TestBM25:
+    def test_rarer_terms_weigh_more(self):
+        bm25 = BM25([["seq", "loop"], ["seq", "range"], ["seq", "index"]])
+        scores = bm25.scores(["seq", "range"])
+        assert max(scores, key=scores.get) == 1
+
+    def test_documents_without_shared_terms_are_left_out(self):
+        bm25 = BM25([["seq"], ["range"]])
+        assert set(bm25.scores(["range"])) == {1}
+
+    def test_empty_index(self):
+        assert BM25([]).scores(["seq"]) == {}
+
+
+class TestExemplarIndex:
+    def test_exchanges_pair_student_and_tutor(self, problem):
+        first = exemplar_index(problem).exemplars[0]
+        assert first.student == "Hi! My code fails the first test. Can you help?"
+        assert first.replies == (
+            "Sure. Why should the first test return 1?",
+            "What differs between the first test and the others?",
+        )
+
+    def test_exchanges_revealing_the_fix_are_left_out(self, problem):
+        index = exemplar_index(problem)
+        assert [exemplar.position for exemplar in index.exemplars] == [0, 1, 2]
+
+    def test_search_ranks_by_relevance(self, problem):
+        found = exemplar_index(problem).search("3번 줄에서 i가 1일 때요?", k=1)
+        assert [exemplar.position for exemplar in found] == [1]
+
+    def test_search_returns_dialogue_order(self, problem):
+        found = exemplar_index(problem).search("seq[i] 비교가 이상해요. first test", k=2)
+        assert [exemplar.position for exemplar in found] == [0, 2]
+
+    def test_no_shared_term_falls_back_to_position(self, problem):
+        index = exemplar_index(problem)
+        assert index.search("모르겠어요", k=2) == []
+        assert [exemplar.position for exemplar in index.search("모르겠어요", k=2, position=2)] == [2]
+        assert [exemplar.position for exemplar in index.search("모르겠어요", k=2, position=9)] == [2]
+
+    def test_index_is_shared_per_dialogue(self, problem):
+        assert exemplar_index(problem) is exemplar_index(problem)
+
+    def test_problem_without_dialogue(self, problem):
+        problem.dialogue = []
+        assert exemplar_index(problem).search("seq", k=2, position=0) == []
+
+
+def test_tokenize_keeps_identifiers_and_korean_words():
+    assert tokenize("seq[i]가 x_1보다 커요") == ["seq", "i", "가", "x_1", "보다", "커요"]
+
+
+def test_format_exemplars():
+    text = format_exemplars(
+        [Exemplar(0, "Hi", ("Why?", "How?")), Exemplar(1, "Because", ("Good.",))],
+    )
+    assert text == "Student: Hi\nTutor: Why?\nTutor (alternative): How?\n\nStudent: Because\nTutor: Good."
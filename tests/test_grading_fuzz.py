@@ -0,0 +1,112 @@
+"""Tests for differential fuzzing against reference solutions."""
+
+from ie_capstone.grading.fuzz import INPUT_SPECS, differential_fuzz, generate_cases
+from ie_capstone.models import Problem
+
+SEARCH_REFERENCE = (
+    "def search(x, seq):\n"
+    "    for i in range(len(seq)):\n"
+    "        if x <= seq[i]:\n"
+    "            return i\n"
+    "    return len(seq)"
+)
+
+
+def make_search_problem(reference_solutions: list[str] | None = None) -> Problem:
+    return Problem(
+        id=1,
+        description="Search",
+        buggy_code=SEARCH_REFERENCE.replace("<=", "<"),
+        bug_description="Wrong comparison",
+        expected_fixes=["Replace `<` with `<=` on line 3"],
+        unit_tests=[],
+        reference_solutions=[SEARCH_REFERENCE] if reference_solutions is None else reference_solutions,
+    )
+
+
+class TestGenerateCases:
+    def test_same_seed_same_cases(self):
+        assert generate_cases(INPUT_SPECS[1], 50, seed=3) == generate_cases(INPUT_SPECS[1], 50, seed=3)
+
+    def test_cases_are_distinct(self):
+        cases = generate_cases(INPUT_SPECS[4], 200)
+        assert len({repr(case) for case in cases}) == len(cases)
+
+    def test_search_inputs_are_sorted(self):
+        for x, seq in generate_cases(INPUT_SPECS[1], 100):
+            assert isinstance(x, int)
+            assert seq == sorted(seq)
+
+    def test_jump_inputs_reach_the_end(self):
+        for (nums,) in generate_cases(INPUT_SPECS[5], 100):
+            assert all(step >= 1 for step in nums[:-1])
+
+    def test_island_inputs_are_rectangular_grids(self):
+        for (grid,) in generate_cases(INPUT_SPECS[6], 50):
+            assert len({len(row) for row in grid}) == 1
+            assert any(1 in row for row in grid)
+
+
+class TestDifferentialFuzz:
+    def test_equivalent_code_passes(self):
+        student = "def search(x, seq):\n    return len([v for v in seq if v < x])"
+        result = differential_fuzz(make_search_problem(), student, cases=300)
+        assert result.passed is True
+        assert result.cases_run == 300
+
+    def test_reports_first_differing_input(self):
+        problem = make_search_problem()
+        result = differential_fuzz(problem, problem.buggy_code, cases=300)
+        assert result.passed is False
+        assert result.failing_input is not None
+        assert result.expected != result.actual
+
+    def test_exception_counts_as_mismatch(self):
+        result = differential_fuzz(make_search_problem(), "def search(x, seq):\n    return seq.index(x)", cases=300)
+        assert result.passed is False
+        assert result.actual.startswith("raised ")
+
+    def test_syntax_error(self):
+        result = differential_fuzz(make_search_problem(), "def search(x, seq)\n    return 0")
+        assert result.passed is False
+        assert "SyntaxError" in result.error
+
+    def test_infinite_loop_times_out(self):
+        result = differential_fuzz(
+            make_search_problem(), "def search(x, seq):\n    while True:\n        pass", timeout=1.0
+        )
+        assert result.passed is False
+        assert result.error == "Timed out"
+
+    def test_student_output_does_not_break_fuzzer(self):
+        student = SEARCH_REFERENCE.replace("    return len(seq)", "    print('debug')\n    return len(seq)")
+        assert differential_fuzz(make_search_problem(), student, cases=50).passed is True
+
+    def test_without_reference_returns_none(self):
+        assert differential_fuzz(make_search_problem(reference_solutions=[]), SEARCH_REFERENCE) is None
+
+    def test_without_input_spec_returns_none(self):
+        problem = make_search_problem()
+        problem.id = 99
+        assert differential_fuzz(problem, SEARCH_REFERENCE) is None
+
+    def test_unparsable_reference_returns_none(self):
+        problem = make_search_problem(reference_solutions=["def search(x, seq)\n    return 0"])
+        assert differential_fuzz(problem, SEARCH_REFERENCE) is None
+
+    def test_reference_failing_to_load_returns_none(self):
+        problem = make_search_problem(reference_solutions=["import missing_module\n" + SEARCH_REFERENCE])
+        assert differential_fuzz(problem, SEARCH_REFERENCE) is None
+
+    def test_reference_rejecting_every_input_returns_none(self):
+        problem = make_search_problem(reference_solutions=["def search(x, seq):\n    raise ValueError"])
+        assert differential_fuzz(problem, SEARCH_REFERENCE, cases=50) is None
+
+    def test_secrets_are_not_inherited(self, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-secret")
+        student = "import os\n" + SEARCH_REFERENCE.replace(
+            "    return len(seq)", "    return os.environ['ANTHROPIC_API_KEY']"
+        )
+        result = differential_fuzz(make_search_problem(), student, cases=50)
+        assert result.passed is False
+        assert "sk-secret" not in (result.actual or "")
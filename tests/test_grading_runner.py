@@ -0,0 +1,45 @@
+"""Tests for the local unit-test runner."""
+
+from ie_capstone.grading.runner import run_unit_tests
+
+
+class TestRunUnitTests:
+    def test_all_tests_pass(self):
+        result = run_unit_tests("def add(a, b):\n    return a + b", ["assert add(1, 2) == 3", "assert add(0, 0) == 0"])
+        assert result.passed is True
+        assert result.failed_tests == []
+        assert result.error is None
+
+    def test_reports_failing_tests(self):
+        result = run_unit_tests("def add(a, b):\n    return a - b", ["assert add(1, 2) == 3", "assert add(0, 0) == 0"])
+        assert result.passed is False
+        assert result.failed_tests == ["assert add(1, 2) == 3"]
+
+    def test_syntax_error_fails_all_tests(self):
+        result = run_unit_tests("def add(a, b)\n    return a + b", ["assert add(1, 2) == 3"])
+        assert result.passed is False
+        assert result.failed_tests == ["assert add(1, 2) == 3"]
+        assert "SyntaxError" in result.error
+
+    def test_student_output_does_not_break_runner(self):
+        result = run_unit_tests("def add(a, b):\n    print('debug')\n    return a + b", ["assert add(1, 2) == 3"])
+        assert result.passed is True
+
+    def test_typing_names_available(self):
+        code = "class Solution:\n    def total(self, nums: List[int]) -> int:\n        return sum(nums)"
+        result = run_unit_tests(code, ["assert Solution().total([1, 2]) == 3"])
+        assert result.passed is True
+
+    def test_infinite_loop_times_out(self):
+        result = run_unit_tests("def spin():\n    while True:\n        pass", ["spin()"], timeout=0.5)
+        assert result.passed is False
+        assert result.error == "Timed out"
+
+    def test_secrets_are_not_inherited(self, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-secret")
+        result = run_unit_tests("import os", ["assert 'ANTHROPIC_API_KEY' not in os.environ"])
+        assert result.passed is True
+
+    def test_memory_is_limited(self):
+        result = run_unit_tests("def grow():\n    return bytearray(4 * 1024**3)", ["grow()"])
+        assert result.passed is False
@@ -144,3 +144,282 @@ class TestLLMJudge:
 
         assert is_correct is True  # 0.5 >= 0.5
         assert scores == [1.0, 0.0, 1.0, 0.0]
+
+    def test_reference_match_skips_llm(self, mock_client, sample_problem):
+        sample_problem.reference_solutions = ["def search(x, seq):\n  if x <= seq[i]:\n    return i"]
+        judge = LLMJudge(mock_client)
+
+        verdict = judge.evaluate(sample_problem, "def search(x, seq):\n    if x <= seq[i]:\n        return i\n")
+
+        assert verdict.is_correct is True
+        assert verdict.decided_by == "reference_ast"
+        mock_client.send_single_message.assert_not_called()
+
+    def test_reference_mismatch_falls_back_to_llm(self, mock_client, sample_problem):
+        sample_problem.reference_solutions = ["def search(x, seq):\n  if x <= seq[i]:\n    return i"]
+        mock_client.send_single_message.return_value = "INCORRECT"
+        judge = LLMJudge(mock_client)
+
+        verdict = judge.evaluate(sample_problem, sample_problem.buggy_code)
+
+        assert verdict.is_correct is False
+        assert verdict.decided_by == "llm"
+        assert mock_client.send_single_message.call_count == 3
+
+    def test_reference_match_can_be_disabled(self, mock_client, sample_problem):
+        sample_problem.reference_solutions = [sample_problem.buggy_code]
+        mock_client.send_single_message.return_value = "INCORRECT"
+        judge = LLMJudge(mock_client, use_reference_match=False)
+
+        is_correct, _ = judge.evaluate_fix(sample_problem, sample_problem.buggy_code)
+
+        assert is_correct is False
+
+    def test_build_request_matches_direct_call(self, mock_client, sample_problem):
+        mock_client.model = "test-model"
+        judge = LLMJudge(mock_client)
+
+        request = judge.build_request(sample_problem, "code")
+
+        assert request["model"] == "test-model"
+        assert request["temperature"] == 0.3
+        assert "Should use <= instead of <" in request["system"][0]["text"]
+        assert "cache_control" not in request["system"][0]  # Shorter than any model's cacheable minimum
+        assert request["messages"][0]["role"] == "user"
+        assert "code" in request["messages"][0]["content"]
+
+    def test_rounds_share_the_system_prefix(self, mock_client, sample_problem):
+        mock_client.send_single_message.return_value = "CORRECT"
+        judge = LLMJudge(mock_client)
+
+        judge.evaluate(sample_problem, "def a(): pass", iterations=2)
+        judge.evaluate(sample_problem, "def b(): pass", iterations=1)
+
+        calls = mock_client.send_single_message.call_args_list
+        assert all(call.kwargs["system_prompt"] == calls[0].kwargs["system_prompt"] for call in calls)
+        assert "def b(): pass" in calls[2].kwargs["user_message"]
+
+
+class TestCascadeJudge:
+    def test_confident_agreeing_fast_votes_decide(self, mock_client, sample_problem):
+        mock_client.send_single_message.return_value = '{"verdict": "CORRECT", "confidence": 0.95}'
+        judge = LLMJudge(mock_client, cascade=True, fast_model="fast", fast_iterations=2)
+
+        verdict = judge.evaluate(sample_problem, "code")
+
+        assert verdict.is_correct is True
+        assert verdict.scores == [1.0, 1.0]
+        assert verdict.decided_by == "fast"
+        assert mock_client.send_single_message.call_count == 2
+        assert mock_client.send_single_message.call_args.kwargs["model"] == "fast"
+
+    def test_disagreement_escalates_to_primary(self, mock_client, sample_problem):
+        mock_client.send_single_message.side_effect = [
+            '{"verdict": "CORRECT", "confidence": 0.9}',
+            '{"verdict": "INCORRECT", "confidence": 0.9}',
+            "INCORRECT",
+            "INCORRECT",
+            "CORRECT",
+        ]
+        judge = LLMJudge(mock_client, cascade=True, fast_iterations=2)
+
+        verdict = judge.evaluate(sample_problem, "code")
+
+        assert verdict.is_correct is False
+        assert verdict.scores == [0.0, 0.0, 1.0]
+        assert verdict.decided_by == "primary"
+        assert "model" not in mock_client.send_single_message.call_args.kwargs
+
+    def test_low_confidence_escalates_early(self, mock_client, sample_problem):
+        mock_client.send_single_message.side_effect = [
+            '{"verdict": "CORRECT", "confidence": 0.4}',
+            "CORRECT",
+            "CORRECT",
+            "CORRECT",
+        ]
+        judge = LLMJudge(mock_client, cascade=True, fast_iterations=2, fast_min_confidence=0.8)
+
+        verdict = judge.evaluate(sample_problem, "code")
+
+        assert verdict.decided_by == "primary"
+        assert mock_client.send_single_message.call_count == 4
+
+    def test_malformed_fast_answer_escalates(self, mock_client, sample_problem):
+        mock_client.send_single_message.side_effect = ["CORRECT", "CORRECT", "CORRECT", "CORRECT"]
+        judge = LLMJudge(mock_client, cascade=True, fast_iterations=1)
+
+        verdict = judge.evaluate(sample_problem, "code")
+
+        assert verdict.decided_by == "primary"
+
+    def test_parse_structured_response(self):
+        assert LLMJudge.parse_structured_response('Sure: {"verdict": "incorrect", "confidence": 0.7}') == (0.0, 0.7)
+        assert LLMJudge.parse_structured_response('{"verdict": "CORRECT", "confidence": 3}') == (1.0, 1.0)
+        assert LLMJudge.parse_structured_response('{"verdict": "MAYBE", "confidence": 0.9}') is None
+        assert LLMJudge.parse_structured_response("CORRECT") is None
+
+
+class TestLocalTests:
+    def test_failing_unit_tests_reject_without_llm(self, mock_client):
+        problem = Problem(
+            id=1,
+            description="Add",
+            buggy_code="def add(a, b):\n    return a - b",
+            bug_description="Subtracts",
+            expected_fixes=["Replace `-` with `+` on line 2"],
+            unit_tests=["assert add(1, 2) == 3"],
+        )
+        judge = LLMJudge(mock_client, use_local_tests=True)
+
+        verdict = judge.evaluate(problem, "def add(a, b):\n    return a * b")
+
+        assert verdict.is_correct is False
+        assert verdict.decided_by == "unit_tests"
+        mock_client.send_single_message.assert_not_called()
+
+    def test_passing_unit_tests_still_use_llm(self, mock_client):
+        problem = Problem(
+            id=1,
+            description="Add",
+            buggy_code="def add(a, b):\n    return a - b",
+            bug_description="Subtracts",
+            expected_fixes=["Replace `-` with `+` on line 2"],
+            unit_tests=["assert add(1, 2) == 3"],
+        )
+        mock_client.send_single_message.return_value = "CORRECT"
+        judge = LLMJudge(mock_client, use_local_tests=True)
+
+        verdict = judge.evaluate(problem, "def add(a, b):\n    return b + a")
+
+        assert verdict.is_correct is True
+        assert verdict.decided_by == "llm"
+
+
+class TestFuzzing:
+    def make_problem(self) -> Problem:
+        reference = (
+            "def factorial(n):\n    fact = 1\n    for i in range(n):\n        fact = fact * (i + 1)\n    return fact"
+        )
+        return Problem(
+            id=2,
+            description="Factorial",
+            buggy_code=reference.replace("(i + 1)", "i"),
+            bug_description="Off by one",
+            expected_fixes=["Replace `i` with `(i + 1)` on line 4"],
+            unit_tests=[],
+            reference_solutions=[reference],
+        )
+
+    def test_mismatch_rejects_without_llm(self, mock_client):
+        problem = self.make_problem()
+        judge = LLMJudge(mock_client, use_fuzzing=True)
+
+        verdict = judge.evaluate(problem, problem.buggy_code)
+
+        assert verdict.is_correct is False
+        assert verdict.decided_by == "fuzz"
+        mock_client.send_single_message.assert_not_called()
+
+    def test_agreement_accepts_without_llm(self, mock_client):
+        judge = LLMJudge(mock_client, use_fuzzing=True)
+        student = "import math\n\ndef factorial(n):\n    return math.factorial(n) if n >= 0 else 1"
+
+        verdict = judge.evaluate(self.make_problem(), student)
+
+        assert verdict.is_correct is True
+        assert verdict.decided_by == "fuzz"
+        mock_client.send_single_message.assert_not_called()
+
+
+class TestParallel:
+    def test_parallel_rounds_collect_every_score(self, mock_client, sample_problem):
+        mock_client.send_single_message.side_effect = ["CORRECT", "INCORRECT", "CORRECT"]
+        judge = LLMJudge(mock_client, parallel=True)
+
+        verdict = judge.evaluate(sample_problem, "def foo(): pass", iterations=3)
+
+        assert sorted(verdict.scores) == [0.0, 1.0, 1.0]
+        assert verdict.is_correct is True
+        assert mock_client.send_single_message.call_count == 3
+
+
+class TestPromptVariant:
+    def make_problem(self) -> Problem:
+        buggy_code = "\n".join([
+            "def search(x, seq):",
+            '    """Return the index where x should be inserted to keep seq sorted."""',
+            "    if not seq:",
+            "        return 0",
+            "    for i in range(len(seq)):",
+            "        if x < seq[i]:",
+            "            return i",
+            "    return len(seq)",
+        ])
+        return Problem(
+            id=1,
+            description="Search",
+            buggy_code=buggy_code,
+            bug_description="Should use <= instead of <",
+            expected_fixes=["Replace `<` with `<=` on line 6"],
+            unit_tests=["assert search(5, [5]) == 0"],
+        )
+
+    def test_diff_variant_is_used_for_llm_calls(self, mock_client):
+        problem = self.make_problem()
+        mock_client.send_single_message.return_value = "CORRECT"
+        judge = LLMJudge(mock_client, prompt_variant="diff")
+
+        judge.evaluate(problem, problem.buggy_code.replace("x < seq", "x <= seq"), iterations=1)
+
+        user_message = mock_client.send_single_message.call_args.kwargs["user_message"]
+        assert "Student's Changes to the Buggy Code" in user_message
+
+    def test_build_request_uses_variant(self, mock_client):
+        problem = self.make_problem()
+        judge = LLMJudge(mock_client, prompt_variant="diff")
+        request = judge.build_request(problem, problem.buggy_code.replace("x < seq", "x <= seq"))
+        assert "Student's Changes to the Buggy Code" in request["messages"][0]["content"]
+
+
+class TestJudgeCalls:
+    def test_calls_keep_raw_responses(self, mock_client, sample_problem):
+        mock_client.model = "claude-test"
+        mock_client.send_single_message.side_effect = ["CORRECT", "Looks INCORRECT"]
+        judge = LLMJudge(mock_client)
+
+        verdict = judge.evaluate(sample_problem, "code", iterations=2)
+
+        assert [call.response for call in verdict.calls] == ["CORRECT", "Looks INCORRECT"]
+        assert all(call.stage == "llm" and call.temperature == 0.3 for call in verdict.calls)
+        assert verdict.calls[0].model == "claude-test"
+        assert verdict.calls[0].latency_seconds >= 0
+
+    def test_calls_record_usage_from_raw_response(self, mock_client, sample_problem):
+        message = MagicMock(model="claude-served", usage=MagicMock(input_tokens=700, output_tokens=3))
+
+        def respond(**kwargs):
+            kwargs["on_response"](message)
+            return "CORRECT"
+
+        mock_client.send_single_message.side_effect = respond
+        judge = LLMJudge(mock_client)
+
+        verdict = judge.evaluate(sample_problem, "code", iterations=1)
+
+        call = verdict.calls[0]
+        assert call.model == "claude-served"
+        assert call.usage["input_tokens"] == 700
+        assert call.usage["output_tokens"] == 3
+
+    def test_cascade_keeps_fast_and_primary_calls(self, mock_client, sample_problem):
+        mock_client.send_single_message.side_effect = [
+            '{"verdict": "CORRECT", "confidence": 0.9}',
+            '{"verdict": "INCORRECT", "confidence": 0.9}',
+            "CORRECT",
+        ]
+        judge = LLMJudge(mock_client, cascade=True, fast_iterations=2, fast_model="fast")
+
+        verdict = judge.evaluate(sample_problem, "code", iterations=1)
+
+        assert [call.stage for call in verdict.calls] == ["fast", "fast", "primary"]
+        assert verdict.calls[0].model == "fast"
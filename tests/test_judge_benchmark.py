@@ -0,0 +1,167 @@
+"""Tests for the judge benchmark."""
+
+import json
+
+import pytest
+
+from ie_capstone.benchmarks.judge import (
+    BenchmarkCase,
+    JudgeConfig,
+    build_corpus,
+    dataset_cases,
+    load_corpus,
+    percentile,
+    run_benchmark,
+    save_corpus,
+)
+from ie_capstone.models import Problem
+
+REFERENCE = "def add(a, b):\n    return a + b"
+
+
+class FakeClient:
+    """Client that answers every judge call with a fixed verdict and counts usage."""
+
+    model = "fake-model"
+
+    def __init__(self, response: str = "CORRECT"):
+        self.response = response
+        self.usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+
+    def usage_snapshot(self) -> dict[str, int]:
+        return dict(self.usage)
+
+    def send_single_message(self, **kwargs) -> str:
+        self.usage["calls"] += 1
+        self.usage["input_tokens"] += 100
+        self.usage["output_tokens"] += 5
+        return self.response
+
+
+@pytest.fixture
+def problem():
+    return Problem(
+        id=1,
+        description="Add",
+        buggy_code="def add(a, b):\n    return a - b",
+        bug_description="Subtracts",
+        expected_fixes=["Replace `-` with `+` on line 2"],
+        unit_tests=["assert add(1, 2) == 3"],
+        reference_solutions=[REFERENCE],
+    )
+
+
+class TestPercentile:
+    def test_interpolates(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+
+    def test_bounds(self):
+        assert percentile([3.0, 1.0, 2.0], 0) == 1.0
+        assert percentile([3.0, 1.0, 2.0], 100) == 3.0
+
+    def test_empty(self):
+        assert percentile([], 90) == 0.0
+
+
+class TestCorpus:
+    def test_save_and_load_roundtrip(self, tmp_path):
+        cases = [BenchmarkCase(1, REFERENCE, True, "manual"), BenchmarkCase(1, "pass", False, "manual")]
+        path = save_corpus(cases, tmp_path / "corpus.jsonl")
+        assert load_corpus(path) == cases
+
+    def test_load_missing_corpus(self, tmp_path):
+        assert load_corpus(tmp_path / "missing.jsonl") == []
+
+    def test_dataset_cases_label_reference_and_buggy_code(self, problem):
+        cases = dataset_cases(problem)
+        assert [(case.source, case.label) for case in cases] == [("reference", True), ("buggy", False)]
+
+    def test_partial_fixes_are_labeled_by_unit_tests(self, problem):
+        problem.buggy_code = "def add(a, b):\n    total = a - b\n    return total * 2"
+        problem.expected_fixes = ["Replace `-` with `+` on line 2", "Replace `total * 2` with `total` on line 3"]
+        # Too weak to reject `a - b`, which shows the label comes from the tests and not from fuzzing
+        problem.unit_tests = ["assert add(1, 0) == 1"]
+
+        partial = {case.code: case.label for case in dataset_cases(problem) if case.source == "partial_fix"}
+
+        assert partial == {
+            "def add(a, b):\n    total = a + b\n    return total * 2": False,
+            "def add(a, b):\n    total = a - b\n    return total": True,
+        }
+
+    def test_build_corpus_keeps_manual_cases_and_deduplicates(self, problem, tmp_path):
+        manual = BenchmarkCase(1, "def add(a, b):\n    # manual\n    return a + b", True, "manual")
+        stale = BenchmarkCase(1, "def add(a, b):\n    return 0", False, "reference")
+
+        cases = build_corpus([problem], tmp_path, [manual, stale])
+
+        assert cases[0] == manual
+        assert stale not in cases
+        # The reference solution has the same AST as the manual case
+        assert [case.source for case in cases] == ["manual", "buggy"]
+
+    def test_build_corpus_labels_logged_submissions(self, tmp_path):
+        # Problem 1 is fuzzed with search inputs, which the add fixture's reference rejects
+        search = "def search(x, seq):\n    return len([v for v in seq if v < x])"
+        problem = Problem(
+            id=1,
+            description="Search",
+            buggy_code=search.replace("<", "<="),
+            bug_description="Wrong comparison",
+            expected_fixes=["Replace `<=` with `<` on line 2"],
+            unit_tests=["assert search(2, [1, 2, 3]) == 1"],
+            reference_solutions=[search],
+        )
+        final_code = "def search(x, seq):\n    return sum(1 for v in seq if v < x)"
+        session = {"problem_attempts": [{"problem_id": 1, "final_code": final_code}]}
+        (tmp_path / "session.json").write_text(json.dumps(session), encoding="utf-8")
+
+        cases = build_corpus([problem], tmp_path, [])
+
+        assert ("logs", True) in [(case.source, case.label) for case in cases]
+
+
+class TestRunBenchmark:
+    def test_reports_agreement_calls_and_tokens(self, problem):
+        cases = [
+            BenchmarkCase(1, "def add(a, b):\n    return b + a", True, "manual"),
+            BenchmarkCase(1, "pass", False, "manual"),
+        ]
+        client = FakeClient("CORRECT")
+
+        report = run_benchmark(client, {1: problem}, cases, JudgeConfig("test", iterations=3))
+
+        assert report["cases"] == 2
+        assert report["agreement"] == 0.5
+        assert report["confusion"] == {"true_positive": 1, "false_positive": 1, "true_negative": 0, "false_negative": 0}
+        assert report["calls_per_verdict"] == 3
+        assert report["tokens"] == {
+            "input": 600,
+            "output": 30,
+            "cache_creation": 0,
+            "cache_read": 0,
+            "per_verdict": 315.0,
+        }
+        assert report["decided_by"] == {"llm": 2}
+        assert set(report["latency_seconds"]) == {"mean", "p50", "p90", "p99", "max"}
+
+    def test_reference_match_needs_no_calls(self, problem):
+        client = FakeClient()
+
+        report = run_benchmark(client, {1: problem}, [BenchmarkCase(1, REFERENCE, True, "reference")], JudgeConfig("x"))
+
+        assert report["agreement"] == 1.0
+        assert report["calls_per_verdict"] == 0
+        assert report["results"][0]["decided_by"] == "reference_ast"
+
+    def test_local_tests_config_leaves_out_unit_test_labels(self, problem):
+        cases = [
+            BenchmarkCase(1, "def add(a, b):\n    return b + a", True, "logs"),
+            BenchmarkCase(1, "pass", False, "manual"),
+        ]
+
+        report = run_benchmark(FakeClient(), {1: problem}, cases, JudgeConfig("x", local_tests=True))
+
+        assert report["cases"] == 1
+        assert report["excluded_cases"] == 1
+        assert report["results"][0]["source"] == "manual"
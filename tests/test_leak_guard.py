@@ -0,0 +1,128 @@
+"""Tests for the streaming answer-leak guard."""
+
+import random
+
+import pytest
+
+from ie_capstone.llm.leak_guard import (
+    AhoCorasick,
+    LeakGuard,
+    StreamReset,
+    leak_matcher,
+    leak_matcher_for_code,
+    normalize_for_leaks,
+)
+from ie_capstone.models import Problem
+
+
+@pytest.fixture
+def problem():
+    return Problem(
+        id=1,
+        description="Write a search function",
+        buggy_code="def search(x, seq):\n  for i in range(len(seq)):\n    if x < seq[i]:\n      return i\n  return len(seq)",
+        bug_description="Missing equality check",
+        expected_fixes=["Replace `<` with `<=` on line 3"],
+        unit_tests=[],
+    )
+
+
+def run(matcher, text):
+    state, found = 0, []
+    for char in text:
+        state = matcher.step(state, char)
+        if matcher.match(state):
+            found.append(matcher.match(state))
+    return found
+
+
+class TestAhoCorasick:
+    def test_finds_overlapping_patterns(self):
+        matcher = AhoCorasick(["he", "she", "his", "hers"])
+        assert run(matcher, "ushers") == ["she", "hers"]
+
+    def test_agrees_with_naive_search(self):
+        rng = random.Random(0)  # noqa: S311
+        patterns = ["".join(rng.choice("ab") for _ in range(rng.randint(2, 4))) for _ in range(5)]
+        matcher = AhoCorasick(patterns)
+        for _ in range(50):
+            text = "".join(rng.choice("ab") for _ in range(30))
+            state = 0
+            for end, char in enumerate(text, 1):
+                state = matcher.step(state, char)
+                naive = any(text[:end].endswith(pattern) for pattern in patterns)
+                assert (matcher.match(state) is not None) == naive
+
+    def test_depth_tracks_partial_match(self):
+        matcher = AhoCorasick(["abc"])
+        state = matcher.step(matcher.step(0, "a"), "b")
+        assert matcher.depth(state) == 2
+        assert matcher.depth(matcher.step(state, "x")) == 0
+
+
+class TestLeakMatcher:
+    def test_patterns_come_from_the_fix(self, problem):
+        _, patterns = leak_matcher(problem)
+        assert patterns == frozenset({"x<=seq"})
+
+    def test_patterns_do_not_occur_in_buggy_code(self, problem):
+        _, patterns = leak_matcher(problem)
+        assert not any(pattern in normalize_for_leaks(problem.buggy_code) for pattern in patterns)
+
+    def test_matcher_is_built_once_per_problem(self, problem):
+        assert leak_matcher(problem)[0] is leak_matcher(problem)[0]
+
+    def test_problem_without_applicable_fix_has_no_patterns(self, problem):
+        problem.expected_fixes = ["Think harder"]
+        assert leak_matcher(problem)[1] == frozenset()
+
+    def test_snippets_in_the_students_code_are_left_out(self, problem):
+        fixed = problem.buggy_code.replace("x < seq[i]", "x <= seq[i]")
+        assert run(leak_matcher_for_code(problem, fixed), "ifx<=seq[i]") == []
+
+    def test_without_typed_snippets_the_shared_matcher_is_used(self, problem):
+        assert leak_matcher_for_code(problem, problem.buggy_code) is leak_matcher(problem)[0]
+        assert leak_matcher_for_code(problem, None) is leak_matcher(problem)[0]
+
+
+class TestLeakGuard:
+    def feed_all(self, guard, chunks):
+        return "".join(guard.feed(chunk) for chunk in chunks) + guard.flush()
+
+    def test_clean_text_passes_through(self, problem):
+        guard = LeakGuard(leak_matcher(problem)[0])
+        text = "What happens when x equals seq[i]? Look at line 3: if x < seq[i]."
+        assert self.feed_all(guard, [text[i : i + 5] for i in range(0, len(text), 5)]) == text
+        assert guard.leak is None
+
+    def test_leak_split_across_chunks_is_cut(self, problem):
+        guard = LeakGuard(leak_matcher(problem)[0])
+        released = self.feed_all(guard, ["Try writing `if X ", "<", "= se", "q[i]` instead."])
+        assert guard.leak == "x<=seq"
+        assert released == "Try writing `if "
+        assert guard.text == "Try writing `if X <= seq"
+
+    def test_only_partial_match_is_held_back(self, problem):
+        guard = LeakGuard(leak_matcher(problem)[0])
+        assert guard.feed("Compare x <") == "Compare "
+        assert guard.feed(" y") == "x < y"
+
+    def test_leak_after_expanding_character_is_cut_at_the_match(self, problem):
+        # "İ" lowercases to two characters
+        guard = LeakGuard(leak_matcher(problem)[0])
+        released = self.feed_all(guard, ["İİ: try x<=seq[i]"])
+        assert guard.leak == "x<=seq"
+        assert released == "İİ: try "
+        assert guard.text == "İİ: try x<=seq"
+
+    def test_nothing_released_after_leak(self, problem):
+        guard = LeakGuard(leak_matcher(problem)[0])
+        guard.feed("x<=seq")
+        assert guard.feed("more text") == ""
+        assert guard.flush() == ""
+
+
+class TestStreamReset:
+    def test_is_an_empty_string(self):
+        assert StreamReset() == ""
+        assert "abc" + StreamReset() == "abc"
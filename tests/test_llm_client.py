@@ -2,7 +2,7 @@
 
 from unittest.mock import MagicMock, patch
 
-from ie_capstone.llm.client import ClaudeClient
+from ie_capstone.llm.client import ClaudeClient, cached_system_prompt
 
 
 class TestClaudeClient:
@@ -95,3 +95,135 @@ class TestClaudeClient:
         assert result == "Multi-turn response"
         call_args = mock_client.messages.create.call_args
         assert len(call_args.kwargs["messages"]) == 3
+
+    @patch("ie_capstone.llm.client.anthropic.Anthropic")
+    def test_create_batch(self, mock_anthropic):
+        mock_client = MagicMock()
+        mock_client.messages.batches.create.return_value = MagicMock(id="msgbatch_1")
+        mock_anthropic.return_value = mock_client
+
+        client = ClaudeClient(api_key="test-key")
+        requests = [{"custom_id": "a_0", "params": {"model": "m"}}]
+
+        assert client.create_batch(requests) == "msgbatch_1"
+        mock_client.messages.batches.create.assert_called_once_with(requests=requests)
+
+    @patch("ie_capstone.llm.client.anthropic.Anthropic")
+    def test_iter_batch_results(self, mock_anthropic):
+        succeeded = MagicMock(custom_id="a_0")
+        succeeded.result.type = "succeeded"
+        succeeded.result.message.content = [MagicMock(text="CORRECT")]
+        errored = MagicMock(custom_id="a_1")
+        errored.result.type = "errored"
+        mock_client = MagicMock()
+        mock_client.messages.batches.results.return_value = [succeeded, errored]
+        mock_anthropic.return_value = mock_client
+
+        client = ClaudeClient(api_key="test-key")
+
+        assert list(client.iter_batch_results("msgbatch_1")) == [("a_0", "CORRECT"), ("a_1", None)]
+
+
+class TestUsageCounters:
+    @patch("ie_capstone.llm.client.anthropic.Anthropic")
+    def test_send_message_counts_calls_and_tokens(self, mock_anthropic):
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="Response")]
+        mock_response.usage = MagicMock(
+            input_tokens=120, output_tokens=8, cache_creation_input_tokens=0, cache_read_input_tokens=900
+        )
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+
+        client = ClaudeClient(api_key="test-key")
+        client.send_single_message("Hello", "System")
+        client.send_single_message("Again", "System")
+
+        assert client.usage_snapshot() == {
+            "calls": 2,
+            "input_tokens": 240,
+            "output_tokens": 16,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 1800,
+        }
+
+    @patch("ie_capstone.llm.client.anthropic.Anthropic")
+    def test_stream_counts_tokens(self, mock_anthropic):
+        stream = mock_anthropic.return_value.messages.stream.return_value.__enter__.return_value
+        stream.text_stream = iter(["Why ", "there?"])
+        stream.get_final_message.return_value.usage = MagicMock(
+            input_tokens=50, output_tokens=4, cache_creation_input_tokens=0, cache_read_input_tokens=0
+        )
+
+        client = ClaudeClient(api_key="test-key")
+
+        assert "".join(client.stream_message([{"role": "user", "content": "Hi"}], "System")) == "Why there?"
+        assert client.usage_snapshot()["input_tokens"] == 50
+
+    @patch("ie_capstone.llm.client.anthropic.Anthropic")
+    def test_closed_stream_still_counts_tokens(self, mock_anthropic):
+        stream = mock_anthropic.return_value.messages.stream.return_value.__enter__.return_value
+        stream.text_stream = iter(["Why ", "there?"])
+        stream.current_message_snapshot.usage = MagicMock(
+            input_tokens=50, output_tokens=1, cache_creation_input_tokens=0, cache_read_input_tokens=0
+        )
+
+        client = ClaudeClient(api_key="test-key")
+        chunks = client.stream_message([{"role": "user", "content": "Hi"}], "System")
+        next(chunks)
+        chunks.close()
+
+        assert client.usage_snapshot()["calls"] == 1
+        assert client.usage_snapshot()["input_tokens"] == 50
+        stream.get_final_message.assert_not_called()
+
+    @patch("ie_capstone.llm.client.anthropic.Anthropic")
+    def test_snapshot_is_a_copy(self, mock_anthropic):
+        client = ClaudeClient(api_key="test-key")
+        snapshot = client.usage_snapshot()
+        snapshot["calls"] = 5
+        assert client.usage_snapshot()["calls"] == 0
+
+
+class TestCachedSystemPrompt:
+    def test_marks_block_reaching_the_minimum(self):
+        rules = "rule " * 5000
+        assert cached_system_prompt(rules) == [{"type": "text", "text": rules, "cache_control": {"type": "ephemeral"}}]
+
+    def test_short_prompt_is_not_marked(self):
+        assert cached_system_prompt("Judge rules") == [{"type": "text", "text": "Judge rules"}]
+
+    def test_minimum_counts_the_blocks_before(self):
+        blocks = cached_system_prompt("rule " * 3000, "fact " * 3000)
+        assert "cache_control" not in blocks[0]
+        assert blocks[1]["cache_control"] == {"type": "ephemeral"}
+
+    def test_minimum_depends_on_the_model(self):
+        rules = "rule " * 2000
+        assert "cache_control" not in cached_system_prompt(rules)[0]
+        assert "cache_control" in cached_system_prompt(rules, model="other-model")[0]
+
+    @patch("ie_capstone.llm.client.anthropic.Anthropic")
+    def test_send_message_accepts_system_blocks(self, mock_anthropic):
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="Response")]
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+
+        client = ClaudeClient(api_key="test-key")
+        client.send_single_message("Hello", cached_system_prompt("System " * 5000))
+
+        system = mock_anthropic.return_value.messages.create.call_args.kwargs["system"]
+        assert system[0]["cache_control"] == {"type": "ephemeral"}
+
+
+class TestOnResponse:
+    @patch("ie_capstone.llm.client.anthropic.Anthropic")
+    def test_callback_receives_raw_response(self, mock_anthropic):
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="Response")]
+        mock_anthropic.return_value.messages.create.return_value = mock_response
+        received = []
+
+        client = ClaudeClient(api_key="test-key")
+        client.send_single_message("Hello", "System", on_response=received.append)
+
+        assert received == [mock_response]
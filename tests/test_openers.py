@@ -0,0 +1,119 @@
+"""Tests for the opening reply bank."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from ie_capstone.llm.openers import (
+    CANONICAL_OPENERS,
+    OpeningBank,
+    OpeningReply,
+    build_opening_bank,
+    dialogue_opening,
+    generate_opening_replies,
+    load_opening_bank,
+    save_opening_bank,
+)
+from ie_capstone.models import Problem
+
+DIALOGUE = """User: Hi! My code fails the first test. Can you help?
+Assistant: Sure. Why should the first test return 1?
+\t<alt>Sure. What differs between the first test and the others?
+User: Because 5 is at position 1.
+Assistant: Good. Does your code check for that?"""
+
+
+@pytest.fixture
+def problem():
+    return Problem(
+        id=1,
+        description="Write a search function",
+        buggy_code="def search(x, seq):\n  return 0",
+        bug_description="Bug",
+        expected_fixes=["Fix"],
+        unit_tests=[],
+        example_dialogue=DIALOGUE,
+    )
+
+
+def make_bank(**kwargs):
+    entries = [
+        OpeningReply("neutral", 1, "첫 번째 테스트는 무엇을 반환해야 합니까?", list(CANONICAL_OPENERS), vetted=True),
+        OpeningReply("neutral", 1, "검토되지 않은 답변", list(CANONICAL_OPENERS)),
+    ]
+    return OpeningBank(entries, **kwargs)
+
+
+class TestDialogueOpening:
+    def test_first_exchange_with_alternatives(self, problem):
+        opener, replies = dialogue_opening(problem)
+        assert opener == "Hi! My code fails the first test. Can you help?"
+        assert replies == [
+            "Sure. Why should the first test return 1?",
+            "Sure. What differs between the first test and the others?",
+        ]
+
+    def test_no_dialogue(self, problem):
+        problem.example_dialogue = ""
+        assert dialogue_opening(problem) == (None, [])
+
+
+class TestOpeningBank:
+    def test_matches_paraphrase_of_opener(self, problem):
+        reply = make_bank().match("neutral", problem, "이 코드에 뭐가 문제인가요", problem.buggy_code)
+        assert reply == "첫 번째 테스트는 무엇을 반환해야 합니까?"
+
+    def test_unrelated_message_falls_back(self, problem):
+        assert make_bank().match("neutral", problem, "3번 줄을 <=로 바꾸면 되나요?", problem.buggy_code) is None
+
+    def test_edited_code_falls_back(self, problem):
+        assert make_bank().match("neutral", problem, "버그가 어디에 있나요?", "def search(x, seq):\n  return 1") is None
+
+    def test_unvetted_replies_are_not_served(self, problem):
+        bank = OpeningBank([OpeningReply("neutral", 1, "검토되지 않은 답변", list(CANONICAL_OPENERS))])
+        assert bank.match("neutral", problem, "버그가 어디에 있나요?", None) is None
+
+    def test_other_persona_has_no_reply(self, problem):
+        assert make_bank().match("emotional", problem, "버그가 어디에 있나요?", None) is None
+
+    def test_threshold(self, problem):
+        assert make_bank(threshold=1.0).match("neutral", problem, "이 코드에 뭐가 문제인가요", None) is None
+
+
+class TestBankFile:
+    def test_round_trip(self, tmp_path):
+        entries = [OpeningReply("emotional", 2, "좋아요! 😊", ["도와주세요"], vetted=True)]
+        path = save_opening_bank(entries, tmp_path / "bank.json")
+        assert load_opening_bank(path) == entries
+
+    def test_missing_file(self, tmp_path):
+        assert load_opening_bank(tmp_path / "missing.json") == []
+
+
+class TestGenerate:
+    def test_generates_unvetted_replies_with_dialogue_guidance(self, problem):
+        client = MagicMock()
+        client.send_message.return_value = "  어떤 값이 반환되어야 할까요?  "
+        entries = generate_opening_replies(client, "neutral", problem, count=2)
+
+        assert [entry.reply for entry in entries] == ["어떤 값이 반환되어야 할까요?"] * 2
+        assert not any(entry.vetted for entry in entries)
+        assert "Hi! My code fails the first test. Can you help?" in entries[0].openers
+        call_kwargs = client.send_message.call_args.kwargs
+        assert "Why should the first test return 1?" in call_kwargs["system_prompt"][2]["text"]
+        assert problem.buggy_code in call_kwargs["messages"][0]["content"]
+
+    def test_build_keeps_existing_pairs(self, problem):
+        client = MagicMock()
+        client.send_message.return_value = "질문"
+        existing = [OpeningReply("neutral", 1, "기존 답변", [], vetted=True)]
+        entries = build_opening_bank(client, [problem], existing, count=1)
+
+        assert entries[0] == existing[0]
+        assert [(entry.persona, entry.problem_id) for entry in entries[1:]] == [("emotional", 1)]
+
+    def test_build_force_regenerates(self, problem):
+        client = MagicMock()
+        client.send_message.return_value = "질문"
+        existing = [OpeningReply("neutral", 1, "기존 답변", [], vetted=True)]
+        assert len(build_opening_bank(client, [problem], existing, count=1, force=True)) == 3
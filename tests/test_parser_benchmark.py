@@ -0,0 +1,49 @@
+"""Tests for the parser benchmark."""
+
+from ie_capstone.benchmarks.parser import (
+    SOCRATIC_TAGS,
+    run_benchmark,
+    synthetic_socratic_file,
+    synthetic_treeinstruct_file,
+)
+from ie_capstone.dataset.parser import extract_tag_content, extract_tags, parse_problem_file, parse_treeinstruct_file
+
+
+def test_synthetic_socratic_file_parses(tmp_path):
+    path = tmp_path / "1.txt"
+    path.write_text(synthetic_socratic_file(200), encoding="utf-8")
+    problem = parse_problem_file(path)
+
+    assert len(problem.buggy_code.split("\n")) == 200
+    assert problem.buggy_code.startswith("value_0 = compute(")
+    assert len(problem.unit_tests) == 20
+    assert len(problem.dialogue) == 41
+    assert problem.dialogue[-2].code.startswith("value_0 = compute(")
+
+
+def test_single_scan_matches_per_tag_lookup():
+    text = synthetic_socratic_file(100)
+    tags = extract_tags(text)
+    assert {name: tags.get(name, "") for name in SOCRATIC_TAGS} == {
+        name: extract_tag_content(text, name) for name in SOCRATIC_TAGS
+    }
+
+
+def test_synthetic_treeinstruct_file_parses(tmp_path):
+    path = tmp_path / "synthetic.py.txt"
+    path.write_text(synthetic_treeinstruct_file(50), encoding="utf-8")
+    problem = parse_treeinstruct_file(path, 4)
+
+    assert len(problem.buggy_code.split("\n")) == 50
+    assert problem.expected_fixes == ["Add a colon at the end of line 2."]
+
+
+def test_run_benchmark_times_every_measurement():
+    results = run_benchmark(lines=50, repeat=2)
+    assert set(results) == {
+        "extract_tags",
+        "extract_tag_content_per_tag",
+        "parse_problem_file",
+        "parse_treeinstruct_file",
+    }
+    assert all(0 <= timing["min"] <= timing["median"] for timing in results.values())
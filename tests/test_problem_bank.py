@@ -0,0 +1,178 @@
+"""Tests for the hot-reloaded problem bank."""
+
+import os
+import shutil
+import threading
+
+import pytest
+
+from ie_capstone.config import DATA_DIR
+from ie_capstone.dataset.bank import DatasetWatcher, ProblemBank, snapshot_files
+from ie_capstone.dataset.cache import ProblemCache
+from ie_capstone.dataset.parser import ProblemSource
+from ie_capstone.llm.leak_guard import leak_matcher
+from ie_capstone.llm.prompt_registry import PromptRegistry
+from ie_capstone.models import Problem
+
+
+def _problem(problem_id, description="Problem"):
+    return Problem(
+        id=problem_id,
+        description=f"{description} {problem_id}",
+        buggy_code="def f(x):\n    return x < 3",
+        bug_description="Bug",
+        expected_fixes=["Replace `<` with `<=` on line 2."],
+        unit_tests=[],
+    )
+
+
+@pytest.fixture
+def registry():
+    return PromptRegistry()
+
+
+class TestProblemBank:
+    def test_snapshot_is_kept_after_swap(self, registry):
+        bank = ProblemBank([_problem(1), _problem(2)], registry)
+        snapshot = bank.problems
+        bank.swap([_problem(1, "Edited"), _problem(2)])
+
+        assert snapshot[0].description == "Problem 1"
+        assert bank.problems[0].description == "Edited 1"
+        assert bank.version == 1
+
+    def test_swap_returns_old_versions_of_changed_problems(self, registry):
+        old = [_problem(1), _problem(2)]
+        bank = ProblemBank(old, registry)
+        assert bank.swap([_problem(1), _problem(2, "Edited")]) == [old[1]]
+
+    def test_unchanged_reload_is_not_swapped(self, registry):
+        bank = ProblemBank([_problem(1)], registry)
+        assert bank.swap([_problem(1)]) == []
+        assert bank.version == 0
+
+    def test_prompts_of_old_content_are_discarded(self, registry):
+        old = _problem(1)
+        bank = ProblemBank([old], registry)
+        held = registry.get("neutral", old)
+        edited = _problem(1, "Edited")
+        bank.swap([edited])
+
+        assert len(registry) == 2
+        assert "Edited 1" in registry.get("neutral", edited).text
+        assert "Problem 1" in held.text  # Sessions holding the old prompt keep it
+
+    def test_leak_matchers_are_rebuilt(self, registry):
+        problem = _problem(1)
+        bank = ProblemBank([problem], registry)
+        before = leak_matcher(problem)
+        bank.swap([_problem(1, "Edited")])
+        assert leak_matcher(problem) is not before
+
+    def test_listeners_get_new_and_changed_problems(self, registry):
+        old = _problem(1)
+        bank = ProblemBank([old], registry)
+        calls = []
+        bank.subscribe(lambda problems, changed: calls.append((problems, changed)))
+        edited = _problem(1, "Edited")
+        bank.swap([edited])
+        bank.swap([edited])
+
+        assert calls == [([edited], [old])]
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "1.txt"
+    shutil.copy(DATA_DIR / "1.txt", path)
+    return path
+
+
+def make_watcher(dataset, tmp_path, registry):
+    cache = ProblemCache(tmp_path / "problems.json", registry=registry)
+    sources = [ProblemSource(dataset, 1, "socratic")]
+
+    def loader():
+        return cache.load(sources)
+
+    bank = ProblemBank(loader(), registry)
+    return DatasetWatcher(bank, loader=loader, paths=lambda: [dataset], interval=0.01), cache
+
+
+def _edit(path, old, new):
+    path.write_text(path.read_text(encoding="utf-8").replace(old, new), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestDatasetWatcher:
+    def test_unchanged_files_are_not_reloaded(self, dataset, tmp_path, registry):
+        watcher, _ = make_watcher(dataset, tmp_path, registry)
+        assert watcher.poll() == []
+        assert watcher.reloads == 0
+
+    def test_edit_is_swapped_in(self, dataset, tmp_path, registry):
+        watcher, cache = make_watcher(dataset, tmp_path, registry)
+        old = watcher.bank.problems[0]
+        _edit(dataset, "<bug_desc>", "<bug_desc>\nEdited.")
+
+        assert watcher.poll() == [old]
+        assert cache.reparsed == [ProblemSource(dataset, 1, "socratic")]
+        assert watcher.bank.problems[0].bug_description.startswith("Edited.")
+        assert watcher.reloads == 1
+
+    def test_touch_without_edit_swaps_nothing(self, dataset, tmp_path, registry):
+        watcher, cache = make_watcher(dataset, tmp_path, registry)
+        _edit(dataset, "<bug_desc>", "<bug_desc>")
+
+        assert watcher.poll() == []
+        assert cache.reparsed == []
+        assert watcher.bank.version == 0
+
+    def test_broken_file_is_retried(self, dataset, tmp_path, registry, caplog):
+        watcher, _ = make_watcher(dataset, tmp_path, registry)
+        content = dataset.read_text(encoding="utf-8")
+        _edit(dataset, content, "half-saved")
+        assert watcher.poll() == []
+        assert "missing IDs [1]" in caplog.text
+        assert watcher.bank.problems[0].description  # The old version stays
+
+        _edit(dataset, "half-saved", content.replace("<bug_desc>", "<bug_desc>\nFixed."))
+        assert len(watcher.poll()) == 1
+        assert watcher.bank.problems[0].bug_description.startswith("Fixed.")
+
+    def test_background_polling(self, dataset, tmp_path, registry):
+        watcher, _ = make_watcher(dataset, tmp_path, registry)
+        watcher.start()
+        try:
+            _edit(dataset, "<bug_desc>", "<bug_desc>\nEdited.")
+            for _ in range(500):
+                if watcher.reloads:
+                    break
+                watcher._stop.wait(0.01)
+        finally:
+            watcher.stop()
+        assert watcher.bank.problems[0].bug_description.startswith("Edited.")
+
+    def test_failed_background_reload_is_logged(self, dataset, tmp_path, registry, caplog):
+        watcher, _ = make_watcher(dataset, tmp_path, registry)
+        polled = threading.Event()
+
+        def loader():
+            polled.set()
+            raise ValueError("Malformed problem file")
+
+        watcher.loader = loader
+        _edit(dataset, "<bug_desc>", "<bug_desc>\nEdited.")
+        watcher.start()
+        try:
+            assert polled.wait(5)
+        finally:
+            watcher.stop()
+        assert "Dataset reload failed" in caplog.text
+        assert "Malformed problem file" in caplog.text
+
+
+def test_snapshot_files_marks_missing_files(tmp_path):
+    missing = tmp_path / "missing.txt"
+    assert snapshot_files([missing]) == ((str(missing), None, None),)
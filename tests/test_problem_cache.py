@@ -0,0 +1,203 @@
+"""Tests for the parsed problem cache."""
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from ie_capstone.config import DATA_DIR, TREEINSTRUCT_DATA_DIR
+from ie_capstone.dataset.cache import _PRODUCERS, ProblemCache, cache_version, problem_from_dict, problem_to_dict
+from ie_capstone.dataset.parser import ProblemSource, load_all_problems
+from ie_capstone.dataset.reference import normalize_code
+from ie_capstone.dataset.testgen import unit_tests_path_for
+from ie_capstone.llm.prompt_registry import PromptRegistry
+from ie_capstone.llm.prompts import get_socratic_prompt
+
+
+@pytest.fixture
+def sources(tmp_path):
+    socratic = tmp_path / "1.txt"
+    shutil.copy(DATA_DIR / "1.txt", socratic)
+    treeinstruct = tmp_path / "9-palindrome-number.py.txt"
+    shutil.copy(TREEINSTRUCT_DATA_DIR / treeinstruct.name, treeinstruct)
+    shutil.copy(unit_tests_path_for(TREEINSTRUCT_DATA_DIR / treeinstruct.name), unit_tests_path_for(treeinstruct))
+    return [ProblemSource(socratic, 1, "socratic"), ProblemSource(treeinstruct, 4, "treeinstruct")]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ProblemCache(tmp_path / "cache" / "problems.json", registry=PromptRegistry())
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestProblemCache:
+    def test_first_load_parses_and_writes(self, cache, sources):
+        problems = cache.load(sources)
+        assert [problem.id for problem in problems] == [1, 4]
+        assert cache.reparsed == sources
+        assert cache.path.exists()
+
+    def test_second_load_reads_cache(self, cache, sources):
+        parsed = cache.load(sources)
+        loaded = cache.load(sources)
+        assert cache.reparsed == []
+        assert loaded == parsed
+
+    def test_cached_problems_equal_parsed(self, cache, sources):
+        cache.load(sources)
+        assert cache.load(sources) == [source.parse() for source in sources]
+
+    def test_only_changed_file_is_reparsed(self, cache, sources):
+        cache.load(sources)
+        path = sources[0].path
+        path.write_text(path.read_text(encoding="utf-8").replace("<bug_desc>", "<bug_desc>\nEdited."), encoding="utf-8")
+        problems = cache.load(sources)
+        assert cache.reparsed == [sources[0]]
+        assert problems[0].bug_description.startswith("Edited.")
+
+    def test_touched_file_is_not_reparsed(self, cache, sources):
+        cache.load(sources)
+        _bump_mtime(sources[0].path)
+        cache.load(sources)
+        assert cache.reparsed == []
+        # The new mtime is recorded, so the file is not hashed again
+        recorded = json.loads(cache.path.read_text(encoding="utf-8"))["entries"][str(sources[0].path)]["files"]
+        assert recorded[str(sources[0].path)]["mtime_ns"] == sources[0].path.stat().st_mtime_ns
+
+    def test_generated_tests_are_a_dependency(self, cache, sources):
+        cache.load(sources)
+        tests_path = unit_tests_path_for(sources[1].path)
+        tests_path.write_text("assert True\n", encoding="utf-8")
+        problems = cache.load(sources)
+        assert cache.reparsed == [sources[1]]
+        assert problems[1].unit_tests == ["assert True"]
+
+    def test_removed_generated_tests_are_noticed(self, cache, sources):
+        cache.load(sources)
+        unit_tests_path_for(sources[1].path).unlink()
+        problems = cache.load(sources)
+        assert cache.reparsed == [sources[1]]
+        assert problems[1].unit_tests == []
+
+    def test_changed_id_is_reparsed(self, cache, sources):
+        cache.load(sources)
+        moved = [sources[0], ProblemSource(sources[1].path, 5, "treeinstruct")]
+        problems = cache.load(moved)
+        assert cache.reparsed == [moved[1]]
+        assert problems[1].id == 5
+
+    def test_other_version_is_ignored(self, cache, sources):
+        cache.load(sources)
+        data = json.loads(cache.path.read_text(encoding="utf-8"))
+        data["version"] = "old"
+        cache.path.write_text(json.dumps(data), encoding="utf-8")
+        cache.load(sources)
+        assert cache.reparsed == sources
+
+    @pytest.mark.parametrize(
+        "corrupt",
+        [
+            lambda entry: entry["problem"].pop("buggy_code"),
+            lambda entry: entry["problem"].update(dialogue=None),
+            lambda entry: entry.update(prompts=[]),
+            lambda entry: entry.pop("files"),
+        ],
+    )
+    def test_malformed_entry_is_reparsed(self, cache, sources, corrupt):
+        cache.load(sources)
+        data = json.loads(cache.path.read_text(encoding="utf-8"))
+        corrupt(data["entries"][str(sources[0].path)])
+        cache.path.write_text(json.dumps(data), encoding="utf-8")
+        assert cache.load(sources) == [source.parse() for source in sources]
+        assert cache.reparsed == [sources[0]]
+
+    def test_version_covers_the_model_and_python(self):
+        assert "models.py" in {Path(sys.modules[p.__module__].__file__).name for p in _PRODUCERS}
+        with patch("ie_capstone.dataset.cache.platform.python_version", return_value="0.0.0"):
+            cache_version.cache_clear()
+            other = cache_version()
+        cache_version.cache_clear()
+        assert other != cache_version()
+
+    def test_corrupt_cache_is_rebuilt(self, cache, sources):
+        cache.path.parent.mkdir()
+        cache.path.write_text("{not json", encoding="utf-8")
+        assert cache.load(sources) == [source.parse() for source in sources]
+        assert cache.load(sources) and cache.reparsed == []
+
+    def test_rebuild_reparses_everything(self, cache, sources):
+        cache.load(sources)
+        cache.load(sources, rebuild=True)
+        assert cache.reparsed == sources
+
+    def test_unwritable_cache_still_loads(self, tmp_path, sources):
+        blocker = tmp_path / "blocker"
+        blocker.write_text("", encoding="utf-8")
+        cache = ProblemCache(blocker / "problems.json", registry=PromptRegistry())
+        assert len(cache.load(sources)) == 2
+
+    def test_dropped_sources_leave_the_cache(self, cache, sources):
+        cache.load(sources)
+        cache.load(sources[:1])
+        entries = json.loads(cache.path.read_text(encoding="utf-8"))["entries"]
+        assert list(entries) == [str(sources[0].path)]
+
+
+class TestDerivedArtifacts:
+    def test_cached_prompts_seed_the_registry(self, tmp_path, sources):
+        path = tmp_path / "problems.json"
+        ProblemCache(path, registry=PromptRegistry()).load(sources)
+        registry = PromptRegistry()
+        problems = ProblemCache(path, registry=registry).load(sources)
+        assert len(registry) == 4
+        prompt = registry.get("emotional", problems[0])
+        assert prompt.text == get_socratic_prompt("emotional", problems[0])
+
+    def test_normalized_buggy_code_is_cached(self, cache, sources):
+        cache.load(sources)
+        entry = json.loads(cache.path.read_text(encoding="utf-8"))["entries"][str(sources[0].path)]
+        problem = sources[0].parse()
+        assert entry["normalized_buggy_code"] == normalize_code(problem.buggy_code)
+
+    def test_problem_dict_roundtrip(self, sources):
+        problem = sources[0].parse()
+        assert problem.dialogue
+        assert problem_from_dict(json.loads(json.dumps(problem_to_dict(problem)))) == problem
+
+
+class TestLoadAllProblems:
+    def test_cached_load_matches_parsing(self):
+        assert load_all_problems(use_cache=True) == load_all_problems(use_cache=False)
+
+    def test_broken_experiment_file_fails_loudly(self, tmp_path, sources, monkeypatch):
+        sources[0].path.write_text("", encoding="utf-8")
+        monkeypatch.setattr("ie_capstone.dataset.parser.problem_sources", lambda: sources)
+        with pytest.raises(ValueError, match=r"1\.txt"):
+            load_all_problems(use_cache=False)
+
+
+class TestStreaming:
+    def test_malformed_files_are_skipped_and_reported(self, tmp_path, cache, sources):
+        broken = tmp_path / "broken.txt"
+        broken.write_text("no tags here", encoding="utf-8")
+        problems = cache.load([*sources, ProblemSource(broken, 1000, "socratic")])
+        assert [problem.id for problem in problems] == [1, 4]
+        assert [error.path for error in cache.errors] == [broken]
+        assert "Malformed" in cache.errors[0].error
+
+    def test_cached_problems_stream_first(self, cache, sources):
+        cache.load(sources)
+        sources[0].path.write_text(sources[0].path.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+        assert [problem.id for problem in cache.iter_load(sources)] == [4, 1]
+
+    def test_worker_processes_parse_the_same_problems(self, tmp_path, sources):
+        pooled = ProblemCache(tmp_path / "pooled.json", registry=PromptRegistry()).load(sources, workers=2)
+        assert pooled == [source.parse() for source in sources]
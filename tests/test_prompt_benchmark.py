@@ -0,0 +1,101 @@
+"""Tests for the prompt token budget analyzer."""
+
+import pytest
+
+from ie_capstone.benchmarks import prompts as prompt_benchmark
+from ie_capstone.benchmarks.prompts import (
+    TEMPLATE_SECTION,
+    analyze_prompts,
+    estimate_tokens,
+    format_report,
+    judge_prompt_budget,
+    template_sections,
+    tutor_prompt_budget,
+)
+from ie_capstone.dataset.parser import load_all_problems
+from ie_capstone.llm.prompts import get_judge_prompt, get_socratic_prompt
+from ie_capstone.models import Problem
+
+
+@pytest.fixture
+def problem():
+    return Problem(
+        id=1,
+        description="Write a search function",
+        buggy_code="def search(x, seq):\n    return 0",
+        bug_description="Always returns 0",
+        expected_fixes=["Return the index"],
+        unit_tests=["assert search(5, [-1, 5]) == 1"],
+    )
+
+
+class TestEstimateTokens:
+    def test_empty(self):
+        assert estimate_tokens("") == 0
+
+    def test_hangul_costs_a_token_per_syllable(self):
+        assert estimate_tokens("안녕하세요") == 5
+
+    def test_long_words_cost_more(self):
+        assert estimate_tokens("a") == 1
+        assert estimate_tokens("evaluation") == 3
+
+    def test_code_counts_symbols_and_indentation(self):
+        assert estimate_tokens("if x:\n    return 1") == 8
+
+    def test_emoji_cost_more_than_ascii_symbols(self):
+        assert estimate_tokens("🎉") > estimate_tokens("!")
+
+
+class TestSections:
+    def test_template_sections_cover_the_rendered_text(self):
+        sections = template_sections("A {x} B {y}", x="1", y="22")
+        assert sections == {TEMPLATE_SECTION: "A  B ", "x": "1", "y": "22"}
+
+    def test_tutor_sections(self, problem):
+        budget = tutor_prompt_budget("neutral", problem)
+        assert set(budget.sections) == {
+            "persona",
+            TEMPLATE_SECTION,
+            "problem_description",
+            "buggy_code",
+            "bug_description",
+            "expected_fix",
+            "unit_tests",
+            "closing",
+        }
+        assert budget.sections["buggy_code"] == estimate_tokens(problem.buggy_code)
+
+    def test_tutor_total_is_close_to_rendered_prompt(self, problem):
+        budget = tutor_prompt_budget("emotional", problem)
+        assert budget.total == pytest.approx(estimate_tokens(get_socratic_prompt("emotional", problem)), rel=0.02)
+
+    def test_judge_total_is_close_to_rendered_prompt(self, problem):
+        budget = judge_prompt_budget(problem, structured=True)
+        assert budget.prompt == "judge:structured"
+        assert budget.total == pytest.approx(estimate_tokens(get_judge_prompt(problem, structured=True)), rel=0.02)
+
+    def test_analyze_covers_every_prompt(self, problem):
+        prompts = [budget.prompt for budget in analyze_prompts([problem])]
+        assert prompts == ["tutor:neutral", "tutor:emotional", "judge", "judge:structured"]
+
+
+class TestBudget:
+    def test_over_budget(self, problem, monkeypatch):
+        monkeypatch.setattr(prompt_benchmark, "PROMPT_TOKEN_BUDGETS", {"tutor": 10})
+        tutor, _, judge, _ = analyze_prompts([problem])
+        assert tutor.over_budget
+        assert judge.budget is None and not judge.over_budget
+        assert "OVER BUDGET" in format_report([tutor])
+
+    def test_check_exits_when_over_budget(self, monkeypatch):
+        monkeypatch.setattr(prompt_benchmark, "PROMPT_TOKEN_BUDGETS", {"judge": 10})
+        with pytest.raises(SystemExit) as excinfo:
+            prompt_benchmark.main(["--check"])
+        assert excinfo.value.code == 1
+
+
+def test_dataset_prompts_are_within_budget():
+    """Regression benchmark: a prompt or problem edit must not outgrow PROMPT_TOKEN_BUDGETS."""
+    over = [budget for budget in analyze_prompts(load_all_problems()) if budget.over_budget]
+    assert not over, "\n" + format_report(over)
@@ -0,0 +1,84 @@
+"""Tests for the tutor prompt registry."""
+
+import pytest
+
+from ie_capstone.llm.prompt_registry import PromptRegistry, prompt_hash
+from ie_capstone.llm.prompts import get_socratic_prompt
+from ie_capstone.llm.socratic_lm import SocraticLM
+from ie_capstone.models import Problem
+
+
+@pytest.fixture
+def problems():
+    return [
+        Problem(
+            id=i,
+            description=f"Problem {i}",
+            buggy_code=f"def f{i}(): pass",
+            bug_description="Bug",
+            expected_fixes=["Fix"],
+            unit_tests=[],
+        )
+        for i in range(1, 4)
+    ]
+
+
+class TestPromptRegistry:
+    def test_register_renders_every_pair(self, problems):
+        registry = PromptRegistry()
+        registry.register(problems)
+        assert len(registry) == 6
+
+    def test_rendered_prompt_matches_template(self, problems):
+        prompt = PromptRegistry().get("emotional", problems[0])
+        assert prompt.text == get_socratic_prompt("emotional", problems[0])
+        assert prompt.hash == prompt_hash(prompt.text)
+        assert (prompt.persona, prompt.problem_id) == ("emotional", 1)
+
+    def test_discard_drops_every_persona(self, problems):
+        registry = PromptRegistry()
+        registry.register(problems)
+        registry.discard(problems[0])
+        assert len(registry) == 4
+
+    def test_prompt_is_rendered_once(self, problems):
+        registry = PromptRegistry()
+        assert registry.get("neutral", problems[0]) is registry.get("neutral", problems[0])
+
+    def test_edited_problem_is_rendered_again(self, problems):
+        registry = PromptRegistry()
+        before = registry.get("neutral", problems[0])
+        problems[0].expected_fixes = ["Another fix"]
+        after = registry.get("neutral", problems[0])
+
+        assert after.hash != before.hash
+        assert "Another fix" in after.text
+
+    def test_prefix_is_shared_across_problems(self, problems):
+        registry = PromptRegistry()
+        blocks = [registry.get("neutral", problem).system_blocks() for problem in problems]
+
+        assert all(block[0] == blocks[0][0] for block in blocks)
+        assert len({block[1]["text"] for block in blocks}) == 3
+        assert all("cache_control" not in block for block in blocks[0])  # Shorter than the cacheable minimum
+
+    def test_hashes_differ_by_persona_and_problem(self, problems):
+        registry = PromptRegistry()
+        registry.register(problems)
+        hashes = {registry.get(persona, problem).hash for persona in ("neutral", "emotional") for problem in problems}
+        assert len(hashes) == 6
+
+    def test_clear(self, problems):
+        registry = PromptRegistry()
+        registry.register(problems)
+        registry.clear()
+        assert len(registry) == 0
+
+
+def test_tutor_exposes_prompt_hash(problems):
+    slm = SocraticLM(None, "neutral", problems[0])
+    first = slm.prompt_hash
+    slm.set_problem(problems[1])
+
+    assert first == prompt_hash(get_socratic_prompt("neutral", problems[0]))
+    assert slm.prompt_hash == prompt_hash(get_socratic_prompt("neutral", problems[1]))
@@ -1,6 +1,17 @@
 """Tests for prompt generation."""
 
-from ie_capstone.llm.prompts import get_judge_prompt, get_socratic_prompt
+import pytest
+
+from ie_capstone.llm.prompts import (
+    TUTOR_CODE_SNAPSHOT,
+    collapse_tutor_code,
+    format_code_diff,
+    get_judge_prompt,
+    get_judge_user_message,
+    get_socratic_prompt,
+    get_socratic_prompt_parts,
+    get_tutor_user_message,
+)
 from ie_capstone.models import Problem
 
 
@@ -46,6 +57,21 @@ class TestGetSocraticPrompt:
         assert "절대" in neutral
         assert "절대" in emotional
 
+    def test_persona_instructions_come_before_problem_section(self):
+        prefix, suffix = get_socratic_prompt_parts("neutral", self.problem)
+        other = Problem(
+            id=2,
+            description="Other problem",
+            buggy_code="def f(): pass",
+            bug_description="Bug",
+            expected_fixes=["Fix"],
+            unit_tests=[],
+        )
+        assert get_socratic_prompt_parts("neutral", other)[0] == prefix
+        assert "Write a search function" not in prefix
+        assert suffix.startswith("문제 설명:\nWrite a search function")
+        assert get_socratic_prompt("neutral", self.problem) == f"{prefix}\n\n{suffix}"
+
 
 class TestGetJudgePrompt:
     def setup_method(self):
@@ -59,15 +85,21 @@ class TestGetJudgePrompt:
         )
 
     def test_judge_prompt_contains_all_sections(self):
-        prompt = get_judge_prompt(self.problem, "def foo(): return 1")
+        prompt = get_judge_prompt(self.problem)
         assert "def foo(): return 0" in prompt  # Original buggy code
         assert "Returns wrong value" in prompt  # Bug description
         assert "return 1" in prompt  # Expected fix
-        assert "def foo(): return 1" in prompt  # Student code
         assert "assert foo() == 1" in prompt  # Unit tests
 
+    def test_student_code_is_in_user_message_only(self):
+        assert "def foo(): return 1" not in get_judge_prompt(self.problem)
+        assert "def foo(): return 1" in get_judge_user_message(self.problem, "def foo(): return 1")
+
+    def test_judge_prompt_is_shared_by_submissions(self):
+        assert get_judge_prompt(self.problem) == get_judge_prompt(self.problem)
+
     def test_judge_prompt_asks_for_correct_or_incorrect(self):
-        prompt = get_judge_prompt(self.problem, "def foo(): return 1")
+        prompt = get_judge_prompt(self.problem)
         assert "CORRECT" in prompt
         assert "INCORRECT" in prompt
 
@@ -80,7 +112,114 @@ class TestGetJudgePrompt:
             expected_fixes=["Fix 1", "Fix 2", "Fix 3"],
             unit_tests=["test1", "test2"],
         )
-        prompt = get_judge_prompt(problem, "student code")
+        prompt = get_judge_prompt(problem)
         assert "Fix 1" in prompt
         assert "Fix 2" in prompt
         assert "Fix 3" in prompt
+
+    def test_judge_prompt_asks_for_bare_verdict_by_default(self):
+        prompt = get_judge_prompt(self.problem)
+        assert 'Respond with ONLY "CORRECT"' in prompt
+        assert "confidence" not in prompt
+
+    def test_structured_judge_prompt_asks_for_confidence(self):
+        prompt = get_judge_prompt(self.problem, structured=True)
+        assert '"confidence"' in prompt
+        assert "def foo(): return 0" in prompt
+
+
+BUGGY_SEARCH = "\n".join([
+    "def search(x, seq):",
+    "    for i in range(len(seq)):",
+    "        if x < seq[i]:",
+    "            return i",
+    "    return len(seq)",
+])
+
+DOCUMENTED_SEARCH = "\n".join([
+    "def search(x, seq):",
+    '    """Return the index where x should be inserted to keep seq sorted."""',
+    "    if not seq:",
+    "        return 0",
+    "    for i in range(len(seq)):",
+    "        if x < seq[i]:",
+    "            return i",
+    "    return len(seq)",
+])
+
+
+class TestFormatCodeDiff:
+    def test_numbers_lines_by_buggy_code(self):
+        diff = format_code_diff(BUGGY_SEARCH, BUGGY_SEARCH.replace("x < seq", "x <= seq"), context=1)
+        assert diff.splitlines() == [
+            "@@ -2,3 +2,3 @@",
+            "    2     for i in range(len(seq)):",
+            "-   3         if x < seq[i]:",
+            "+             if x <= seq[i]:",
+            "    4             return i",
+        ]
+
+    def test_context_limits_unchanged_lines(self):
+        student = BUGGY_SEARCH.replace("x < seq", "x <= seq")
+        assert "def search" not in format_code_diff(BUGGY_SEARCH, student, context=1)
+        assert "def search" in format_code_diff(BUGGY_SEARCH, student, context=3)
+
+    def test_added_lines_keep_later_numbering(self):
+        student = BUGGY_SEARCH.replace("    return len(seq)", "    print(seq)\n    return len(seq)")
+        diff = format_code_diff(BUGGY_SEARCH, student, context=1)
+        assert "+         print(seq)" in diff
+        assert "    5     return len(seq)" in diff
+
+    def test_identical_code(self):
+        assert format_code_diff(BUGGY_SEARCH, BUGGY_SEARCH) == "(no changes)"
+
+
+class TestDiffJudgePrompt:
+    def setup_method(self):
+        self.problem = Problem(
+            id=1,
+            description="Search",
+            buggy_code=DOCUMENTED_SEARCH,
+            bug_description="Wrong comparison",
+            expected_fixes=["Replace `<` with `<=` on line 6"],
+            unit_tests=["assert search(5, [1, 5]) == 1"],
+        )
+
+    def test_diff_message_sends_only_changes(self):
+        message = get_judge_user_message(self.problem, DOCUMENTED_SEARCH.replace("x < seq", "x <= seq"), variant="diff")
+        assert "-   6         if x < seq[i]:" in message
+        assert "def search(x, seq):" not in message
+
+    def test_diff_message_is_shorter(self):
+        student = DOCUMENTED_SEARCH.replace("x < seq", "x <= seq")
+        full = get_judge_user_message(self.problem, student)
+        assert len(get_judge_user_message(self.problem, student, variant="diff")) < len(full)
+
+    def test_rewrite_falls_back_to_full_code(self):
+        student = "def search(x, seq):\n    return len([v for v in seq if v < x])"
+        assert get_judge_user_message(self.problem, student, variant="diff") == get_judge_user_message(
+            self.problem, student
+        )
+
+    def test_unknown_variant(self):
+        with pytest.raises(ValueError):
+            get_judge_user_message(self.problem, BUGGY_SEARCH, variant="summary")
+
+
+class TestTutorUserMessage:
+    def test_without_code(self):
+        assert get_tutor_user_message("Why?") == "Why?"
+
+    def test_with_code_section(self):
+        message = get_tutor_user_message("Why?", TUTOR_CODE_SNAPSHOT.format(code="x = 1"))
+        assert message == "[학생의 현재 코드]\n```python\nx = 1\n```\n\n[학생의 메시지]\nWhy?"
+
+    def test_collapse_keeps_message(self):
+        message = get_tutor_user_message("Why?", TUTOR_CODE_SNAPSHOT.format(code="x = 1"))
+        collapsed = collapse_tutor_code(message)
+        assert "x = 1" not in collapsed
+        assert collapsed.startswith("[학생의 이전 코드]")
+        assert collapsed.endswith("[학생의 메시지]\nWhy?")
+
+    def test_collapse_without_code_section(self):
+        assert collapse_tutor_code("Why?") == "Why?"
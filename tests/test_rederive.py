@@ -0,0 +1,77 @@
+"""Tests for re-deriving verdicts from stored judge calls."""
+
+import json
+from dataclasses import asdict
+
+from ie_capstone.llm.rederive import rederive_logs, rederive_verdict
+from ie_capstone.models import JudgeCall
+
+
+def make_call(response: str, stage: str = "llm") -> JudgeCall:
+    return JudgeCall(stage=stage, model="claude-test", temperature=0.3, response=response, latency_seconds=1.0)
+
+
+class TestRederiveVerdict:
+    def test_majority_of_llm_calls(self):
+        verdict = rederive_verdict([make_call("CORRECT"), make_call("INCORRECT"), make_call("CORRECT")])
+        assert verdict.is_correct is True
+        assert verdict.scores == [1.0, 0.0, 1.0]
+        assert verdict.decided_by == "llm"
+
+    def test_threshold_change(self):
+        calls = [make_call("CORRECT"), make_call("INCORRECT")]
+        assert rederive_verdict(calls).is_correct is True
+        assert rederive_verdict(calls, threshold=0.75).is_correct is False
+
+    def test_confident_fast_votes_decide(self):
+        calls = [make_call('{"verdict": "INCORRECT", "confidence": 0.9}', "fast")] * 2
+        verdict = rederive_verdict(calls)
+        assert verdict.is_correct is False
+        assert verdict.decided_by == "fast"
+
+    def test_stricter_confidence_without_primary_calls_is_undecidable(self):
+        calls = [make_call('{"verdict": "CORRECT", "confidence": 0.85}', "fast")] * 2
+        assert rederive_verdict(calls, fast_min_confidence=0.9) is None
+
+    def test_escalated_fast_votes_use_primary_calls(self):
+        calls = [
+            make_call('{"verdict": "CORRECT", "confidence": 0.9}', "fast"),
+            make_call('{"verdict": "INCORRECT", "confidence": 0.9}', "fast"),
+            make_call("CORRECT", "primary"),
+        ]
+        verdict = rederive_verdict(calls)
+        assert verdict.is_correct is True
+        assert verdict.decided_by == "primary"
+
+    def test_early_stopped_fast_tier_that_would_continue_is_undecidable(self):
+        calls = [make_call('{"verdict": "CORRECT", "confidence": 0.5}', "fast"), make_call("INCORRECT", "primary")]
+        # With the lower confidence the live judge would have asked for a second fast vote
+        assert rederive_verdict(calls, fast_min_confidence=0.4) is None
+
+    def test_early_stopped_fast_tier_still_escalates(self):
+        calls = [make_call('{"verdict": "CORRECT", "confidence": 0.5}', "fast"), make_call("INCORRECT", "primary")]
+        verdict = rederive_verdict(calls)
+        assert verdict.decided_by == "primary"
+        assert verdict.is_correct is False
+
+
+class TestRederiveLogs:
+    def test_reports_changed_and_skipped_attempts(self, tmp_path):
+        session = {
+            "session_id": "S1",
+            "problem_attempts": [
+                {
+                    "problem_id": 1,
+                    "is_correct": True,
+                    "judge_calls": [asdict(make_call("CORRECT")), asdict(make_call("INCORRECT"))],
+                },
+                {"problem_id": 2, "is_correct": True, "judge_decided_by": "reference_ast", "judge_calls": []},
+            ],
+        }
+        (tmp_path / "S1.json").write_text(json.dumps(session), encoding="utf-8")
+
+        results, counts = rederive_logs(tmp_path, threshold=0.75)
+
+        assert counts == {"rederived": 1, "skipped": 1}
+        assert results[0].original is True
+        assert results[0].rederived is False
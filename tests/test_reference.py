@@ -0,0 +1,158 @@
+"""Tests for reference-solution synthesis and AST matching."""
+
+from dataclasses import replace
+
+import pytest
+
+from ie_capstone.dataset.parser import load_all_problems
+from ie_capstone.dataset.reference import (
+    apply_fix,
+    apply_fixes,
+    load_reference_solutions,
+    matches_reference,
+    normalize_code,
+    problem_version,
+    replace_token,
+    save_reference_solutions,
+    synthesize_reference_solutions,
+)
+from ie_capstone.models import Problem
+
+
+@pytest.fixture
+def search_problem():
+    return Problem(
+        id=1,
+        description="Write a search function",
+        buggy_code="def search(x, seq):\n for i in range(len(seq)):\n   if x < seq[i]:\n     return i\n return len(seq)",
+        bug_description="Should use <= instead of <",
+        expected_fixes=["Replace `<` with `<=` on line 3"],
+        unit_tests=["assert search(5, [-1, 5, 8, 10, 12]) == 1", "assert search(55, [-99, -2, 0]) == 3"],
+    )
+
+
+class TestReplaceToken:
+    def test_replaces_operator(self):
+        assert replace_token("if x < seq[i]:", "<", "<=") == "if x <= seq[i]:"
+
+    def test_does_not_match_inside_longer_operator(self):
+        assert replace_token("if x <= y:", "<", "<=") is None
+
+    def test_does_not_match_inside_identifier(self):
+        assert replace_token("fact = fact * i", "i", "(i + 1)") == "fact = fact * (i + 1)"
+
+    def test_missing_token_returns_none(self):
+        assert replace_token("return x", "<", "<=") is None
+
+
+class TestApplyFix:
+    def test_backticked_replace(self, search_problem):
+        fixed = apply_fix(search_problem.buggy_code, "Replace `<` with `<=` on line 3")
+        assert "if x <= seq[i]:" in fixed
+
+    def test_bare_replace(self):
+        assert apply_fix("a\nif x <= 0:", "Replace <= with < on line 2.") == "a\nif x < 0:"
+
+    def test_multiple_lines(self):
+        code = 'if a = "N":\n  pass\nelif a = "E":\n  pass'
+        fixed = apply_fix(code, "Replace `=` with `==` on lines 1, and 3.")
+        assert fixed == 'if a == "N":\n  pass\nelif a == "E":\n  pass'
+
+    def test_add_colon(self):
+        assert apply_fix("while x > 0\n  x -= 1", "Add a colon at the end of line 1.") == "while x > 0:\n  x -= 1"
+
+    def test_unknown_fix_returns_none(self):
+        assert apply_fix("x = 1", "Insert a return statement after line 1.") is None
+
+    def test_line_out_of_range_returns_none(self):
+        assert apply_fix("x = 1", "Replace `1` with `2` on line 5.") is None
+
+    def test_apply_fixes_fails_if_any_fix_fails(self):
+        assert apply_fixes("x = 1", ["Replace `1` with `2` on line 1.", "Replace `3` with `4` on line 1."]) is None
+
+
+class TestNormalizeCode:
+    def test_ignores_formatting_and_comments(self):
+        a = "def f(x):\n    return x+1"
+        b = "def f( x ):\n  # add one\n  return (x + 1)"
+        assert normalize_code(a) == normalize_code(b)
+
+    def test_ignores_docstrings(self):
+        assert normalize_code('def f():\n    """Doc."""\n    return 1') == normalize_code("def f():\n    return 1")
+
+    def test_distinguishes_logic(self):
+        assert normalize_code("x < y") != normalize_code("x <= y")
+
+    def test_syntax_error_returns_none(self):
+        assert normalize_code("def f(:") is None
+
+
+class TestSynthesizeReferenceSolutions:
+    def test_single_fix(self, search_problem):
+        solutions = synthesize_reference_solutions(search_problem)
+        assert len(solutions) == 1
+        assert "x <= seq[i]" in solutions[0]
+
+    def test_alternative_fixes_verified_by_unit_tests(self):
+        problem = Problem(
+            id=2,
+            description="Factorial",
+            buggy_code="def factorial(n):\n    fact = 1\n    for i in range(n):\n        fact = fact * i\n    return fact",
+            bug_description="Multiplies by zero",
+            expected_fixes=[
+                "Replace `i` with `(i + 1)` in line 4.",
+                "Replace `range(n)` with `range(1, n + 1)` in line 3.",
+            ],
+            unit_tests=["assert factorial(3) == 6", "assert factorial(0) == 1"],
+        )
+        solutions = synthesize_reference_solutions(problem)
+        # Each fix alone is correct; applying both computes (n + 1)!
+        assert len(solutions) == 2
+
+    def test_without_unit_tests_uses_all_fixes(self):
+        problem = Problem(
+            id=4,
+            description="Loop",
+            buggy_code="while x > 0\n    x /= 10",
+            bug_description="Two bugs",
+            expected_fixes=["Add a colon at the end of line 1.", "Replace `x /= 10` with `x //= 10` on line 2."],
+            unit_tests=[],
+        )
+        assert synthesize_reference_solutions(problem) == ["while x > 0:\n    x //= 10"]
+
+
+class TestMatchesReference:
+    def test_matches_reformatted_solution(self, search_problem):
+        search_problem.reference_solutions = synthesize_reference_solutions(search_problem)
+        student = "def search(x, seq):\n    for i in range(len(seq)):\n        if x <= seq[i]:  # fixed\n            return i\n    return len(seq)\n"
+        assert matches_reference(search_problem, student) is True
+
+    def test_rejects_buggy_code(self, search_problem):
+        search_problem.reference_solutions = synthesize_reference_solutions(search_problem)
+        assert matches_reference(search_problem, search_problem.buggy_code) is False
+
+    def test_no_references(self, search_problem):
+        assert matches_reference(search_problem, search_problem.buggy_code) is False
+
+
+class TestProblemVersion:
+    def test_same_content_same_version(self, search_problem):
+        assert problem_version(search_problem) == problem_version(replace(search_problem))
+
+    def test_edit_changes_version(self, search_problem):
+        assert problem_version(search_problem) != problem_version(replace(search_problem, bug_description="Edited"))
+
+
+class TestStoredReferenceSolutions:
+    def test_save_and_load_roundtrip(self, tmp_path):
+        path = tmp_path / "refs.json"
+        save_reference_solutions({2: ["b"], 1: ["a"]}, path)
+        assert load_reference_solutions(path) == {1: ["a"], 2: ["b"]}
+
+    def test_missing_file_returns_empty(self, tmp_path):
+        assert load_reference_solutions(tmp_path / "missing.json") == {}
+
+    def test_all_dataset_problems_have_references(self):
+        for problem in load_all_problems():
+            assert problem.reference_solutions, f"Problem {problem.id} has no reference solution"
+            assert not matches_reference(problem, problem.buggy_code)
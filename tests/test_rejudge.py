@@ -0,0 +1,159 @@
+"""Tests for bulk offline re-judging."""
+
+import json
+from unittest.mock import MagicMock
+
+import anthropic
+import pytest
+
+from ie_capstone.llm.judge import LLMJudge
+from ie_capstone.llm.rejudge import (
+    BulkRejudger,
+    RejudgeState,
+    collect_submissions,
+    submission_key,
+    write_rejudge_results,
+)
+from ie_capstone.models import JudgeVerdict, Problem
+
+
+@pytest.fixture
+def problem():
+    return Problem(
+        id=1,
+        description="Write a search function",
+        buggy_code="def search(x, seq):\n  return 0",
+        bug_description="Always returns 0",
+        expected_fixes=["Replace `0` with `1` on line 2"],
+        unit_tests=[],
+        reference_solutions=["def search(x, seq):\n  return 1"],
+    )
+
+
+def write_session(logs_dir, name, codes):
+    attempts = [{"problem_id": 1, "final_code": code, "is_correct": False, "judge_scores": [0.0]} for code in codes]
+    path = logs_dir / f"{name}.json"
+    path.write_text(json.dumps({"session_id": name, "problem_attempts": attempts}), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def mock_client():
+    client = MagicMock()
+    client.model = "test-model"
+    return client
+
+
+class TestCollectSubmissions:
+    def test_deduplicates_ast_equivalent_code(self, tmp_path):
+        write_session(tmp_path, "a", ["def f():\n    return 2"])
+        write_session(tmp_path, "b", ["def f():  # same\n  return (2)", ""])
+        (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+
+        submissions = collect_submissions(tmp_path)
+
+        assert len(submissions) == 1
+
+    def test_key_depends_on_problem(self):
+        assert submission_key(1, "x = 1") != submission_key(2, "x = 1")
+
+
+class TestRejudgeState:
+    def test_state_survives_reload(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        state = RejudgeState(path)
+        state.record_batch("batch_1", ["k1"])
+        state.record_verdict("k0", JudgeVerdict(is_correct=True, scores=[1.0], decided_by="llm"))
+
+        reloaded = RejudgeState(path)
+
+        assert reloaded.pending_batches == {"batch_1": ["k1"]}
+        assert reloaded.verdicts["k0"].is_correct is True
+
+        reloaded.record_batch_done("batch_1")
+        assert RejudgeState(path).pending_batches == {}
+
+
+class TestBulkRejudger:
+    def test_batch_mode_submits_and_ingests(self, tmp_path, problem, mock_client):
+        write_session(tmp_path, "a", ["def search(x, seq):\n  return x"])
+        submissions = list(collect_submissions(tmp_path).values())
+        key = submissions[0].key
+        mock_client.create_batch.return_value = "batch_1"
+        mock_client.get_batch_status.return_value = "ended"
+        mock_client.iter_batch_results.return_value = [(f"{key}_0", "CORRECT"), (f"{key}_1", "INCORRECT")]
+        state = RejudgeState(tmp_path / "state.jsonl")
+
+        BulkRejudger(LLMJudge(mock_client), {1: problem}, state, iterations=2, poll_interval=0).run_batch(submissions)
+
+        requests = mock_client.create_batch.call_args.args[0]
+        assert [r["custom_id"] for r in requests] == [f"{key}_0", f"{key}_1"]
+        assert requests[0]["params"]["temperature"] == 0.3
+        assert state.verdicts[key].scores == [1.0, 0.0]
+        assert state.verdicts[key].is_correct is True
+        assert state.pending_batches == {}
+
+    def test_reference_matches_skip_batch(self, tmp_path, problem, mock_client):
+        write_session(tmp_path, "a", ["def search(x, seq):\n    return 1"])
+        submissions = list(collect_submissions(tmp_path).values())
+        state = RejudgeState(tmp_path / "state.jsonl")
+
+        BulkRejudger(LLMJudge(mock_client), {1: problem}, state).run_batch(submissions)
+
+        mock_client.create_batch.assert_not_called()
+        assert state.verdicts[submissions[0].key].decided_by == "reference_ast"
+
+    def test_resumes_pending_batch_without_resubmitting(self, tmp_path, problem, mock_client):
+        write_session(tmp_path, "a", ["def search(x, seq):\n  return x"])
+        submissions = list(collect_submissions(tmp_path).values())
+        key = submissions[0].key
+        state = RejudgeState(tmp_path / "state.jsonl")
+        state.record_batch("batch_old", [key])
+        mock_client.get_batch_status.return_value = "ended"
+        mock_client.iter_batch_results.return_value = [(f"{key}_0", "INCORRECT")]
+
+        BulkRejudger(LLMJudge(mock_client), {1: problem}, state, iterations=1, poll_interval=0).run_batch(submissions)
+
+        mock_client.create_batch.assert_not_called()
+        assert state.verdicts[key].is_correct is False
+
+    def test_errored_requests_leave_submission_unjudged(self, tmp_path, problem, mock_client):
+        write_session(tmp_path, "a", ["def search(x, seq):\n  return x"])
+        submissions = list(collect_submissions(tmp_path).values())
+        key = submissions[0].key
+        mock_client.create_batch.return_value = "batch_1"
+        mock_client.get_batch_status.return_value = "ended"
+        mock_client.iter_batch_results.return_value = [(f"{key}_0", "CORRECT"), (f"{key}_1", None)]
+        state = RejudgeState(tmp_path / "state.jsonl")
+
+        BulkRejudger(LLMJudge(mock_client), {1: problem}, state, iterations=2, poll_interval=0).run_batch(submissions)
+
+        assert key not in state.verdicts
+
+    def test_falls_back_to_direct_calls(self, tmp_path, problem, mock_client):
+        write_session(tmp_path, "a", ["def search(x, seq):\n  return x"])
+        submissions = list(collect_submissions(tmp_path).values())
+        mock_client.create_batch.side_effect = anthropic.APIConnectionError(request=MagicMock())
+        mock_client.send_single_message.return_value = "INCORRECT"
+        state = RejudgeState(tmp_path / "state.jsonl")
+
+        BulkRejudger(LLMJudge(mock_client), {1: problem}, state, iterations=3).run_batch(submissions)
+
+        assert mock_client.send_single_message.call_count == 3
+        assert state.verdicts[submissions[0].key].is_correct is False
+
+
+class TestWriteRejudgeResults:
+    def test_writes_alongside_original_scores(self, tmp_path):
+        path = write_session(tmp_path, "a", ["x = 1", "x = 2"])
+        verdicts = {submission_key(1, "x = 1"): JudgeVerdict(is_correct=True, scores=[1.0, 1.0], decided_by="llm")}
+
+        updated = write_rejudge_results(tmp_path, "v2", verdicts)
+
+        data = json.loads(path.read_text(encoding="utf-8"))
+        first, second = data["problem_attempts"]
+        assert updated == 1
+        assert first["judge_scores"] == [0.0]
+        assert first["rejudge"]["v2"]["judge_scores"] == [1.0, 1.0]
+        assert first["rejudge"]["v2"]["is_correct"] is True
+        assert "rejudge" not in second
@@ -0,0 +1,113 @@
+"""Tests for the cohort-wide tutor reply cache."""
+
+import pytest
+
+from ie_capstone.llm.response_cache import ResponseCache
+
+CODE = "def search(x, seq):\n  return 0"
+QUESTION = "3번 줄의 비교 연산자가 맞나요?"
+# Tutor prompt hash of the problem version the replies were given for
+VERSION = "prompt-v1"
+
+
+def store(cache, question=QUESTION, reply="무엇과 비교하고 있나요?", persona="neutral", turn_index=1, code=CODE):
+    cache.store(persona, 1, VERSION, turn_index, code, question, reply)
+
+
+class TestLookup:
+    def test_exact_question_hits(self):
+        cache = ResponseCache()
+        store(cache)
+        assert cache.lookup("neutral", 1, VERSION, 1, CODE, QUESTION) == "무엇과 비교하고 있나요?"
+        assert cache.hits == 1
+
+    def test_normalized_question_hits(self):
+        cache = ResponseCache()
+        store(cache)
+        assert cache.lookup("neutral", 1, VERSION, 1, CODE, "  3번 줄의 비교 연산자가 맞나요  ") is not None
+
+    def test_equivalent_code_hits(self):
+        cache = ResponseCache()
+        store(cache)
+        reformatted = "def search(x, seq):\n    return 0  # comment"
+        assert cache.lookup("neutral", 1, VERSION, 1, reformatted, QUESTION) is not None
+
+    def test_different_question_misses(self):
+        cache = ResponseCache()
+        store(cache)
+        assert cache.lookup("neutral", 1, VERSION, 1, CODE, "5번 줄은 언제 실행되나요?") is None
+        assert cache.misses == 1
+
+    def test_somewhat_similar_question_misses_at_strict_threshold(self):
+        cache = ResponseCache(threshold=0.9)
+        store(cache)
+        assert cache.lookup("neutral", 1, VERSION, 1, CODE, "3번 줄의 비교 연산자가 틀렸나요?") is None
+
+    @pytest.mark.parametrize(
+        "situation",
+        [
+            {"persona": "emotional"},
+            {"version": "edited"},
+            {"turn_index": 2},
+            {"code": "def search(x, seq):\n  return 1"},
+            {"code": None},
+        ],
+    )
+    def test_different_situation_misses(self, situation):
+        cache = ResponseCache()
+        store(cache)
+        lookup = {"persona": "neutral", "version": VERSION, "turn_index": 1, "code": CODE, **situation}
+        assert (
+            cache.lookup(lookup["persona"], 1, lookup["version"], lookup["turn_index"], lookup["code"], QUESTION)
+            is None
+        )
+
+    def test_best_match_wins(self):
+        cache = ResponseCache(threshold=0.5)
+        store(cache, question="3번 줄의 비교 연산자가 틀렸나요?", reply="far")
+        store(cache, reply="near")
+        assert cache.lookup("neutral", 1, VERSION, 1, CODE, QUESTION) == "near"
+
+
+class TestOptOut:
+    def test_disabled_persona_is_neither_stored_nor_served(self):
+        cache = ResponseCache(personas=("neutral",))
+        store(cache, persona="emotional")
+        assert len(cache) == 0
+        assert cache.lookup("emotional", 1, VERSION, 1, CODE, QUESTION) is None
+        assert cache.enabled_for("neutral")
+        assert not cache.enabled_for("emotional")
+
+    def test_empty_question_is_not_stored(self):
+        cache = ResponseCache()
+        store(cache, question="?!")
+        assert len(cache) == 0
+
+
+class TestEviction:
+    def test_least_recently_used_is_evicted(self):
+        cache = ResponseCache(max_size=2)
+        store(cache, turn_index=1, reply="first")
+        store(cache, turn_index=2, reply="second")
+        cache.lookup("neutral", 1, VERSION, 1, CODE, QUESTION)  # first becomes most recent
+        store(cache, turn_index=3, reply="third")
+
+        assert len(cache) == 2
+        assert cache.lookup("neutral", 1, VERSION, 1, CODE, QUESTION) == "first"
+        assert cache.lookup("neutral", 1, VERSION, 2, CODE, QUESTION) is None
+        assert cache._buckets  # Buckets of the evicted reply are cleaned up, the others stay
+        assert all(1 not in ids for ids in cache._buckets.values())  # "second" had ID 1
+
+    def test_discard_problems(self):
+        cache = ResponseCache()
+        store(cache, turn_index=1)
+        cache.store("neutral", 2, VERSION, 1, CODE, QUESTION, "other problem")
+
+        assert cache.discard_problems([1]) == 1
+        assert cache.lookup("neutral", 1, VERSION, 1, CODE, QUESTION) is None
+        assert cache.lookup("neutral", 2, VERSION, 1, CODE, QUESTION) == "other problem"
+        assert all(scope[1] == 2 for scope, _ in cache._buckets)
+
+    def test_bands_must_divide_permutations(self):
+        with pytest.raises(ValueError, match="bands must divide permutations"):
+            ResponseCache(permutations=64, bands=10)
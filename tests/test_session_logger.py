@@ -8,6 +8,7 @@ from pathlib import Path
 import pytest
 
 from ie_capstone.logging.session_logger import SessionLogger
+from ie_capstone.models import JudgeCall, LeakEvent
 
 
 @pytest.fixture
@@ -97,6 +98,87 @@ class TestSessionLogger:
         assert attempt.final_code == "def foo(): return 1"
         assert attempt.is_correct is True
         assert attempt.judge_scores == [1.0, 1.0, 1.0]
+        assert attempt.judge_decided_by == "llm"
+
+    def test_log_submission_leaves_verdict_pending(self, temp_logs_dir):
+        logger = SessionLogger(logs_dir=temp_logs_dir)
+        session = logger.create_session("P001", "neutral")
+
+        logger.log_submission(session, problem_id=1, final_code="def foo(): return 1")
+
+        attempt = session.problem_attempts[0]
+        assert attempt.final_code == "def foo(): return 1"
+        assert attempt.is_correct is None
+        assert session.success_rate == 0.0
+
+    def test_log_final_submission_records_decider(self, temp_logs_dir):
+        logger = SessionLogger(logs_dir=temp_logs_dir)
+        session = logger.create_session("P001", "neutral")
+
+        logger.log_final_submission(session, 1, "code", True, [1.0], decided_by="reference_ast")
+
+        result = logger._session_to_dict(session)
+        assert result["problem_attempts"][0]["judge_decided_by"] == "reference_ast"
+
+    def test_log_summary_is_saved_next_to_history(self, temp_logs_dir):
+        logger = SessionLogger(logs_dir=temp_logs_dir)
+        session = logger.create_session("P001", "neutral")
+
+        logger.log_message(session, problem_id=1, role="user", content="Test")
+        logger.log_summary(session, problem_id=1, summary="- 요약")
+
+        attempt = logger._session_to_dict(session)["problem_attempts"][0]
+        assert attempt["conversation_summary"] == "- 요약"
+        assert len(attempt["conversation_history"]) == 1
+
+    def test_leak_events_are_saved(self, temp_logs_dir):
+        logger = SessionLogger(logs_dir=temp_logs_dir)
+        session = logger.create_session("P001", "neutral")
+        event = LeakEvent(pattern="x<=seq", attempt=0, text="Write x <= seq", timestamp=datetime(2026, 1, 1))
+
+        logger.log_leak(session, problem_id=1, event=event)
+
+        attempt = logger._session_to_dict(session)["problem_attempts"][0]
+        assert attempt["leak_events"] == [
+            {"pattern": "x<=seq", "attempt": 0, "text": "Write x <= seq", "timestamp": "2026-01-01T00:00:00"}
+        ]
+
+    def test_prompt_hash_is_saved_with_each_message(self, temp_logs_dir):
+        logger = SessionLogger(logs_dir=temp_logs_dir)
+        session = logger.create_session("P001", "neutral")
+
+        logger.log_message(session, problem_id=1, role="assistant", content="안녕하십니까.", prompt_hash="abc123")
+        logger.log_message(session, problem_id=1, role="user", content="Test")
+
+        history = logger._session_to_dict(session)["problem_attempts"][0]["conversation_history"]
+        assert [msg["prompt_hash"] for msg in history] == ["abc123", ""]
+
+    def test_judge_calls_are_saved(self, temp_logs_dir):
+        logger = SessionLogger(logs_dir=temp_logs_dir)
+        session = logger.create_session("P001", "neutral")
+        call = JudgeCall(
+            stage="llm",
+            model="claude-test",
+            temperature=0.3,
+            response="CORRECT",
+            latency_seconds=1.5,
+            usage={"input_tokens": 500, "output_tokens": 2},
+        )
+
+        logger.log_final_submission(session, 1, "code", True, [1.0], judge_calls=[call])
+        logger.save_session(session)
+
+        loaded = logger.load_session(session.session_id)
+        assert loaded["problem_attempts"][0]["judge_calls"] == [
+            {
+                "stage": "llm",
+                "model": "claude-test",
+                "temperature": 0.3,
+                "response": "CORRECT",
+                "latency_seconds": 1.5,
+                "usage": {"input_tokens": 500, "output_tokens": 2},
+            }
+        ]
 
     def test_save_and_load_session(self, temp_logs_dir):
         logger = SessionLogger(logs_dir=temp_logs_dir)
@@ -0,0 +1,52 @@
+"""Tests for local n-gram similarity."""
+
+from ie_capstone.llm.similarity import MinHasher, char_ngrams, ngram_similarity, normalize_text
+
+
+class TestNormalizeText:
+    def test_lowercases_and_strips_punctuation(self):
+        assert normalize_text("  What's   WRONG?!  ") == "what s wrong"
+
+    def test_keeps_hangul(self):
+        assert normalize_text("이 코드 뭐가 문제인가요?") == "이 코드 뭐가 문제인가요"
+
+
+class TestNgramSimilarity:
+    def test_char_ngrams(self):
+        assert char_ngrams("abc") == {"ab", "bc"}
+        assert char_ngrams("a") == {"a"}
+        assert char_ngrams("?!") == set()
+
+    def test_identical_after_normalization(self):
+        assert ngram_similarity("Where is the bug?", "where is the bug") == 1.0
+
+    def test_close_paraphrase_scores_high(self):
+        assert ngram_similarity("이 코드 뭐가 문제인가요?", "이 코드에 뭐가 문제인가요") > 0.7
+
+    def test_different_question_scores_low(self):
+        assert ngram_similarity("버그가 어디에 있나요?", "3번 줄을 고치면 되나요?") < 0.3
+
+    def test_empty_text(self):
+        assert ngram_similarity("", "anything") == 0.0
+
+
+class TestMinHasher:
+    def test_signature_is_stable(self):
+        grams = char_ngrams("버그가 어디에 있나요?")
+        assert MinHasher(16).signature(grams) == MinHasher(16).signature(grams)
+
+    def test_signature_agreement_tracks_similarity(self):
+        hasher = MinHasher(128)
+        base = hasher.signature(char_ngrams("3번 줄의 비교 연산자가 맞나요?"))
+        near = hasher.signature(char_ngrams("3번 줄의 비교 연산자가 맞나요"))
+        far = hasher.signature(char_ngrams("재귀 함수는 언제 멈추나요?"))
+        agreement = [sum(x == y for x, y in zip(base, other, strict=True)) / 128 for other in (near, far)]
+        assert agreement[0] > 0.9
+        assert agreement[1] < 0.2
+
+    def test_bands(self):
+        bands = MinHasher(8).bands(tuple(range(8)), 4)
+        assert bands == [(0, 0, 1), (1, 2, 3), (2, 4, 5), (3, 6, 7)]
+
+    def test_empty_set(self):
+        assert MinHasher(4).signature(set()) == (0, 0, 0, 0)
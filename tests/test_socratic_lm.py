@@ -1,11 +1,16 @@
 """Tests for Socratic LM chatbot."""
 
+from dataclasses import replace
 from unittest.mock import MagicMock
 
 import pytest
 
+from ie_capstone.llm.leak_guard import StreamReset
+from ie_capstone.llm.openers import CANONICAL_OPENERS, OpeningBank, OpeningReply
+from ie_capstone.llm.prompts import LEAK_FALLBACK_REPLIES
+from ie_capstone.llm.response_cache import ResponseCache
 from ie_capstone.llm.socratic_lm import SocraticLM
-from ie_capstone.models import Problem
+from ie_capstone.models import DialogueTurn, Problem
 
 
 @pytest.fixture
@@ -139,6 +144,404 @@ class TestSocraticLM:
 
         mock_client.send_message.assert_called_once()
         call_kwargs = mock_client.send_message.call_args.kwargs
-        assert call_kwargs["system_prompt"] == slm.system_prompt
+        prefix, suffix = slm.prompt.prefix, slm.prompt.suffix
+        assert call_kwargs["system_prompt"] == [
+            {"type": "text", "text": prefix},
+            {"type": "text", "text": suffix},
+        ]
+        assert f"{prefix}\n\n{suffix}" == slm.system_prompt
         assert call_kwargs["temperature"] == 0.7
         assert len(call_kwargs["messages"]) == 1
+
+
+class TestBoundedContext:
+    def make_slm(self, sample_problem, mock_client, **kwargs):
+        mock_client.send_message.side_effect = [f"Question {i}?" for i in range(10)]
+        mock_client.send_single_message.return_value = "- 학생은 비교 연산자를 확인함"
+        return SocraticLM(mock_client, "neutral", sample_problem, context_turns=2, **kwargs)
+
+    def test_full_history_by_default(self, sample_problem, mock_client):
+        slm = SocraticLM(mock_client, "neutral", sample_problem)
+        for i in range(4):
+            slm.get_response(f"Turn {i}")
+        slm.wait_for_summary()
+
+        assert len(slm._get_conversation_for_api()) == 8
+        mock_client.send_single_message.assert_not_called()
+
+    def test_old_turns_are_folded_into_summary(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client)
+        slm.get_initial_greeting()
+        for i in range(3):
+            slm.get_response(f"Turn {i}")
+            slm.wait_for_summary()
+
+        api_messages = slm._get_conversation_for_api()
+        assert [msg["content"] for msg in api_messages if msg["role"] == "user"] == ["Turn 1", "Turn 2"]
+        assert api_messages[0]["role"] == "user"
+        assert slm.summary == "- 학생은 비교 연산자를 확인함"
+        assert len(slm.conversation_history) == 7  # Raw history is kept in full
+
+    def test_summary_uses_summary_model(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client)
+        for i in range(3):
+            slm.get_response(f"Turn {i}")
+        slm.wait_for_summary()
+
+        call_kwargs = mock_client.send_single_message.call_args.kwargs
+        assert call_kwargs["model"] == "claude-haiku-4-5-20251001"
+        assert "Turn 0" in call_kwargs["user_message"]
+        assert "Turn 2" not in call_kwargs["user_message"]
+
+    def test_summary_is_sent_as_system_block(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client)
+        for i in range(4):
+            slm.get_response(f"Turn {i}")
+            slm.wait_for_summary()
+
+        system_prompt = mock_client.send_message.call_args.kwargs["system_prompt"]
+        assert system_prompt[:2] == slm.prompt.system_blocks()
+        assert "cache_control" not in system_prompt[2]
+        assert "- 학생은 비교 연산자를 확인함" in system_prompt[2]["text"]
+
+    def test_failed_summary_keeps_turns_verbatim(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client)
+        mock_client.send_single_message.side_effect = RuntimeError("API down")
+        for i in range(3):
+            slm.get_response(f"Turn {i}")
+            slm.wait_for_summary()
+
+        assert slm.summary == ""
+        assert len(slm._get_conversation_for_api()) == 6
+
+    def test_on_summary_callback(self, sample_problem, mock_client):
+        summaries = []
+        slm = self.make_slm(sample_problem, mock_client, on_summary=lambda *args: summaries.append(args))
+        for i in range(3):
+            slm.get_response(f"Turn {i}")
+        slm.wait_for_summary()
+
+        assert summaries == [(1, "- 학생은 비교 연산자를 확인함")]
+
+    def test_set_problem_clears_summary(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client)
+        for i in range(3):
+            slm.get_response(f"Turn {i}")
+        slm.wait_for_summary()
+
+        slm.set_problem(sample_problem)
+
+        assert slm.summary == ""
+        assert slm._get_conversation_for_api() == []
+
+
+LONG_CODE = "\n".join([
+    "def search(x, seq):",
+    '    """Return the index where x belongs in the sorted sequence seq."""',
+    "    if not seq:",
+    "        return 0",
+    "    for i in range(len(seq)):",
+    "        if x < seq[i]:",
+    "            return i",
+    "    return len(seq)",
+    "",
+    "",
+    "print(search(5, [-1, 5]))",
+    "print(search(42, [1, 2, 3]))",
+])
+FIXED_CODE = LONG_CODE.replace("if x < seq[i]", "if x <= seq[i]")
+
+
+class TestCodeContext:
+    def make_slm(self, sample_problem, mock_client, code_context, **kwargs):
+        mock_client.send_message.side_effect = [f"Question {i}?" for i in range(10)]
+        mock_client.send_single_message.return_value = "- 요약"
+        return SocraticLM(mock_client, "neutral", sample_problem, code_context=code_context, **kwargs)
+
+    def sent_user_messages(self, mock_client):
+        messages = mock_client.send_message.call_args.kwargs["messages"]
+        return [msg["content"] for msg in messages if msg["role"] == "user"]
+
+    def test_full_mode_repeats_code(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client, "full")
+        slm.get_response("Turn 0", LONG_CODE)
+        slm.get_response("Turn 1", LONG_CODE)
+
+        assert all(LONG_CODE in content for content in self.sent_user_messages(mock_client))
+
+    def test_changed_mode_skips_unchanged_code(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client, "changed")
+        slm.get_response("Turn 0", LONG_CODE)
+        slm.get_response("Turn 1", LONG_CODE)
+
+        first, second = self.sent_user_messages(mock_client)
+        assert LONG_CODE in first
+        assert LONG_CODE not in second
+        assert "직전에 보여준 코드와 동일" in second
+        assert second.endswith("Turn 1")
+
+    def test_changed_mode_collapses_stale_code(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client, "changed")
+        slm.get_response("Turn 0", LONG_CODE)
+        slm.get_response("Turn 1", FIXED_CODE)
+
+        first, second = self.sent_user_messages(mock_client)
+        assert LONG_CODE not in first
+        assert "[학생의 이전 코드]" in first
+        assert first.endswith("Turn 0")
+        assert FIXED_CODE in second
+        # The raw history keeps every snapshot
+        assert LONG_CODE in slm.conversation_history[0].content
+
+    def test_diff_mode_sends_changes(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client, "diff")
+        slm.get_response("Turn 0", LONG_CODE)
+        slm.get_response("Turn 1", FIXED_CODE)
+
+        first, second = self.sent_user_messages(mock_client)
+        assert LONG_CODE in first  # The diff's base stays visible
+        assert "-   6         if x < seq[i]:" in second
+        assert "+             if x <= seq[i]:" in second
+        assert len(second) < len(FIXED_CODE)
+
+    def test_diff_mode_falls_back_to_full_code_on_rewrite(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client, "diff")
+        rewrite = "def search(x, seq):\n    return sum(1 for y in seq if y < x)"
+        slm.get_response("Turn 0", LONG_CODE)
+        slm.get_response("Turn 1", rewrite)
+
+        first, second = self.sent_user_messages(mock_client)
+        assert rewrite in second
+        assert "[학생의 이전 코드]" in first
+
+    def test_summarized_snapshot_is_resent(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client, "diff", context_turns=1)
+        slm.get_response("Turn 0", LONG_CODE)
+        slm.get_response("Turn 1", LONG_CODE)
+        slm.wait_for_summary()
+        slm.get_response("Turn 2", FIXED_CODE)
+
+        # Turn 0 holding the full program was summarized away, so the diff would have no base
+        assert self.sent_user_messages(mock_client)[-1].startswith("[학생의 현재 코드]")
+        assert FIXED_CODE in self.sent_user_messages(mock_client)[-1]
+
+    def test_reset_forgets_seen_code(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client, "changed")
+        slm.get_response("Turn 0", LONG_CODE)
+        slm.reset_conversation()
+        slm.get_response("Turn 1", LONG_CODE)
+
+        assert LONG_CODE in self.sent_user_messages(mock_client)[0]
+
+    def test_unknown_mode(self, sample_problem, mock_client):
+        with pytest.raises(ValueError, match="Unknown code context mode"):
+            SocraticLM(mock_client, "neutral", sample_problem, code_context="patch")
+
+
+class TestOpeningBank:
+    def make_slm(self, sample_problem, mock_client):
+        bank = OpeningBank([
+            OpeningReply("neutral", 1, "x와 seq[i]가 같을 때는 어떻게 됩니까?", list(CANONICAL_OPENERS), vetted=True)
+        ])
+        return SocraticLM(mock_client, "neutral", sample_problem, opening_bank=bank)
+
+    def test_matching_first_message_skips_model(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client)
+        slm.get_initial_greeting()
+        response = slm.get_response("이 코드에 뭐가 문제인가요", sample_problem.buggy_code)
+
+        assert response == "x와 seq[i]가 같을 때는 어떻게 됩니까?"
+        mock_client.send_message.assert_not_called()
+        assert [msg.role for msg in slm.conversation_history] == ["assistant", "user", "assistant"]
+
+    def test_banked_reply_is_streamed_locally(self, sample_problem, mock_client, monkeypatch):
+        monkeypatch.setattr("ie_capstone.llm.socratic_lm.OPENING_STREAM_DELAY", 0)
+        slm = self.make_slm(sample_problem, mock_client)
+        chunks = list(slm.stream_response("버그가 어디에 있나요?"))
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == "x와 seq[i]가 같을 때는 어떻게 됩니까?"
+        mock_client.stream_message.assert_not_called()
+        assert slm.conversation_history[-1].content == "".join(chunks)
+
+    def test_later_turns_use_model(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client)
+        slm.get_response("버그가 어디에 있나요?")
+        slm.get_response("버그가 어디에 있나요?")
+
+        mock_client.send_message.assert_called_once()
+
+    def test_unmatched_first_message_uses_model(self, sample_problem, mock_client):
+        slm = self.make_slm(sample_problem, mock_client)
+        slm.get_response("3번 줄을 <=로 바꾸면 되나요?")
+
+        mock_client.send_message.assert_called_once()
+
+
+class TestResponseCache:
+    def test_repeated_question_is_served_from_cache(self, sample_problem, mock_client, monkeypatch):
+        monkeypatch.setattr("ie_capstone.llm.socratic_lm.OPENING_STREAM_DELAY", 0)
+        cache = ResponseCache()
+        first = SocraticLM(mock_client, "neutral", sample_problem, response_cache=cache)
+        second = SocraticLM(mock_client, "neutral", sample_problem, response_cache=cache)
+
+        first.get_response("3번 줄이 왜 틀렸나요?", sample_problem.buggy_code)
+        chunks = list(second.stream_response("3번 줄이 왜 틀렸나요", sample_problem.buggy_code))
+
+        mock_client.send_message.assert_called_once()
+        mock_client.stream_message.assert_not_called()
+        assert "".join(chunks) == mock_client.send_message.return_value
+        assert second.conversation_history[-1].content == mock_client.send_message.return_value
+
+    def test_edited_problem_does_not_reuse_old_version_replies(self, sample_problem, mock_client):
+        cache = ResponseCache()
+        old = SocraticLM(mock_client, "neutral", sample_problem, response_cache=cache)
+        edited = SocraticLM(
+            mock_client, "neutral", replace(sample_problem, bug_description="Edited"), response_cache=cache
+        )
+
+        # A session still on the old version keeps filling the cache after the edit
+        old.get_response("3번 줄이 왜 틀렸나요?", sample_problem.buggy_code)
+        edited.get_response("3번 줄이 왜 틀렸나요?", sample_problem.buggy_code)
+
+        assert mock_client.send_message.call_count == 2
+
+    def test_streamed_reply_is_cached(self, sample_problem, mock_client):
+        mock_client.stream_message.return_value = iter(["Why ", "there?"])
+        cache = ResponseCache()
+        slm = SocraticLM(mock_client, "neutral", sample_problem, response_cache=cache)
+        list(slm.stream_response("3번 줄이 왜 틀렸나요?"))
+
+        assert cache.lookup("neutral", 1, slm.prompt.hash, 0, None, "3번 줄이 왜 틀렸나요?") == "Why there?"
+
+    def test_later_turn_does_not_reuse_first_turn_reply(self, sample_problem, mock_client):
+        cache = ResponseCache()
+        slm = SocraticLM(mock_client, "neutral", sample_problem, response_cache=cache)
+        slm.get_response("3번 줄이 왜 틀렸나요?")
+        slm.get_response("3번 줄이 왜 틀렸나요?")
+
+        assert mock_client.send_message.call_count == 2
+
+
+class TestLeakGuard:
+    @pytest.fixture
+    def leak_problem(self, sample_problem):
+        sample_problem.expected_fixes = ["Replace `<` with `<=` on line 3"]
+        return sample_problem
+
+    def test_leaking_stream_is_cut_and_regenerated(self, leak_problem, mock_client):
+        events = []
+        mock_client.stream_message.side_effect = [
+            iter(["Just write ", "if x <= ", "seq[i] and it works."]),
+            iter(["What should happen ", "when x equals seq[i]?"]),
+        ]
+        slm = SocraticLM(mock_client, "neutral", leak_problem, on_leak=lambda *args: events.append(args))
+        chunks = list(slm.stream_response("Help"))
+
+        reset = chunks.index(StreamReset())
+        assert isinstance(chunks[reset], StreamReset)
+        assert "".join(chunks[:reset]) == "Just write if "
+        assert "".join(chunks[reset + 1 :]) == "What should happen when x equals seq[i]?"
+        assert slm.conversation_history[-1].content == "What should happen when x equals seq[i]?"
+        assert [(problem_id, event.pattern, event.attempt) for problem_id, event in events] == [(1, "x<=seq", 0)]
+        retry_system = mock_client.stream_message.call_args.kwargs["system_prompt"]
+        assert "정답 수정 내용" in retry_system[-1]["text"]
+
+    def test_repeated_leak_falls_back_to_generic_question(self, leak_problem, mock_client):
+        mock_client.stream_message.side_effect = [iter(["x <= seq[i]"]), iter(["use x<=seq[i]"])]
+        slm = SocraticLM(mock_client, "neutral", leak_problem)
+        chunks = list(slm.stream_response("Help"))
+
+        assert chunks[-1] == LEAK_FALLBACK_REPLIES["neutral"]
+        assert slm.conversation_history[-1].content == LEAK_FALLBACK_REPLIES["neutral"]
+        assert mock_client.stream_message.call_count == 2
+
+    def test_non_streaming_reply_is_checked(self, leak_problem, mock_client):
+        mock_client.send_message.side_effect = ["Change it to x <= seq[i].", "Which comparison is used on line 3?"]
+        slm = SocraticLM(mock_client, "neutral", leak_problem)
+
+        assert slm.get_response("Help") == "Which comparison is used on line 3?"
+
+    def test_quoting_the_students_own_fix_is_not_a_leak(self, leak_problem, mock_client):
+        mock_client.stream_message.return_value = iter(["You wrote ", "if x <= seq[i]. ", "What does it return for 5?"])
+        fixed = leak_problem.buggy_code.replace("x < seq[i]", "x <= seq[i]")
+        slm = SocraticLM(mock_client, "neutral", leak_problem)
+        chunks = list(slm.stream_response("Is this right?", fixed))
+
+        assert "".join(chunks) == "You wrote if x <= seq[i]. What does it return for 5?"
+        assert mock_client.stream_message.call_count == 1
+
+    def test_non_streaming_reply_may_quote_the_students_fix(self, leak_problem, mock_client):
+        mock_client.send_message.return_value = "You changed it to x <= seq[i]."
+        fixed = leak_problem.buggy_code.replace("x < seq[i]", "x <= seq[i]")
+        slm = SocraticLM(mock_client, "neutral", leak_problem)
+
+        assert slm.get_response("Is this right?", fixed) == "You changed it to x <= seq[i]."
+
+    def test_guard_can_be_disabled(self, leak_problem, mock_client):
+        mock_client.send_message.return_value = "Change it to x <= seq[i]."
+        slm = SocraticLM(mock_client, "neutral", leak_problem, leak_guard=False)
+
+        assert slm.get_response("Help") == "Change it to x <= seq[i]."
+
+
+class TestExemplars:
+    @pytest.fixture
+    def dialogue_problem(self, sample_problem):
+        sample_problem.dialogue = [
+            DialogueTurn("user", "My code fails the first test."),
+            DialogueTurn("assistant", "Why should the first test return 1?", alternatives=["Which test fails?"]),
+            DialogueTurn("user", "Because 5 is at position 1."),
+            DialogueTurn("assistant", "What happens on line 3 when `i` is 1?"),
+        ]
+        return sample_problem
+
+    def test_relevant_exchange_follows_persona_block(self, dialogue_problem, mock_client):
+        slm = SocraticLM(mock_client, "neutral", dialogue_problem, exemplars=1)
+        slm.get_response("3번 줄은 왜 그런가요?")
+
+        system_prompt = mock_client.send_message.call_args.kwargs["system_prompt"]
+        assert system_prompt[:2] == slm.prompt.system_blocks()
+        assert "cache_control" not in system_prompt[2]
+        assert "What happens on line 3" in system_prompt[2]["text"]
+        assert "first test" not in system_prompt[2]["text"]
+
+    def test_exemplars_change_with_the_message(self, dialogue_problem, mock_client):
+        slm = SocraticLM(mock_client, "neutral", dialogue_problem, exemplars=1)
+        slm.get_response("first test가 실패해요")
+        first = mock_client.send_message.call_args.kwargs["system_prompt"][2]["text"]
+        slm.get_response("3번 줄이요?")
+        second = mock_client.send_message.call_args.kwargs["system_prompt"][2]["text"]
+
+        assert "Which test fails?" in first
+        assert "line 3" in second and "Which test fails?" not in second
+
+    def test_streamed_reply_uses_exemplars(self, dialogue_problem, mock_client):
+        mock_client.stream_message.return_value = iter(["Question?"])
+        slm = SocraticLM(mock_client, "neutral", dialogue_problem, exemplars=2)
+        list(slm.stream_response("도와주세요"))
+
+        system_prompt = mock_client.stream_message.call_args.kwargs["system_prompt"]
+        assert "My code fails the first test." in system_prompt[2]["text"]
+
+    def test_disabled_by_default(self, dialogue_problem, mock_client):
+        slm = SocraticLM(mock_client, "neutral", dialogue_problem)
+        slm.get_response("3번 줄은 왜 그런가요?")
+
+        assert len(mock_client.send_message.call_args.kwargs["system_prompt"]) == 2
+
+    def test_set_problem_without_dialogue_drops_exemplars(self, dialogue_problem, mock_client):
+        slm = SocraticLM(mock_client, "neutral", dialogue_problem, exemplars=1)
+        slm.get_response("3번 줄은 왜 그런가요?")
+        other = Problem(
+            id=2,
+            description="Other",
+            buggy_code="def f(): pass",
+            bug_description="Bug",
+            expected_fixes=["Fix"],
+            unit_tests=[],
+        )
+        slm.set_problem(other)
+        slm.get_response("3번 줄은 왜 그런가요?")
+
+        assert len(mock_client.send_message.call_args.kwargs["system_prompt"]) == 2
@@ -0,0 +1,93 @@
+"""Tests for the memory-mapped problem store."""
+
+import pickle
+
+import pytest
+
+from ie_capstone.dataset.parser import load_all_problems
+from ie_capstone.dataset.store import ProblemStore, StoredProblem, write_store
+from ie_capstone.models import Problem
+
+
+@pytest.fixture
+def problems():
+    return load_all_problems(use_cache=False)
+
+
+@pytest.fixture
+def store(tmp_path, problems):
+    path = tmp_path / "problems.store"
+    write_store(path, problems)
+    store = ProblemStore(path)
+    yield store
+    store.close()
+
+
+def _problem(problem_id):
+    return Problem(
+        id=problem_id,
+        description=f"Problem {problem_id}",
+        buggy_code="def f(): pass",
+        bug_description="Bug",
+        expected_fixes=["Fix"],
+        unit_tests=[],
+    )
+
+
+class TestProblemStore:
+    def test_roundtrip(self, store, problems):
+        assert [stored.to_problem() for stored in store] == problems
+
+    def test_lookup_by_id(self, store, problems):
+        for problem in problems:
+            assert store[problem.id].buggy_code == problem.buggy_code
+            assert store[problem.id].dialogue == problem.dialogue
+
+    def test_missing_id(self, store):
+        assert store.get(999) is None
+        assert 999 not in store
+        with pytest.raises(KeyError):
+            store[999]
+
+    def test_len_and_ids(self, store, problems):
+        assert len(store) == len(problems)
+        assert store.ids() == [problem.id for problem in problems]
+
+    def test_fields_are_decoded_on_access(self, store):
+        stored = store[1]
+        assert isinstance(stored, StoredProblem)
+        assert not hasattr(stored, "__dict__")
+        assert stored.description == stored.description
+        assert stored.description is not stored.description
+
+    def test_many_colliding_ids(self, tmp_path):
+        ids = [i * 1024 for i in range(500)] + [10**12 + i for i in range(500)]
+        path = tmp_path / "many.store"
+        assert write_store(path, (_problem(i) for i in ids)) == len(ids)
+        store = ProblemStore(path)
+        assert all(store[i].description == f"Problem {i}" for i in ids)
+        assert 1 not in store
+
+    def test_empty_store(self, tmp_path):
+        path = tmp_path / "empty.store"
+        write_store(path, [])
+        store = ProblemStore(path)
+        assert len(store) == 0
+        assert store.get(1) is None
+
+    def test_duplicate_ids_are_rejected(self, tmp_path):
+        path = tmp_path / "duplicate.store"
+        with pytest.raises(ValueError, match="Duplicate"):
+            write_store(path, [_problem(1), _problem(1)])
+        assert list(tmp_path.iterdir()) == []
+
+    def test_not_a_store(self, tmp_path):
+        path = tmp_path / "problems.json"
+        path.write_text("{}" * 40, encoding="utf-8")
+        with pytest.raises(ValueError, match="Not a problem store"):
+            ProblemStore(path)
+
+    def test_pickled_store_reopens_the_file(self, store):
+        copy = pickle.loads(pickle.dumps(store))  # noqa: S301
+        assert copy.path == store.path
+        assert copy[2].description == store[2].description
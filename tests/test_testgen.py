@@ -0,0 +1,79 @@
+"""Tests for offline unit-test generation."""
+
+from ie_capstone.config import TREEINSTRUCT_DATA_DIR
+from ie_capstone.dataset.parser import load_all_problems
+from ie_capstone.dataset.testgen import (
+    boundary_variants,
+    extract_examples,
+    find_entry_point,
+    generate_unit_tests,
+    unit_tests_path_for,
+)
+from ie_capstone.grading.runner import run_unit_tests
+
+PALINDROME_REFERENCE = """class Solution:
+    def isPalindrome(self, x):
+        if x < 0:
+            return False
+        return str(x) == str(x)[::-1]"""
+
+
+class TestExtractExamples:
+    def test_single_line_examples(self):
+        description = "예시 1:\n입력: 121\n출력: true\n\n예시 2:\n입력: -121\n출력: false\n설명: 회문이 아닙니다."
+        assert extract_examples(description) == [(121, True), (-121, False)]
+
+    def test_named_input(self):
+        assert extract_examples("입력: nums = [2,3,1,1,4]\n출력: 2") == [([2, 3, 1, 1, 4], 2)]
+
+    def test_multiline_input(self):
+        description = "입력:\n[[0,1],\n [1,1]]\n출력: 8"
+        assert extract_examples(description) == [([[0, 1], [1, 1]], 8)]
+
+    def test_non_literal_example_skipped(self):
+        assert extract_examples("입력: some text\n출력: 3") == []
+
+
+class TestFindEntryPoint:
+    def test_solution_class(self):
+        assert find_entry_point(PALINDROME_REFERENCE) == "Solution().isPalindrome"
+
+    def test_plain_function(self):
+        assert find_entry_point("def search(x, seq):\n    return 0") == "search"
+
+
+class TestBoundaryVariants:
+    def test_int(self):
+        assert 0 in boundary_variants(121)
+
+    def test_grid_transpose(self):
+        assert boundary_variants([[0, 1, 1], [1, 0, 0]]) == [[[0, 1], [1, 0], [1, 0]]]
+
+    def test_bool_has_no_variants(self):
+        assert boundary_variants(True) == []
+
+
+class TestGenerateUnitTests:
+    def test_expected_values_from_reference(self):
+        description = "입력: 121\n출력: true\n입력: 10\n출력: false"
+        tests = generate_unit_tests(description, PALINDROME_REFERENCE)
+        assert "assert Solution().isPalindrome(121) == True" in tests
+        assert "assert Solution().isPalindrome(10) == False" in tests
+        assert "assert Solution().isPalindrome(0) == True" in tests
+
+    def test_example_disagreeing_with_reference_is_dropped(self):
+        tests = generate_unit_tests("입력: 121\n출력: false", PALINDROME_REFERENCE, include_variants=False)
+        assert tests == []
+
+
+class TestGeneratedDatasetTests:
+    def test_tests_file_naming(self):
+        path = unit_tests_path_for(TREEINSTRUCT_DATA_DIR / "9-palindrome-number.py.txt")
+        assert path.name == "9-palindrome-number.py.tests"
+
+    def test_generated_tests_pass_on_references_and_fail_on_buggy_code(self):
+        for problem in load_all_problems():
+            if problem.id < 4:
+                continue
+            assert run_unit_tests(problem.reference_solutions[0], problem.unit_tests).passed
+            assert not run_unit_tests(problem.buggy_code, problem.unit_tests).passed